@@ -0,0 +1,280 @@
+# benchmarks/bench_servicios.py - BENCHMARK DE SERVICIOS SIN INTERFAZ
+# Uso:
+#   python benchmarks/bench_servicios.py --pedidos 100000 --salida resultados.json
+#   python benchmarks/bench_servicios.py --pedidos 1000000 --modo cluster --comparar base.json
+"""
+Mide latencia y throughput de operaciones de PedidoService, CocinaService,
+CajaService y TicketService contra una base sembrada y desechable
+(benchmarks/entorno.py + benchmarks/semilla.py).
+
+La salida JSON incluye los parámetros de siembra, la versión (git) y, por
+operación, n, ops/s y p50/p95/p99/máx en ms, más las métricas por consulta de
+PostgreSQLService. Con --comparar se marca como regresión todo p95 que empeore
+más de --tolerancia % respecto a un resultado anterior (código de salida 1).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import psycopg2
+
+from benchmarks.entorno import EntornoBench
+from benchmarks.semilla import SembradorBench
+from services.database_service import METRICAS
+from services.pedido_service import PedidoService
+from services.cocina_service import CocinaService
+from services.caja_service import CajaService
+from services.ticket_service import TicketService
+from services.auditoria_service import AuditoriaService
+from utils.logger import obtener_logger, cambiar_nivel, detener_logging
+
+log = obtener_logger(__name__)
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(p * len(ordenados)), len(ordenados) - 1)]
+
+
+class ContextoBench:
+    """Servicios, generador aleatorio y ids de trabajo compartidos por las operaciones"""
+
+    def __init__(self, db, semilla: int):
+        self.db = db
+        self.rng = random.Random(semilla)
+        self.pedidos = PedidoService(db)
+        self.cocina = CocinaService(db)
+        self.caja = CajaService(db)
+        self.tickets = TicketService(db)
+
+        conn = psycopg2.connect(**db.conn_params)
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, precio FROM productos WHERE activo = TRUE")
+            self.productos = cur.fetchall()
+            cur.execute("SELECT id FROM empleados WHERE rol = 'mesero'")
+            self.meseros = [r[0] for r in cur.fetchall()]
+            cur.execute("SELECT MIN(id), MAX(id) FROM pedidos WHERE estado = 'entregado'")
+            self.rango_historico = cur.fetchone()
+        conn.close()
+
+        # Pedidos creados por el benchmark, en cola para las operaciones que los consumen
+        self.para_cocina: List[int] = []
+        self.para_cobrar: List[int] = []
+        self.para_dividir: List[int] = []
+
+    def pedido_historico(self) -> int:
+        return self.rng.randint(*self.rango_historico)
+
+    def crear_pedido(self) -> int:
+        pedido_id = self.pedidos.crear_pedido(str(self.rng.randint(1, 20)), self.rng.choice(self.meseros))
+        for _ in range(3):
+            producto_id, precio = self.rng.choice(self.productos)
+            self.pedidos.agregar_item_pedido(pedido_id, producto_id, self.rng.randint(1, 3), float(precio))
+        return pedido_id
+
+
+# ========== OPERACIONES ==========
+# nombre → (servicio, función(ctx)); las que consumen pedidos los preparan en 'preparar'
+def _op_crear_pedido(ctx: ContextoBench):
+    pedido_id = ctx.crear_pedido()
+    ctx.para_cocina.append(pedido_id)
+
+def _op_cambiar_estado(ctx: ContextoBench):
+    ctx.pedidos.cambiar_estado_pedido(ctx.para_cocina.pop(), 'preparacion', ctx.rng.choice(ctx.meseros))
+
+def _op_cocina_listo(ctx: ContextoBench):
+    pedido_id = ctx.para_cocina.pop()
+    ctx.cocina.cambiar_estado_pedido(pedido_id, 'listo')
+    ctx.para_cobrar.append(pedido_id)
+
+def _op_registrar_pago(ctx: ContextoBench):
+    pedido_id = ctx.para_cobrar.pop()
+    ctx.caja.registrar_pago(pedido_id, ctx.rng.choice(ctx.meseros), 100.0,
+                            ctx.rng.choice(['efectivo', 'tarjeta', 'transferencia']))
+
+def _op_ticket_parcial(ctx: ContextoBench):
+    pedido_id = ctx.para_dividir.pop()
+    estado = ctx.tickets.estado_cobro(pedido_id)
+    linea = estado['lineas'][0]
+    ctx.tickets.crear_ticket_parcial(pedido_id, [{
+        'item_pedido_id': linea['item_pedido_id'],
+        'cantidad': 1,
+        'precio_unitario': linea['precio_unitario']
+    }], 'efectivo', ctx.rng.choice(ctx.meseros))
+
+OPERACIONES: Dict[str, tuple] = {
+    'pedido.crear_con_items': ('PedidoService', _op_crear_pedido),
+    'pedido.obtener_pedido_por_id': ('PedidoService', lambda ctx: ctx.pedidos.obtener_pedido_por_id(ctx.pedido_historico())),
+    'pedido.obtener_items_pedido': ('PedidoService', lambda ctx: ctx.pedidos.obtener_items_pedido(ctx.pedido_historico())),
+    'pedido.cambiar_estado_pedido': ('PedidoService', _op_cambiar_estado),
+    'cocina.obtener_pedidos_activos': ('CocinaService', lambda ctx: ctx.cocina.obtener_pedidos_activos()),
+    'cocina.cambiar_estado_pedido': ('CocinaService', _op_cocina_listo),
+    'caja.obtener_pedidos_pendientes_pago': ('CajaService', lambda ctx: ctx.caja.obtener_pedidos_pendientes_pago()),
+    'caja.registrar_pago': ('CajaService', _op_registrar_pago),
+    'caja.obtener_ventas_dia': ('CajaService', lambda ctx: ctx.caja.obtener_ventas_dia()),
+    'caja.generar_reporte_cierre': ('CajaService', lambda ctx: ctx.caja.generar_reporte_cierre(ctx.meseros[0])),
+    'caja.obtener_historial_cierres': ('CajaService', lambda ctx: ctx.caja.obtener_historial_cierres(30)),
+    'ticket.estado_cobro': ('TicketService', lambda ctx: ctx.tickets.estado_cobro(ctx.pedido_historico())),
+    'ticket.estado_cobro_abiertos': ('TicketService', lambda ctx: ctx.tickets.estado_cobro_abiertos()),
+    'ticket.crear_ticket_parcial': ('TicketService', _op_ticket_parcial),
+}
+
+# Pedidos que hay que crear antes de medir cada operación consumidora
+PREPARAR: Dict[str, Callable[[ContextoBench, int], None]] = {
+    'pedido.cambiar_estado_pedido': lambda ctx, n: ctx.para_cocina.extend(ctx.crear_pedido() for _ in range(n)),
+    'cocina.cambiar_estado_pedido': lambda ctx, n: ctx.para_cocina.extend(ctx.crear_pedido() for _ in range(n)),
+    'caja.registrar_pago': lambda ctx, n: ctx.para_cobrar.extend(ctx.crear_pedido() for _ in range(n)),
+    'ticket.crear_ticket_parcial': lambda ctx, n: ctx.para_dividir.extend(ctx.crear_pedido() for _ in range(n)),
+}
+
+
+def medir(ctx: ContextoBench, nombre: str, repeticiones: int, calentamiento: int) -> Dict:
+    servicio, funcion = OPERACIONES[nombre]
+    if nombre in PREPARAR:
+        ctx.para_cocina.clear(); ctx.para_cobrar.clear(); ctx.para_dividir.clear()
+        PREPARAR[nombre](ctx, repeticiones + calentamiento)
+
+    for _ in range(calentamiento):
+        funcion(ctx)
+
+    tiempos = []
+    errores = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        try:
+            funcion(ctx)
+        except Exception as e:
+            errores += 1
+            log.error("❌ %s: %s", nombre, e)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - inicio
+
+    resultado = {
+        'operacion': nombre,
+        'servicio': servicio,
+        'n': repeticiones,
+        'errores': errores,
+        'total_s': round(total, 3),
+        'ops_s': round(repeticiones / total, 1) if total else 0.0,
+        'media_ms': round(sum(tiempos) / len(tiempos), 3) if tiempos else 0.0,
+        'p50_ms': round(percentil(tiempos, 0.50), 3),
+        'p95_ms': round(percentil(tiempos, 0.95), 3),
+        'p99_ms': round(percentil(tiempos, 0.99), 3),
+        'max_ms': round(max(tiempos), 3) if tiempos else 0.0
+    }
+    log.info("⏱️ %-38s %8.1f ops/s  p50 %7.2f  p95 %7.2f  p99 %7.2f ms",
+             nombre, resultado['ops_s'], resultado['p50_ms'], resultado['p95_ms'], resultado['p99_ms'])
+    return resultado
+
+
+def version_git() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def comparar(actual: Dict, base_ruta: str, tolerancia: float) -> List[Dict]:
+    """Operaciones cuyo p95 empeoró más de 'tolerancia' % respecto a la base"""
+    with open(base_ruta, 'r', encoding='utf-8') as f:
+        base = {r['operacion']: r for r in json.load(f)['resultados']}
+
+    regresiones = []
+    for r in actual['resultados']:
+        anterior = base.get(r['operacion'])
+        if not anterior or not anterior['p95_ms']:
+            continue
+        cambio = (r['p95_ms'] - anterior['p95_ms']) / anterior['p95_ms'] * 100
+        marca = "🔴" if cambio > tolerancia else ("🟢" if cambio < -tolerancia else "⚪")
+        log.info("%s %-38s p95 %7.2f → %7.2f ms (%+.1f%%)", marca, r['operacion'],
+                 anterior['p95_ms'], r['p95_ms'], cambio)
+        if cambio > tolerancia:
+            regresiones.append({'operacion': r['operacion'], 'antes_ms': anterior['p95_ms'],
+                                'despues_ms': r['p95_ms'], 'cambio_pct': round(cambio, 1)})
+    return regresiones
+
+
+def ejecutar(args) -> Dict:
+    volumen = {
+        'pedidos': args.pedidos, 'productos': args.productos, 'empleados': args.empleados,
+        'items_por_pedido': args.items_por_pedido, 'dias': args.dias, 'abiertos': args.abiertos
+    }
+
+    with EntornoBench(args.modo, conservar=args.conservar) as entorno:
+        conteos = SembradorBench(entorno.db, args.semilla).sembrar(**volumen)
+
+        ctx = ContextoBench(entorno.db, args.semilla)
+        METRICAS.reiniciar()
+
+        operaciones = args.operaciones or list(OPERACIONES)
+        resultados = [medir(ctx, nombre, args.repeticiones, args.calentamiento) for nombre in operaciones]
+
+        # La auditoría escribe en segundo plano: vaciarla antes de borrar la base
+        AuditoriaService.instancia(entorno.db).detener()
+
+    return {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'git': version_git(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'modo': args.modo,
+            'semilla': args.semilla,
+            'repeticiones': args.repeticiones,
+            'volumen': volumen,
+            'filas': conteos
+        },
+        'resultados': resultados,
+        'consultas': METRICAS.resumen()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de servicios del POS sobre una base sembrada")
+    parser.add_argument('--modo', choices=EntornoBench.MODOS, default='esquema')
+    parser.add_argument('--pedidos', type=int, default=100_000)
+    parser.add_argument('--productos', type=int, default=60)
+    parser.add_argument('--empleados', type=int, default=12)
+    parser.add_argument('--items-por-pedido', type=int, default=3)
+    parser.add_argument('--dias', type=int, default=90)
+    parser.add_argument('--abiertos', type=int, default=200)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--calentamiento', type=int, default=10)
+    parser.add_argument('--operaciones', nargs='*', choices=list(OPERACIONES))
+    parser.add_argument('--salida', default='resultados_bench.json')
+    parser.add_argument('--comparar', help="JSON de una ejecución anterior")
+    parser.add_argument('--tolerancia', type=float, default=15.0, help="%% de empeoramiento de p95 tolerado")
+    parser.add_argument('--conservar', action='store_true', help="No borrar la base al terminar")
+    args = parser.parse_args()
+
+    # El detalle por llamada de los servicios distorsiona la medición
+    cambiar_nivel('WARNING', 'services')
+
+    resultado = ejecutar(args)
+
+    regresiones = []
+    if args.comparar:
+        regresiones = comparar(resultado, args.comparar, args.tolerancia)
+        resultado['regresiones'] = regresiones
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False, default=str)
+    log.info("📄 Resultados guardados en %s", args.salida)
+    detener_logging()
+
+    sys.exit(1 if regresiones else 0)
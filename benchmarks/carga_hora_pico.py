@@ -0,0 +1,409 @@
+# benchmarks/carga_hora_pico.py - SIMULADOR DE HORA PICO CON VARIAS TERMINALES
+# Uso:
+#   python benchmarks/carga_hora_pico.py --meseros 8 --cocinas 2 --cajas 2 --duracion 120
+#   python benchmarks/carga_hora_pico.py --meseros 30 --pensar-mesero 2 --salida carga.json
+"""
+Simula N terminales concurrentes (un hilo por terminal, sin Kivy) que hacen los
+flujos reales del restaurante con los servicios:
+
+- mesero: toma un pedido (PedidoService.crear_pedido + agregar_item_pedido) y, a
+  veces, agrega una ronda más (agregar_productos_pedido_abierto).
+- cocina: consulta la pantalla (CocinaService.obtener_pedidos_activos) y avanza un
+  pedido pendiente → preparacion → listo.
+- caja: consulta pedidos listos (CajaService.obtener_pedidos_pendientes_pago) y
+  cobra; una fracción se divide con TicketService antes de cerrar.
+
+Cada terminal espera un tiempo de "pensar" exponencial entre acciones. Los pedidos
+se reparten por id entre las terminales de cocina y de caja para que dos terminales
+no trabajen el mismo pedido.
+
+El reporte JSON trae throughput por flujo, percentiles por acción y las conexiones
+a PostgreSQL vistas en pg_stat_activity (por estado, muestreadas cada segundo) más
+las sesiones abiertas en total, que con una conexión por llamada es el costo real.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import abc
+import argparse
+import json
+import platform
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import psycopg2
+
+from benchmarks.entorno import EntornoBench
+from benchmarks.semilla import SembradorBench
+from benchmarks.bench_servicios import percentil, version_git
+from models import ItemPedido
+from services.pedido_service import PedidoService
+from services.cocina_service import CocinaService
+from services.caja_service import CajaService
+from services.ticket_service import TicketService
+from services.auditoria_service import AuditoriaService
+from utils.logger import obtener_logger, cambiar_nivel, detener_logging
+
+log = obtener_logger(__name__)
+
+# Nombre de aplicación de todas las conexiones del simulador (libpq lee PGAPPNAME)
+NOMBRE_APLICACION = "pos_carga"
+
+
+class Registro:
+    """Latencias por acción y flujos completados, compartidos por todas las terminales"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+        self.flujos: Dict[str, int] = defaultdict(int)
+
+    def medir(self, accion: str, funcion, *args):
+        """Ejecutar y registrar; los servicios devuelven False/None en vez de lanzar"""
+        t0 = time.perf_counter()
+        try:
+            resultado = funcion(*args)
+        except Exception as e:
+            log.error("❌ %s: %s", accion, e)
+            resultado = None
+        ms = (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self.latencias[accion].append(ms)
+            if resultado is None or resultado is False:
+                self.errores[accion] += 1
+        return resultado
+
+    def flujo(self, nombre: str):
+        with self._lock:
+            self.flujos[nombre] += 1
+
+    def resumen(self, duracion: float) -> Dict:
+        with self._lock:
+            acciones = []
+            for accion, tiempos in sorted(self.latencias.items()):
+                acciones.append({
+                    'accion': accion,
+                    'n': len(tiempos),
+                    'errores': self.errores.get(accion, 0),
+                    'ops_s': round(len(tiempos) / duracion, 2),
+                    'p50_ms': round(percentil(tiempos, 0.50), 2),
+                    'p95_ms': round(percentil(tiempos, 0.95), 2),
+                    'p99_ms': round(percentil(tiempos, 0.99), 2),
+                    'max_ms': round(max(tiempos), 2)
+                })
+            flujos = {nombre: {'completados': n, 'por_minuto': round(n * 60 / duracion, 1)}
+                      for nombre, n in sorted(self.flujos.items())}
+        return {'acciones': acciones, 'flujos': flujos}
+
+
+class MonitorConexiones(threading.Thread):
+    """Muestrea pg_stat_activity (conexiones del simulador por estado) cada segundo"""
+
+    def __init__(self, conn_params: Dict, intervalo: float = 1.0):
+        super().__init__(name="monitor_conexiones", daemon=True)
+        self.conn_params = conn_params
+        self.intervalo = intervalo
+        self.muestras: List[Dict[str, int]] = []
+        self.sesiones_inicio: Optional[int] = None
+        self.sesiones_fin: Optional[int] = None
+        self._detener = threading.Event()
+
+    def run(self):
+        conn = psycopg2.connect(**self.conn_params)
+        conn.autocommit = True
+        cur = conn.cursor()
+        self.sesiones_inicio = self._sesiones(cur)
+
+        while not self._detener.wait(self.intervalo):
+            cur.execute("""
+                SELECT COALESCE(state, 'desconocido'), COUNT(*)
+                FROM pg_stat_activity
+                WHERE datname = current_database()
+                  AND application_name = %s
+                  AND pid <> pg_backend_pid()
+                GROUP BY 1
+            """, (NOMBRE_APLICACION,))
+            self.muestras.append(dict(cur.fetchall()))
+
+        self.sesiones_fin = self._sesiones(cur)
+        cur.close()
+        conn.close()
+
+    @staticmethod
+    def _sesiones(cur) -> Optional[int]:
+        # pg_stat_database.sessions existe desde PostgreSQL 14
+        try:
+            cur.execute("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+            return cur.fetchone()[0]
+        except psycopg2.Error:
+            return None
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+    def resumen(self, duracion: float) -> Dict:
+        totales = [sum(m.values()) for m in self.muestras] or [0]
+        por_estado: Dict[str, int] = defaultdict(int)
+        for muestra in self.muestras:
+            for estado, n in muestra.items():
+                por_estado[estado] = max(por_estado[estado], n)
+
+        resumen = {
+            'muestras': len(self.muestras),
+            'max': max(totales),
+            'media': round(sum(totales) / len(totales), 1),
+            'p95': percentil(totales, 0.95),
+            'max_por_estado': dict(por_estado)
+        }
+        if self.sesiones_inicio is not None and self.sesiones_fin is not None:
+            nuevas = self.sesiones_fin - self.sesiones_inicio
+            resumen['sesiones_abiertas'] = nuevas
+            resumen['sesiones_por_segundo'] = round(nuevas / duracion, 1)
+        return resumen
+
+
+# ========== TERMINALES ==========
+class Terminal(threading.Thread, abc.ABC):
+    """Una tablet, pantalla de cocina o caja; repite su flujo hasta 'fin'"""
+
+    ROL = ''
+
+    def __init__(self, indice: int, total_rol: int, simulacion: "Simulacion", pensar: float):
+        super().__init__(name=f"{self.ROL}_{indice}", daemon=True)
+        self.indice = indice
+        self.total_rol = total_rol
+        self.sim = simulacion
+        self.pensar_medio = pensar
+        self.rng = random.Random(f"{simulacion.semilla}:{self.ROL}:{indice}")
+
+    def run(self):
+        # Arranque escalonado dentro de la rampa
+        time.sleep(self.sim.rampa * self.indice / max(self.total_rol, 1))
+        while time.monotonic() < self.sim.fin:
+            self.ciclo()
+            self.pensar()
+
+    def pensar(self):
+        if self.pensar_medio > 0:
+            time.sleep(min(self.rng.expovariate(1 / self.pensar_medio), self.pensar_medio * 5))
+
+    def es_mio(self, pedido_id: int) -> bool:
+        return pedido_id % self.total_rol == self.indice
+
+    @abc.abstractmethod
+    def ciclo(self):
+        """Una vuelta del flujo del rol (pedir, cocinar, cobrar)"""
+
+
+class TerminalMesero(Terminal):
+    ROL = 'mesero'
+
+    def ciclo(self):
+        sim, reg = self.sim, self.sim.registro
+        empleado_id = self.rng.choice(sim.meseros)
+        mesa = str(self.rng.randint(1, 20))
+
+        pedido_id = reg.medir('pedido.crear_pedido', sim.pedidos.crear_pedido, mesa, empleado_id)
+        if not pedido_id:
+            return
+        for _ in range(self.rng.randint(1, sim.items_por_pedido * 2 - 1)):
+            producto_id, precio = self.rng.choice(sim.productos)
+            reg.medir('pedido.agregar_item_pedido', sim.pedidos.agregar_item_pedido,
+                      pedido_id, producto_id, self.rng.randint(1, 3), precio)
+
+        # Segunda ronda en la misma mesa (bebidas, postre)
+        if self.rng.random() < sim.fraccion_segunda_ronda:
+            self.pensar()
+            producto_id, precio = self.rng.choice(sim.productos)
+            reg.medir('pedido.agregar_productos_pedido_abierto', sim.pedidos.agregar_productos_pedido_abierto,
+                      pedido_id, [ItemPedido(producto_id, cantidad=1, precio=precio)])
+        reg.flujo('tomar_pedido')
+
+
+class TerminalCocina(Terminal):
+    ROL = 'cocina'
+    SIGUIENTE = {'pendiente': 'preparacion', 'confirmado': 'preparacion', 'preparacion': 'listo'}
+
+    def ciclo(self):
+        sim, reg = self.sim, self.sim.registro
+        activos = reg.medir('cocina.obtener_pedidos_activos', sim.cocina.obtener_pedidos_activos) or []
+        mios = [p for p in activos if self.es_mio(p.id)]
+        if not mios:
+            return
+
+        # El más antiguo primero, como la pantalla de cocina
+        pedido = mios[0]
+        nuevo = self.SIGUIENTE[pedido.estado]
+        if reg.medir('cocina.cambiar_estado_pedido', sim.cocina.cambiar_estado_pedido, pedido.id, nuevo):
+            reg.flujo('cocina_' + nuevo)
+
+
+class TerminalCaja(Terminal):
+    ROL = 'caja'
+
+    def ciclo(self):
+        sim, reg = self.sim, self.sim.registro
+        listos = reg.medir('caja.obtener_pedidos_pendientes_pago', sim.caja.obtener_pedidos_pendientes_pago) or []
+        mios = [p for p in listos if self.es_mio(p.id)]
+        if not mios:
+            return
+
+        pedido = mios[0]
+        empleado_id = self.rng.choice(sim.cajeros)
+        metodo = self.rng.choice(['efectivo', 'tarjeta', 'transferencia'])
+
+        if self.rng.random() < sim.fraccion_divididos:
+            self._dividir(pedido.id, empleado_id, metodo)
+
+        if reg.medir('caja.registrar_pago', sim.caja.registrar_pago, pedido.id, empleado_id,
+                     pedido.total, metodo):
+            reg.flujo('cobrar')
+
+    def _dividir(self, pedido_id: int, empleado_id: int, metodo: str):
+        """Un comensal paga su parte con un ticket parcial"""
+        sim, reg = self.sim, self.sim.registro
+        estado = reg.medir('ticket.estado_cobro', sim.tickets.estado_cobro, pedido_id)
+        if not estado or not estado['lineas']:
+            return
+        linea = self.rng.choice(estado['lineas'])
+        reg.medir('ticket.crear_ticket_parcial', sim.tickets.crear_ticket_parcial, pedido_id, [{
+            'item_pedido_id': linea['item_pedido_id'],
+            'cantidad': 1,
+            'precio_unitario': linea['precio_unitario']
+        }], metodo, empleado_id)
+        reg.flujo('dividir_cuenta')
+
+
+# ========== SIMULACIÓN ==========
+class Simulacion:
+    """Servicios compartidos, catálogos y reloj de la corrida"""
+
+    def __init__(self, db, args):
+        self.db = db
+        self.semilla = args.semilla
+        self.rampa = args.rampa
+        self.items_por_pedido = args.items_por_pedido
+        self.fraccion_divididos = args.fraccion_divididos
+        self.fraccion_segunda_ronda = args.fraccion_segunda_ronda
+        self.registro = Registro()
+        self.fin = 0.0
+
+        # Servicios sin estado por terminal: una instancia compartida como en la app
+        self.pedidos = PedidoService(db)
+        self.cocina = CocinaService(db)
+        self.caja = CajaService(db)
+        self.tickets = TicketService(db)
+
+        conn = psycopg2.connect(**db.conn_params)
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, precio FROM productos WHERE activo = TRUE")
+            self.productos = cur.fetchall()
+            cur.execute("SELECT id FROM empleados WHERE rol = 'mesero'")
+            self.meseros = [r[0] for r in cur.fetchall()]
+            cur.execute("SELECT id FROM empleados WHERE rol IN ('cajero', 'administrador')")
+            self.cajeros = [r[0] for r in cur.fetchall()] or self.meseros
+        conn.close()
+
+        self.terminales: List[Terminal] = []
+        for clase, cantidad, pensar in ((TerminalMesero, args.meseros, args.pensar_mesero),
+                                        (TerminalCocina, args.cocinas, args.pensar_cocina),
+                                        (TerminalCaja, args.cajas, args.pensar_caja)):
+            self.terminales += [clase(i, cantidad, self, pensar) for i in range(cantidad)]
+
+    def correr(self, duracion: float) -> float:
+        self.fin = time.monotonic() + self.rampa + duracion
+        inicio = time.perf_counter()
+        for terminal in self.terminales:
+            terminal.start()
+        for terminal in self.terminales:
+            terminal.join()
+        return time.perf_counter() - inicio
+
+
+def ejecutar(args) -> Dict:
+    os.environ['PGAPPNAME'] = NOMBRE_APLICACION
+
+    with EntornoBench(args.modo, conservar=args.conservar) as entorno:
+        conteos = SembradorBench(entorno.db, args.semilla).sembrar(
+            pedidos=args.pedidos, items_por_pedido=args.items_por_pedido, abiertos=args.abiertos)
+
+        sim = Simulacion(entorno.db, args)
+        monitor = MonitorConexiones(entorno.db.conn_params)
+        monitor.start()
+
+        log.info("🚦 %s meseros, %s cocinas, %s cajas durante %s s (+%s s de rampa)",
+                 args.meseros, args.cocinas, args.cajas, args.duracion, args.rampa)
+        duracion = sim.correr(args.duracion)
+        monitor.detener()
+
+        AuditoriaService.instancia(entorno.db).detener()
+
+    resumen = sim.registro.resumen(duracion)
+    return {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'git': version_git(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'modo': args.modo,
+            'semilla': args.semilla,
+            'duracion_s': round(duracion, 1),
+            'terminales': {'meseros': args.meseros, 'cocinas': args.cocinas, 'cajas': args.cajas},
+            'pensar_s': {'mesero': args.pensar_mesero, 'cocina': args.pensar_cocina, 'caja': args.pensar_caja},
+            'filas': conteos
+        },
+        'flujos': resumen['flujos'],
+        'acciones': resumen['acciones'],
+        'conexiones': monitor.resumen(duracion)
+    }
+
+
+def mostrar(resultado: Dict):
+    for nombre, flujo in resultado['flujos'].items():
+        log.info("🔁 %-28s %6s completados (%.1f/min)", nombre, flujo['completados'], flujo['por_minuto'])
+    for a in resultado['acciones']:
+        log.info("⏱️ %-40s %7s  p50 %7.1f  p95 %7.1f  p99 %7.1f ms  errores %s",
+                 a['accion'], a['n'], a['p50_ms'], a['p95_ms'], a['p99_ms'], a['errores'])
+    c = resultado['conexiones']
+    log.info("🔌 Conexiones: máx %s, media %s, p95 %s, sesiones abiertas %s (%s/s)",
+             c['max'], c['media'], c['p95'], c.get('sesiones_abiertas', '?'), c.get('sesiones_por_segundo', '?'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de hora pico con varias terminales")
+    parser.add_argument('--modo', choices=EntornoBench.MODOS, default='esquema')
+    parser.add_argument('--meseros', type=int, default=6)
+    parser.add_argument('--cocinas', type=int, default=2)
+    parser.add_argument('--cajas', type=int, default=1)
+    parser.add_argument('--duracion', type=float, default=60, help="Segundos de carga sostenida")
+    parser.add_argument('--rampa', type=float, default=5, help="Segundos para arrancar todas las terminales")
+    parser.add_argument('--pensar-mesero', type=float, default=8.0, help="Media en s entre pedidos")
+    parser.add_argument('--pensar-cocina', type=float, default=2.0, help="Media en s entre refrescos")
+    parser.add_argument('--pensar-caja', type=float, default=4.0, help="Media en s entre cobros")
+    parser.add_argument('--fraccion-divididos', type=float, default=0.15)
+    parser.add_argument('--fraccion-segunda-ronda', type=float, default=0.3)
+    parser.add_argument('--pedidos', type=int, default=100_000, help="Pedidos históricos sembrados")
+    parser.add_argument('--abiertos', type=int, default=50)
+    parser.add_argument('--items-por-pedido', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', default='resultados_carga.json')
+    parser.add_argument('--conservar', action='store_true', help="No borrar la base al terminar")
+    args = parser.parse_args()
+
+    cambiar_nivel('WARNING', 'services')
+
+    resultado = ejecutar(args)
+    mostrar(resultado)
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False, default=str)
+    log.info("📄 Resultados guardados en %s", args.salida)
+    detener_logging()
@@ -0,0 +1,276 @@
+# benchmarks/entorno.py - BASE DE DATOS DESECHABLE PARA BENCHMARKS
+"""
+Provisiona una base aislada para medir servicios sin tocar la del restaurante:
+
+- modo 'esquema' (por defecto): un esquema bench_<pid> dentro de la BD configurada
+  (DB_HOST/DB_NAME/...). Todas las conexiones del proceso usan ese esquema vía
+  PGOPTIONS=-c search_path=..., así los servicios y utils/crear_tablas_*.py no cambian.
+- modo 'cluster': un cluster temporal con initdb/pg_ctl en un directorio temporal
+  y un puerto libre (requiere los binarios de PostgreSQL en el PATH).
+
+Al salir del contexto se borra el esquema o se detiene y elimina el cluster.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import psycopg2
+from typing import Optional
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Tablas base que la app espera (no hay schema.sql en el repo); caja, reportes y
+# permisos se crean con sus scripts de utils/
+ESQUEMA_BASE = """
+CREATE TABLE IF NOT EXISTS empleados (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    email VARCHAR(100),
+    pin_code VARCHAR(10),
+    pin_hash VARCHAR(200),
+    rol VARCHAR(30) NOT NULL,
+    activo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS productos (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    descripcion TEXT,
+    precio DECIMAL(10,2) NOT NULL,
+    costo DECIMAL(10,2),
+    categoria VARCHAR(50),
+    subcategoria VARCHAR(50),
+    stock INTEGER DEFAULT 0,
+    peso_gramos INTEGER,
+    imagen_url VARCHAR(255),
+    activo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pedidos (
+    id SERIAL PRIMARY KEY,
+    mesa VARCHAR(10) NOT NULL,
+    empleado_id INTEGER REFERENCES empleados(id),
+    estado VARCHAR(20) DEFAULT 'pendiente',
+    total DECIMAL(10,2) DEFAULT 0,
+    notas TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS items_pedido (
+    id SERIAL PRIMARY KEY,
+    pedido_id INTEGER REFERENCES pedidos(id) ON DELETE CASCADE,
+    producto_id INTEGER REFERENCES productos(id),
+    cantidad INTEGER NOT NULL,
+    precio_unitario DECIMAL(10,2) NOT NULL,
+    subtotal DECIMAL(10,2) GENERATED ALWAYS AS (cantidad * precio_unitario) STORED,
+    notas TEXT
+);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    id SERIAL PRIMARY KEY,
+    pedido_id INTEGER REFERENCES pedidos(id),
+    numero_ticket INTEGER NOT NULL,
+    total DECIMAL(10,2) NOT NULL,
+    metodo_pago VARCHAR(20),
+    empleado_id INTEGER REFERENCES empleados(id),
+    estado VARCHAR(20) DEFAULT 'pendiente',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS items_ticket (
+    id SERIAL PRIMARY KEY,
+    ticket_id INTEGER REFERENCES tickets(id) ON DELETE CASCADE,
+    item_pedido_id INTEGER REFERENCES items_pedido(id),
+    cantidad_asignada INTEGER NOT NULL,
+    subtotal DECIMAL(10,2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS historial_sesiones (
+    id SERIAL PRIMARY KEY,
+    empleado_id INTEGER REFERENCES empleados(id),
+    accion VARCHAR(50),
+    detalles TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS historial_estados_pedidos (
+    id SERIAL PRIMARY KEY,
+    pedido_id INTEGER REFERENCES pedidos(id),
+    empleado_id INTEGER REFERENCES empleados(id),
+    estado_anterior VARCHAR(20),
+    estado_nuevo VARCHAR(20),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_pedidos_estado ON pedidos (estado);
+CREATE INDEX IF NOT EXISTS idx_pedidos_mesa ON pedidos (mesa);
+CREATE INDEX IF NOT EXISTS idx_items_pedido_pedido ON items_pedido (pedido_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_pedido ON tickets (pedido_id);
+CREATE INDEX IF NOT EXISTS idx_items_ticket_ticket ON items_ticket (ticket_id);
+CREATE INDEX IF NOT EXISTS idx_movimientos_caja_pedido ON movimientos_caja (pedido_id);
+"""
+
+# Columnas de arqueo que CajaService.registrar_arqueo espera en cierres_caja
+ESQUEMA_ARQUEO = """
+ALTER TABLE cierres_caja ADD COLUMN IF NOT EXISTS diferencia_arqueo DECIMAL(10,2);
+ALTER TABLE cierres_caja ADD COLUMN IF NOT EXISTS estado_arqueo VARCHAR(20);
+"""
+
+
+class EntornoBench:
+    """Contexto con una base desechable lista para sembrar"""
+
+    MODOS = ('esquema', 'cluster')
+
+    def __init__(self, modo: str = 'esquema', conservar: bool = False):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo inválido: {modo}")
+        self.modo = modo
+        self.conservar = conservar
+        self.esquema = f"bench_{os.getpid()}"
+        self.db = None
+
+        self._dir_cluster: Optional[str] = None
+        self._entorno_previo = {}
+
+    def __enter__(self):
+        if self.modo == 'cluster':
+            self._iniciar_cluster()
+        else:
+            self._crear_esquema()
+
+        # Importar tarde: PostgreSQLService lee DB_* al construirse
+        from services.database_service import PostgreSQLService
+        self.db = PostgreSQLService()
+        self._crear_tablas()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self.conservar:
+                log.info("📌 Base de benchmark conservada (%s)", self.descripcion())
+            elif self.modo == 'cluster':
+                self._detener_cluster()
+            else:
+                self._borrar_esquema()
+        finally:
+            for clave, valor in self._entorno_previo.items():
+                if valor is None:
+                    os.environ.pop(clave, None)
+                else:
+                    os.environ[clave] = valor
+        return False
+
+    def descripcion(self) -> str:
+        if self.modo == 'cluster':
+            return f"cluster {self._dir_cluster} puerto {os.environ.get('DB_PORT')}"
+        return f"esquema {self.esquema} en {os.environ.get('DB_NAME', 'pos_system')}"
+
+    def _fijar_entorno(self, **variables):
+        for clave, valor in variables.items():
+            self._entorno_previo.setdefault(clave, os.environ.get(clave))
+            os.environ[clave] = valor
+
+    # ========== MODO ESQUEMA ==========
+    def _conexion_admin(self):
+        return psycopg2.connect(
+            host=os.environ.get('DB_HOST', 'localhost'),
+            dbname=os.environ.get('DB_NAME', 'pos_system'),
+            user=os.environ.get('DB_USER', 'postgres'),
+            password=os.environ.get('DB_PASSWORD', 'qwerty'),
+            port=os.environ.get('DB_PORT', '5432'),
+            options='-c search_path=public'
+        )
+
+    def _crear_esquema(self):
+        conn = self._conexion_admin()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {self.esquema} CASCADE")
+            cur.execute(f"CREATE SCHEMA {self.esquema}")
+        conn.close()
+
+        self._fijar_entorno(PGOPTIONS=f"-c search_path={self.esquema}")
+        log.info("🧪 Esquema de benchmark %s creado", self.esquema)
+
+    def _borrar_esquema(self):
+        conn = self._conexion_admin()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {self.esquema} CASCADE")
+        conn.close()
+        log.info("🧹 Esquema de benchmark %s eliminado", self.esquema)
+
+    # ========== MODO CLUSTER ==========
+    @staticmethod
+    def _puerto_libre() -> int:
+        with socket.socket() as s:
+            s.bind(('localhost', 0))
+            return s.getsockname()[1]
+
+    def _iniciar_cluster(self):
+        if not shutil.which('initdb') or not shutil.which('pg_ctl'):
+            raise RuntimeError("El modo 'cluster' requiere initdb y pg_ctl en el PATH")
+
+        self._dir_cluster = tempfile.mkdtemp(prefix="pos_bench_")
+        datos = os.path.join(self._dir_cluster, "datos")
+        puerto = self._puerto_libre()
+
+        subprocess.run(['initdb', '-D', datos, '-U', 'postgres', '--auth=trust', '-E', 'UTF8'],
+                       check=True, stdout=subprocess.DEVNULL)
+        subprocess.run(['pg_ctl', '-D', datos, '-w', '-l', os.path.join(self._dir_cluster, 'postgres.log'),
+                        '-o', f"-p {puerto} -c listen_addresses=localhost -c fsync=off", 'start'],
+                       check=True, stdout=subprocess.DEVNULL)
+
+        self._fijar_entorno(DB_HOST='localhost', DB_PORT=str(puerto), DB_USER='postgres',
+                            DB_PASSWORD='', DB_NAME='pos_bench')
+
+        conn = psycopg2.connect(host='localhost', port=puerto, user='postgres', dbname='postgres')
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("CREATE DATABASE pos_bench")
+        conn.close()
+        log.info("🧪 Cluster temporal en puerto %s (%s)", puerto, self._dir_cluster)
+
+    def _detener_cluster(self):
+        datos = os.path.join(self._dir_cluster, "datos")
+        subprocess.run(['pg_ctl', '-D', datos, '-m', 'fast', 'stop'], check=False, stdout=subprocess.DEVNULL)
+        shutil.rmtree(self._dir_cluster, ignore_errors=True)
+        log.info("🧹 Cluster temporal eliminado")
+
+    # ========== TABLAS ==========
+    def _crear_tablas(self):
+        from utils.crear_tablas_caja import crear_tablas_caja
+        from utils.crear_tablas_reportes import crear_tablas_reportes
+        from utils.crear_tablas_permisos import crear_tablas_permisos
+        from utils.crear_tablas_recetas import crear_tablas_recetas
+        from utils.crear_tablas_estaciones import crear_tablas_estaciones
+        from utils.migrar_estado_items import migrar_estado_items
+        from utils.crear_indices_busqueda import crear_indices_busqueda
+
+        conn = psycopg2.connect(**self.db.conn_params)
+        with conn.cursor() as cur:
+            # movimientos_caja referencia pedidos: tablas base primero, índices al final
+            base, indices = ESQUEMA_BASE.split("CREATE INDEX", 1)
+            cur.execute(base)
+            conn.commit()
+
+            crear_tablas_caja()
+            crear_tablas_reportes()
+            crear_tablas_permisos()
+            crear_tablas_recetas()
+            crear_tablas_estaciones()
+            migrar_estado_items()
+
+            cur.execute("CREATE INDEX" + indices)
+            cur.execute(ESQUEMA_ARQUEO)
+        conn.commit()
+        conn.close()
+
+        # Sin permisos para CREATE EXTENSION sólo avisa: la búsqueda cae al índice en memoria
+        crear_indices_busqueda()
@@ -0,0 +1,270 @@
+# benchmarks/semilla.py - DATOS SINTÉTICOS REPRODUCIBLES
+"""
+Siembra volúmenes configurables (10^5–10^7 pedidos) a partir de los empleados y
+productos de utils/insertar_datos_ejemplo.py. Todo se genera en el servidor con
+generate_series (sin ida y vuelta por fila) y setseed() para que una misma semilla
+produzca los mismos datos.
+"""
+import time
+import psycopg2
+from typing import Dict
+from utils.insertar_datos_ejemplo import EMPLEADOS_EJEMPLO, PRODUCTOS_EJEMPLO
+from services.auth_service import crear_pepper, hash_pin, nuevo_salt
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+METODOS_PAGO = "ARRAY['efectivo', 'tarjeta', 'transferencia']"
+
+
+class SembradorBench:
+    """Genera empleados, productos, pedidos históricos, movimientos y tickets"""
+
+    LOTE_PEDIDOS = 500_000
+    MESAS = 20
+
+    def __init__(self, db_service, semilla: int = 42):
+        self.db = db_service
+        self.semilla = semilla
+
+    def sembrar(self, pedidos: int = 100_000, productos: int = 60, empleados: int = 12,
+                items_por_pedido: int = 3, dias: int = 90, abiertos: int = 200,
+                fraccion_divididos: float = 0.05) -> Dict[str, int]:
+        """Sembrar todo; devuelve filas por tabla"""
+        inicio = time.perf_counter()
+        conn = psycopg2.connect(**self.db.conn_params)
+        cur = conn.cursor()
+
+        try:
+            # setseed() vale para la sesión: todo se siembra en esta conexión
+            cur.execute("SELECT setseed(%s)", ((self.semilla % 1000) / 1000.0,))
+            self._empleados(cur, empleados)
+            self._productos(cur, productos)
+            conn.commit()
+
+            for desde in range(1, pedidos + 1, self.LOTE_PEDIDOS):
+                hasta = min(desde + self.LOTE_PEDIDOS - 1, pedidos)
+                self._pedidos_historicos(cur, desde, hasta, items_por_pedido, dias)
+                conn.commit()
+                log.info("🌱 Pedidos %s-%s sembrados", desde, hasta)
+
+            self._caja(cur, dias)
+            self._tickets_divididos(cur, fraccion_divididos)
+            self._pedidos_abiertos(cur, abiertos, items_por_pedido)
+            conn.commit()
+
+            # Estadísticas frescas para que los planes sean los de producción
+            conn.autocommit = True
+            cur.execute("ANALYZE")
+
+            conteos = {}
+            for tabla in ('empleados', 'productos', 'pedidos', 'items_pedido',
+                          'movimientos_caja', 'tickets', 'items_ticket'):
+                cur.execute(f"SELECT COUNT(*) FROM {tabla}")
+                conteos[tabla] = cur.fetchone()[0]
+        finally:
+            cur.close()
+            conn.close()
+
+        log.info("🌱 Siembra completa en %.1f s: %s", time.perf_counter() - inicio, conteos)
+        return conteos
+
+    # ========== CATÁLOGOS ==========
+    def _empleados(self, cur, total: int):
+        crear_pepper()
+        salt = nuevo_salt()
+        filas = list(EMPLEADOS_EJEMPLO)
+        roles = ['mesero', 'mesero', 'mesero', 'cocinero', 'cajero']
+        for i in range(len(filas), total):
+            filas.append((f"Empleado {i + 1}", roles[i % len(roles)]))
+
+        # PIN = 1000 + índice, ya hasheado como lo deja utils/migrar_pins.py
+        for i, (nombre, rol) in enumerate(filas):
+            cur.execute("""
+                INSERT INTO empleados (nombre, rol, pin_hash, activo)
+                VALUES (%s, %s, %s, TRUE)
+            """, (nombre, rol, hash_pin(str(1000 + i), salt)))
+
+    def _productos(self, cur, total: int):
+        # Variantes numeradas de los productos de ejemplo hasta llegar al total
+        for i in range(total):
+            nombre, descripcion, precio, costo, categoria, subcategoria = PRODUCTOS_EJEMPLO[i % len(PRODUCTOS_EJEMPLO)]
+            variante = i // len(PRODUCTOS_EJEMPLO)
+            cur.execute("""
+                INSERT INTO productos
+                (nombre, descripcion, precio, costo, categoria, subcategoria, stock, activo)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)
+            """, (
+                nombre if variante == 0 else f"{nombre} {variante + 1}",
+                descripcion, precio + variante, costo, categoria, subcategoria, 1_000_000
+            ))
+
+    # ========== PEDIDOS ==========
+    def _pedidos_historicos(self, cur, desde: int, hasta: int, items_por_pedido: int, dias: int):
+        """Pedidos ya cobrados ('entregado') repartidos en los últimos días"""
+        cur.execute("""
+            WITH emp AS (SELECT array_agg(id) AS ids FROM empleados WHERE rol IN ('mesero', 'administrador')),
+            nuevos AS (
+                INSERT INTO pedidos (mesa, empleado_id, estado, notas, created_at, updated_at)
+                SELECT
+                    (1 + floor(random() * %(mesas)s))::int::text,
+                    emp.ids[1 + floor(random() * cardinality(emp.ids))::int],
+                    'entregado',
+                    '',
+                    ts, ts + INTERVAL '45 minutes'
+                FROM generate_series(%(desde)s, %(hasta)s) g
+                CROSS JOIN emp
+                CROSS JOIN LATERAL (
+                    SELECT date_trunc('day', now()) - (1 + floor(random() * %(dias)s)) * INTERVAL '1 day'
+                           + INTERVAL '12 hours' + random() * INTERVAL '11 hours' AS ts
+                    WHERE g > 0
+                ) t
+                RETURNING id
+            )
+            SELECT MIN(id), MAX(id) FROM nuevos
+        """, {'mesas': self.MESAS, 'desde': desde, 'hasta': hasta, 'dias': max(dias, 1)})
+        primero, ultimo = cur.fetchone()
+
+        self._items(cur, primero, ultimo, items_por_pedido)
+
+        # Total del pedido y su venta en caja
+        cur.execute("""
+            UPDATE pedidos p SET total = s.total
+            FROM (
+                SELECT pedido_id, SUM(cantidad * precio_unitario) AS total
+                FROM items_pedido WHERE pedido_id BETWEEN %(a)s AND %(b)s
+                GROUP BY pedido_id
+            ) s
+            WHERE p.id = s.pedido_id
+        """, {'a': primero, 'b': ultimo})
+
+        cur.execute(f"""
+            INSERT INTO movimientos_caja (tipo, empleado_id, pedido_id, monto, metodo_pago, detalles, created_at)
+            SELECT 'venta', p.empleado_id, p.id, p.total,
+                   ({METODOS_PAGO})[1 + floor(random() * 3)::int],
+                   'Pago pedido #' || p.id, p.updated_at
+            FROM pedidos p
+            WHERE p.id BETWEEN %(a)s AND %(b)s
+        """, {'a': primero, 'b': ultimo})
+
+    def _items(self, cur, primero: int, ultimo: int, items_por_pedido: int):
+        # Entre 1 y 2×items_por_pedido líneas por pedido, productos al azar
+        # (0 * p.id hace la serie LATERAL: se recalcula el tamaño en cada pedido)
+        cur.execute("""
+            WITH prod AS (SELECT array_agg(id) AS ids FROM productos),
+            lineas AS (
+                SELECT p.id AS pedido_id,
+                       prod.ids[1 + floor(random() * cardinality(prod.ids))::int] AS producto_id,
+                       1 + floor(random() * 3)::int AS cantidad
+                FROM pedidos p
+                CROSS JOIN prod
+                CROSS JOIN LATERAL generate_series(1, 1 + floor(random() * (2 * %(n)s))::int + 0 * p.id) g
+                WHERE p.id BETWEEN %(a)s AND %(b)s
+            )
+            INSERT INTO items_pedido (pedido_id, producto_id, cantidad, precio_unitario, notas)
+            SELECT l.pedido_id, l.producto_id, l.cantidad, pr.precio, ''
+            FROM lineas l
+            JOIN productos pr ON pr.id = l.producto_id
+        """, {'a': primero, 'b': ultimo, 'n': max(items_por_pedido, 1)})
+
+    def _caja(self, cur, dias: int):
+        """Apertura y cierre por día (incluido hoy, que queda abierto)"""
+        cur.execute("""
+            WITH emp AS (SELECT MIN(id) AS id FROM empleados WHERE rol IN ('cajero', 'administrador')),
+            dias AS (
+                SELECT (CURRENT_DATE - d)::date AS fecha
+                FROM generate_series(0, %(dias)s) d
+            ),
+            totales AS (
+                SELECT created_at::date AS fecha,
+                       SUM(monto) AS total,
+                       SUM(monto) FILTER (WHERE metodo_pago = 'efectivo') AS efectivo,
+                       SUM(monto) FILTER (WHERE metodo_pago = 'tarjeta') AS tarjeta,
+                       SUM(monto) FILTER (WHERE metodo_pago = 'transferencia') AS transferencia
+                FROM movimientos_caja
+                WHERE tipo = 'venta'
+                GROUP BY 1
+            )
+            INSERT INTO cierres_caja (empleado_id, fecha, fondo_inicial, total_ventas, total_efectivo,
+                                      total_tarjeta, total_transferencia, total_cierre, created_at)
+            SELECT emp.id, d.fecha, 1000,
+                   COALESCE(t.total, 0), COALESCE(t.efectivo, 0), COALESCE(t.tarjeta, 0),
+                   COALESCE(t.transferencia, 0),
+                   CASE WHEN d.fecha < CURRENT_DATE THEN COALESCE(t.total, 0) ELSE 0 END,
+                   d.fecha + INTERVAL '11 hours'
+            FROM dias d CROSS JOIN emp
+            LEFT JOIN totales t ON t.fecha = d.fecha
+        """, {'dias': max(dias, 1)})
+
+        cur.execute("""
+            INSERT INTO movimientos_caja (tipo, empleado_id, monto, detalles, created_at)
+            SELECT 'apertura', empleado_id, fondo_inicial, 'Apertura de caja', fecha + INTERVAL '11 hours'
+            FROM cierres_caja
+            UNION ALL
+            SELECT 'cierre', empleado_id, total_cierre, 'Cierre de caja', fecha + INTERVAL '23 hours 30 minutes'
+            FROM cierres_caja WHERE fecha < CURRENT_DATE
+        """)
+
+    def _tickets_divididos(self, cur, fraccion: float):
+        """Una fracción de pedidos cobrados en dos tickets (cuenta dividida)"""
+        if fraccion <= 0:
+            return
+
+        cur.execute(f"""
+            WITH elegidos AS (
+                SELECT id, empleado_id, updated_at FROM pedidos
+                WHERE estado = 'entregado' AND random() < %(f)s
+            ),
+            lineas AS (
+                SELECT ip.id, ip.pedido_id, ip.cantidad, ip.cantidad * ip.precio_unitario AS subtotal,
+                       1 + (row_number() OVER (PARTITION BY ip.pedido_id ORDER BY ip.id) %% 2) AS numero
+                FROM items_pedido ip JOIN elegidos e ON e.id = ip.pedido_id
+            ),
+            nuevos AS (
+                INSERT INTO tickets (pedido_id, numero_ticket, total, metodo_pago, empleado_id, estado, created_at)
+                SELECT l.pedido_id, l.numero, SUM(l.subtotal),
+                       ({METODOS_PAGO})[1 + floor(random() * 3)::int],
+                       e.empleado_id, 'pagado', e.updated_at
+                FROM lineas l JOIN elegidos e ON e.id = l.pedido_id
+                GROUP BY l.pedido_id, l.numero, e.empleado_id, e.updated_at
+                RETURNING id, pedido_id, numero_ticket
+            )
+            INSERT INTO items_ticket (ticket_id, item_pedido_id, cantidad_asignada, subtotal)
+            SELECT n.id, l.id, l.cantidad, l.subtotal
+            FROM nuevos n
+            JOIN lineas l ON l.pedido_id = n.pedido_id AND l.numero = n.numero_ticket
+        """, {'f': fraccion})
+
+    def _pedidos_abiertos(self, cur, total: int, items_por_pedido: int):
+        """Pedidos de hoy aún en curso (cocina y caja los consultan)"""
+        if total <= 0:
+            return
+
+        cur.execute("""
+            WITH emp AS (SELECT array_agg(id) AS ids FROM empleados WHERE rol IN ('mesero', 'administrador')),
+            nuevos AS (
+                INSERT INTO pedidos (mesa, empleado_id, estado, notas, created_at, updated_at)
+                SELECT
+                    (1 + floor(random() * %(mesas)s))::int::text,
+                    emp.ids[1 + floor(random() * cardinality(emp.ids))::int],
+                    (ARRAY['pendiente', 'preparacion', 'listo'])[1 + floor(random() * 3)::int],
+                    '',
+                    now() - random() * INTERVAL '2 hours',
+                    now()
+                FROM generate_series(1, %(n)s) g CROSS JOIN emp
+                RETURNING id
+            )
+            SELECT MIN(id), MAX(id) FROM nuevos
+        """, {'mesas': self.MESAS, 'n': total})
+        primero, ultimo = cur.fetchone()
+
+        self._items(cur, primero, ultimo, items_por_pedido)
+        cur.execute("""
+            UPDATE pedidos p SET total = s.total
+            FROM (
+                SELECT pedido_id, SUM(cantidad * precio_unitario) AS total
+                FROM items_pedido WHERE pedido_id BETWEEN %(a)s AND %(b)s
+                GROUP BY pedido_id
+            ) s
+            WHERE p.id = s.pedido_id
+        """, {'a': primero, 'b': ultimo})
@@ -24,6 +24,9 @@ from mis_widgets.responsive_widgets import (
     EmptyStateWidget, CocinaEmptyState, CajaEmptyState, EmptyCartState,
     EstadisticaCard)
 
+from utils.logger import obtener_logger, detener_logging
+from utils.monitor_ui import MonitorUI
+
 # Sistema de diseño
 from themes.design_system import (
     DesignSystem, ds_color, ds_spacing, dp, ds_font, 
@@ -44,6 +47,8 @@ builtins.sp = lambda x: dp(x)
 
 import os
 
+log = obtener_logger(__name__)
+
 # Registrar widgets personalizados
 
 # Registrar en Factory
@@ -74,8 +79,10 @@ Factory.register('EstadisticaCard', cls=EstadisticaCard)
 
 class MiAppPOS(MDApp):
     is_dark_theme = BooleanProperty(False)
+    servicios = ObjectProperty(None)
     db_service = ObjectProperty(None)
     auth_service = ObjectProperty(None)
+    mesa_service = ObjectProperty(None)
     usuario_actual = DictProperty({})
     
     def build(self):
@@ -141,17 +148,33 @@ class MiAppPOS(MDApp):
     def _inicializar_servicios(self):
         """Inicializar servicios de base de datos y autenticación"""
         try:
-            from services.database_service import PostgreSQLService
-            from services.auth_service import AuthService
+            from services.contenedor import ContenedorServicios
+            
+            # Las pantallas obtienen sus servicios de aquí (views/servicios_app.py)
+            self.servicios = ContenedorServicios()
+            # Con servidor central la terminal no se conecta a PostgreSQL
+            self.db_service = None if self.servicios.remoto else self.servicios.db
+            self.auth_service = self.servicios.auth
+            self.mesa_service = self.servicios.mesas
             
-            self.db_service = PostgreSQLService()
-            self.auth_service = AuthService(self.db_service)
-            print("✅ Servicios de BD y Auth inicializados")
+            # Con servidor central, el índice de mesas sigue los cambios de las demás terminales
+            from views.servicios_app import suscribir_eventos
+            suscribir_eventos(self._on_evento_servidor)
+            print("✅ Servicios de BD, Auth y Mesas inicializados")
         except Exception as e:
             print(f"❌ Error inicializando servicios: {e}")
             import traceback
             traceback.print_exc()
     
+    def _on_evento_servidor(self, evento):
+        """Pedido modificado en cualquier terminal (servidor central)"""
+        if not self.mesa_service or not self.mesa_service.cargado:
+            return
+        if evento.get('tipo') == 'reconectado':
+            self.mesa_service.cargar()
+        elif evento.get('tipo') == 'pedido':
+            self.mesa_service.actualizar_pedido(evento['pedido_id'])
+    
     def load_global_styles(self):
         """Cargar estilos globales PRIMERO (REGLA #2)"""
         global_styles = "themes/global_styles.kv"
@@ -214,6 +237,13 @@ class MiAppPOS(MDApp):
         """Cuando la app inicia"""
         print("🚀 Aplicación iniciada correctamente")
         
+        # Precargar caché de empleados para que el primer login no espere a la BD
+        if self.auth_service:
+            self.auth_service.precargar_cache()
+        
+        # Monitor de frames/bloqueos de UI (opcional: POS_MONITOR_UI=1)
+        MonitorUI.activar_si_configurado()
+        
         # Verificar pantallas disponibles
         self._verificar_pantallas()
         
@@ -256,8 +286,23 @@ class MiAppPOS(MDApp):
             import traceback
             traceback.print_exc()
     
+    def on_stop(self):
+        """Cuando la app se cierra: vaciar auditoría, métricas y logs pendientes"""
+        if self.servicios:
+            self.servicios.cerrar()
+        monitor = MonitorUI.instancia()
+        if monitor:
+            monitor.registrar_reporte()
+            monitor.detener()
+        if self.db_service:
+            try:
+                self.db_service.volcar_metricas()
+            except Exception as e:
+                log.error("❌ Error guardando métricas de consultas: %s", e)
+        detener_logging()
+    
     def cambiar_pantalla(self, screen_name, close_drawer=True):
-        """Método centralizado para cambiar pantallas - VERSIÓN SIMPLIFICADA"""
+        """Método centralizado para cambiar pantallas"""
         try:
             sm = self.root.ids.screen_manager
             
@@ -266,16 +311,20 @@ class MiAppPOS(MDApp):
             
             # Verificar que la pantalla existe
             if screen_name not in sm.screen_names:
-                print(f"⚠️ Pantalla '{screen_name}' no existe en screen_names")
-                print(f"   Pantallas disponibles: {sm.screen_names}")
+                log.warning("⚠️ Pantalla '%s' no existe; disponibles: %s", screen_name, sm.screen_names)
                 return
             
-            # VERIFICACIÓN SIMPLIFICADA - eliminar lógica de permisos temporalmente
-            # Solo verificar usuario para pantallas no públicas
-            if screen_name not in pantallas_publicas and not self.usuario_actual:
-                print(f"🔐 Redirigiendo a login - no hay usuario para {screen_name}")
-                sm.current = "login"
-                return
+            # Solo verificar usuario y permisos para pantallas no públicas
+            if screen_name not in pantallas_publicas:
+                if not self.usuario_actual:
+                    log.warning("🔐 Redirigiendo a login - no hay usuario para %s", screen_name)
+                    sm.current = "login"
+                    return
+                
+                if self.auth_service and not self.auth_service.verificar_permiso(screen_name):
+                    log.warning("🚫 Rol '%s' sin acceso a '%s'", self.usuario_actual.get('rol'), screen_name)
+                    self.mostrar_error_permisos(screen_name)
+                    return
                 
             # Cerrar drawer si está abierto
             if close_drawer and hasattr(self.root, 'ids') and 'nav_drawer' in self.root.ids:
@@ -283,10 +332,10 @@ class MiAppPOS(MDApp):
             
             # Cambiar pantalla
             sm.current = screen_name
-            print(f"✅ Navegación exitosa → {screen_name}")
+            log.debug("✅ Navegación exitosa → %s", screen_name)
             
         except Exception as e:
-            print(f"❌ Error cambiando pantalla: {e}")
+            log.error("❌ Error cambiando pantalla: %s", e)
             import traceback
             traceback.print_exc()
 
@@ -311,15 +360,15 @@ class MiAppPOS(MDApp):
     def abrir_menu(self):
         """Abrir menú lateral"""
         if not self.usuario_actual:
-            print("⚠️ No hay usuario logueado - menú bloqueado")
+            log.warning("⚠️ No hay usuario logueado - menú bloqueado")
             return
             
         try:
             if hasattr(self.root, 'ids') and 'nav_drawer' in self.root.ids:
                 self.root.ids.nav_drawer.set_state("open")
-                print("📂 Menú lateral abierto")
+                log.debug("📂 Menú lateral abierto")
         except Exception as e:
-            print(f"❌ Error abriendo menú: {e}")
+            log.error("❌ Error abriendo menú: %s", e)
 
     def logout_user(self):
         """Cerrar sesión del usuario"""
@@ -335,7 +384,7 @@ class MiAppPOS(MDApp):
             # Ir a pantalla de login
             self.root.ids.screen_manager.current = "login"
             
-            print(f"🚪 Sesión cerrada - {usuario_nombre}")
+            log.info("🚪 Sesión cerrada - %s", usuario_nombre)
     
     def toggle_theme(self):
         """Cambiar tema claro/oscuro"""
@@ -345,7 +394,7 @@ class MiAppPOS(MDApp):
     def actualizar_tema(self):
         """Actualizar tema de la aplicación"""
         self.theme_cls.theme_style = "Dark" if self.is_dark_theme else "Light"
-        print(f"🎨 Tema cambiado a: {self.theme_cls.theme_style}")
+        log.debug("🎨 Tema cambiado a: %s", self.theme_cls.theme_style)
     
     def _mostrar_dialogo_info(self, titulo, mensaje):
         """Mostrar diálogo informativo"""
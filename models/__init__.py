@@ -0,0 +1,22 @@
+# models/__init__.py - MODELOS DE DOMINIO
+"""
+Dataclasses con __slots__: sin __dict__ por instancia y construcción posicional
+directa desde las filas de psycopg2 (Pedido(*fila)). Los importes son Dinero
+(centavos enteros, models/dinero.py).
+"""
+from dataclasses import fields
+from models.caja import MovimientoCaja
+from models.carrito import Carrito
+from models.dinero import CERO, Dinero
+from models.pedido import ItemPedido, Pedido
+from models.producto import Producto
+from models.ticket import Ticket
+
+# nombre → clase y orden de campos, para viajar por el protocolo del servidor
+MODELOS = {cls.__name__: cls for cls in (ItemPedido, Pedido, Producto, Ticket, MovimientoCaja)}
+CAMPOS = {nombre: tuple(f.name for f in fields(cls)) for nombre, cls in MODELOS.items()}
+
+__all__ = [
+    'CERO', 'Dinero', 'Carrito', 'ItemPedido', 'Pedido', 'Producto', 'Ticket', 'MovimientoCaja',
+    'MODELOS', 'CAMPOS',
+]
@@ -0,0 +1,21 @@
+# models/caja.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from models.dinero import CERO, Dinero
+
+
+@dataclass(slots=True)
+class MovimientoCaja:
+    """Movimiento de movimientos_caja (venta, retiro, ingreso...)"""
+    tipo: str
+    empleado_id: int
+    pedido_id: Optional[int] = None
+    monto: Dinero = CERO
+    metodo_pago: str = "efectivo"
+    detalles: str = ""
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        self.monto = Dinero.de(self.monto)
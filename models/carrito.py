@@ -0,0 +1,109 @@
+# models/carrito.py - PEDIDO EN CAPTURA DE LA TERMINAL
+from typing import Dict, Iterator, List, Tuple
+from models.dinero import CERO, Dinero
+from models.pedido import ItemPedido
+from models.producto import Producto
+
+Clave = Tuple[int, str]
+# (producto_id, nombre, cantidad, centavos, notas): inmutable y serializable a JSON
+Linea = Tuple[int, str, int, int, str]
+
+
+class Carrito:
+    """Líneas del pedido en captura, indexadas por (producto_id, notas).
+
+    El dict conserva el orden de llegada, así que es a la vez índice y lista:
+    agregar, cambiar cantidad y quitar son O(1), y total/unidades se ajustan
+    con cada cambio en lugar de volver a sumar todas las líneas. Las cantidades
+    se cambian sólo a través del carrito para que los acumulados no se desfasen.
+    """
+
+    __slots__ = ('mesa', '_lineas', '_por_producto', 'total', 'unidades')
+
+    def __init__(self, mesa: str = '1'):
+        self.mesa = mesa
+        self._lineas: Dict[Clave, ItemPedido] = {}
+        self._por_producto: Dict[int, int] = {}
+        self.total: Dinero = CERO
+        self.unidades = 0
+
+    @staticmethod
+    def clave(linea: ItemPedido) -> Clave:
+        return (linea.producto_id, linea.notas)
+
+    # ========== CAMBIOS ==========
+    def agregar(self, producto: Producto, cantidad: int = 1, notas: str = "") -> ItemPedido:
+        """Sumar a la línea (producto, notas) o abrirla al final → la línea"""
+        clave = (producto.id, notas)
+        linea = self._lineas.get(clave)
+        if linea is None:
+            linea = self._lineas[clave] = ItemPedido(producto.id, producto.nombre, 0, producto.precio, notas)
+        self._ajustar(linea, cantidad)
+        return linea
+
+    def cambiar_cantidad(self, linea: ItemPedido, delta: int) -> bool:
+        """Sumar delta a la línea; si llega a cero se quita → True si la línea sigue"""
+        if linea not in self:
+            return False
+        if linea.cantidad + delta <= 0:
+            self.quitar(linea)
+            return False
+        self._ajustar(linea, delta)
+        return True
+
+    def quitar(self, linea: ItemPedido) -> bool:
+        if linea not in self:
+            return False
+        self._ajustar(linea, -linea.cantidad)
+        del self._lineas[self.clave(linea)]
+        return True
+
+    def limpiar(self):
+        self._lineas.clear()
+        self._por_producto.clear()
+        self.total = CERO
+        self.unidades = 0
+
+    def _ajustar(self, linea: ItemPedido, delta: int):
+        linea.cantidad += delta
+        self.total += linea.precio * delta
+        self.unidades += delta
+        restantes = self._por_producto.get(linea.producto_id, 0) + delta
+        if restantes:
+            self._por_producto[linea.producto_id] = restantes
+        else:
+            self._por_producto.pop(linea.producto_id, None)
+
+    # ========== INSTANTÁNEAS ==========
+    def instantanea(self) -> Tuple[Linea, ...]:
+        """Copia inmutable de las líneas (para guardar en disco o deshacer)"""
+        return tuple((l.producto_id, l.nombre, l.cantidad, l.precio.centavos, l.notas) for l in self._lineas.values())
+
+    @classmethod
+    def restaurar(cls, mesa: str, lineas) -> "Carrito":
+        """Carrito a partir de instantanea() (o de su versión leída del JSON)"""
+        carrito = cls(mesa)
+        for producto_id, nombre, cantidad, centavos, notas in lineas:
+            linea = carrito._lineas[(producto_id, notas)] = ItemPedido(producto_id, nombre, 0, Dinero(centavos=centavos), notas)
+            carrito._ajustar(linea, cantidad)
+        return carrito
+
+    # ========== CONSULTAS ==========
+    def cantidad_producto(self, producto_id: int) -> int:
+        """Unidades del producto en todas sus líneas (con o sin notas)"""
+        return self._por_producto.get(producto_id, 0)
+
+    @property
+    def items(self) -> List[ItemPedido]:
+        """Líneas en orden de captura (lo que recibe crear_pedido_con_items)"""
+        return list(self._lineas.values())
+
+    def __contains__(self, linea: ItemPedido) -> bool:
+        # Identidad, no igualdad: dos líneas iguales de otro carrito no cuentan
+        return self._lineas.get(self.clave(linea)) is linea
+
+    def __iter__(self) -> Iterator[ItemPedido]:
+        return iter(self._lineas.values())
+
+    def __len__(self) -> int:
+        return len(self._lineas)
@@ -0,0 +1,140 @@
+# models/dinero.py - IMPORTES EN CENTAVOS ENTEROS
+"""
+Dinero guarda el importe como un int de centavos: sumar líneas, multiplicar por
+cantidades y comparar contra la tolerancia del arqueo es aritmética entera,
+exacta y sin crear un Decimal por operación.
+
+La conversión ocurre una vez en cada frontera:
+
+    Dinero.de(Decimal('12.50'))   # fila de PostgreSQL (NUMERIC) → 1250 centavos
+    Dinero.de("12.5")             # texto capturado en pantalla
+    Dinero(centavos=1250)         # ya en centavos (JSON, instantáneas); sólo por nombre
+    float(total)                  # NumericProperty de Kivy
+    total.a_decimal()             # parámetro de psycopg2 (adaptador en database_service)
+
+Sólo los porcentajes (IVA, descuentos) redondean, a centavo y mitad hacia arriba.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Union
+
+Numero = Union[int, float, str, Decimal]
+
+
+class Dinero:
+    __slots__ = ('centavos',)
+
+    def __init__(self, *, centavos: int = 0):
+        # Sólo por nombre: en Dinero.de() y en las comparaciones un int son pesos,
+        # así que Dinero(10) sería ambiguo (¿10 centavos o 10 pesos?)
+        self.centavos = centavos
+
+    @classmethod
+    def de(cls, valor) -> "Dinero":
+        """Importe en pesos (Decimal, int, float o texto) → Dinero; None cuenta como cero"""
+        if isinstance(valor, Dinero):
+            return valor
+        if valor is None or valor == '':
+            return cls(centavos=0)
+        if isinstance(valor, int):
+            return cls(centavos=valor * 100)
+        if not isinstance(valor, Decimal):
+            # float pasa por str() para no arrastrar el error binario (0.1 → '0.1')
+            valor = Decimal(str(valor))
+        return cls(centavos=int(valor.scaleb(2).to_integral_value(ROUND_HALF_UP)))
+
+    # ========== CONVERSIONES ==========
+    def a_decimal(self) -> Decimal:
+        return Decimal(self.centavos).scaleb(-2)
+
+    def __float__(self) -> float:
+        return self.centavos / 100
+
+    def __str__(self) -> str:
+        signo = '-' if self.centavos < 0 else ''
+        pesos, centavos = divmod(abs(self.centavos), 100)
+        return f"{signo}{pesos}.{centavos:02d}"
+
+    def __repr__(self) -> str:
+        return f"Dinero.de('{self}')"
+
+    def __format__(self, especificacion: str) -> str:
+        # f"${total:.2f}" sigue funcionando donde antes había float
+        return format(self.a_decimal(), especificacion) if especificacion else str(self)
+
+    # ========== ARITMÉTICA ==========
+    def __add__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(centavos=self.centavos + otro.centavos)
+        return NotImplemented
+
+    def __radd__(self, otro):
+        # sum() arranca en 0
+        if otro == 0 and not isinstance(otro, Dinero):
+            return self
+        return self.__add__(otro)
+
+    def __sub__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(centavos=self.centavos - otro.centavos)
+        return NotImplemented
+
+    def __mul__(self, factor):
+        """Por cantidad (int) es exacto; por tasa (Decimal, float, texto) redondea a centavo"""
+        if isinstance(factor, bool):
+            return NotImplemented
+        if isinstance(factor, int):
+            return Dinero(centavos=self.centavos * factor)
+        if isinstance(factor, (Decimal, float, str)):
+            tasa = factor if isinstance(factor, Decimal) else Decimal(str(factor))
+            return Dinero(centavos=int((self.centavos * tasa).to_integral_value(ROUND_HALF_UP)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Dinero(centavos=-self.centavos)
+
+    def __abs__(self):
+        return Dinero(centavos=abs(self.centavos))
+
+    def __bool__(self) -> bool:
+        return self.centavos != 0
+
+    # ========== COMPARACIÓN ==========
+    def _centavos_de(self, otro):
+        if isinstance(otro, Dinero):
+            return otro.centavos
+        if isinstance(otro, (int, float, Decimal)) and not isinstance(otro, bool):
+            return Dinero.de(otro).centavos
+        return None
+
+    def __eq__(self, otro) -> bool:
+        # Igualdad exacta con números (sin redondear a centavo), como Decimal:
+        # Dinero.de(1) == 1 y hash() coincide, así se pueden mezclar en dicts y sets
+        if isinstance(otro, Dinero):
+            return self.centavos == otro.centavos
+        if isinstance(otro, (int, float, Decimal)) and not isinstance(otro, bool):
+            return self.a_decimal() == otro
+        return NotImplemented
+
+    def __lt__(self, otro) -> bool:
+        centavos = self._centavos_de(otro)
+        return NotImplemented if centavos is None else self.centavos < centavos
+
+    def __le__(self, otro) -> bool:
+        centavos = self._centavos_de(otro)
+        return NotImplemented if centavos is None else self.centavos <= centavos
+
+    def __gt__(self, otro) -> bool:
+        centavos = self._centavos_de(otro)
+        return NotImplemented if centavos is None else self.centavos > centavos
+
+    def __ge__(self, otro) -> bool:
+        centavos = self._centavos_de(otro)
+        return NotImplemented if centavos is None else self.centavos >= centavos
+
+    def __hash__(self) -> int:
+        return hash(self.a_decimal())
+
+
+CERO = Dinero(centavos=0)
@@ -1,24 +1,46 @@
 # models/pedido.py
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Optional
+from models.dinero import CERO, Dinero
 
+
+@dataclass(slots=True)
 class ItemPedido:
-    def __init__(self, producto_id: int, cantidad: int, precio: float, notas: str = ""):
-        self.producto_id = producto_id
-        self.cantidad = cantidad
-        self.precio_unitario = precio
-        self.notas = notas
-        self.subtotal = cantidad * precio
+    """Línea de pedido; los campos siguen el orden de las consultas (ItemPedido(*fila))"""
+    producto_id: int
+    nombre: str = ""
+    cantidad: int = 1
+    precio: Dinero = CERO
+    notas: str = ""
+    id: Optional[int] = None
+    estado: str = "pendiente"  # en cocina: pendiente, preparacion, listo
+
+    def __post_init__(self):
+        # NUMERIC de psycopg2 (Decimal) → centavos, una vez por fila
+        self.precio = Dinero.de(self.precio)
+
+    @property
+    def subtotal(self) -> Dinero:
+        return self.precio * self.cantidad
 
+
+@dataclass(slots=True)
 class Pedido:
-    def __init__(self):
-        self.id: Optional[int] = None
-        self.mesa: str = ""
-        self.estado: str = "pendiente"  # pendiente, preparacion, listo, entregado, cancelado
-        self.items: List[ItemPedido] = []
-        self.total: float = 0.0
-        self.created_at: datetime = datetime.now()
-        self.tipo: str = "local"  # local, llevar, delivery
-        
-    def calcular_total(self):
-        self.total = sum(item.subtotal for item in self.items)
\ No newline at end of file
+    """Pedido con sus líneas; Pedido(*fila) con id, mesa, estado, created_at, mesero, total"""
+    id: Optional[int] = None
+    mesa: str = ""
+    estado: str = "pendiente"  # pendiente, preparacion, listo, entregado, pagado, cancelado
+    created_at: Optional[datetime] = None
+    mesero: str = ""
+    total: Dinero = CERO
+    items: List[ItemPedido] = field(default_factory=list)
+    notas: str = ""
+    tipo: str = "local"  # local, llevar, delivery
+
+    def __post_init__(self):
+        self.total = Dinero.de(self.total)
+
+    def calcular_total(self) -> Dinero:
+        self.total = sum((item.subtotal for item in self.items), CERO)
+        return self.total
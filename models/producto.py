@@ -0,0 +1,20 @@
+# models/producto.py
+from dataclasses import dataclass
+from typing import Optional
+from models.dinero import CERO, Dinero
+
+
+@dataclass(slots=True)
+class Producto:
+    """Producto del catálogo; Producto(*fila) con las columnas de COLUMNAS_PRODUCTO"""
+    id: int
+    nombre: str
+    categoria: str = ""
+    precio: Dinero = CERO
+    stock: Optional[int] = None  # None: sin control de existencias
+    descripcion: str = ""
+    imagen_url: str = ""
+    activo: bool = True
+
+    def __post_init__(self):
+        self.precio = Dinero.de(self.precio)
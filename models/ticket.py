@@ -0,0 +1,20 @@
+# models/ticket.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from models.dinero import CERO, Dinero
+
+
+@dataclass(slots=True)
+class Ticket:
+    """Ticket (cuenta parcial) de un pedido; Ticket(*fila)"""
+    id: int
+    numero: int
+    total: Dinero = CERO
+    metodo_pago: str = "efectivo"
+    estado: str = "pendiente"
+    fecha: Optional[datetime] = None
+    empleado: str = ""
+
+    def __post_init__(self):
+        self.total = Dinero.de(self.total)
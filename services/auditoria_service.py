@@ -0,0 +1,250 @@
+# services/auditoria_service.py - ESCRITURA DE AUDITORÍA EN SEGUNDO PLANO
+import io
+import json
+import os
+import queue
+import threading
+import time
+import psycopg2
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from utils.logger import obtener_logger
+from utils.rutas import ruta_datos
+
+log = obtener_logger(__name__)
+
+# La BD no está disponible: el evento se reintenta más tarde. Cualquier otro
+# error (FK, restricción, valor inválido) es del dato y no se arregla reintentando
+ERRORES_CONEXION = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+class AuditoriaService:
+    """Pipeline de auditoría: cola en memoria + hilo que escribe por lotes con COPY.
+
+    Registrar un evento sólo lo encola (no toca la BD ni bloquea la UI). El hilo
+    vacía la cola cada INTERVALO_FLUSH segundos o al juntar TAMANO_LOTE eventos,
+    agrupando por tabla. Si la BD no responde, el lote se guarda en ARCHIVO_SPILL
+    (JSON por línea) y se reintenta antes del siguiente lote. Si la BD rechaza un
+    lote por sus datos, se escribe evento por evento y los rechazados van a
+    ARCHIVO_RECHAZADOS, para que un evento malo no detenga la auditoría.
+    detener() vacía la cola al cerrar la app.
+    """
+
+    INTERVALO_FLUSH = 0.5
+    TAMANO_LOTE = 200
+    ARCHIVO_SPILL = "auditoria_pendiente.jsonl"
+    ARCHIVO_RECHAZADOS = "auditoria_rechazada.jsonl"
+
+    # Tabla → columnas en el orden en que se encolan los valores
+    TABLAS = {
+        'historial_sesiones': ('empleado_id', 'accion', 'detalles', 'created_at'),
+        'historial_estados_pedidos': ('pedido_id', 'empleado_id', 'estado_anterior', 'estado_nuevo', 'created_at'),
+    }
+
+    _instancia = None
+    _lock_instancia = threading.Lock()
+
+    @classmethod
+    def instancia(cls, db_service) -> "AuditoriaService":
+        """Escritor compartido por todo el proceso (una conexión, un hilo)"""
+        with cls._lock_instancia:
+            if cls._instancia is None:
+                cls._instancia = cls(db_service)
+            return cls._instancia
+
+    def __init__(self, db_service, intervalo_flush: float = None, tamano_lote: int = None,
+                 archivo_spill: str = None, archivo_rechazados: str = None):
+        self.db = db_service
+        self.intervalo_flush = intervalo_flush or self.INTERVALO_FLUSH
+        self.tamano_lote = tamano_lote or self.TAMANO_LOTE
+        self.archivo_spill = ruta_datos(archivo_spill or self.ARCHIVO_SPILL)
+        self.archivo_rechazados = ruta_datos(archivo_rechazados or self.ARCHIVO_RECHAZADOS)
+
+        self._cola = queue.Queue()
+        self._detener = threading.Event()
+        self._conn = None
+        self._hilo = threading.Thread(target=self._ejecutar, name="auditoria", daemon=True)
+        self._hilo.start()
+
+    # ========== REGISTRO (no bloqueante) ==========
+    def registrar(self, tabla: str, *valores):
+        """Encolar un evento; valores en el orden de TABLAS[tabla] sin created_at"""
+        if tabla not in self.TABLAS:
+            raise ValueError(f"Tabla de auditoría desconocida: {tabla}")
+        self._cola.put((tabla, valores + (datetime.now(),)))
+
+    def registrar_sesion(self, empleado_id: int, accion: str, detalles: str = ""):
+        """Encolar registro para historial_sesiones"""
+        self.registrar('historial_sesiones', empleado_id, accion, detalles)
+
+    def registrar_cambio_estado(self, pedido_id: int, empleado_id: int,
+                                estado_anterior: Optional[str], estado_nuevo: str):
+        """Encolar registro para historial_estados_pedidos"""
+        self.registrar('historial_estados_pedidos', pedido_id, empleado_id, estado_anterior, estado_nuevo)
+
+    # ========== HILO ESCRITOR ==========
+    def _ejecutar(self):
+        while not (self._detener.is_set() and self._cola.empty()):
+            lote = self._tomar_lote()
+            if lote:
+                self._escribir_o_derramar(lote)
+            elif os.path.exists(self.archivo_spill):
+                self._reintentar_spill()
+
+        if self._conn is not None:
+            self._conn.close()
+
+    def _tomar_lote(self) -> List[Tuple[str, tuple]]:
+        """Esperar el primer evento y juntar los que lleguen dentro del intervalo"""
+        try:
+            lote = [self._cola.get(timeout=self.intervalo_flush)]
+        except queue.Empty:
+            return []
+
+        limite = time.monotonic() + self.intervalo_flush
+        while len(lote) < self.tamano_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _escribir_o_derramar(self, lote: List[Tuple[str, tuple]]):
+        # Primero lo pendiente, para conservar el orden de los eventos
+        if os.path.exists(self.archivo_spill) and not self._reintentar_spill():
+            self._derramar(lote)
+            return
+
+        pendientes = self._escribir_o_apartar(lote)
+        if pendientes:
+            self._derramar(pendientes)
+
+    def _escribir_o_apartar(self, lote: List[Tuple[str, tuple]]) -> List[Tuple[str, tuple]]:
+        """Escribir el lote → eventos que quedan pendientes por falta de BD ([] si ninguno).
+
+        Si la BD rechaza el lote por sus datos, se reintenta evento por evento y
+        los que vuelven a fallar se apartan en archivo_rechazados.
+        """
+        try:
+            self._escribir(lote)
+            return []
+        except ERRORES_CONEXION as e:
+            log.warning("⚠️ Auditoría sin BD (%s); %s eventos pendientes en %s", e, len(lote), self.archivo_spill)
+            return lote
+        except Exception as e:
+            log.warning("⚠️ Lote de auditoría rechazado (%s); se escribe evento por evento", e)
+
+        rechazados = []
+        for i, evento in enumerate(lote):
+            try:
+                self._escribir([evento])
+            except ERRORES_CONEXION as e:
+                log.warning("⚠️ Auditoría sin BD (%s); %s eventos pendientes", e, len(lote) - i)
+                self._guardar(self.archivo_rechazados, rechazados)
+                return lote[i:]
+            except Exception as e:
+                log.error("❌ Evento de auditoría rechazado por la BD (%s): %s", e, evento)
+                rechazados.append(evento)
+        self._guardar(self.archivo_rechazados, rechazados)
+        return []
+
+    def _escribir(self, lote: List[Tuple[str, tuple]]):
+        """Escribir un lote con un COPY por tabla en una sola transacción"""
+        por_tabla: Dict[str, List[tuple]] = {}
+        for tabla, valores in lote:
+            por_tabla.setdefault(tabla, []).append(valores)
+
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = psycopg2.connect(**self.db.conn_params)
+
+            with self._conn.cursor() as cur:
+                for tabla, filas in por_tabla.items():
+                    columnas = ', '.join(self.TABLAS[tabla])
+                    cur.copy_expert(
+                        f"COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv)",
+                        self._csv(filas)
+                    )
+            self._conn.commit()
+        except Exception:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            raise
+
+    @staticmethod
+    def _csv(filas: List[tuple]) -> io.StringIO:
+        """CSV para COPY: textos siempre entre comillas, None sin comillas (= NULL)"""
+        buffer = io.StringIO()
+        for fila in filas:
+            campos = []
+            for valor in fila:
+                if valor is None:
+                    campos.append('')
+                elif isinstance(valor, str):
+                    campos.append('"' + valor.replace('"', '""') + '"')
+                elif isinstance(valor, datetime):
+                    campos.append(valor.isoformat())
+                else:
+                    campos.append(str(valor))
+            buffer.write(','.join(campos) + '\n')
+        buffer.seek(0)
+        return buffer
+
+    # ========== SPILL LOCAL ==========
+    def _derramar(self, lote: List[Tuple[str, tuple]]):
+        self._guardar(self.archivo_spill, lote)
+
+    def _guardar(self, archivo: str, lote: List[Tuple[str, tuple]], modo: str = 'a'):
+        """Eventos como JSON por línea (modo 'w' reemplaza el archivo)"""
+        if not lote and modo == 'a':
+            return
+        try:
+            with open(archivo, modo, encoding='utf-8') as f:
+                for tabla, valores in lote:
+                    f.write(json.dumps({'tabla': tabla, 'valores': valores}, default=datetime.isoformat) + '\n')
+        except Exception as e:
+            log.error("❌ Error guardando auditoría en %s: %s", archivo, e)
+
+    def _reintentar_spill(self) -> bool:
+        """Reenviar eventos pendientes del archivo local; True si quedó vacío"""
+        try:
+            with open(self.archivo_spill, 'r', encoding='utf-8') as f:
+                lote = []
+                for linea in f:
+                    if not linea.strip():
+                        continue
+                    try:
+                        evento = json.loads(linea)
+                        valores = list(evento['valores'])
+                        valores[-1] = datetime.fromisoformat(valores[-1])
+                        lote.append((evento['tabla'], tuple(valores)))
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        log.error("❌ Línea ilegible en auditoría pendiente, apartada: %s", linea.strip())
+                        with open(self.archivo_rechazados, 'a', encoding='utf-8') as r:
+                            r.write(linea)
+        except FileNotFoundError:
+            return True
+        except Exception as e:
+            log.error("❌ Error leyendo auditoría pendiente: %s", e)
+            return False
+
+        pendientes = self._escribir_o_apartar(lote) if lote else []
+        if pendientes:
+            # Sólo quedan los no escritos (los primeros pudieron entrar antes de caer la BD)
+            if len(pendientes) < len(lote):
+                tmp = self.archivo_spill + ".tmp"
+                self._guardar(tmp, pendientes, 'w')
+                os.replace(tmp, self.archivo_spill)
+            return False
+
+        os.remove(self.archivo_spill)
+        log.debug("✅ %s eventos de auditoría pendientes enviados", len(lote))
+        return True
+
+    def detener(self, timeout: Optional[float] = 2.0):
+        """Vaciar la cola y detener el hilo (llamar al cerrar la app)"""
+        self._detener.set()
+        self._hilo.join(timeout)
@@ -1,75 +1,296 @@
-# services/auth_service.py - PERMISOS CORREGIDOS
+# services/auth_service.py
+import hashlib
+import hmac
+import os
+import threading
+import time
 import psycopg2
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from services.auditoria_service import AuditoriaService
+from services.permisos_service import PermisosService
+from utils.logger import obtener_logger
+from utils.rutas import ruta_datos
+
+log = obtener_logger(__name__)
+
+# Formato de pin_hash: <algoritmo>$<iteraciones>$<salt hex>$<hash hex>
+#
+# El login es sólo por PIN, así que todos comparten salt (un hash por intento, no
+# uno por empleado). Para que la tabla sola no baste para recorrer los 10^6 PINs,
+# el PIN pasa antes por un HMAC con un secreto ("pepper") que no está en la base:
+# POS_PIN_PEPPER o el archivo ARCHIVO_PEPPER, que deben ser iguales en todas las
+# terminales que comparten la base. Sólo la instalación (utils/migrar_pins.py,
+# utils/configurar_pins.py) lo crea: una terminal sin pepper no verifica ni
+# hashea PINs, porque con uno distinto nadie podría entrar y cada rehash
+# dejaría al empleado afuera en las demás terminales.
+PIN_HASH_ALGORITMO = 'pbkdf2_sha256_pepper'
+# Hashes anteriores sin pepper: se aceptan y se rehashean en el siguiente login
+PIN_HASH_LEGADO = 'pbkdf2_sha256'
+PIN_HASH_ITERACIONES = 20000
+ARCHIVO_PEPPER = "pin_pepper.key"
+
+_pepper: Optional[bytes] = None
+
+class PepperNoConfigurado(Exception):
+    """La terminal no tiene el pepper de PINs (POS_PIN_PEPPER ni ARCHIVO_PEPPER)"""
+
+def obtener_pepper() -> bytes:
+    """Secreto de los PINs: POS_PIN_PEPPER o ARCHIVO_PEPPER (lanza PepperNoConfigurado)"""
+    global _pepper
+    if _pepper is None:
+        secreto = os.environ.get('POS_PIN_PEPPER')
+        if secreto:
+            _pepper = secreto.encode('utf-8')
+        else:
+            ruta = ruta_datos(ARCHIVO_PEPPER)
+            if not os.path.exists(ruta):
+                raise PepperNoConfigurado(
+                    f"Falta el pepper de PINs: defina POS_PIN_PEPPER o copie {ruta} "
+                    "desde la terminal donde se corrió utils/migrar_pins.py"
+                )
+            with open(ruta, 'r') as f:
+                _pepper = bytes.fromhex(f.read().strip())
+    return _pepper
+
+def crear_pepper() -> bytes:
+    """Sólo para la instalación: crear ARCHIVO_PEPPER si la terminal aún no tiene pepper"""
+    try:
+        return obtener_pepper()
+    except PepperNoConfigurado:
+        ruta = ruta_datos(ARCHIVO_PEPPER)
+        fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(os.urandom(32).hex())
+        log.warning("🔑 Pepper de PINs creado en %s: cópielo a las demás terminales", ruta)
+        return obtener_pepper()
+
+def hash_pin(pin_code: str, salt: bytes, iteraciones: int = PIN_HASH_ITERACIONES,
+             algoritmo: str = PIN_HASH_ALGORITMO) -> str:
+    """Hash salado (y con pepper) de un PIN en el formato almacenado en empleados.pin_hash"""
+    clave = pin_code.encode('utf-8')
+    if algoritmo == PIN_HASH_ALGORITMO:
+        clave = hmac.new(obtener_pepper(), clave, hashlib.sha256).digest()
+    digest = hashlib.pbkdf2_hmac('sha256', clave, salt, iteraciones)
+    return f"{algoritmo}${iteraciones}${salt.hex()}${digest.hex()}"
+
+def parsear_pin_hash(pin_hash: str) -> Optional[Tuple[str, int, bytes, str]]:
+    """Obtener (algoritmo, iteraciones, salt, digest hex) de un pin_hash, o None si no es válido"""
+    try:
+        algoritmo, iteraciones, salt, digest = pin_hash.split('$')
+        if algoritmo not in (PIN_HASH_ALGORITMO, PIN_HASH_LEGADO):
+            return None
+        return algoritmo, int(iteraciones), bytes.fromhex(salt), digest
+    except (AttributeError, ValueError):
+        return None
+
+def nuevo_salt() -> bytes:
+    return os.urandom(16)
+
+def salt_compartido(pin_hashes) -> bytes:
+    """Salt vigente (el del primer hash con pepper) o uno nuevo"""
+    for pin_hash in pin_hashes:
+        parsed = parsear_pin_hash(pin_hash) if pin_hash else None
+        if parsed and parsed[0] == PIN_HASH_ALGORITMO:
+            return parsed[2]
+    return nuevo_salt()
 
 class AuthService:
+    # Tras un PIN no encontrado, recargar la caché como máximo cada N segundos
+    RECARGA_MINIMA_SEG = 5
+    # Refrescar la caché en segundo plano si es más vieja que esto
+    CACHE_TTL_SEG = 300
+    
     def __init__(self, db_service):
         self.db = db_service
         self.usuario_actual = None
+        # Mensaje para la pantalla si la terminal está mal configurada (sin pepper)
+        self.error_configuracion: Optional[str] = None
+        # Terminal con servidor central (sin BD): PINs, auditoría y permisos los
+        # resuelve el servidor (ver servidor/protocolo.OPERACIONES['auth'])
+        self.auditoria = AuditoriaService.instancia(db_service) if db_service is not None else None
+        self.permisos = PermisosService(db_service, escuchar_cambios=db_service is not None)
+        
+        # Caché de verificadores: (algoritmo, iteraciones, salt) → {digest hex: empleado}
+        self._verificadores: Dict[Tuple[str, int, bytes], Dict[str, Dict]] = {}
+        self._salt_actual: Optional[bytes] = None
+        self._cache_cargada_en = 0.0
+        self._lock_cache = threading.Lock()
+        self._recargando = False
     
-    def login(self, pin_code: str) -> Tuple[bool, Optional[Dict]]:
-        """Autenticar usuario por PIN"""
+    # ========== CACHÉ DE EMPLEADOS ==========
+    def cargar_cache_empleados(self):
+        """Cargar empleados activos y sus verificadores de PIN en memoria"""
+        conn = psycopg2.connect(**self.db.conn_params)
+        cur = conn.cursor()
+        
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
-            
             cur.execute("""
-                SELECT id, nombre, rol, pin_code, activo
+                SELECT id, nombre, rol, activo, pin_hash, pin_code
                 FROM empleados 
-                WHERE pin_code = %s AND activo = TRUE
-            """, (pin_code,))
-            
-            resultado = cur.fetchone()
+                WHERE activo = TRUE
+            """)
+            filas = cur.fetchall()
+        except psycopg2.errors.UndefinedColumn:
+            # Base sin migrar (utils/migrar_pins.py): sólo PIN en texto plano
+            conn.rollback()
+            cur.execute("""
+                SELECT id, nombre, rol, activo, NULL, pin_code
+                FROM empleados 
+                WHERE activo = TRUE
+            """)
+            filas = cur.fetchall()
+        finally:
             cur.close()
             conn.close()
-            
-            if resultado:
-                usuario = {
-                    'id': resultado[0],
-                    'nombre': resultado[1],
-                    'rol': resultado[2],
-                    'pin_code': resultado[3],
-                    'activo': resultado[4]
-                }
-                
-                self.usuario_actual = usuario
-                self.registrar_accion(usuario['id'], 'LOGIN', 'Inicio de sesión exitoso')
-                
-                print(f"✅ Login exitoso: {usuario['nombre']} ({usuario['rol']})")
-                return True, usuario
-            else:
-                print("❌ Login fallido: PIN incorrecto o usuario inactivo")
-                return False, None
-                
+        
+        verificadores = {}
+        pendientes = []
+        salt_actual = None
+        for id_, nombre, rol, activo, pin_hash, pin_code in filas:
+            usuario = {'id': id_, 'nombre': nombre, 'rol': rol, 'activo': activo}
+            parsed = parsear_pin_hash(pin_hash) if pin_hash else None
+            if parsed:
+                algoritmo, iteraciones, salt, digest = parsed
+                verificadores.setdefault((algoritmo, iteraciones, salt), {})[digest] = usuario
+                if algoritmo == PIN_HASH_ALGORITMO:
+                    salt_actual = salt_actual or salt
+            elif pin_code:
+                pendientes.append((usuario, pin_code))
+        
+        # PINs aún sin migrar: se hashean sólo en memoria con el salt vigente
+        if pendientes:
+            salt_actual = salt_actual or self._salt_actual or nuevo_salt()
+            for usuario, pin_code in pendientes:
+                digest = parsear_pin_hash(hash_pin(pin_code, salt_actual))[3]
+                clave = (PIN_HASH_ALGORITMO, PIN_HASH_ITERACIONES, salt_actual)
+                verificadores.setdefault(clave, {})[digest] = usuario
+        
+        with self._lock_cache:
+            self._verificadores = verificadores
+            self._salt_actual = salt_actual
+            self._cache_cargada_en = time.monotonic()
+        
+        log.info("🔑 Caché de empleados: %s activos", sum(len(v) for v in verificadores.values()))
+    
+    def invalidar_cache(self):
+        """Forzar recarga de empleados en el siguiente login"""
+        with self._lock_cache:
+            self._cache_cargada_en = 0.0
+            self._verificadores = {}
+    
+    def precargar_cache(self):
+        """Cargar la caché de empleados en segundo plano (al iniciar la app)"""
+        self._refrescar_en_segundo_plano()
+    
+    def _refrescar_en_segundo_plano(self):
+        if self._recargando:
+            return
+        self._recargando = True
+        
+        def refrescar():
+            try:
+                self.cargar_cache_empleados()
+            except Exception as e:
+                log.error("❌ Error refrescando caché de empleados: %s", e)
+            finally:
+                self._recargando = False
+        
+        threading.Thread(target=refrescar, name="cache_empleados", daemon=True).start()
+    
+    @staticmethod
+    def _error_pepper() -> Optional[str]:
+        """Sin pepper no se verifica ni se guarda ningún PIN → mensaje para la pantalla"""
+        try:
+            obtener_pepper()
+            return None
+        except PepperNoConfigurado as e:
+            log.error("❌ %s", e)
+            return str(e)
+    
+    def _buscar_pin(self, pin_code: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Verificar PIN contra la caché (un hash por salt distinto, normalmente uno) → (empleado, algoritmo)"""
+        with self._lock_cache:
+            grupos = list(self._verificadores.items())
+        
+        for (algoritmo, iteraciones, salt), por_digest in grupos:
+            digest = parsear_pin_hash(hash_pin(pin_code, salt, iteraciones, algoritmo))[3]
+            usuario = por_digest.get(digest)
+            if usuario:
+                return usuario, algoritmo
+        return None, None
+    
+    def autenticar(self, pin_code: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Verificar un PIN contra la caché sin abrir sesión → (empleado, error de configuración).
+
+        Es la parte que corre en el servidor central; login() guarda la sesión.
+        """
+        error = self._error_pepper()
+        if error:
+            return None, error
+        
+        edad = time.monotonic() - self._cache_cargada_en
+        if not self._cache_cargada_en:
+            self.cargar_cache_empleados()
+        elif edad > self.CACHE_TTL_SEG:
+            self._refrescar_en_segundo_plano()
+        
+        usuario, algoritmo = self._buscar_pin(pin_code)
+        
+        # PIN desconocido: quizá es un empleado nuevo o un PIN cambiado en otra terminal
+        if not usuario and time.monotonic() - self._cache_cargada_en > self.RECARGA_MINIMA_SEG:
+            self.cargar_cache_empleados()
+            usuario, algoritmo = self._buscar_pin(pin_code)
+        
+        if not usuario:
+            log.warning("❌ Login fallido: PIN incorrecto o usuario inactivo")
+            return None, None
+        
+        usuario = dict(usuario)
+        if algoritmo == PIN_HASH_LEGADO:
+            try:
+                self._guardar_pin(usuario['id'], pin_code)
+            except Exception as e:
+                log.warning("⚠️ No se pudo rehashear el PIN de %s: %s", usuario['nombre'], e)
+        self.registrar_accion(usuario['id'], 'LOGIN', 'Inicio de sesión exitoso')
+        
+        log.info("✅ Login exitoso: %s (%s)", usuario['nombre'], usuario['rol'])
+        return usuario, None
+    
+    def login(self, pin_code: str) -> Tuple[bool, Optional[Dict]]:
+        """Autenticar usuario por PIN y abrir su sesión en esta terminal"""
+        try:
+            usuario, self.error_configuracion = self.autenticar(pin_code)
         except Exception as e:
-            print(f"❌ Error en login: {e}")
+            log.error("❌ Error en login: %s", e)
+            return False, None
+        
+        if not usuario:
             return False, None
+        
+        self.usuario_actual = usuario
+        if self.db is None:
+            # Sin LISTEN propio: la terminal toma los permisos vigentes en cada login
+            try:
+                self.permisos.reemplazar(self.filas_permisos())
+            except Exception as e:
+                log.warning("⚠️ Permisos no actualizados desde el servidor: %s", e)
+        return True, usuario
+    
+    def filas_permisos(self) -> List[Tuple[str, str]]:
+        """Reglas (rol, recurso) vigentes, para las terminales con servidor central"""
+        return self.permisos.filas
     
     def logout(self):
         """Cerrar sesión del usuario actual"""
         if self.usuario_actual:
             self.registrar_accion(self.usuario_actual['id'], 'LOGOUT', 'Cierre de sesión')
-            print(f"🚪 Logout: {self.usuario_actual['nombre']}")
+            log.info("🚪 Logout: %s", self.usuario_actual['nombre'])
             self.usuario_actual = None
     
     def registrar_accion(self, empleado_id: int, accion: str, detalles: str = ""):
-        """Registrar acción en el historial"""
-        try:
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
-            
-            cur.execute("""
-                INSERT INTO historial_sesiones (empleado_id, accion, detalles)
-                VALUES (%s, %s, %s)
-            """, (empleado_id, accion, detalles))
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            
-        except Exception as e:
-            print(f"❌ Error registrando acción: {e}")
+        """Registrar acción en el historial (se escribe en segundo plano, por lotes)"""
+        self.auditoria.registrar_sesion(empleado_id, accion, detalles)
     
     def obtener_historial(self, limite: int = 50) -> list:
         """Obtener historial de sesiones recientes"""
@@ -106,91 +327,74 @@ class AuthService:
             return historial
             
         except Exception as e:
-            print(f"❌ Error obteniendo historial: {e}")
+            log.error("❌ Error obteniendo historial: %s", e)
             return []
     
     def verificar_permiso(self, pantalla: str) -> bool:
-        """Verificar permisos - VERSIÓN CORREGIDA Y MÁS FLEXIBLE"""
+        """Verificar acceso del usuario actual a una pantalla (O(1) sobre la matriz compilada)"""
         if not self.usuario_actual:
-            print(f"⚠️ Sin usuario actual - denegando acceso a {pantalla}")
             return False
-        
-        rol = self.usuario_actual['rol'].lower()
-        
-        # ADMINISTRADOR tiene acceso a TODO
-        if rol == 'administrador' or rol == 'admin':
-            print(f"✅ Admin tiene acceso total a {pantalla}")
-            return True
-        
-        # PERMISOS POR ROL - MÁS FLEXIBLES
-        permisos = {
-            'mesero': [
-                'menu', 'pedidos', 'cierre_cuenta', 'cocina'
-            ],
-            'cocinero': [
-                'menu', 'cocina', 'pedidos'  # Puede ver pedidos
-            ],
-            'cajero': [
-                'menu', 'caja', 'cierre_cuenta', 'pedidos', 'cocina', 'inventario'
-            ],
-            'administrador': [  # Por si acaso no detecta 'admin'
-                'menu', 'pedidos', 'cierre_cuenta', 'cocina', 
-                'caja', 'inventario', 'config', 'reportes'
-            ]
-        }
-        
-        pantallas_permitidas = permisos.get(rol, ['menu'])
-        
-        tiene_permiso = pantalla in pantallas_permitidas
-        
-        if tiene_permiso:
-            print(f"✅ Rol '{rol}' tiene acceso a '{pantalla}'")
-        else:
-            print(f"🚫 Rol '{rol}' NO tiene acceso a '{pantalla}'")
-            print(f"   Pantallas permitidas: {pantallas_permitidas}")
-        
-        return tiene_permiso
+        return self.permisos.permite(self.usuario_actual['rol'], pantalla)
     
     def cambiar_pin(self, nuevo_pin: str) -> bool:
-        """Cambiar PIN del usuario actual"""
+        """Cambiar PIN del usuario actual (se guarda sólo el hash)"""
         if not self.usuario_actual:
             return False
         
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
-            
+            return self.cambiar_pin_empleado(self.usuario_actual['id'], nuevo_pin)
+        except Exception as e:
+            log.error("❌ Error cambiando PIN: %s", e)
+            return False
+    
+    def cambiar_pin_empleado(self, empleado_id: int, nuevo_pin: str) -> bool:
+        """Guardar el nuevo PIN de un empleado (lo que corre en el servidor central)"""
+        if self._error_pepper():
+            return False
+        
+        if not self._cache_cargada_en:
+            self.cargar_cache_empleados()
+        
+        # Con login sólo por PIN, dos empleados con el mismo PIN serían indistinguibles
+        otro, _ = self._buscar_pin(nuevo_pin)
+        if otro and otro['id'] != empleado_id:
+            log.warning("⚠️ PIN no disponible, elija otro")
+            return False
+        
+        self._guardar_pin(empleado_id, nuevo_pin)
+        self.cargar_cache_empleados()
+        self.registrar_accion(empleado_id, 'CAMBIAR_PIN', 'PIN actualizado')
+        
+        log.info("✅ PIN actualizado para el empleado %s", empleado_id)
+        return True
+    
+    def _guardar_pin(self, empleado_id: int, pin_code: str):
+        """Guardar el hash con pepper del PIN (también rehashea los del formato anterior)"""
+        if self._salt_actual is None:
+            self._salt_actual = nuevo_salt()
+        salt = self._salt_actual
+        
+        conn = psycopg2.connect(**self.db.conn_params)
+        cur = conn.cursor()
+        try:
             cur.execute("""
                 UPDATE empleados 
-                SET pin_code = %s 
+                SET pin_hash = %s, pin_code = NULL
                 WHERE id = %s
-            """, (nuevo_pin, self.usuario_actual['id']))
-            
+            """, (hash_pin(pin_code, salt), empleado_id))
             conn.commit()
+        finally:
             cur.close()
             conn.close()
-            
-            self.registrar_accion(self.usuario_actual['id'], 'CAMBIAR_PIN', 'PIN actualizado')
-            
-            print(f"✅ PIN actualizado para {self.usuario_actual['nombre']}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error cambiando PIN: {e}")
-            return False
         
     def puede_cerrar_pedidos(self, usuario_actual: Dict) -> bool:
         """Verificar si el usuario puede cerrar pedidos (procesar pagos)"""
         if not usuario_actual:
             return False
-        
-        rol = usuario_actual.get('rol', '').lower()
-        return rol in ['cajero', 'administrador', 'admin']
+        return self.permisos.permite(usuario_actual.get('rol'), 'cerrar_pedidos')
 
     def puede_imprimir_tickets(self, usuario_actual: Dict) -> bool:
         """Verificar si el usuario puede imprimir tickets"""
         if not usuario_actual:
             return False
-        
-        rol = usuario_actual.get('rol', '').lower()
-        return rol in ['cajero', 'administrador', 'admin']
\ No newline at end of file
+        return self.permisos.permite(usuario_actual.get('rol'), 'imprimir_tickets')
@@ -0,0 +1,105 @@
+# services/borradores_service.py - PEDIDOS EN CAPTURA POR MESA (LOCALES A LA TERMINAL)
+"""
+Cada terminal puede tener abierto un borrador por mesa y saltar entre ellos sin
+consultar la base: los carritos viven en memoria y cambiar de mesa es buscar
+en un dict.
+
+Para que reiniciar la tablet no pierda nada, guardar() escribe las instantáneas
+de todos los borradores en un JSON local de la carpeta de datos (tmp + fsync +
+os.replace: ni un corte de luz deja un archivo a medias o vacío) y se leen la
+primera vez que se usan. Es estado de la
+terminal: nunca viaja al servidor.
+"""
+import json
+import os
+from typing import Dict, List
+from models import Carrito
+from utils.logger import obtener_logger
+from utils.rutas import ruta_datos
+
+log = obtener_logger(__name__)
+
+
+class BorradoresPedido:
+    """Carritos por mesa + mesa activa, persistidos en ARCHIVO"""
+
+    ARCHIVO = "borradores_pedido.json"
+
+    def __init__(self, archivo: str = None):
+        self.archivo = ruta_datos(archivo or self.ARCHIVO)
+        self._carritos: Dict[str, Carrito] = {}
+        self._mesa_activa = '1'
+        self._cargado = False
+
+    # ========== BORRADOR ACTIVO ==========
+    @property
+    def mesa_activa(self) -> str:
+        self._cargar()
+        return self._mesa_activa
+
+    @property
+    def activo(self) -> Carrito:
+        """Carrito de la mesa activa (se crea vacío la primera vez)"""
+        self._cargar()
+        carrito = self._carritos.get(self._mesa_activa)
+        if carrito is None:
+            carrito = self._carritos[self._mesa_activa] = Carrito(self._mesa_activa)
+        return carrito
+
+    def cambiar_mesa(self, mesa: str) -> Carrito:
+        """Pasar a otra mesa conservando el borrador de la actual"""
+        self._cargar()
+        self._mesa_activa = str(mesa)
+        self.guardar()
+        return self.activo
+
+    def descartar(self, mesa: str = None):
+        """Quitar el borrador de la mesa (la activa por defecto): confirmado o limpiado"""
+        self._cargar()
+        self._carritos.pop(str(mesa) if mesa is not None else self._mesa_activa, None)
+        self.guardar()
+
+    def abiertos(self) -> List[Carrito]:
+        """Borradores con líneas, en orden de mesa"""
+        self._cargar()
+        carritos = [c for c in self._carritos.values() if c]
+        carritos.sort(key=lambda c: (not c.mesa.isdigit(), int(c.mesa) if c.mesa.isdigit() else 0, c.mesa))
+        return carritos
+
+    # ========== PERSISTENCIA ==========
+    def guardar(self) -> bool:
+        """Escribir todos los borradores con líneas (llamar tras cada cambio)"""
+        datos = {
+            'activa': self._mesa_activa,
+            'borradores': {mesa: c.instantanea() for mesa, c in self._carritos.items() if c},
+        }
+        tmp = self.archivo + ".tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.archivo)
+            return True
+        except OSError as e:
+            log.error("❌ Error guardando borradores de pedido: %s", e)
+            return False
+
+    def _cargar(self):
+        if self._cargado:
+            return
+        self._cargado = True
+        if not os.path.exists(self.archivo):
+            return
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            self._mesa_activa = str(datos.get('activa', self._mesa_activa))
+            self._carritos = {
+                mesa: Carrito.restaurar(mesa, lineas)
+                for mesa, lineas in datos.get('borradores', {}).items()
+            }
+            if self._carritos:
+                log.info("📝 %s borradores de pedido recuperados", len(self._carritos))
+        except (OSError, ValueError, TypeError) as e:
+            log.error("❌ Borradores de pedido ilegibles (%s); se empieza sin borradores", e)
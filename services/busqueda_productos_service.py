@@ -0,0 +1,207 @@
+# services/busqueda_productos_service.py - BÚSQUEDA DE PRODUCTOS CON RANKING
+"""
+Búsqueda por nombre tolerante a acentos y errores de tecleo, paginada.
+
+- Con utils/crear_indices_busqueda.py aplicado: pg_trgm sobre pos_normalizar(nombre)
+  (índice GIN). Coinciden los nombres que contienen el texto o se le parecen
+  (word_similarity); primero los que empiezan por el texto, luego por parecido.
+- Sin pg_trgm/unaccent en el servidor, o si la consulta falla: IndiceProductos, un
+  índice en memoria del catálogo (prefijos de palabra + trigramas) que se carga con
+  una sola consulta y se invalida al crear/editar/eliminar productos.
+"""
+import bisect
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from models import Producto
+from services.producto_service import COLUMNAS_PRODUCTO as COLUMNAS
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos (equivalente a pos_normalizar en la BD)"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower().strip()
+
+
+def trigramas(palabra: str) -> Set[str]:
+    """Trigramas de una palabra con el relleno de pg_trgm ('  ab' ... 'yz ')"""
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceProductos:
+    """Catálogo en memoria: prefijo de palabra por bisect + trigramas invertidos"""
+
+    UMBRAL_SIMILITUD = 0.5
+
+    def __init__(self, productos: List[Producto]):
+        self.productos: Dict[int, Producto] = {p.id: p for p in productos}
+        self._nombres: Dict[int, str] = {}
+        palabras: List[Tuple[str, int]] = []
+        self._trigramas: Dict[str, Set[int]] = defaultdict(set)
+
+        for producto in productos:
+            nombre = normalizar(producto.nombre)
+            self._nombres[producto.id] = nombre
+            for palabra in set(nombre.split()):
+                palabras.append((palabra, producto.id))
+                for trigrama in trigramas(palabra):
+                    self._trigramas[trigrama].add(producto.id)
+
+        palabras.sort()
+        self._palabras = [p for p, _ in palabras]
+        self._ids_palabras = [i for _, i in palabras]
+        self._ordenados = sorted(productos, key=lambda p: (p.categoria, p.nombre))
+
+    def _por_prefijo(self, prefijo: str) -> Set[int]:
+        ids = set()
+        i = bisect.bisect_left(self._palabras, prefijo)
+        while i < len(self._palabras) and self._palabras[i].startswith(prefijo):
+            ids.add(self._ids_palabras[i])
+            i += 1
+        return ids
+
+    def _por_parecido(self, palabra: str) -> Dict[int, float]:
+        """Fracción de los trigramas de la palabra buscada presentes en el nombre"""
+        buscados = trigramas(palabra)
+        comunes = Counter()
+        for trigrama in buscados:
+            comunes.update(self._trigramas.get(trigrama, ()))
+        return {pid: n / len(buscados) for pid, n in comunes.items()
+                if n / len(buscados) >= self.UMBRAL_SIMILITUD}
+
+    def buscar(self, texto: str, categoria: Optional[str] = None,
+               limite: int = 50, desplazamiento: int = 0) -> Tuple[List[Producto], bool]:
+        palabras = normalizar(texto).split()
+        puntajes: Optional[Dict[int, float]] = None
+
+        # Todas las palabras deben coincidir (por prefijo o por parecido)
+        for palabra in palabras:
+            actuales = self._por_parecido(palabra)
+            for pid in self._por_prefijo(palabra):
+                actuales[pid] = 2.0
+            if puntajes is None:
+                puntajes = actuales
+            else:
+                puntajes = {pid: puntajes[pid] + p for pid, p in actuales.items() if pid in puntajes}
+            if not puntajes:
+                break
+
+        if puntajes is None:
+            candidatos = self._ordenados
+        else:
+            candidatos = [self.productos[pid] for pid in
+                          sorted(puntajes, key=lambda pid: (-puntajes[pid], self._nombres[pid]))]
+
+        if categoria:
+            candidatos = [p for p in candidatos if p.categoria == categoria]
+        pagina = candidatos[desplazamiento:desplazamiento + limite]
+        return pagina, len(candidatos) > desplazamiento + limite
+
+
+class BusquedaProductosService:
+    """Búsqueda paginada de productos activos (pg_trgm o índice en memoria)"""
+
+    def __init__(self, db_service):
+        self.db = db_service
+        self._trgm_disponible: Optional[bool] = None
+        self._indice: Optional[IndiceProductos] = None
+        self._lock = threading.Lock()
+
+    def buscar(self, texto: str = "", categoria: Optional[str] = None,
+               limite: int = 50, desplazamiento: int = 0) -> Dict:
+        """{'productos': [...], 'hay_mas': bool, 'origen': 'bd' | 'memoria'}"""
+        categoria = categoria if categoria and categoria != 'Todos' else None
+
+        if self._usar_bd():
+            try:
+                productos, hay_mas = self._buscar_bd(texto, categoria, limite, desplazamiento)
+                return {'productos': productos, 'hay_mas': hay_mas, 'origen': 'bd'}
+            except Exception as e:
+                log.warning("⚠️ Búsqueda en BD falló, usando índice en memoria: %s", e)
+
+        indice = self._indice_local()
+        if indice is None:
+            return {'productos': [], 'hay_mas': False, 'origen': 'memoria'}
+        productos, hay_mas = indice.buscar(texto, categoria, limite, desplazamiento)
+        return {'productos': productos, 'hay_mas': hay_mas, 'origen': 'memoria'}
+
+    def invalidar(self):
+        """El catálogo cambió: recargar el índice en memoria en la próxima búsqueda"""
+        with self._lock:
+            self._indice = None
+
+    # ========== POSTGRESQL ==========
+    def _usar_bd(self) -> bool:
+        if self._trgm_disponible is None:
+            try:
+                conn = self.db.conectar()
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT to_regprocedure('pos_normalizar(text)') IS NOT NULL
+                       AND EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')
+                """)
+                self._trgm_disponible = cur.fetchone()[0]
+                cur.close()
+                conn.close()
+                if not self._trgm_disponible:
+                    log.info("ℹ️ Sin índice trigram (utils/crear_indices_busqueda.py): búsqueda en memoria")
+            except Exception as e:
+                log.warning("⚠️ No se pudo verificar pg_trgm: %s", e)
+                return False
+        return self._trgm_disponible
+
+    def _buscar_bd(self, texto: str, categoria: Optional[str], limite: int,
+                   desplazamiento: int) -> Tuple[List[Producto], bool]:
+        q = normalizar(texto)
+        conn = self.db.conectar()
+        cur = conn.cursor()
+
+        if not q:
+            cur.execute(f"""
+                SELECT {COLUMNAS} FROM productos
+                WHERE activo = TRUE AND (%(categoria)s::text IS NULL OR categoria = %(categoria)s)
+                ORDER BY categoria, nombre
+                LIMIT %(limite)s OFFSET %(desplazamiento)s
+            """, {'categoria': categoria, 'limite': limite + 1, 'desplazamiento': desplazamiento})
+        else:
+            literal = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            cur.execute(f"""
+                SELECT {COLUMNAS} FROM productos
+                WHERE activo = TRUE
+                  AND (%(categoria)s::text IS NULL OR categoria = %(categoria)s)
+                  AND (pos_normalizar(nombre) LIKE %(contiene)s OR %(q)s <%% pos_normalizar(nombre))
+                ORDER BY pos_normalizar(nombre) LIKE %(empieza)s DESC,
+                         word_similarity(%(q)s, pos_normalizar(nombre)) DESC,
+                         nombre
+                LIMIT %(limite)s OFFSET %(desplazamiento)s
+            """, {
+                'categoria': categoria, 'q': q,
+                'contiene': f"%{literal}%", 'empieza': f"{literal}%",
+                'limite': limite + 1, 'desplazamiento': desplazamiento
+            })
+
+        filas = cur.fetchall()
+        cur.close()
+        conn.close()
+        return [Producto(*row) for row in filas[:limite]], len(filas) > limite
+
+    # ========== MEMORIA ==========
+    def _indice_local(self) -> Optional[IndiceProductos]:
+        with self._lock:
+            if self._indice is None:
+                try:
+                    conn = self.db.conectar()
+                    cur = conn.cursor()
+                    cur.execute(f"SELECT {COLUMNAS} FROM productos WHERE activo = TRUE")
+                    self._indice = IndiceProductos([Producto(*row) for row in cur.fetchall()])
+                    cur.close()
+                    conn.close()
+                    log.debug("🔎 Índice en memoria: %s productos", len(self._indice.productos))
+                except Exception as e:
+                    log.error("❌ Error cargando catálogo para búsqueda: %s", e)
+            return self._indice
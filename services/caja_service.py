@@ -1,9 +1,18 @@
 # services/caja_service.py
-import psycopg2
 from typing import List, Dict, Optional
 from datetime import datetime, date
+from models import CERO, Dinero, MovimientoCaja, Pedido
+from services.consumo_service import ConsumoService
+from services.pedido_service import COLUMNAS_PEDIDO, cargar_items
+from services.reporte_service import ReporteService
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class CajaService:
+    # Diferencia de arqueo que todavía cuenta como caja cuadrada
+    TOLERANCIA_ARQUEO = Dinero(centavos=10)
+
     def __init__(self, db_service):
         self.db = db_service
         self.caja_abierta = False
@@ -12,7 +21,7 @@ class CajaService:
     def verificar_caja_abierta(self) -> bool:
         """Verificar si hay caja abierta hoy"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -30,21 +39,21 @@ class CajaService:
             return self.caja_abierta
             
         except Exception as e:
-            print(f"❌ Error verificando caja: {e}")
+            log.error("❌ Error verificando caja: %s", e)
             return False
     
-    def abrir_caja(self, empleado_id: int, fondo_inicial: float) -> bool:
+    def abrir_caja(self, empleado_id: int, fondo_inicial) -> bool:
         """Abrir caja con fondo inicial"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            fondo_inicial = Dinero.de(fondo_inicial)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Registrar apertura
-            cur.execute("""
-                INSERT INTO movimientos_caja 
-                (tipo, empleado_id, monto, detalles)
-                VALUES (%s, %s, %s, %s)
-            """, ('apertura', empleado_id, fondo_inicial, f'Apertura de caja - Fondo: ${fondo_inicial:.2f}'))
+            self._insertar_movimiento(cur, MovimientoCaja(
+                'apertura', empleado_id, monto=fondo_inicial,
+                detalles=f'Apertura de caja - Fondo: ${fondo_inicial:.2f}'
+            ))
             
             # Crear registro de cierre para el día
             cur.execute("""
@@ -62,27 +71,39 @@ class CajaService:
             conn.close()
             
             self.caja_abierta = True
-            print(f"✅ Caja abierta con fondo: ${fondo_inicial:.2f}")
+            log.info("✅ Caja abierta con fondo: $%.2f", fondo_inicial)
             return True
             
         except Exception as e:
-            print(f"❌ Error abriendo caja: {e}")
+            log.error("❌ Error abriendo caja: %s", e)
             return False
     
-    def registrar_pago(self, pedido_id: int, empleado_id: int, monto: float, 
+    @staticmethod
+    def _insertar_movimiento(cur, movimiento: MovimientoCaja) -> MovimientoCaja:
+        """INSERT en movimientos_caja; completa id y created_at del movimiento"""
+        cur.execute("""
+            INSERT INTO movimientos_caja 
+            (tipo, empleado_id, pedido_id, monto, metodo_pago, detalles)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING id, created_at
+        """, (movimiento.tipo, movimiento.empleado_id, movimiento.pedido_id, movimiento.monto,
+              movimiento.metodo_pago, movimiento.detalles))
+        movimiento.id, movimiento.created_at = cur.fetchone()
+        return movimiento
+    
+    def registrar_pago(self, pedido_id: int, empleado_id: int, monto, 
                       metodo_pago: str = 'efectivo') -> bool:
         """Registrar pago de un pedido"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Registrar movimiento de caja
-            cur.execute("""
-                INSERT INTO movimientos_caja 
-                (tipo, empleado_id, pedido_id, monto, metodo_pago, detalles)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, ('venta', empleado_id, pedido_id, monto, metodo_pago, 
-                  f'Pago pedido #{pedido_id} - {metodo_pago}'))
+            monto = Dinero.de(monto)
+            self._insertar_movimiento(cur, MovimientoCaja(
+                'venta', empleado_id, pedido_id, monto, metodo_pago,
+                f'Pago pedido #{pedido_id} - {metodo_pago}'
+            ))
             
             # Actualizar totales en cierre actual
             cur.execute("""
@@ -94,28 +115,36 @@ class CajaService:
                 WHERE fecha = CURRENT_DATE
             """, (monto, metodo_pago, monto, metodo_pago, monto, metodo_pago, monto))
             
-            # Cambiar estado del pedido a "pagado"
+            # Cambiar estado del pedido a "pagado" (un cancelado ya devolvió su stock: no se cobra)
             cur.execute("""
                 UPDATE pedidos 
                 SET estado = 'entregado', total = %s
-                WHERE id = %s
+                WHERE id = %s AND estado <> 'cancelado'
             """, (monto, pedido_id))
+            if cur.rowcount == 0:
+                log.warning("⚠️ Pedido #%s no existe o está cancelado: no se registra el pago", pedido_id)
+                conn.rollback()
+                cur.close()
+                conn.close()
+                return False
             
             conn.commit()
             cur.close()
             conn.close()
             
-            print(f"✅ Pago registrado: Pedido #{pedido_id} - ${monto:.2f} ({metodo_pago})")
+            ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            log.info("✅ Pago registrado: Pedido #%s - $%.2f (%s)", pedido_id, monto, metodo_pago)
             return True
             
         except Exception as e:
-            print(f"❌ Error registrando pago: {e}")
+            log.error("❌ Error registrando pago: %s", e)
             return False
     
     def obtener_ventas_dia(self) -> Dict:
         """Obtener resumen de ventas del día actual"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -136,56 +165,31 @@ class CajaService:
             
             return {
                 'total_ventas': resultado[0],
-                'total_monto': float(resultado[1]),
-                'efectivo': float(resultado[2]),
-                'tarjeta': float(resultado[3]),
-                'transferencia': float(resultado[4])
+                'total_monto': Dinero.de(resultado[1]),
+                'efectivo': Dinero.de(resultado[2]),
+                'tarjeta': Dinero.de(resultado[3]),
+                'transferencia': Dinero.de(resultado[4])
             }
             
         except Exception as e:
-            print(f"❌ Error obteniendo ventas: {e}")
-            return {'total_ventas': 0, 'total_monto': 0, 'efectivo': 0, 'tarjeta': 0, 'transferencia': 0}
+            log.error("❌ Error obteniendo ventas: %s", e)
+            return {'total_ventas': 0, 'total_monto': CERO, 'efectivo': CERO, 'tarjeta': CERO, 'transferencia': CERO}
     
-    def obtener_pedidos_pendientes_pago(self) -> List[Dict]:
-        """Obtener pedidos listos para pagar (estado: listo)"""
+    def obtener_pedidos_pendientes_pago(self) -> List[Pedido]:
+        """Obtener pedidos listos para pagar (estado: listo) con sus líneas"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT 
-                    p.id,
-                    p.mesa,
-                    p.total,
-                    p.created_at,
-                    e.nombre as mesero,
-                    JSON_AGG(
-                        JSON_BUILD_OBJECT(
-                            'nombre', pr.nombre,
-                            'cantidad', ip.cantidad,
-                            'precio', ip.precio_unitario
-                        )
-                    ) as items
+            cur.execute(f"""
+                SELECT {COLUMNAS_PEDIDO}
                 FROM pedidos p
                 JOIN empleados e ON p.empleado_id = e.id
-                JOIN items_pedido ip ON p.id = ip.pedido_id
-                JOIN productos pr ON ip.producto_id = pr.id
                 WHERE p.estado = 'listo'
-                GROUP BY p.id, p.mesa, p.total, p.created_at, e.nombre
                 ORDER BY p.created_at ASC
             """)
             
-            pedidos = []
-            for row in cur.fetchall():
-                pedido = {
-                    'id': row[0],
-                    'mesa': row[1],
-                    'total': float(row[2]),
-                    'created_at': row[3],
-                    'mesero': row[4],
-                    'items': row[5] if row[5] else []
-                }
-                pedidos.append(pedido)
+            pedidos = cargar_items(cur, [Pedido(*row) for row in cur.fetchall()])
             
             cur.close()
             conn.close()
@@ -193,7 +197,7 @@ class CajaService:
             return pedidos
             
         except Exception as e:
-            print(f"❌ Error obteniendo pedidos pendientes: {e}")
+            log.error("❌ Error obteniendo pedidos pendientes: %s", e)
             return []
     
     def cerrar_caja(self, empleado_id: int, observaciones: str = "") -> bool:
@@ -202,7 +206,7 @@ class CajaService:
             # Obtener totales actualizados
             ventas = self.obtener_ventas_dia()
             
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Calcular total de cierre (fondo inicial + ventas efectivo)
@@ -214,11 +218,10 @@ class CajaService:
             fondo_inicial_result = cur.fetchone()
             
             if not fondo_inicial_result:
-                print("❌ No se encontró cierre para hoy")
+                log.warning("⚠️ No se encontró cierre para hoy")
                 return False
                 
-            # Convertir Decimal a float explícitamente
-            fondo_inicial = float(fondo_inicial_result[0])
+            fondo_inicial = Dinero.de(fondo_inicial_result[0])
             total_cierre = fondo_inicial + ventas['efectivo']
             
             # Actualizar cierre con totales finales
@@ -232,37 +235,39 @@ class CajaService:
                     observaciones = %s
                 WHERE fecha = CURRENT_DATE
             """, (
-                float(ventas['total_monto']), 
-                float(ventas['efectivo']), 
-                float(ventas['tarjeta']), 
-                float(ventas['transferencia']), 
-                float(total_cierre), 
+                ventas['total_monto'],
+                ventas['efectivo'],
+                ventas['tarjeta'],
+                ventas['transferencia'],
+                total_cierre,
                 observaciones
             ))
             
             # Registrar movimiento de cierre
-            cur.execute("""
-                INSERT INTO movimientos_caja 
-                (tipo, empleado_id, monto, detalles)
-                VALUES (%s, %s, %s, %s)
-            """, ('cierre', empleado_id, float(total_cierre), f'Cierre de caja - Total: ${total_cierre:.2f}'))
+            self._insertar_movimiento(cur, MovimientoCaja(
+                'cierre', empleado_id, monto=total_cierre,
+                detalles=f'Cierre de caja - Total: ${total_cierre:.2f}'
+            ))
             
             conn.commit()
             cur.close()
             conn.close()
             
             self.caja_abierta = False
-            print(f"✅ Caja cerrada - Total: ${total_cierre:.2f}")
+            log.info("✅ Caja cerrada - Total: $%.2f", total_cierre)
+            
+            # Rollup del día para reportes históricos (no bloquea el cierre si falla)
+            ReporteService(self.db).generar_rollup_dia()
             return True
             
         except Exception as e:
-            print(f"❌ Error cerrando caja: {e}")
+            log.error("❌ Error cerrando caja: %s", e)
             return False    
     def obtener_cierre_actual(self):
 
         """Obtener información del cierre actual del día"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -289,114 +294,124 @@ class CajaService:
             return None
             
         except Exception as e:
-            print(f"❌ Error obteniendo cierre actual: {e}")
+            log.error("❌ Error obteniendo cierre actual: %s", e)
             return None
         
     def generar_reporte_cierre(self, empleado_id: int) -> Dict:
-        """Generar reporte detallado para el cierre de caja"""
+        """Generar reporte detallado para el cierre de caja (una consulta, snapshot consistente)"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
+            # Todas las secciones se leen del mismo snapshot
+            conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
             cur = conn.cursor()
             
-            # Obtener información del cierre actual
+            # Rango del día sobre created_at (aprovecha índices, a diferencia de DATE(created_at))
             cur.execute("""
+                WITH cierre AS (
+                    SELECT 
+                        cc.fondo_inicial,
+                        cc.total_ventas,
+                        cc.total_efectivo,
+                        cc.total_tarjeta,
+                        cc.total_transferencia,
+                        cc.total_cierre,
+                        e.nombre AS empleado
+                    FROM cierres_caja cc
+                    JOIN empleados e ON cc.empleado_id = e.id
+                    WHERE cc.fecha = CURRENT_DATE
+                    LIMIT 1
+                ),
+                ventas AS (
+                    SELECT pedido_id, metodo_pago, monto
+                    FROM movimientos_caja
+                    WHERE tipo = 'venta'
+                    AND created_at >= CURRENT_DATE
+                    AND created_at < CURRENT_DATE + INTERVAL '1 day'
+                ),
+                pedidos_vendidos AS (
+                    -- Un pedido con varios movimientos cuenta una sola vez
+                    SELECT DISTINCT pedido_id
+                    FROM ventas
+                    WHERE pedido_id IS NOT NULL
+                ),
+                lineas AS (
+                    SELECT 
+                        p.id AS producto_id,
+                        p.nombre,
+                        p.categoria,
+                        ip.cantidad,
+                        ip.cantidad * ip.precio_unitario AS importe
+                    FROM items_pedido ip
+                    JOIN pedidos_vendidos pv ON ip.pedido_id = pv.pedido_id
+                    JOIN productos p ON ip.producto_id = p.id
+                ),
+                por_categoria AS (
+                    SELECT categoria, COUNT(*) AS cantidad, SUM(importe) AS total
+                    FROM lineas
+                    GROUP BY categoria
+                ),
+                por_producto AS (
+                    SELECT nombre, SUM(cantidad) AS cantidad, SUM(importe) AS ingreso
+                    FROM lineas
+                    GROUP BY producto_id, nombre
+                    ORDER BY SUM(cantidad) DESC
+                    LIMIT 10
+                ),
+                por_pago AS (
+                    SELECT metodo_pago, COUNT(*) AS transacciones, SUM(monto) AS total
+                    FROM ventas
+                    GROUP BY metodo_pago
+                )
                 SELECT 
-                    cc.fondo_inicial,
-                    cc.total_ventas,
-                    cc.total_efectivo,
-                    cc.total_tarjeta,
-                    cc.total_transferencia,
-                    cc.total_cierre,
-                    e.nombre as empleado
-                FROM cierres_caja cc
-                JOIN empleados e ON cc.empleado_id = e.id
-                WHERE cc.fecha = CURRENT_DATE
+                    (SELECT ROW_TO_JSON(c) FROM cierre c),
+                    (SELECT COALESCE(JSON_AGG(pc ORDER BY pc.total DESC), '[]') FROM por_categoria pc),
+                    (SELECT COALESCE(JSON_AGG(pp ORDER BY pp.cantidad DESC), '[]') FROM por_producto pp),
+                    (SELECT COALESCE(JSON_AGG(pg), '[]') FROM por_pago pg)
             """)
             
-            cierre_info = cur.fetchone()
+            cierre_info, categorias, productos, pagos = cur.fetchone()
+            
+            conn.commit()
+            cur.close()
+            conn.close()
             
             if not cierre_info:
                 return {"error": "No hay cierre para hoy"}
             
-            # Obtener ventas por categoría
-            cur.execute("""
-                SELECT 
-                    p.categoria,
-                    COUNT(*) as cantidad,
-                    SUM(ip.cantidad * ip.precio_unitario) as total
-                FROM items_pedido ip
-                JOIN productos p ON ip.producto_id = p.id
-                JOIN pedidos ped ON ip.pedido_id = ped.id
-                JOIN movimientos_caja mc ON ped.id = mc.pedido_id
-                WHERE DATE(mc.created_at) = CURRENT_DATE
-                AND mc.tipo = 'venta'
-                GROUP BY p.categoria
-                ORDER BY total DESC
-            """)
-            
-            ventas_categoria = []
-            for row in cur.fetchall():
-                ventas_categoria.append({
-                    'categoria': row[0],
-                    'cantidad': row[1],
-                    'total': float(row[2])
-                })
-            
-            # Obtener productos más vendidos
-            cur.execute("""
-                SELECT 
-                    p.nombre,
-                    SUM(ip.cantidad) as total_vendido,
-                    SUM(ip.cantidad * ip.precio_unitario) as ingreso
-                FROM items_pedido ip
-                JOIN productos p ON ip.producto_id = p.id
-                JOIN pedidos ped ON ip.pedido_id = ped.id
-                JOIN movimientos_caja mc ON ped.id = mc.pedido_id
-                WHERE DATE(mc.created_at) = CURRENT_DATE
-                AND mc.tipo = 'venta'
-                GROUP BY p.id, p.nombre
-                ORDER BY total_vendido DESC
-                LIMIT 10
-            """)
-            
-            productos_top = []
-            for row in cur.fetchall():
-                productos_top.append({
-                    'nombre': row[0],
-                    'cantidad': row[1],
-                    'ingreso': float(row[2])
-                })
-            
-            # Obtener resumen por método de pago
-            cur.execute("""
-                SELECT 
-                    metodo_pago,
-                    COUNT(*) as transacciones,
-                    SUM(monto) as total
-                FROM movimientos_caja
-                WHERE tipo = 'venta'
-                AND DATE(created_at) = CURRENT_DATE
-                GROUP BY metodo_pago
-            """)
-            
-            resumen_pagos = {}
-            for row in cur.fetchall():
-                resumen_pagos[row[0]] = {
-                    'transacciones': row[1],
-                    'total': float(row[2])
+            ventas_categoria = [
+                {
+                    'categoria': row['categoria'],
+                    'cantidad': row['cantidad'],
+                    'total': float(row['total'])
                 }
+                for row in categorias
+            ]
+            
+            productos_top = [
+                {
+                    'nombre': row['nombre'],
+                    'cantidad': row['cantidad'],
+                    'ingreso': float(row['ingreso'])
+                }
+                for row in productos
+            ]
             
-            cur.close()
-            conn.close()
+            resumen_pagos = {
+                row['metodo_pago']: {
+                    'transacciones': row['transacciones'],
+                    'total': float(row['total'])
+                }
+                for row in pagos
+            }
             
             return {
-                'fondo_inicial': float(cierre_info[0]),
-                'total_ventas': float(cierre_info[1]),
-                'total_efectivo': float(cierre_info[2]),
-                'total_tarjeta': float(cierre_info[3]),
-                'total_transferencia': float(cierre_info[4]),
-                'total_cierre': float(cierre_info[5]),
-                'empleado': cierre_info[6],
+                'fondo_inicial': float(cierre_info['fondo_inicial']),
+                'total_ventas': float(cierre_info['total_ventas']),
+                'total_efectivo': float(cierre_info['total_efectivo']),
+                'total_tarjeta': float(cierre_info['total_tarjeta']),
+                'total_transferencia': float(cierre_info['total_transferencia']),
+                'total_cierre': float(cierre_info['total_cierre']),
+                'empleado': cierre_info['empleado'],
                 'ventas_por_categoria': ventas_categoria,
                 'productos_top': productos_top,
                 'resumen_pagos': resumen_pagos,
@@ -404,13 +419,13 @@ class CajaService:
             }
             
         except Exception as e:
-            print(f"❌ Error generando reporte: {e}")
+            log.error("❌ Error generando reporte: %s", e)
             return {"error": str(e)}
 
     def obtener_historial_cierres(self, dias: int = 7) -> List[Dict]:
         """Obtener historial de cierres de caja"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -426,9 +441,9 @@ class CajaService:
                     cc.observaciones
                 FROM cierres_caja cc
                 JOIN empleados e ON cc.empleado_id = e.id
-                WHERE cc.fecha >= CURRENT_DATE - INTERVAL '%s days'
+                WHERE cc.fecha >= CURRENT_DATE - %s
                 ORDER BY cc.fecha DESC
-            """, (dias,))
+            """, (int(dias),))
             
             historial = []
             for row in cur.fetchall():
@@ -450,13 +465,13 @@ class CajaService:
             return historial
             
         except Exception as e:
-            print(f"❌ Error obteniendo historial: {e}")
+            log.error("❌ Error obteniendo historial: %s", e)
             return []
         
     def calcular_efectivo_teorico(self) -> Dict:
         """Calcular el efectivo teórico que debería haber en caja"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Obtener fondo inicial del día
@@ -466,7 +481,7 @@ class CajaService:
                 WHERE fecha = CURRENT_DATE
             """)
             fondo_inicial_result = cur.fetchone()
-            fondo_inicial = float(fondo_inicial_result[0]) if fondo_inicial_result else 0.0
+            fondo_inicial = Dinero.de(fondo_inicial_result[0]) if fondo_inicial_result else CERO
             
             # Obtener ventas en efectivo del día
             cur.execute("""
@@ -476,7 +491,7 @@ class CajaService:
                 AND metodo_pago = 'efectivo'
                 AND DATE(created_at) = CURRENT_DATE
             """)
-            ventas_efectivo = float(cur.fetchone()[0])
+            ventas_efectivo = Dinero.de(cur.fetchone()[0])
             
             # Obtener devoluciones en efectivo (si las hay)
             cur.execute("""
@@ -486,7 +501,7 @@ class CajaService:
                 AND metodo_pago = 'efectivo'
                 AND DATE(created_at) = CURRENT_DATE
             """)
-            devoluciones_efectivo = float(cur.fetchone()[0])
+            devoluciones_efectivo = Dinero.de(cur.fetchone()[0])
             
             cur.close()
             conn.close()
@@ -503,13 +518,15 @@ class CajaService:
             }
             
         except Exception as e:
-            print(f"❌ Error calculando efectivo teórico: {e}")
-            return {'efectivo_teorico': 0.0, 'error': str(e)}
+            log.error("❌ Error calculando efectivo teórico: %s", e)
+            return {'efectivo_teorico': CERO, 'error': str(e)}
 
-    def registrar_arqueo(self, empleado_id: int, efectivo_fisico: float, 
+    def registrar_arqueo(self, empleado_id: int, efectivo_fisico, 
                         observaciones: str = "") -> Dict:
         """Registrar arqueo de caja y calcular diferencias"""
         try:
+            efectivo_fisico = Dinero.de(efectivo_fisico)
+            
             # Calcular efectivo teórico
             teorico_data = self.calcular_efectivo_teorico()
             
@@ -520,7 +537,7 @@ class CajaService:
             diferencia = efectivo_fisico - efectivo_teorico
             
             # Determinar estado
-            if abs(diferencia) <= 0.10:  # Menos de 10 centavos de diferencia
+            if abs(diferencia) <= self.TOLERANCIA_ARQUEO:
                 estado = "cuadrado"
                 color_estado = "success"
             elif diferencia > 0:
@@ -530,7 +547,7 @@ class CajaService:
                 estado = "faltante" 
                 color_estado = "error"
             
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Registrar arqueo en base de datos
@@ -567,13 +584,13 @@ class CajaService:
             }
             
         except Exception as e:
-            print(f"❌ Error registrando arqueo: {e}")
+            log.error("❌ Error registrando arqueo: %s", e)
             return {'success': False, 'error': str(e)}
 
     def obtener_historial_arqueos(self, dias: int = 7) -> List[Dict]:
         """Obtener historial de arqueos"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -587,9 +604,9 @@ class CajaService:
                     a.observaciones
                 FROM arqueos_caja a
                 JOIN empleados e ON a.empleado_id = e.id
-                WHERE a.created_at >= CURRENT_DATE - INTERVAL '%s days'
+                WHERE a.created_at >= CURRENT_DATE - %s
                 ORDER BY a.created_at DESC
-            """, (dias,))
+            """, (int(dias),))
             
             historial = []
             for row in cur.fetchall():
@@ -618,5 +635,5 @@ class CajaService:
             return historial
             
         except Exception as e:
-            print(f"❌ Error obteniendo historial de arqueos: {e}")
+            log.error("❌ Error obteniendo historial de arqueos: %s", e)
             return []
\ No newline at end of file
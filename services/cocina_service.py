@@ -1,115 +1,266 @@
 # services/cocina_service.py
-import psycopg2
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from models import ItemPedido, Pedido
+from services.consumo_service import ESTADOS_CONSUMO, ConsumoService
+from services.pedido_service import (
+    COLUMNAS_PEDIDO, CONDICION_NO_CANCELADO, cargar_items, columnas_item, hay_estado_items
+)
+from services.stock_service import liberar_pedido
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Estación de cada línea (utils/crear_tablas_estaciones.py): la de la subcategoría
+# del producto, si no la de su categoría, si no la general
+ESTACION_GENERAL = 'cocina'
+JOIN_ESTACION = """
+    LEFT JOIN estaciones_cocina es ON es.categoria = pr.subcategoria
+    LEFT JOIN estaciones_cocina ec ON ec.categoria = pr.categoria
+"""
+SQL_ESTACION = f"COALESCE(es.estacion, ec.estacion, '{ESTACION_GENERAL}')"
+
+_hay_estaciones: Optional[bool] = None
+
+
+def ruteo_estacion(cur) -> Tuple[str, str]:
+    """(expresión de la estación, joins) de cada línea; sin estaciones_cocina todo va a la general"""
+    global _hay_estaciones
+    if _hay_estaciones is None:
+        cur.execute("SELECT to_regclass('estaciones_cocina') IS NOT NULL")
+        _hay_estaciones = cur.fetchone()[0]
+    if _hay_estaciones:
+        return SQL_ESTACION, JOIN_ESTACION
+    return f"'{ESTACION_GENERAL}'", ""
+
+ESTADOS_COCINA = ('pendiente', 'confirmado', 'preparacion')
+# Estados de cada línea (items_pedido.estado), en orden
+ESTADOS_ITEM = ('pendiente', 'preparacion', 'listo')
+
 
 class CocinaService:
     def __init__(self, db_service):
         self.db = db_service
     
-    def obtener_pedidos_activos(self) -> List[Dict]:
-        """Obtener pedidos para cocina (pendientes y en preparación)"""
+    def obtener_pedidos_activos(self, estacion: Optional[str] = None) -> List[Pedido]:
+        """Pedidos para cocina (pendientes y en preparación) con sus líneas.
+
+        Con estacion sólo vienen los pedidos que tienen algo para esa estación y,
+        de cada uno, sólo esas líneas.
+        """
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            # Consulta simplificada para evitar problemas con JSON_AGG
-            cur.execute("""
-                SELECT 
-                    p.id,
-                    p.mesa,
-                    p.estado,
-                    p.created_at,
-                    e.nombre as mesero
-                FROM pedidos p
-                JOIN empleados e ON p.empleado_id = e.id
-                WHERE p.estado IN ('pendiente', 'confirmado', 'preparacion')
-                ORDER BY p.created_at ASC
-            """)
-            
-            pedidos = []
-            for row in cur.fetchall():
-                pedido = {
-                    'id': row[0],
-                    'mesa': row[1],
-                    'estado': row[2],
-                    'created_at': row[3],
-                    'mesero': row[4],
-                    'items': self._obtener_items_pedido(row[0])  # Obtener items separadamente
-                }
-                pedidos.append(pedido)
+            if estacion:
+                pedidos = self._cola_estacion(cur, estacion)
+            else:
+                cur.execute(f"""
+                    SELECT {COLUMNAS_PEDIDO}
+                    FROM pedidos p
+                    JOIN empleados e ON p.empleado_id = e.id
+                    WHERE p.estado = ANY(%s)
+                    ORDER BY p.created_at ASC
+                """, (list(ESTADOS_COCINA),))
+                
+                # Líneas de todos los pedidos en una consulta (antes una por pedido)
+                pedidos = cargar_items(cur, [Pedido(*row) for row in cur.fetchall()])
             
             cur.close()
             conn.close()
             
-            print(f"📊 Obtenidos {len(pedidos)} pedidos activos para cocina")
+            log.debug("📊 Obtenidos %s pedidos activos para cocina (%s)", len(pedidos), estacion or "todas")
             return pedidos
             
         except Exception as e:
-            print(f"❌ Error obteniendo pedidos activos: {e}")
+            log.error("❌ Error obteniendo pedidos activos: %s", e)
             return []
     
-    def _obtener_items_pedido(self, pedido_id: int) -> List[Dict]:
-        """Obtener items de un pedido específico"""
+    @staticmethod
+    def _cola_estacion(cur, estacion: str) -> List[Pedido]:
+        """Pedidos y líneas de una estación con una sola consulta (fila = línea)"""
+        sql_estacion, join_estacion = ruteo_estacion(cur)
+        cur.execute(f"""
+            SELECT {COLUMNAS_PEDIDO}, {columnas_item(cur)}
+            FROM pedidos p
+            JOIN empleados e ON p.empleado_id = e.id
+            JOIN items_pedido ip ON ip.pedido_id = p.id
+            JOIN productos pr ON ip.producto_id = pr.id
+            {join_estacion}
+            WHERE p.estado = ANY(%s) AND {sql_estacion} = %s
+            ORDER BY p.created_at ASC, p.id, ip.id
+        """, (list(ESTADOS_COCINA), estacion))
+        
+        pedidos: Dict[int, Pedido] = {}
+        for fila in cur.fetchall():
+            # Las 6 primeras columnas son COLUMNAS_PEDIDO, el resto columnas_item
+            pedido = pedidos.get(fila[0])
+            if pedido is None:
+                pedido = pedidos[fila[0]] = Pedido(*fila[:6])
+            pedido.items.append(ItemPedido(*fila[6:]))
+        return list(pedidos.values())
+    
+    def obtener_estaciones(self) -> List[str]:
+        """Estaciones configuradas más la general (para elegir la de cada pantalla)"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
+            cur = conn.cursor()
+            cur.execute("SELECT DISTINCT estacion FROM estaciones_cocina ORDER BY estacion")
+            estaciones = [row[0] for row in cur.fetchall()]
+            cur.close()
+            conn.close()
+        except Exception as e:
+            log.warning("⚠️ Sin estaciones de cocina configuradas: %s", e)
+            estaciones = []
+        
+        if ESTACION_GENERAL not in estaciones:
+            estaciones.append(ESTACION_GENERAL)
+        return estaciones
+    
+    def cambiar_estado_pedido(self, pedido_id: int, nuevo_estado: str) -> bool:
+        """Cambiar estado de un pedido (al cancelar devuelve el stock)"""
+        return self.cambiar_estado_pedidos([pedido_id], nuevo_estado) is not None
+    
+    # ========== CAMBIOS EN BLOQUE ==========
+    def cambiar_estado_pedidos(self, pedido_ids: List[int], nuevo_estado: str) -> Optional[Dict[int, str]]:
+        """Pasar varios pedidos al mismo estado con un solo UPDATE → {pedido_id: estado}.
+
+        Sus líneas avanzan con ellos (un pedido listo deja todas sus líneas listas).
+        Los cancelados no cambian y no aparecen en el resultado.
+        None si falló: la pantalla deshace lo que ya había pintado.
+        """
+        if not pedido_ids:
+            return {}
+        # Líneas que se quedaron atrás del nuevo estado (ninguna si no es de cocina)
+        atrasados = list(ESTADOS_ITEM[:ESTADOS_ITEM.index(nuevo_estado)]) if nuevo_estado in ESTADOS_ITEM else []
+        try:
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT 
-                    ip.producto_id,
-                    pr.nombre,
-                    ip.cantidad,
-                    ip.notas
-                FROM items_pedido ip
-                JOIN productos pr ON ip.producto_id = pr.id
-                WHERE ip.pedido_id = %s
-            """, (pedido_id,))
-            
-            items = []
-            for row in cur.fetchall():
-                item = {
-                    'producto_id': row[0],
-                    'nombre': row[1],
-                    'cantidad': row[2],
-                    'notas': row[3] or ''
-                }
-                items.append(item)
+            # Sin la columna (utils/migrar_estado_items.py) sólo cambia el pedido
+            lineas = """, lineas AS (
+                    UPDATE items_pedido
+                    SET estado = %(estado)s
+                    WHERE pedido_id IN (SELECT id FROM cambiados) AND estado = ANY(%(atrasados)s)
+                )""" if hay_estado_items(cur) else ""
+            cur.execute(f"""
+                WITH cambiados AS (
+                    UPDATE pedidos p
+                    SET estado = %(estado)s, updated_at = CURRENT_TIMESTAMP
+                    FROM (SELECT id, estado FROM pedidos WHERE id = ANY(%(pedidos)s) FOR UPDATE) anterior
+                    WHERE p.id = anterior.id AND {CONDICION_NO_CANCELADO}
+                    RETURNING p.id, anterior.estado
+                ){lineas}
+                SELECT id, estado FROM cambiados
+            """, {'estado': nuevo_estado, 'pedidos': list(pedido_ids), 'atrasados': atrasados})
+            
+            anteriores = dict(cur.fetchall())
+            if nuevo_estado == 'cancelado':
+                for pedido_id, anterior in anteriores.items():
+                    if anterior != 'cancelado':
+                        liberar_pedido(cur, pedido_id)
             
+            conn.commit()
             cur.close()
             conn.close()
             
-            return items
+            if nuevo_estado in ESTADOS_CONSUMO:
+                for pedido_id in anteriores:
+                    ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            log.debug("🔄 %s pedidos cambiados a estado: %s", len(anteriores), nuevo_estado)
+            return {pedido_id: nuevo_estado for pedido_id in anteriores}
             
         except Exception as e:
-            print(f"❌ Error obteniendo items del pedido {pedido_id}: {e}")
-            return []
+            log.error("❌ Error cambiando estado de pedidos %s: %s", pedido_ids, e)
+            return None
     
-    def cambiar_estado_pedido(self, pedido_id: int, nuevo_estado: str) -> bool:
-        """Cambiar estado de un pedido"""
+    def cambiar_estado_items(self, item_ids: List[int], nuevo_estado: str) -> Optional[Dict[int, str]]:
+        """Pasar varias líneas al mismo estado en un solo UPDATE → {pedido_id: estado del pedido}.
+
+        En la misma sentencia cada pedido tocado avanza según sus líneas: en
+        preparación en cuanto una empieza, listo cuando están todas listas.
+        None si falló.
+        """
+        if nuevo_estado not in ESTADOS_ITEM:
+            log.warning("⚠️ Estado de línea inválido: %s", nuevo_estado)
+            return None
+        if not item_ids:
+            return {}
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute(
-                "UPDATE pedidos SET estado = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (nuevo_estado, pedido_id)
-            )
+            if not hay_estado_items(cur):
+                cur.close()
+                conn.close()
+                log.warning("⚠️ Falta items_pedido.estado: ejecute utils/migrar_estado_items.py")
+                return None
+            
+            # Bloquear antes los pedidos: si dos estaciones terminan a la vez las
+            # últimas líneas de un pedido, la segunda espera y ya ve la primera
+            # como lista (si no, ambas derivarían 'preparacion' y nunca 'listo')
+            cur.execute("""
+                SELECT id FROM pedidos
+                WHERE id IN (SELECT pedido_id FROM items_pedido WHERE id = ANY(%s))
+                ORDER BY id
+                FOR UPDATE
+            """, (list(item_ids),))
             
+            # Los CTE ven la tabla de antes del UPDATE: el estado nuevo de las
+            # líneas cambiadas se toma de "cambiados", el del resto de la tabla
+            cur.execute("""
+                WITH cambiados AS (
+                    UPDATE items_pedido
+                    SET estado = %(estado)s
+                    WHERE id = ANY(%(items)s) AND estado <> %(estado)s
+                    RETURNING id, pedido_id
+                ), lineas AS (
+                    SELECT ip.pedido_id,
+                           CASE WHEN c.id IS NULL THEN ip.estado ELSE %(estado)s END AS estado
+                    FROM items_pedido ip
+                    LEFT JOIN cambiados c ON c.id = ip.id
+                    WHERE ip.pedido_id IN (SELECT pedido_id FROM cambiados)
+                ), derivado AS (
+                    SELECT pedido_id,
+                           CASE WHEN bool_and(estado = 'listo') THEN 'listo'
+                                WHEN bool_or(estado <> 'pendiente') THEN 'preparacion'
+                                ELSE 'pendiente' END AS estado
+                    FROM lineas
+                    GROUP BY pedido_id
+                ), promovidos AS (
+                    UPDATE pedidos p
+                    SET estado = d.estado, updated_at = CURRENT_TIMESTAMP
+                    FROM derivado d
+                    WHERE p.id = d.pedido_id AND p.estado = ANY(%(cocina)s)
+                      AND d.estado <> 'pendiente' AND p.estado <> d.estado
+                    RETURNING p.id, p.estado
+                )
+                SELECT p.id, COALESCE(pr.estado, p.estado), pr.id IS NOT NULL
+                FROM pedidos p
+                LEFT JOIN promovidos pr ON pr.id = p.id
+                WHERE p.id IN (SELECT pedido_id FROM cambiados)
+            """, {'estado': nuevo_estado, 'items': list(item_ids), 'cocina': list(ESTADOS_COCINA)})
+            
+            filas = cur.fetchall()
             conn.commit()
             cur.close()
             conn.close()
             
-            print(f"🔄 Pedido {pedido_id} cambiado a estado: {nuevo_estado}")
-            return True
+            for pedido_id, estado, promovido in filas:
+                if promovido and estado in ESTADOS_CONSUMO:
+                    ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            log.debug("🔄 %s líneas a %s en %s pedidos", len(item_ids), nuevo_estado, len(filas))
+            return {pedido_id: estado for pedido_id, estado, _ in filas}
             
         except Exception as e:
-            print(f"❌ Error cambiando estado del pedido: {e}")
-            return False
+            log.error("❌ Error cambiando estado de líneas %s: %s", item_ids, e)
+            return None
     
     def obtener_estadisticas_cocina(self) -> Dict:
         """Obtener estadísticas para la cocina"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Pedidos por estado
@@ -133,7 +284,7 @@ class CocinaService:
             return stats
             
         except Exception as e:
-            print(f"❌ Error obteniendo estadísticas: {e}")
+            log.error("❌ Error obteniendo estadísticas: %s", e)
             return {'por_estado': {}, 'total_activos': 0}
         
     # Tiempos de espera 
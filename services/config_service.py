@@ -6,6 +6,9 @@ Almacena datos en archivo JSON local
 import json
 import os
 from typing import Dict, Optional
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class ConfigService:
     """Gestión de configuración de empresa"""
@@ -29,7 +32,7 @@ class ConfigService:
         """Asegurar que existe el archivo de configuración"""
         if not os.path.exists(self.CONFIG_FILE):
             self._save_config(self.DEFAULT_CONFIG)
-            print(f"✅ Archivo de configuración creado: {self.CONFIG_FILE}")
+            log.debug("✅ Archivo de configuración creado: %s", self.CONFIG_FILE)
     
     def _save_config(self, config: Dict) -> bool:
         """Guardar configuración en archivo"""
@@ -38,7 +41,7 @@ class ConfigService:
                 json.dump(config, f, indent=4, ensure_ascii=False)
             return True
         except Exception as e:
-            print(f"❌ Error guardando configuración: {e}")
+            log.error("❌ Error guardando configuración: %s", e)
             return False
     
     def _load_config(self) -> Dict:
@@ -49,7 +52,7 @@ class ConfigService:
                     return json.load(f)
             return self.DEFAULT_CONFIG.copy()
         except Exception as e:
-            print(f"❌ Error cargando configuración: {e}")
+            log.error("❌ Error cargando configuración: %s", e)
             return self.DEFAULT_CONFIG.copy()
     
     def obtener_config_empresa(self) -> Dict:
@@ -69,12 +72,12 @@ class ConfigService:
             
             # Guardar
             if self._save_config(config_actual):
-                print(f"✅ Configuración actualizada: {config_actual}")
+                log.debug("✅ Configuración actualizada: %s", config_actual)
                 return True
             return False
             
         except Exception as e:
-            print(f"❌ Error actualizando configuración: {e}")
+            log.error("❌ Error actualizando configuración: %s", e)
             return False
     
     def resetear_config(self) -> bool:
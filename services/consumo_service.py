@@ -0,0 +1,289 @@
+# services/consumo_service.py - CONSUMO DE INSUMOS POR RECETA EN SEGUNDO PLANO
+import queue
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from services.auditoria_service import ERRORES_CONEXION
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Un pedido consume insumos al llegar a alguno de estos estados (y las líneas que
+# se le agreguen después, al registrarlo de nuevo)
+ESTADOS_CONSUMO = ('listo', 'entregado', 'pagado')
+
+
+class ConsumoService:
+    """Descuento de ingredientes por lotes de pedidos (tablas de utils/crear_tablas_recetas.py).
+
+    Cobrar un pedido o terminarlo en cocina sólo encola su id. El hilo junta los
+    ids que lleguen en INTERVALO_FLUSH segundos (o TAMANO_LOTE) y procesa el lote
+    con cuatro sentencias, sin importar cuántas líneas tenga:
+
+    1. avanzar la marca de cada pedido en consumo_pedidos (ultimo_item_id, el
+       id de la última línea ya descontada) hasta su última línea: nunca se
+       descuenta dos veces, aunque se cobre y se termine en cocina, y las
+       líneas agregadas a un pedido ya listo se descuentan al registrarlo otra vez;
+    2. sumar por producto las líneas entre la marca anterior y la nueva;
+    3. leer las recetas de esos productos y explotar en memoria
+       producto × cantidad → {ingrediente: cantidad};
+    4. un UPDATE ingredientes ... FROM unnest(...) con todos los deltas.
+
+    La cola es sólo un atajo: cada INTERVALO_BARRIDO segundos (y al arrancar el
+    hilo) se buscan en la BD los pedidos en ESTADOS_CONSUMO de los últimos
+    VENTANA_BARRIDO_DIAS con líneas sin descontar, así lo encolado que se perdió
+    en una caída se recupera. Si la BD no responde, el lote vuelve a la cola; si
+    la BD rechaza el lote, se procesa pedido por pedido y los que vuelven a
+    fallar se apartan (hasta reiniciar) para no frenar el consumo de los demás.
+    """
+
+    INTERVALO_FLUSH = 2.0
+    TAMANO_LOTE = 200
+    INTERVALO_BARRIDO = 60.0
+    VENTANA_BARRIDO_DIAS = 2
+
+    _instancia = None
+    _lock_instancia = threading.Lock()
+
+    @classmethod
+    def instancia(cls, db_service) -> "ConsumoService":
+        """Procesador compartido por todo el proceso (un hilo)"""
+        with cls._lock_instancia:
+            if cls._instancia is None:
+                cls._instancia = cls(db_service)
+            return cls._instancia
+
+    def __init__(self, db_service, intervalo_flush: float = None, tamano_lote: int = None):
+        self.db = db_service
+        self.intervalo_flush = intervalo_flush or self.INTERVALO_FLUSH
+        self.tamano_lote = tamano_lote or self.TAMANO_LOTE
+
+        self._cola = queue.Queue()
+        self._detener = threading.Event()
+        self._sin_tablas = False
+        self._apartados = set()
+        self._proximo_barrido = 0.0
+        self._hilo = threading.Thread(target=self._ejecutar, name="consumo_insumos", daemon=True)
+        self._hilo.start()
+
+    # ========== REGISTRO (no bloqueante) ==========
+    def registrar_pedido(self, pedido_id: int):
+        """Encolar un pedido cobrado o terminado para descontar sus insumos"""
+        self._cola.put(pedido_id)
+
+    # ========== HILO ==========
+    def _ejecutar(self):
+        while not (self._detener.is_set() and self._cola.empty()):
+            if not self._detener.is_set() and time.monotonic() >= self._proximo_barrido:
+                self._proximo_barrido = time.monotonic() + self.INTERVALO_BARRIDO
+                for pedido_id in self._barrer():
+                    self._cola.put(pedido_id)
+
+            lote = self._tomar_lote()
+            if not lote:
+                continue
+            pendientes = self._procesar_o_apartar(lote)
+            if pendientes:
+                if self._detener.is_set():
+                    break
+                for pedido_id in pendientes:
+                    self._cola.put(pedido_id)
+                self._detener.wait(self.intervalo_flush)
+
+    def _sin_recetas(self, e: Exception) -> bool:
+        """¿Falla porque faltan las tablas de recetas (o su última versión)?"""
+        if getattr(e, 'pgcode', None) not in ('42P01', '42703'):
+            return False
+        if not self._sin_tablas:
+            log.info("ℹ️ Sin tablas de recetas al día (utils/crear_tablas_recetas.py): "
+                     "no se descuentan insumos")
+            self._sin_tablas = True
+        return True
+
+    def _procesar_o_apartar(self, lote: List[int]) -> List[int]:
+        """Procesar el lote → pedidos que quedan pendientes por falta de BD ([] si ninguno)"""
+        try:
+            self.procesar(lote)
+            return []
+        except ERRORES_CONEXION as e:
+            log.warning("⚠️ Consumo de insumos pendiente (%s); %s pedidos se reintentan", e, len(lote))
+            return lote
+        except Exception as e:
+            if self._sin_recetas(e):
+                return []
+            log.warning("⚠️ Lote de consumo rechazado (%s); se procesa pedido por pedido", e)
+
+        for i, pedido_id in enumerate(lote):
+            try:
+                self.procesar([pedido_id])
+            except ERRORES_CONEXION as e:
+                log.warning("⚠️ Consumo de insumos pendiente (%s); %s pedidos se reintentan", e, len(lote) - i)
+                return lote[i:]
+            except Exception as e:
+                log.error("❌ Consumo del pedido #%s rechazado por la BD (%s): queda apartado", pedido_id, e)
+                self._apartados.add(pedido_id)
+        return []
+
+    def _barrer(self) -> List[int]:
+        """Pedidos recientes en ESTADOS_CONSUMO con líneas sin descontar (sin los apartados)"""
+        try:
+            conn = self.db.conectar()
+            try:
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT DISTINCT p.id
+                    FROM pedidos p
+                    JOIN items_pedido ip ON ip.pedido_id = p.id
+                    LEFT JOIN consumo_pedidos c ON c.pedido_id = p.id
+                    WHERE p.estado = ANY(%s)
+                      AND p.created_at >= CURRENT_DATE - %s::int
+                      AND ip.id > COALESCE(c.ultimo_item_id, 0)
+                """, (list(ESTADOS_CONSUMO), self.VENTANA_BARRIDO_DIAS))
+                encontrados = [fila[0] for fila in cur.fetchall() if fila[0] not in self._apartados]
+                cur.close()
+            finally:
+                conn.close()
+        except Exception as e:
+            if not self._sin_recetas(e):
+                log.warning("⚠️ No se pudieron buscar pedidos sin consumir: %s", e)
+            return []
+
+        if encontrados:
+            log.info("🥕 %s pedidos con insumos sin descontar", len(encontrados))
+        return encontrados
+
+    def _tomar_lote(self) -> List[int]:
+        """Esperar el primer pedido y juntar los que lleguen dentro del intervalo"""
+        try:
+            lote = [self._cola.get(timeout=self.intervalo_flush)]
+        except queue.Empty:
+            return []
+
+        limite = time.monotonic() + self.intervalo_flush
+        while len(lote) < self.tamano_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0 or self._detener.is_set():
+                break
+            try:
+                lote.append(self._cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    # ========== PROCESO POR LOTES ==========
+    def procesar(self, pedido_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Descontar los insumos de los pedidos aún no consumidos → {ingrediente_id: cantidad descontada}"""
+        ids = sorted(set(pedido_ids))
+        if not ids:
+            return {}
+
+        conn = self.db.conectar()
+        try:
+            cur = conn.cursor()
+
+            cur.execute("""
+                INSERT INTO consumo_pedidos (pedido_id, ultimo_item_id)
+                SELECT unnest(%s::int[]), 0
+                ON CONFLICT (pedido_id) DO NOTHING
+            """, (ids,))
+            # Bloquear las marcas antes de leerlas: otra terminal que procese el
+            # mismo pedido espera y, en su siguiente sentencia, ve la marca nueva
+            cur.execute("""
+                SELECT pedido_id FROM consumo_pedidos
+                WHERE pedido_id = ANY(%s::int[])
+                ORDER BY pedido_id
+                FOR UPDATE
+            """, (ids,))
+            cur.execute("""
+                UPDATE consumo_pedidos c
+                SET ultimo_item_id = n.hasta
+                FROM (
+                    SELECT ip.pedido_id, m.ultimo_item_id AS desde, MAX(ip.id) AS hasta
+                    FROM items_pedido ip
+                    JOIN consumo_pedidos m ON m.pedido_id = ip.pedido_id
+                    WHERE ip.pedido_id = ANY(%s::int[]) AND ip.id > m.ultimo_item_id
+                    GROUP BY ip.pedido_id, m.ultimo_item_id
+                ) n
+                WHERE c.pedido_id = n.pedido_id
+                RETURNING c.pedido_id, n.desde, n.hasta
+            """, (ids,))
+            tramos = cur.fetchall()
+
+            deltas: Dict[int, Decimal] = {}
+            if tramos:
+                cur.execute("""
+                    SELECT ip.producto_id, SUM(ip.cantidad)
+                    FROM items_pedido ip
+                    JOIN unnest(%s::int[], %s::int[], %s::int[]) AS t(pedido_id, desde, hasta)
+                      ON ip.pedido_id = t.pedido_id AND ip.id > t.desde AND ip.id <= t.hasta
+                    GROUP BY ip.producto_id
+                """, tuple(map(list, zip(*tramos))))
+                vendidos = dict(cur.fetchall())
+
+                if vendidos:
+                    cur.execute("""
+                        SELECT producto_id, ingrediente_id, cantidad
+                        FROM recetas
+                        WHERE producto_id = ANY(%s::int[])
+                    """, (list(vendidos),))
+                    for producto_id, ingrediente_id, cantidad in cur.fetchall():
+                        deltas[ingrediente_id] = deltas.get(ingrediente_id, 0) + cantidad * vendidos[producto_id]
+
+                if deltas:
+                    ingredientes = sorted(deltas)
+                    cur.execute("""
+                        UPDATE ingredientes i
+                        SET stock = i.stock - d.cantidad, updated_at = CURRENT_TIMESTAMP
+                        FROM unnest(%s::int[], %s::numeric[]) AS d(id, cantidad)
+                        WHERE i.id = d.id
+                        RETURNING i.nombre, i.stock, i.stock_minimo
+                    """, (ingredientes, [deltas[i] for i in ingredientes]))
+                    for nombre, stock, minimo in cur.fetchall():
+                        if minimo is not None and stock <= minimo:
+                            log.warning("⚠️ Ingrediente bajo mínimo: %s (%s, mínimo %s)", nombre, stock, minimo)
+
+            conn.commit()
+            cur.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        log.debug("🥕 Insumos de %s pedidos descontados (%s ingredientes)", len(tramos), len(deltas))
+        return deltas
+
+    # ========== CONSULTAS ==========
+    def ingredientes_bajo_minimo(self) -> List[Dict]:
+        """Ingredientes activos con stock en o bajo su mínimo, los más escasos primero"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT id, nombre, unidad, stock, stock_minimo
+                FROM ingredientes
+                WHERE activo = TRUE AND stock <= stock_minimo
+                ORDER BY stock / NULLIF(stock_minimo, 0) NULLS FIRST, nombre
+            """)
+            alertas = [
+                {
+                    'id': row[0],
+                    'nombre': row[1],
+                    'unidad': row[2],
+                    'stock': float(row[3]),
+                    'stock_minimo': float(row[4])
+                }
+                for row in cur.fetchall()
+            ]
+            cur.close()
+            conn.close()
+            return alertas
+        except Exception as e:
+            log.error("❌ Error consultando ingredientes bajo mínimo: %s", e)
+            return []
+
+    def detener(self, timeout: Optional[float] = 5.0):
+        """Procesar lo encolado y detener el hilo (llamar al cerrar la app)"""
+        self._detener.set()
+        self._hilo.join(timeout)
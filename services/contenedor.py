@@ -0,0 +1,130 @@
+# services/contenedor.py - SERVICIOS COMPARTIDOS SIN INTERFAZ
+"""
+Punto único para construir los servicios sobre una sola PostgreSQLService.
+
+No importa Kivy (ni nada de views/ o utils/helpers), así que sirve igual para la
+app, un script por lotes, un benchmark o un proceso en segundo plano:
+
+    servicios = ContenedorServicios()
+    pedido_id = servicios.pedidos.crear_pedido("4", empleado_id)
+    servicios.caja.registrar_pago(pedido_id, empleado_id, 250.0, 'tarjeta')
+
+Cada servicio se crea la primera vez que se pide; los módulos se importan en ese
+momento, de modo que un proceso que sólo cobra no carga reportes ni exportación.
+
+Con POS_API_URL (o api_url) todos los servicios van al servidor central
+(servidor/api_pos.py) en lugar de a PostgreSQL y la terminal no abre ninguna
+conexión propia: el número de conexiones lo fija el pool del servidor. En ese
+modo `db` no está disponible.
+"""
+import importlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# nombre → (módulo, clase, dependencias del contenedor además de db)
+SERVICIOS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    'auth': ('services.auth_service', 'AuthService', ()),
+    'pedidos': ('services.pedido_service', 'PedidoService', ()),
+    'productos': ('services.producto_service', 'ProductoService', ()),
+    'busqueda': ('services.busqueda_productos_service', 'BusquedaProductosService', ()),
+    'stock': ('services.stock_service', 'StockService', ()),
+    'cocina': ('services.cocina_service', 'CocinaService', ()),
+    'caja': ('services.caja_service', 'CajaService', ()),
+    'tickets': ('services.ticket_service', 'TicketService', ()),
+    'tickets_caja': ('services.ticket_service_caja', 'TicketServiceCaja', ('config',)),
+    'mesas': ('services.mesa_service', 'MesaService', ('tickets',)),
+    'reportes': ('services.reporte_service', 'ReporteService', ()),
+}
+
+
+class ContenedorServicios:
+    """Servicios perezosos que comparten una PostgreSQLService"""
+
+    def __init__(self, db_service=None, api_url: Optional[str] = None):
+        self._db = db_service
+        # Quien pasa su propia BD (el servidor) nunca trabaja en modo remoto
+        self.api_url = api_url or (None if db_service is not None else os.environ.get('POS_API_URL'))
+        self._api = None
+        self._instancias: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def remoto(self) -> bool:
+        return bool(self.api_url)
+
+    @property
+    def api(self):
+        """ClienteAPI del servidor central (sólo en modo remoto)"""
+        with self._lock:
+            if self._api is None and self.remoto:
+                from servidor.cliente import ClienteAPI
+                self._api = ClienteAPI(self.api_url, os.environ.get('POS_API_TOKEN'))
+            return self._api
+
+    @property
+    def db(self):
+        if self.remoto:
+            raise RuntimeError("Terminal con servidor central (POS_API_URL): sin conexión directa a PostgreSQL")
+        with self._lock:
+            if self._db is None:
+                from services.database_service import PostgreSQLService
+                self._db = PostgreSQLService()
+            return self._db
+
+    @property
+    def config(self):
+        # ConfigService no usa la base: archivo JSON local
+        with self._lock:
+            if 'config' not in self._instancias:
+                from services.config_service import ConfigService
+                self._instancias['config'] = ConfigService()
+            return self._instancias['config']
+
+    def __getattr__(self, nombre: str):
+        if nombre.startswith('_') or nombre not in SERVICIOS:
+            raise AttributeError(nombre)
+        return self.obtener(nombre)
+
+    def obtener(self, nombre: str):
+        """Servicio por nombre (ver SERVICIOS), creado una sola vez"""
+        with self._lock:
+            if nombre not in self._instancias:
+                modulo, clase, dependencias = SERVICIOS[nombre]
+                tipo = getattr(importlib.import_module(modulo), clase)
+                self._instancias[nombre] = self._construir(nombre, tipo, dependencias)
+                log.debug("🧩 %s creado%s", clase, " (remoto)" if self.remoto else "")
+            return self._instancias[nombre]
+
+    def _construir(self, nombre: str, tipo, dependencias: Tuple[str, ...]):
+        if self.remoto:
+            from servidor.protocolo import OPERACIONES
+            from servidor.cliente import ServicioRemoto
+            if nombre in OPERACIONES:
+                # La instancia local sólo guarda el estado de la terminal (sin BD)
+                return ServicioRemoto(self.api, nombre, tipo(None, *(getattr(self, d) for d in dependencias)))
+            if nombre == 'mesas':
+                # MesaService sólo consulta a través de TicketService
+                return tipo(None, self.tickets)
+        return tipo(self.db, *(getattr(self, d) for d in dependencias))
+
+    def creado(self, nombre: str) -> Optional[Any]:
+        """Instancia ya creada o None (sin construirla)"""
+        return self._instancias.get(nombre)
+
+    def cerrar(self):
+        """Detener hilos de fondo de los servicios creados (auditoría, consumo, permisos, eventos)"""
+        if self._api is not None:
+            self._api.detener()
+        auth = self._instancias.get('auth')
+        if auth is not None:
+            auth.permisos.detener()
+        if self._db is not None:
+            from services.auditoria_service import AuditoriaService
+            from services.consumo_service import ConsumoService
+            AuditoriaService.instancia(self._db).detener()
+            if ConsumoService._instancia is not None:
+                ConsumoService._instancia.detener()
@@ -1,35 +1,332 @@
 # services/database_service.py (actualizado)
+import json
+import math
+import os
+import sys
+import threading
+import time
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 from psycopg2.extras import RealDictCursor
-import os
+from typing import Dict, List, Optional
+from models.dinero import Dinero
+from utils.logger import obtener_logger
+from utils.rutas import ruta_datos
+
+log = obtener_logger(__name__)
+
+# Dinero como parámetro de consulta: se envía como NUMERIC con sus dos decimales
+psycopg2.extensions.register_adapter(Dinero, lambda dinero: psycopg2.extensions.adapt(dinero.a_decimal()))
+
+
+class MetricasConsultas:
+    """Latencia y filas por consulta, agregadas en memoria por nombre (Servicio.metodo).
+
+    Cada nombre guarda un histograma logarítmico fijo (cubetas de +20%), así el
+    costo por consulta es constante y los percentiles salen sin guardar muestras.
+    """
+
+    BASE_MS = 0.1
+    FACTOR = 1.2
+    NUM_CUBETAS = 80  # 0.1 ms … ~200 s
+
+    def __init__(self, umbral_lenta_ms: float = 200.0):
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self._lock = threading.Lock()
+        self._por_nombre: Dict[str, Dict] = {}
+        self._limites = [self.BASE_MS * self.FACTOR ** i for i in range(self.NUM_CUBETAS)]
+        self._log_factor = math.log(self.FACTOR)
+
+    def _cubeta(self, ms: float) -> int:
+        if ms <= self.BASE_MS:
+            return 0
+        indice = int(math.log(ms / self.BASE_MS) / self._log_factor) + 1
+        return min(indice, self.NUM_CUBETAS - 1)
+
+    def registrar(self, nombre: str, ms: float, filas: int, consulta: str):
+        with self._lock:
+            stats = self._por_nombre.get(nombre)
+            if stats is None:
+                stats = self._por_nombre[nombre] = {
+                    'llamadas': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'filas': 0,
+                    'lentas': 0, 'cubetas': [0] * self.NUM_CUBETAS
+                }
+            stats['llamadas'] += 1
+            stats['total_ms'] += ms
+            stats['filas'] += max(filas, 0)
+            stats['cubetas'][self._cubeta(ms)] += 1
+            if ms > stats['max_ms']:
+                stats['max_ms'] = ms
+            lenta = ms >= self.umbral_lenta_ms
+            if lenta:
+                stats['lentas'] += 1
+
+        if lenta:
+            log.warning("🐢 Consulta lenta %s: %.1f ms, %s filas\n%s", nombre, ms, filas, consulta.strip())
+
+    def _percentil(self, stats: Dict, p: float) -> float:
+        objetivo = p * stats['llamadas']
+        acumulado = 0
+        for indice, cantidad in enumerate(stats['cubetas']):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(self._limites[indice], stats['max_ms'])
+        return stats['max_ms']
+
+    def resumen(self) -> List[Dict]:
+        """Estadísticas por consulta, de mayor a menor tiempo total"""
+        with self._lock:
+            copia = {nombre: dict(stats, cubetas=list(stats['cubetas'])) for nombre, stats in self._por_nombre.items()}
+
+        filas = []
+        for nombre, stats in copia.items():
+            filas.append({
+                'nombre': nombre,
+                'llamadas': stats['llamadas'],
+                'total_ms': round(stats['total_ms'], 2),
+                'media_ms': round(stats['total_ms'] / stats['llamadas'], 2),
+                'p50_ms': round(self._percentil(stats, 0.50), 2),
+                'p95_ms': round(self._percentil(stats, 0.95), 2),
+                'p99_ms': round(self._percentil(stats, 0.99), 2),
+                'max_ms': round(stats['max_ms'], 2),
+                'filas': stats['filas'],
+                'lentas': stats['lentas']
+            })
+        filas.sort(key=lambda f: f['total_ms'], reverse=True)
+        return filas
+
+    def reiniciar(self):
+        with self._lock:
+            self._por_nombre.clear()
+
+    def datos(self) -> Dict:
+        """Resumen con fecha y umbral (el formato que lee utils/metricas_consultas.py)"""
+        return {'generado': time.strftime('%Y-%m-%d %H:%M:%S'), 'umbral_lenta_ms': self.umbral_lenta_ms,
+                'consultas': self.resumen()}
+
+    def volcar(self, ruta: str) -> str:
+        """Guardar el resumen en JSON"""
+        tmp = ruta + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.datos(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, ruta)
+        return ruta
+
+
+# Instancia del proceso: todas las conexiones creadas con conn_params la usan
+METRICAS = MetricasConsultas(float(os.environ.get('POS_SLOW_QUERY_MS', 200)))
+ARCHIVO_METRICAS = "metricas_consultas.json"
+
+# Frames que no cuentan como "quien consulta" al nombrar la consulta
+_ARCHIVOS_INTERNOS = (os.path.dirname(psycopg2.__file__), os.path.abspath(__file__))
+_nombres_por_codigo: Dict[object, str] = {}
+
+
+def _nombre_llamador() -> str:
+    """Servicio.metodo del primer frame fuera de psycopg2 y de este módulo"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(_ARCHIVOS_INTERNOS):
+        frame = frame.f_back
+    if frame is None:
+        return 'desconocido'
+
+    codigo = frame.f_code
+    nombre = _nombres_por_codigo.get(codigo)
+    if nombre is None:
+        instancia = frame.f_locals.get('self')
+        if instancia is not None:
+            prefijo = type(instancia).__name__
+        else:
+            prefijo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+        nombre = _nombres_por_codigo[codigo] = f"{prefijo}.{codigo.co_name}"
+    return nombre
+
+
+class _Instrumentado:
+    """Mezcla para cursores: mide execute/executemany y cuenta filas"""
+
+    # Nombre explícito opcional (cur.nombre_consulta = '...'); si no, Servicio.metodo
+    nombre_consulta: Optional[str] = None
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            METRICAS.registrar(self.nombre_consulta or _nombre_llamador(),
+                               (time.perf_counter() - inicio) * 1000, self.rowcount,
+                               query if isinstance(query, str) else str(query))
+
+    def executemany(self, query, vars_list):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            METRICAS.registrar(self.nombre_consulta or _nombre_llamador(),
+                               (time.perf_counter() - inicio) * 1000, self.rowcount,
+                               query if isinstance(query, str) else str(query))
+
+
+class CursorInstrumentado(_Instrumentado, psycopg2.extensions.cursor):
+    pass
+
+
+class RealDictCursorInstrumentado(_Instrumentado, RealDictCursor):
+    pass
+
+
+# ========== POOL DE CONEXIONES (opcional) ==========
+class ConexionPrestada:
+    """Conexión del pool con la interfaz de psycopg2: close() la devuelve al pool.
+
+    Si un servicio no llega a cerrarla (excepción antes de conn.close()), se
+    devuelve al recolectarse el objeto.
+    """
+
+    __slots__ = ('_pool', '_conn')
+
+    def __init__(self, pool: "PoolConexiones", conn):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_conn', conn)
+
+    def __getattr__(self, nombre):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already closed")
+        return getattr(self._conn, nombre)
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._conn, nombre, valor)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    @property
+    def closed(self) -> int:
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, '_conn', None)
+            self._pool.devolver(conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class PoolConexiones:
+    """Como mucho 'maximo' conexiones abiertas; si están todas prestadas, esperar"""
+
+    def __init__(self, conn_params: Dict, maximo: int, espera: float = 30.0):
+        self.conn_params = conn_params
+        self.maximo = maximo
+        self.espera = espera
+        self.creadas = 0
+        self._libres: List = []
+        self._prestadas = 0
+        self._cond = threading.Condition()
+
+    def prestar(self) -> ConexionPrestada:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._libres or self._prestadas < self.maximo, self.espera):
+                raise psycopg2.pool.PoolError(f"Sin conexiones libres tras {self.espera:.0f} s ({self.maximo} prestadas)")
+            self._prestadas += 1
+            conn = self._libres.pop() if self._libres else None
+
+        if conn is None:
+            try:
+                conn = psycopg2.connect(**self.conn_params)
+            except Exception:
+                with self._cond:
+                    self._prestadas -= 1
+                    self._cond.notify()
+                raise
+            self.creadas += 1
+        return ConexionPrestada(self, conn)
+
+    def devolver(self, conn):
+        """Dejar la conexión como nueva (sin transacción ni set_session) o descartarla"""
+        try:
+            if not conn.closed:
+                estado = conn.info.transaction_status
+                if estado == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    conn.close()
+                elif estado != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.closed and (conn.autocommit or conn.isolation_level is not None
+                                        or conn.readonly is not None or conn.deferrable is not None):
+                    conn.reset()
+        except psycopg2.Error:
+            conn.close()
+
+        with self._cond:
+            self._prestadas -= 1
+            if not conn.closed:
+                self._libres.append(conn)
+            self._cond.notify()
+
+    def cerrar(self):
+        with self._cond:
+            libres, self._libres = self._libres, []
+        for conn in libres:
+            conn.close()
+
+    def estado(self) -> Dict:
+        with self._cond:
+            return {'maximo': self.maximo, 'prestadas': self._prestadas,
+                    'libres': len(self._libres), 'creadas': self.creadas}
+
 
 class PostgreSQLService:
-    def __init__(self):
+    def __init__(self, pool_max: int = 0):
+        # Mismas variables que database/config.py (DB_HOST, DB_NAME, ...); por defecto la BD local
         self.conn_params = {
-            'host': 'localhost',
-            'database': 'pos_system',
-            'user': 'postgres', 
-            'password': 'qwerty',  # Cambia por tu password real
-            'port': '5432'
+            'host': os.environ.get('DB_HOST', 'localhost'),
+            'database': os.environ.get('DB_NAME', 'pos_system'),
+            'user': os.environ.get('DB_USER', 'postgres'), 
+            'password': os.environ.get('DB_PASSWORD', 'qwerty'),  # Cambia por tu password real
+            'port': os.environ.get('DB_PORT', '5432'),
+            # Todas las conexiones del POS miden sus consultas (ver METRICAS)
+            'cursor_factory': CursorInstrumentado
         }
+        # Con pool_max > 0 (servidor API) conectar() presta conexiones de un pool acotado
+        self.pool = PoolConexiones(self.conn_params, pool_max) if pool_max > 0 else None
         self._test_connection()
     
+    def conectar(self):
+        """Conexión para una operación; cerrarla con close() como siempre"""
+        if self.pool is not None:
+            return self.pool.prestar()
+        return psycopg2.connect(**self.conn_params)
+    
+    def cerrar_pool(self):
+        if self.pool is not None:
+            self.pool.cerrar()
+    
     def _test_connection(self):
         """Prueba básica de conexión"""
         try:
-            conn = psycopg2.connect(**self.conn_params)
-            print("✅ PostgreSQLService: Conexión exitosa")
+            conn = self.conectar()
+            log.debug("✅ PostgreSQLService: Conexión exitosa")
             conn.close()
         except Exception as e:
-            print(f"❌ PostgreSQLService: Error - {e}")
+            log.error("❌ PostgreSQLService: Error - %s", e)
             raise
     
   
     def ejecutar_consulta(self, query, params=None):
         """Método genérico para ejecutar queries - VERSIÓN CORREGIDA"""
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with self.conectar() as conn:
+                with conn.cursor(cursor_factory=RealDictCursorInstrumentado) as cur:
                     cur.execute(query, params or ())
                     
                     # PARA INSERT CON RETURNING - manejar diferente
@@ -52,9 +349,7 @@ class PostgreSQLService:
                         return cur.rowcount
                         
         except Exception as e:
-            print(f"❌ Error en consulta: {e}")
-            print(f"   Query: {query}")
-            print(f"   Params: {params}")
+            log.error("❌ Error en consulta: %s\n   Query: %s\n   Params: %s", e, query, params)
             raise
 
     def obtener_tablas(self):
@@ -66,5 +361,16 @@ class PostgreSQLService:
                 WHERE table_schema = 'public'
             """)
         except Exception as e:
-            print(f"Error obteniendo tablas: {e}")
-            return []
\ No newline at end of file
+            log.error("❌ Error obteniendo tablas: %s", e)
+            return []
+
+    # ========== MÉTRICAS DE CONSULTAS ==========
+    def metricas_consultas(self) -> List[Dict]:
+        """p50/p95/p99, llamadas y filas por consulta (Servicio.metodo)"""
+        return METRICAS.resumen()
+
+    def volcar_metricas(self, ruta: str = ARCHIVO_METRICAS) -> str:
+        """Guardar las métricas actuales en JSON (en utils/rutas.directorio_datos())"""
+        ruta = METRICAS.volcar(ruta_datos(ruta))
+        log.info("📈 Métricas de consultas guardadas en %s", ruta)
+        return ruta
@@ -0,0 +1,226 @@
+# services/exportacion_service.py - EXPORTACIÓN COLUMNAR DE HISTORIAL DE VENTAS
+"""
+Exporta movimientos_caja, pedidos e items_pedido a archivos columnares
+particionados por día (Parquet o Arrow IPC) para análisis fuera del POS.
+
+- Lee con cursores con nombre (server-side): en memoria sólo vive un lote.
+- Escribe <destino>/<tabla>/fecha=YYYY-MM-DD/part-0.<ext>
+- Exportación incremental: guarda en <destino>/_watermark.json el último día
+  completo exportado por tabla; el día en curso nunca se exporta.
+- Un pedido cambia después de exportado (se cobra, se cancela, se le agregan
+  líneas), así que pedidos e items_pedido vuelven a exportar en cada corrida
+  los últimos DIAS_REVISION días; reexportar un día reemplaza su partición.
+
+Requiere pyarrow (dependencia opcional, no se usa en las terminales).
+"""
+import json
+import os
+import psycopg2
+from datetime import date, timedelta
+from typing import Dict, Optional
+from utils.logger import obtener_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+log = obtener_logger(__name__)
+
+
+class ExportacionService:
+    """Exportación columnar incremental de tablas de ventas"""
+
+    WATERMARK_FILE = "_watermark.json"
+    TAMANO_LOTE = 10000
+
+    # Tabla → días cerrados que se reexportan siempre (movimientos_caja sólo recibe INSERT)
+    DIAS_REVISION = {
+        'pedidos': 7,
+        'items_pedido': 7,
+    }
+
+    # Tabla → consulta (debe exponer la columna 'fecha' de partición y ordenar por ella)
+    TABLAS = {
+        'movimientos_caja': """
+            SELECT mc.*, mc.created_at::date AS fecha
+            FROM movimientos_caja mc
+            WHERE mc.created_at >= %(desde)s AND mc.created_at < %(hasta)s
+            ORDER BY mc.created_at
+        """,
+        'pedidos': """
+            SELECT p.*, p.created_at::date AS fecha
+            FROM pedidos p
+            WHERE p.created_at >= %(desde)s AND p.created_at < %(hasta)s
+            ORDER BY p.created_at
+        """,
+        'items_pedido': """
+            SELECT ip.*, p.created_at::date AS fecha
+            FROM items_pedido ip
+            JOIN pedidos p ON ip.pedido_id = p.id
+            WHERE p.created_at >= %(desde)s AND p.created_at < %(hasta)s
+            ORDER BY p.created_at
+        """
+    }
+
+    FORMATOS = {
+        'parquet': 'parquet',
+        'arrow': 'arrow'
+    }
+
+    def __init__(self, db_service, destino: str, formato: str = 'parquet'):
+        if pa is None:
+            raise RuntimeError("La exportación columnar requiere pyarrow (pip install pyarrow)")
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato inválido: {formato}")
+
+        self.db = db_service
+        self.destino = destino
+        self.formato = formato
+        os.makedirs(self.destino, exist_ok=True)
+
+    # ========== WATERMARK ==========
+    def _ruta_watermark(self) -> str:
+        return os.path.join(self.destino, self.WATERMARK_FILE)
+
+    def obtener_watermarks(self) -> Dict[str, str]:
+        """Último día exportado por tabla (ISO)"""
+        ruta = self._ruta_watermark()
+        if not os.path.exists(ruta):
+            return {}
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _guardar_watermark(self, tabla: str, dia: date):
+        watermarks = self.obtener_watermarks()
+        watermarks[tabla] = dia.isoformat()
+
+        # Escritura atómica para no corromper el watermark si el proceso muere
+        tmp = self._ruta_watermark() + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(watermarks, f, indent=4)
+        os.replace(tmp, self._ruta_watermark())
+
+    # ========== EXPORTACIÓN ==========
+    def exportar_todo(self, desde: Optional[date] = None) -> Dict[str, int]:
+        """Exportar todas las tablas; devuelve filas exportadas por tabla"""
+        return {tabla: self.exportar_tabla(tabla, desde) for tabla in self.TABLAS}
+
+    def exportar_tabla(self, tabla: str, desde: Optional[date] = None) -> int:
+        """Exportar días completos pendientes de una tabla desde su watermark"""
+        hasta = date.today()  # exclusivo: sólo días cerrados
+
+        if desde is None:
+            watermark = self.obtener_watermarks().get(tabla)
+            desde = date.fromisoformat(watermark) + timedelta(days=1) if watermark else date(2000, 1, 1)
+            revision = self.DIAS_REVISION.get(tabla, 0)
+            if watermark and revision:
+                desde = min(desde, hasta - timedelta(days=revision))
+
+        if desde >= hasta:
+            log.info("⏭️ %s: sin días pendientes de exportar", tabla)
+            return 0
+
+        log.info("📤 Exportando %s del %s al %s...", tabla, desde, hasta - timedelta(days=1))
+
+        conn = psycopg2.connect(**self.db.conn_params)
+        filas = 0
+        escritor = None
+        dia_actual = None
+
+        try:
+            # Cursor con nombre: los datos se traen del servidor por lotes
+            cur = conn.cursor(name=f"exportar_{tabla}")
+            cur.itersize = self.TAMANO_LOTE
+            cur.execute(self.TABLAS[tabla], {'desde': desde, 'hasta': hasta})
+
+            columnas = None
+            esquema = None
+
+            while True:
+                lote = cur.fetchmany(self.TAMANO_LOTE)
+                if not lote:
+                    break
+
+                if esquema is None:
+                    columnas = [col.name for col in cur.description]
+                    esquema = self._esquema(cur.description)
+                indice_fecha = columnas.index('fecha')
+
+                # Cortar el lote por día (viene ordenado por fecha)
+                inicio = 0
+                for i in range(1, len(lote) + 1):
+                    if i < len(lote) and lote[i][indice_fecha] == lote[inicio][indice_fecha]:
+                        continue
+
+                    dia = lote[inicio][indice_fecha]
+                    if dia != dia_actual:
+                        if escritor:
+                            escritor.close()
+                            self._guardar_watermark(tabla, dia_actual)
+                        escritor = self._abrir_escritor(tabla, dia, esquema)
+                        dia_actual = dia
+
+                    escritor.write_batch(self._lote_arrow(lote[inicio:i], columnas, esquema))
+                    filas += i - inicio
+                    inicio = i
+
+            cur.close()
+
+            if escritor:
+                escritor.close()
+                escritor = None
+            conn.commit()
+
+            # Días sin datos también quedan cubiertos por el watermark
+            self._guardar_watermark(tabla, hasta - timedelta(days=1))
+            log.info("✅ %s: %s filas exportadas", tabla, filas)
+            return filas
+
+        finally:
+            if escritor:
+                escritor.close()
+            conn.close()
+
+    # ========== ARROW ==========
+    # OID de tipo PostgreSQL → tipo Arrow
+    TIPOS_ARROW = {
+        16: lambda: pa.bool_(),
+        20: lambda: pa.int64(),
+        21: lambda: pa.int16(),
+        23: lambda: pa.int32(),
+        700: lambda: pa.float32(),
+        701: lambda: pa.float64(),
+        1700: lambda: pa.decimal128(18, 2),
+        1082: lambda: pa.date32(),
+        1114: lambda: pa.timestamp('us'),
+        1184: lambda: pa.timestamp('us', tz='UTC'),
+    }
+
+    def _esquema(self, descripcion) -> "pa.Schema":
+        campos = []
+        for col in descripcion:
+            tipo = self.TIPOS_ARROW.get(col.type_code, pa.string)()
+            campos.append(pa.field(col.name, tipo))
+        return pa.schema(campos)
+
+    def _lote_arrow(self, filas, columnas, esquema) -> "pa.RecordBatch":
+        arreglos = []
+        for indice, campo in enumerate(esquema):
+            valores = [fila[indice] for fila in filas]
+            if pa.types.is_string(campo.type):
+                valores = [None if v is None else str(v) for v in valores]
+            arreglos.append(pa.array(valores, type=campo.type))
+        return pa.RecordBatch.from_arrays(arreglos, schema=esquema)
+
+    def _abrir_escritor(self, tabla: str, dia: date, esquema):
+        carpeta = os.path.join(self.destino, tabla, f"fecha={dia.isoformat()}")
+        os.makedirs(carpeta, exist_ok=True)
+
+        # Reexportar un día sobrescribe su partición (idempotente)
+        ruta = os.path.join(carpeta, f"part-0.{self.FORMATOS[self.formato]}")
+        if self.formato == 'parquet':
+            return pq.ParquetWriter(ruta, esquema, compression='zstd')
+        return pa.ipc.new_file(ruta, esquema)
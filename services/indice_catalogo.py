@@ -0,0 +1,119 @@
+# services/indice_catalogo.py - ÍNDICE DEL CATÁLOGO PARA TOMA RÁPIDA
+"""
+Búsqueda por teclazo en la toma de pedidos, sin tocar la base.
+
+Se construye una vez con la lista de productos activos y responde en memoria:
+
+    indice = IndiceCatalogo(servicios.productos.obtener_todos_productos())
+    indice.buscar("ham")     # → hamburguesas (prefijo de cualquier palabra)
+    indice.buscar("hamb do") # → "Hamburguesa Doble" (todas las palabras)
+    indice.buscar("12")      # → producto con código 12 primero, luego 120, 121...
+
+El código PLU de cada producto es su id (la tabla productos no tiene otro
+código numérico). Cada nodo del trie guarda, ordenados por nombre, los ids que
+pasan por él, así que una consulta cuesta recorrer tantos nodos como letras
+escritas más intersectar listas cortas.
+"""
+from typing import Dict, List, Optional, Tuple
+from models import Producto
+from services.busqueda_productos_service import normalizar
+
+
+class NodoTrie:
+    __slots__ = ('hijos', 'ids')
+
+    def __init__(self):
+        self.hijos: Dict[str, 'NodoTrie'] = {}
+        self.ids: List[int] = []
+
+
+class Trie:
+    """Trie de palabras → ids de producto (sin repetir un id en un mismo nodo)"""
+
+    def __init__(self):
+        self.raiz = NodoTrie()
+
+    def insertar(self, palabra: str, producto_id: int):
+        nodo = self.raiz
+        for letra in palabra:
+            nodo = nodo.hijos.setdefault(letra, NodoTrie())
+            if not nodo.ids or nodo.ids[-1] != producto_id:
+                nodo.ids.append(producto_id)
+
+    def prefijo(self, texto: str) -> List[int]:
+        nodo = self.raiz
+        for letra in texto:
+            nodo = nodo.hijos.get(letra)
+            if nodo is None:
+                return []
+        return nodo.ids
+
+
+class IndiceCatalogo:
+    """Trie de nombres normalizados + trie de códigos PLU"""
+
+    def __init__(self, productos: List[Producto]):
+        # Insertar en orden de nombre deja cada lista de ids ya ordenada
+        ordenados = sorted(productos, key=lambda p: normalizar(p.nombre))
+        self.productos: Dict[int, Producto] = {p.id: p for p in ordenados}
+        self._nombres = Trie()
+        self._codigos = Trie()
+
+        for producto in ordenados:
+            for palabra in normalizar(producto.nombre).split():
+                self._nombres.insertar(palabra, producto.id)
+            self._codigos.insertar(str(producto.id), producto.id)
+
+    def por_codigo(self, codigo) -> Optional[Producto]:
+        try:
+            return self.productos.get(int(codigo))
+        except (TypeError, ValueError):
+            return None
+
+    def actualizar_stock(self, disponible: Dict):
+        """Aplicar {producto_id: stock} (StockService.disponibilidad; por JSON las claves llegan como texto)"""
+        for producto_id, stock in disponible.items():
+            producto = self.productos.get(int(producto_id))
+            if producto is not None:
+                producto.stock = stock
+
+    def disponible(self, producto_id: int) -> Optional[int]:
+        """Stock conocido (None = sin control o producto fuera del índice)"""
+        producto = self.productos.get(producto_id)
+        return producto.stock if producto else None
+
+    def por_categoria(self, categoria: str) -> List[Producto]:
+        return [p for p in self.productos.values() if p.categoria == categoria]
+
+    def buscar(self, texto: str, limite: int = 12) -> List[Producto]:
+        """Productos cuyo código o palabras del nombre empiezan por lo escrito"""
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+
+        if consulta.isdigit():
+            exacto = self.por_codigo(consulta)
+            ids = [exacto.id] if exacto else []
+            ids += [pid for pid in self._codigos.prefijo(consulta) if not exacto or pid != exacto.id]
+            return [self.productos[pid] for pid in ids[:limite]]
+
+        # Todas las palabras deben coincidir; se parte de la lista más corta
+        listas = sorted((self._nombres.prefijo(p) for p in consulta.split()), key=len)
+        if not listas[0]:
+            return []
+        resto = [set(lista) for lista in listas[1:]]
+        resultado = []
+        for pid in listas[0]:
+            if all(pid in ids for ids in resto):
+                resultado.append(pid)
+                if len(resultado) == limite:
+                    break
+        return [self.productos[pid] for pid in resultado]
+
+
+def interpretar_entrada(texto: str) -> Tuple[int, str]:
+    """'3*12' → (3, '12'); 'ham' → (1, 'ham'). Cantidad delante del asterisco"""
+    cantidad, separador, resto = texto.strip().partition('*')
+    if separador and cantidad.strip().isdigit():
+        return max(1, int(cantidad)), resto.strip()
+    return 1, texto.strip()
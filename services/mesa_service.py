@@ -0,0 +1,119 @@
+# services/mesa_service.py - ÍNDICE EN MEMORIA DE CUENTAS ABIERTAS POR MESA
+from typing import Callable, Dict, List, Optional
+from services.ticket_service import TicketService
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+class MesaService:
+    """Índice mesa → pedidos abiertos → líneas para el cierre de cuenta.
+
+    Se carga completo con una sola consulta y se mantiene al día con los
+    eventos de pedido/pago (actualizar_pedido, quitar_pedido), de modo que
+    cambiar de mesa o de pedido en pantalla no consulta la base de datos.
+    """
+
+    ESTADOS_ABIERTOS = ('pendiente', 'preparacion', 'listo')
+
+    def __init__(self, db_service, ticket_service: Optional[TicketService] = None):
+        self.db = db_service
+        self.ticket_service = ticket_service or TicketService(db_service)
+        self._pedidos: Dict[int, Dict] = {}
+        self._mesas: Dict[str, Dict[int, Dict]] = {}
+        self._observadores: List[Callable] = []
+        self.cargado = False
+
+    # ========== CARGA ==========
+    def cargar(self) -> bool:
+        """Reconstruir el índice completo (una consulta para todas las mesas)"""
+        pedidos = self.ticket_service.estado_cobro_abiertos()
+
+        self._pedidos = {}
+        self._mesas = {}
+        for pedido in pedidos:
+            self._indexar(pedido)
+
+        self.cargado = True
+        log.debug("🏷️ Índice de mesas: %s mesas, %s pedidos abiertos", len(self._mesas), len(self._pedidos))
+        self._notificar()
+        return True
+
+    def _indexar(self, estado_cobro: Dict):
+        """Agregar o reemplazar un pedido en el índice"""
+        pedido = dict(estado_cobro)
+        pedido['id'] = pedido['pedido_id']
+        pedido['total'] = pedido['total_pedido']
+        pedido['num_items'] = len(pedido['lineas'])
+
+        self._desindexar(pedido['id'])
+        self._pedidos[pedido['id']] = pedido
+        self._mesas.setdefault(str(pedido['mesa']), {})[pedido['id']] = pedido
+
+    def _desindexar(self, pedido_id: int) -> Optional[Dict]:
+        """Quitar un pedido del índice sin notificar"""
+        pedido = self._pedidos.pop(pedido_id, None)
+        if pedido:
+            mesa = str(pedido['mesa'])
+            pedidos_mesa = self._mesas.get(mesa)
+            if pedidos_mesa is not None:
+                pedidos_mesa.pop(pedido_id, None)
+                if not pedidos_mesa:
+                    del self._mesas[mesa]
+        return pedido
+
+    # ========== EVENTOS ==========
+    def actualizar_pedido(self, pedido_id: int):
+        """Refrescar un solo pedido tras crearlo, agregarle items, cobrarlo o cambiar su estado"""
+        estado = self.ticket_service.estado_cobro(pedido_id)
+
+        if estado and estado['estado'] in self.ESTADOS_ABIERTOS:
+            self._indexar(estado)
+        else:
+            self._desindexar(pedido_id)
+
+        self._notificar()
+
+    def quitar_pedido(self, pedido_id: int):
+        """Quitar un pedido cerrado (pagado, entregado o cancelado) del índice"""
+        if self._desindexar(pedido_id):
+            self._notificar()
+
+    def agregar_observador(self, callback: Callable):
+        """Registrar callback llamado cada vez que cambia el índice"""
+        if callback not in self._observadores:
+            self._observadores.append(callback)
+
+    def quitar_observador(self, callback: Callable):
+        """Eliminar callback registrado"""
+        if callback in self._observadores:
+            self._observadores.remove(callback)
+
+    def _notificar(self):
+        for callback in list(self._observadores):
+            try:
+                callback()
+            except Exception as e:
+                log.error("❌ Error notificando cambio de mesas: %s", e)
+
+    # ========== CONSULTAS EN MEMORIA ==========
+    def obtener_mesas(self) -> List[Dict]:
+        """Resumen de mesas con pedidos abiertos, ordenadas por número de mesa"""
+        resumen = []
+        for mesa, pedidos in self._mesas.items():
+            resumen.append({
+                'mesa': mesa,
+                'num_pedidos': len(pedidos),
+                'total': sum(p['total'] for p in pedidos.values())
+            })
+
+        resumen.sort(key=lambda m: (not m['mesa'].isdigit(), int(m['mesa']) if m['mesa'].isdigit() else 0, m['mesa']))
+        return resumen
+
+    def obtener_pedidos_mesa(self, mesa: str) -> List[Dict]:
+        """Pedidos abiertos de una mesa (en orden de creación)"""
+        pedidos = self._mesas.get(str(mesa), {}).values()
+        return sorted(pedidos, key=lambda p: (p['created_at'], p['id']))
+
+    def obtener_pedido(self, pedido_id: int) -> Optional[Dict]:
+        """Pedido abierto con sus líneas y estado de cobro"""
+        return self._pedidos.get(pedido_id)
@@ -1,27 +1,79 @@
 # services/pedido_service.py
-from typing import List, Dict, Optional
+from typing import List, Optional
 from datetime import datetime
+from models import Carrito, Dinero, ItemPedido, Pedido, Producto
 from services.database_service import PostgreSQLService
-import psycopg2
+from services.auditoria_service import AuditoriaService
+from services.borradores_service import BorradoresPedido
+from services.consumo_service import ESTADOS_CONSUMO, ConsumoService
+from services.stock_service import StockInsuficiente, liberar_pedido, reservar
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Pedidos a los que aún se pueden agregar productos (cancelado y pagado ya no)
+ESTADOS_ABIERTOS = ('pendiente', 'confirmado', 'preparacion', 'listo', 'entregado')
+# Un pedido cancelado ya devolvió su stock: no vuelve a ningún otro estado
+CONDICION_NO_CANCELADO = "(anterior.estado <> 'cancelado' OR %(estado)s = 'cancelado')"
+
+# Orden de los campos de Pedido / ItemPedido
+COLUMNAS_PEDIDO = "p.id, p.mesa, p.estado, p.created_at, e.nombre, p.total"
+COLUMNAS_ITEM_BASE = "ip.producto_id, pr.nombre, ip.cantidad, ip.precio_unitario, COALESCE(ip.notas, ''), ip.id"
+
+_hay_estado_items: Optional[bool] = None
+
+
+def hay_estado_items(cur) -> bool:
+    """¿Tiene items_pedido la columna estado (utils/migrar_estado_items.py)? Se consulta una vez"""
+    global _hay_estado_items
+    if _hay_estado_items is None:
+        cur.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'items_pedido' AND column_name = 'estado'
+              AND table_schema = ANY(current_schemas(false))
+        """)
+        _hay_estado_items = cur.fetchone() is not None
+        if not _hay_estado_items:
+            log.warning("⚠️ items_pedido sin columna estado: las líneas se leen como 'pendiente'")
+    return _hay_estado_items
+
+
+def columnas_item(cur) -> str:
+    """Columnas de ItemPedido; sin migrar, el estado de cada línea es 'pendiente'"""
+    estado = "ip.estado" if hay_estado_items(cur) else "'pendiente'"
+    return f"{COLUMNAS_ITEM_BASE}, {estado}"
+
+
+def cargar_items(cur, pedidos: List[Pedido]) -> List[Pedido]:
+    """Llenar pedido.items de todos los pedidos con una sola consulta"""
+    if not pedidos:
+        return pedidos
+    por_id = {pedido.id: pedido for pedido in pedidos}
+    cur.execute(f"""
+        SELECT ip.pedido_id, {columnas_item(cur)}
+        FROM items_pedido ip
+        JOIN productos pr ON ip.producto_id = pr.id
+        WHERE ip.pedido_id = ANY(%s)
+        ORDER BY ip.pedido_id, ip.id
+    """, (list(por_id),))
+    for fila in cur.fetchall():
+        por_id[fila[0]].items.append(ItemPedido(*fila[1:]))
+    return pedidos
+
 
 class PedidoService:
     def __init__(self, db_service: PostgreSQLService):
         self.db = db_service
-        self.pedido_temporal = {
-            'mesa': '1',
-            'items': [],
-            'total': 0.0,
-            'notas': ''
-        }
+        self.borradores = BorradoresPedido()
    
    # crear pedido
     def crear_pedido(self, mesa: str, empleado_id: int, notas: str = "") -> Optional[int]:
         """Crear pedido - VERSIÓN SIMPLE Y ROBUSTA"""
         try:
-            print(f"📝 Creando pedido para mesa {mesa}...")
+            log.info("📝 Creando pedido para mesa %s...", mesa)
             
             # Conexión directa para evitar problemas
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute(
@@ -38,26 +90,38 @@ class PedidoService:
             conn.close()
             
             if pedido_id:
-                print(f"✅ Pedido creado con ID: {pedido_id}")
+                log.info("✅ Pedido creado con ID: %s", pedido_id)
                 return pedido_id
             else:
-                print("❌ No se pudo obtener ID del pedido")
+                log.error("❌ No se pudo obtener ID del pedido")
                 return None
                 
         except Exception as e:
-            print(f"❌ Error creando pedido: {e}")
+            log.error("❌ Error creando pedido: %s", e)
             return None
     
     def agregar_item_pedido(self, pedido_id: int, producto_id: int, 
-                          cantidad: int, precio_unitario: float, 
+                          cantidad: int, precio_unitario: Dinero, 
                           notas: str = "") -> bool:
-        """Agregar item al pedido - VERSIÓN SIMPLE Y ROBUSTA"""
+        """Agregar item al pedido reservando su stock (lanza StockInsuficiente)"""
         try:
-            print(f"📦 Agregando item al pedido {pedido_id}...")
+            log.debug("📦 Agregando item al pedido %s...", pedido_id)
             
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
+            # Igual que agregar_productos_pedido_abierto: sólo pedidos abiertos,
+            # bloqueados para que no se cancelen ni cobren a mitad de la reserva
+            cur.execute("SELECT estado FROM pedidos WHERE id = %s FOR UPDATE", (pedido_id,))
+            resultado = cur.fetchone()
+            
+            if not resultado or resultado[0] not in ESTADOS_ABIERTOS:
+                log.warning("⚠️ Pedido #%s no admite productos (estado %s)", pedido_id, resultado[0] if resultado else None)
+                conn.rollback()
+                cur.close()
+                conn.close()
+                return False
+            
             cur.execute(
                 """
                 INSERT INTO items_pedido 
@@ -66,22 +130,83 @@ class PedidoService:
                 """,
                 (pedido_id, producto_id, cantidad, precio_unitario, notas)
             )
+            reservar(cur, [(producto_id, cantidad)])
             
             conn.commit()
             cur.close()
             conn.close()
             
-            print(f"✅ Item {producto_id} agregado exitosamente")
+            # Pedido ya listo/entregado: la línea nueva también consume insumos
+            if resultado[0] in ESTADOS_CONSUMO:
+                ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            log.debug("✅ Item %s agregado exitosamente", producto_id)
             return True
             
+        except StockInsuficiente:
+            conn.rollback()
+            conn.close()
+            raise
         except Exception as e:
-            print(f"❌ Error agregando item: {e}")
+            log.error("❌ Error agregando item: %s", e)
             return False
+
+    def crear_pedido_con_items(self, mesa: str, empleado_id: int, items: List[ItemPedido],
+                               notas: str = "") -> Optional[int]:
+        """Pedido, items y total en una sola transacción (una llamada a la API).
+
+        items: [ItemPedido] como en pedido_temporal.items.
+        Reserva el stock de todas las líneas; si falta alguno lanza StockInsuficiente
+        y no se guarda nada.
+        """
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            cur.execute(
+                "INSERT INTO pedidos (mesa, empleado_id, notas) VALUES (%s, %s, %s) RETURNING id",
+                (mesa, empleado_id, notas)
+            )
+            pedido_id = cur.fetchone()[0]
+
+            cur.executemany(
+                """
+                INSERT INTO items_pedido
+                (pedido_id, producto_id, cantidad, precio_unitario, notas)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                [(pedido_id, item.producto_id, item.cantidad, item.precio, item.notas) for item in items]
+            )
+            reservar(cur, [(item.producto_id, item.cantidad) for item in items])
+
+            cur.execute(
+                """
+                UPDATE pedidos
+                SET total = (SELECT COALESCE(SUM(subtotal), 0) FROM items_pedido WHERE pedido_id = %s)
+                WHERE id = %s
+                """,
+                (pedido_id, pedido_id)
+            )
+
+            conn.commit()
+            cur.close()
+            conn.close()
+
+            log.info("✅ Pedido #%s creado con %s items - Mesa %s", pedido_id, len(items), mesa)
+            return pedido_id
+
+        except StockInsuficiente:
+            conn.rollback()
+            conn.close()
+            raise
+        except Exception as e:
+            log.error("❌ Error creando pedido con items: %s", e)
+            return None
    # SE AFECTA CON CIERRE DE CUENTAS  
     def _actualizar_total_pedido(self, pedido_id: int):
         """Actualizar total en base de datos"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute(
@@ -102,63 +227,47 @@ class PedidoService:
             cur.close()
             conn.close()
             
-            print(f"💰 Total actualizado para pedido {pedido_id}")
+            log.debug("💰 Total actualizado para pedido %s", pedido_id)
             
         except Exception as e:
-            print(f"❌ Error actualizando total: {e}")
+            log.error("❌ Error actualizando total: %s", e)
     
     # Métodos para el pedido temporal (antes de guardar)
-    def agregar_item_temporal(self, producto: dict, cantidad: int = 1, notas: str = ""):
-        """Agregar item al pedido temporal"""
-        item = {
-            'producto_id': producto['id'],
-            'nombre': producto['nombre'],
-            'precio': float(producto['precio']),
-            'cantidad': cantidad,
-            'notas': notas,
-            'subtotal': float(producto['precio']) * cantidad
-        }
-        
-        # Verificar si ya existe
-        for existing_item in self.pedido_temporal['items']:
-            if (existing_item['producto_id'] == producto['id'] and 
-                existing_item.get('notas', '') == notas):
-                existing_item['cantidad'] += cantidad
-                existing_item['subtotal'] = existing_item['cantidad'] * existing_item['precio']
-                break
-        else:
-            self.pedido_temporal['items'].append(item)
-        
-        self._calcular_total_temporal()
-        print(f"➕ Item temporal agregado: {producto['nombre']} x{cantidad}")
-        
-    def _calcular_total_temporal(self):
-        """Calcular total del pedido temporal"""
-        self.pedido_temporal['total'] = sum(item['subtotal'] for item in self.pedido_temporal['items'])
-        print(f"🧮 Total temporal: ${self.pedido_temporal['total']:.2f}")
+    @property
+    def pedido_temporal(self) -> Carrito:
+        """Borrador de la mesa activa (ver BorradoresPedido)"""
+        return self.borradores.activo
+    
+    def agregar_item_temporal(self, producto: Producto, cantidad: int = 1, notas: str = "") -> ItemPedido:
+        """Agregar item al pedido temporal → la línea (nueva o la existente con las mismas notas)"""
+        linea = self.pedido_temporal.agregar(producto, cantidad, notas)
+        log.debug("➕ Item temporal agregado: %s x%s (total $%s)", producto.nombre, cantidad,
+                  self.pedido_temporal.total)
+        return linea
     
     def limpiar_pedido_temporal(self):
-        """Limpiar pedido temporal"""
-        self.pedido_temporal = {
-            'mesa': '1',
-            'items': [],
-            'total': 0.0,
-            'notas': ''
-        }
-        print("🧹 Pedido temporal limpiado")
+        """Descartar el borrador de la mesa activa"""
+        self.borradores.descartar()
+        log.debug("🧹 Pedido temporal limpiado")
     
-    def obtener_pedidos_activos(self) -> List[Dict]:
-        """Obtener pedidos en estado pendiente o preparación"""
+    def obtener_pedidos_activos(self) -> List[Pedido]:
+        """Obtener pedidos en estado pendiente o preparación (sin líneas)"""
         try:
-            return self.db.ejecutar_consulta("""
-                SELECT p.*, e.nombre as mesero
+            conn = self.db.conectar()
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT {COLUMNAS_PEDIDO}
                 FROM pedidos p
                 JOIN empleados e ON p.empleado_id = e.id
                 WHERE p.estado IN ('pendiente', 'confirmado', 'preparacion')
                 ORDER BY p.created_at DESC
             """)
+            pedidos = [Pedido(*fila) for fila in cur.fetchall()]
+            cur.close()
+            conn.close()
+            return pedidos
         except Exception as e:
-            print(f"Error obteniendo pedidos activos: {e}")
+            log.error("❌ Error obteniendo pedidos activos: %s", e)
             return []
     
    
@@ -167,14 +276,14 @@ class PedidoService:
         return ['pendiente', 'preparacion', 'listo', 'entregado', 'pagado', 'cancelado']
 
     #PEDIDOS ABIERTOS
-    def obtener_pedido_por_id(self, pedido_id: int) -> Optional[Dict]:
-        """Obtener datos generales de un pedido por ID"""
+    def obtener_pedido_por_id(self, pedido_id: int) -> Optional[Pedido]:
+        """Obtener datos generales de un pedido por ID (sin líneas)"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT p.id, p.mesa, p.total, e.nombre as mesero
+            cur.execute(f"""
+                SELECT {COLUMNAS_PEDIDO}
                 FROM pedidos p
                 JOIN empleados e ON p.empleado_id = e.id
                 WHERE p.id = %s
@@ -183,117 +292,102 @@ class PedidoService:
             row = cur.fetchone()
             cur.close()
             conn.close()
-            
-            if row:
-                return {
-                    'id': row[0],
-                    'mesa': row[1],
-                    'total': float(row[2]),
-                    'mesero': row[3]
-                }
-            else:
-                return None
+            return Pedido(*row) if row else None
                 
         except Exception as e:
-            print(f"❌ Error obteniendo pedido: {e}")
+            log.error("❌ Error obteniendo pedido: %s", e)
             return None
     
-    def obtener_items_pedido(self, pedido_id: int) -> List[Dict]:
+    def obtener_items_pedido(self, pedido_id: int) -> List[ItemPedido]:
         """Obtener productos de un pedido por ID"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT pr.nombre, ip.cantidad, ip.precio_unitario,
-                    (ip.cantidad * ip.precio_unitario) as subtotal
+            cur.execute(f"""
+                SELECT {columnas_item(cur)}
                 FROM items_pedido ip
                 JOIN productos pr ON ip.producto_id = pr.id
                 WHERE ip.pedido_id = %s
+                ORDER BY ip.id
             """, (pedido_id,))
             
-            items = []
-            for row in cur.fetchall():
-                items.append({
-                    'nombre': row[0],
-                    'cantidad': row[1],
-                    'precio': float(row[2]),
-                    'subtotal': float(row[3])
-                })
-            
+            items = [ItemPedido(*row) for row in cur.fetchall()]
             cur.close()
             conn.close()
             return items
             
         except Exception as e:
-            print(f"❌ Error obteniendo items del pedido: {e}")
+            log.error("❌ Error obteniendo items del pedido: %s", e)
             return []
     
     def cambiar_estado_pedido(self, pedido_id: int, nuevo_estado: str, empleado_id: int = None) -> bool:
-        """Cambiar estado de un pedido con auditoría"""
+        """Cambiar estado de un pedido con auditoría (al cancelar devuelve el stock)"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            # Actualizar estado del pedido
-            cur.execute("""
-                UPDATE pedidos 
-                SET estado = %s
-                WHERE id = %s
-                RETURNING id
-            """, (nuevo_estado, pedido_id))
-            
-            if not cur.fetchone():
-                return False
-            
-            # Registrar en historial si hay empleado
-            if empleado_id:
-                cur.execute("""
-                    INSERT INTO historial_estados_pedidos 
-                    (pedido_id, empleado_id, estado_anterior, estado_nuevo)
-                    VALUES (%s, %s, 
-                        (SELECT estado FROM pedidos WHERE id = %s),
-                        %s
-                    )
-                """, (pedido_id, empleado_id, pedido_id, nuevo_estado))
+            # Actualizar estado y obtener el anterior en la misma sentencia
+            cur.execute(f"""
+                UPDATE pedidos p
+                SET estado = %(estado)s
+                FROM (SELECT id, estado FROM pedidos WHERE id = %(pedido)s FOR UPDATE) anterior
+                WHERE p.id = anterior.id AND {CONDICION_NO_CANCELADO}
+                RETURNING anterior.estado
+            """, {'estado': nuevo_estado, 'pedido': pedido_id})
             
+            resultado = cur.fetchone()
+            if resultado and nuevo_estado == 'cancelado' and resultado[0] != 'cancelado':
+                liberar_pedido(cur, pedido_id)
             conn.commit()
             cur.close()
             conn.close()
             
-            print(f"✅ Pedido #{pedido_id} cambió a estado: {nuevo_estado}")
+            if not resultado:
+                log.warning("⚠️ Pedido #%s no existe o está cancelado: no pasa a %s", pedido_id, nuevo_estado)
+                return False
+            
+            if nuevo_estado in ESTADOS_CONSUMO:
+                ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            # Historial en segundo plano: no añade latencia al cambio de estado
+            if empleado_id:
+                AuditoriaService.instancia(self.db).registrar_cambio_estado(
+                    pedido_id, empleado_id, resultado[0], nuevo_estado
+                )
+            
+            log.info("✅ Pedido #%s cambió a estado: %s", pedido_id, nuevo_estado)
             return True
             
         except Exception as e:
-            print(f"❌ Error cambiando estado: {e}")
+            log.error("❌ Error cambiando estado: %s", e)
             return False
 
-    def agregar_productos_pedido_abierto(self, pedido_id: int, productos: List[Dict]) -> bool:
-        """Agregar más productos a un pedido abierto"""
+    def agregar_productos_pedido_abierto(self, pedido_id: int, items: List[ItemPedido]) -> bool:
+        """Agregar más productos a un pedido abierto reservando su stock (lanza StockInsuficiente)"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            # Verificar que el pedido está abierto (no pagado)
-            cur.execute("SELECT estado FROM pedidos WHERE id = %s", (pedido_id,))
+            # Verificar que el pedido sigue abierto; el bloqueo evita que se cancele
+            # o se cobre mientras se reservan las nuevas líneas
+            cur.execute("SELECT estado FROM pedidos WHERE id = %s FOR UPDATE", (pedido_id,))
             resultado = cur.fetchone()
             
-            if not resultado or resultado[0] == 'pagado':
+            if not resultado or resultado[0] not in ESTADOS_ABIERTOS:
+                log.warning("⚠️ Pedido #%s no admite productos (estado %s)", pedido_id, resultado[0] if resultado else None)
+                conn.rollback()
+                cur.close()
+                conn.close()
                 return False
             
             # Agregar nuevos productos
-            for producto in productos:
-                cur.execute("""
-                    INSERT INTO items_pedido 
-                    (pedido_id, producto_id, cantidad, precio_unitario, notas)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    pedido_id, 
-                    producto['id'], 
-                    producto['cantidad'],
-                    producto['precio'],
-                    producto.get('notas', '')
-                ))
+            cur.executemany("""
+                INSERT INTO items_pedido 
+                (pedido_id, producto_id, cantidad, precio_unitario, notas)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(pedido_id, item.producto_id, item.cantidad, item.precio, item.notas) for item in items])
+            reservar(cur, [(item.producto_id, item.cantidad) for item in items])
             
             # Recalcular total
             cur.execute("""
@@ -310,60 +404,40 @@ class PedidoService:
             cur.close()
             conn.close()
             
-            print(f"✅ {len(productos)} productos agregados al pedido #{pedido_id}")
+            # Pedido ya listo/entregado: las líneas nuevas también consumen insumos
+            if resultado[0] in ESTADOS_CONSUMO:
+                ConsumoService.instancia(self.db).registrar_pedido(pedido_id)
+            
+            log.info("✅ %s productos agregados al pedido #%s", len(items), pedido_id)
             return True
             
+        except StockInsuficiente:
+            conn.rollback()
+            conn.close()
+            raise
         except Exception as e:
-            print(f"❌ Error agregando productos: {e}")
+            log.error("❌ Error agregando productos: %s", e)
             return False
 
-    def obtener_pedidos_por_estado(self, estado: str) -> List[Dict]:
-        """Obtener pedidos por estado específico"""
+    def obtener_pedidos_por_estado(self, estado: str) -> List[Pedido]:
+        """Obtener pedidos por estado específico, con sus líneas"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
-            cur.execute("""
-                SELECT 
-                    p.id,
-                    p.mesa,
-                    p.total,
-                    p.created_at,
-                    e.nombre as mesero,
-                    JSON_AGG(
-                        JSON_BUILD_OBJECT(
-                            'nombre', pr.nombre,
-                            'cantidad', ip.cantidad,
-                            'precio_unitario', ip.precio_unitario,
-                            'notas', ip.notas
-                        )
-                    ) as items
+            cur.execute(f"""
+                SELECT {COLUMNAS_PEDIDO}
                 FROM pedidos p
                 JOIN empleados e ON p.empleado_id = e.id
-                JOIN items_pedido ip ON p.id = ip.pedido_id
-                JOIN productos pr ON ip.producto_id = pr.id
                 WHERE p.estado = %s
-                GROUP BY p.id, p.mesa, p.total, p.created_at, e.nombre
                 ORDER BY p.created_at ASC
             """, (estado,))
             
-            pedidos = []
-            for row in cur.fetchall():
-                pedido = {
-                    'id': row[0],
-                    'mesa': row[1],
-                    'total': float(row[2]),
-                    'created_at': row[3],
-                    'mesero': row[4],
-                    'items': row[5] if row[5] else []
-                }
-                pedidos.append(pedido)
-            
+            pedidos = cargar_items(cur, [Pedido(*row) for row in cur.fetchall()])
             cur.close()
             conn.close()
             return pedidos
             
         except Exception as e:
-            print(f"❌ Error obteniendo pedidos por estado: {e}")
+            log.error("❌ Error obteniendo pedidos por estado: %s", e)
             return []
-
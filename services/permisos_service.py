@@ -0,0 +1,178 @@
+# services/permisos_service.py - MATRIZ DE PERMISOS ROL × RECURSO
+import select
+import threading
+import psycopg2
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Pantallas y acciones conocidas; la tabla puede añadir recursos nuevos
+RECURSOS = (
+    'menu', 'pedidos', 'cierre_cuenta', 'cocina', 'caja', 'inventario', 'config', 'reportes',
+    'cerrar_pedidos', 'imprimir_tickets',
+)
+
+# Permisos iniciales (se siembran en permisos_rol con utils/crear_tablas_permisos.py
+# y se usan si la tabla aún no existe). Recursos: nombres de pantalla y acciones.
+PERMISOS_POR_DEFECTO = {
+    'mesero': ['menu', 'pedidos', 'cierre_cuenta', 'cocina'],
+    'cocinero': ['menu', 'cocina', 'pedidos'],
+    'cajero': ['menu', 'caja', 'cierre_cuenta', 'pedidos', 'cocina', 'inventario',
+               'cerrar_pedidos', 'imprimir_tickets'],
+    'administrador': ['*'],
+}
+
+# Recurso comodín: el rol tiene todos los bits encendidos
+TODOS = '*'
+
+# Nombres alternativos de rol que existen en empleados.rol
+ALIAS_ROLES = {
+    'admin': 'administrador',
+}
+
+CANAL_NOTIFICACION = 'permisos_rol'
+
+
+class MatrizPermisos:
+    """Matriz inmutable rol × recurso compilada a un entero (bitmap) por rol.
+
+    Cada recurso tiene un bit; permite() es un par de búsquedas en dict y un AND.
+    Para cambiar permisos se compila una matriz nueva y se reemplaza la referencia.
+    """
+
+    __slots__ = ('_bits', '_mascaras', '_recursos')
+
+    def __init__(self, filas: Iterable[Tuple[str, str]]):
+        por_rol: Dict[str, List[str]] = {}
+        recursos = list(RECURSOS)
+        for rol, recurso in filas:
+            por_rol.setdefault(rol.lower(), []).append(recurso)
+            if recurso != TODOS and recurso not in recursos:
+                recursos.append(recurso)
+
+        bits = {recurso: 1 << i for i, recurso in enumerate(recursos)}
+        todos = -1  # todos los bits, incluidos recursos añadidos después
+
+        mascaras = {}
+        for rol, lista in por_rol.items():
+            mascara = 0
+            for recurso in lista:
+                mascara |= todos if recurso == TODOS else bits[recurso]
+            mascaras[rol] = mascara
+        for alias, rol in ALIAS_ROLES.items():
+            if rol in mascaras:
+                mascaras.setdefault(alias, mascaras[rol])
+
+        object.__setattr__(self, '_bits', bits)
+        object.__setattr__(self, '_mascaras', mascaras)
+        object.__setattr__(self, '_recursos', frozenset(recursos))
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("MatrizPermisos es inmutable")
+
+    def permite(self, rol: Optional[str], recurso: str) -> bool:
+        mascara = self._mascaras.get(rol)
+        if mascara is None:
+            if not rol:
+                return False
+            mascara = self._mascaras.get(rol.lower(), 0)
+        return bool(mascara & self._bits.get(recurso, 0))
+
+    def recursos_de(self, rol: Optional[str]) -> FrozenSet[str]:
+        """Recursos permitidos para un rol (para construir menús)"""
+        mascara = self._mascaras.get(rol) or self._mascaras.get((rol or '').lower(), 0)
+        return frozenset(r for r, bit in self._bits.items() if mascara & bit)
+
+    @property
+    def recursos(self) -> FrozenSet[str]:
+        return self._recursos
+
+
+class PermisosService:
+    """Carga permisos_rol una vez y la mantiene al día con LISTEN/NOTIFY.
+
+    La tabla tiene un trigger que notifica en el canal 'permisos_rol' cuando un
+    administrador cambia permisos; un hilo escucha y recompila la matriz.
+    """
+
+    # Tiempo máximo de espera del hilo de escucha entre comprobaciones
+    ESPERA_NOTIFICACION_SEG = 5.0
+
+    def __init__(self, db_service, escuchar_cambios: bool = True):
+        self.db = db_service
+        self.filas: List[Tuple[str, str]] = []
+        self.reemplazar(self._filas_por_defecto())
+        self._detener = threading.Event()
+        self._hilo = None
+
+        # Sin BD (terminal con servidor central) las reglas llegan con reemplazar()
+        if db_service is not None:
+            try:
+                self.recargar()
+            except Exception as e:
+                log.warning("⚠️ Permisos por defecto en uso (%s)", e)
+
+        if escuchar_cambios:
+            self._hilo = threading.Thread(target=self._escuchar, name="permisos", daemon=True)
+            self._hilo.start()
+
+    @staticmethod
+    def _filas_por_defecto() -> List[Tuple[str, str]]:
+        return [(rol, recurso) for rol, recursos in PERMISOS_POR_DEFECTO.items() for recurso in recursos]
+
+    def recargar(self):
+        """Leer permisos_rol y reemplazar la matriz compilada"""
+        conn = psycopg2.connect(**self.db.conn_params)
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT rol, recurso FROM permisos_rol")
+            filas = cur.fetchall()
+        except psycopg2.errors.UndefinedTable:
+            # Base sin migrar (utils/crear_tablas_permisos.py): permisos por defecto
+            filas = self._filas_por_defecto()
+        finally:
+            cur.close()
+            conn.close()
+
+        self.reemplazar(filas)
+        log.info("🛡️ Permisos cargados: %s reglas", len(filas))
+
+    def reemplazar(self, filas: Iterable[Tuple[str, str]]):
+        """Compilar y publicar una matriz nueva a partir de filas (rol, recurso)"""
+        filas = [tuple(fila) for fila in filas]
+        self.matriz = MatrizPermisos(filas)
+        self.filas = filas
+
+    def permite(self, rol: Optional[str], recurso: str) -> bool:
+        return self.matriz.permite(rol, recurso)
+
+    def recursos_de(self, rol: Optional[str]) -> FrozenSet[str]:
+        return self.matriz.recursos_de(rol)
+
+    # ========== RECARGA EN CALIENTE ==========
+    def _escuchar(self):
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db.conn_params)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CANAL_NOTIFICACION}")
+
+                while not self._detener.is_set():
+                    if select.select([conn], [], [], self.ESPERA_NOTIFICACION_SEG) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.recargar()
+            except Exception as e:
+                log.warning("⚠️ Escucha de permisos interrumpida: %s", e)
+                self._detener.wait(self.ESPERA_NOTIFICACION_SEG)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def detener(self):
+        self._detener.set()
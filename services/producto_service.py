@@ -1,6 +1,14 @@
 # services/producto_service.py
 from services.database_service import PostgreSQLService
-from typing import List, Dict
+from typing import List
+from models import Producto
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Orden de los campos de Producto (Producto(*fila))
+COLUMNAS_PRODUCTO = ("id, nombre, COALESCE(categoria, ''), precio, stock, COALESCE(descripcion, ''), "
+                     "COALESCE(imagen_url, ''), activo")
 
 class ProductoService:
     def __init__(self, db_service: PostgreSQLService):
@@ -14,31 +22,31 @@ class ProductoService:
             )
             return [row['categoria'] for row in result if row['categoria']]
         except Exception as e:
-            print(f"Error obteniendo categorías: {e}")
+            log.error("❌ Error obteniendo categorías: %s", e)
             return []
     
-    def obtener_productos_por_categoria(self, categoria: str) -> List[Dict]:
+    def obtener_productos_por_categoria(self, categoria: str) -> List[Producto]:
         """Obtener productos por categoría"""
-        try:
-            return self.db.ejecutar_consulta(
-                """
-                SELECT id, nombre, descripcion, precio, imagen_url, stock
-                FROM productos 
-                WHERE categoria = %s AND activo = TRUE
-                ORDER BY nombre
-                """,
-                (categoria,)
-            )
-        except Exception as e:
-            print(f"Error obteniendo productos: {e}")
-            return []
+        return self._consultar(
+            f"SELECT {COLUMNAS_PRODUCTO} FROM productos WHERE categoria = %s AND activo = TRUE ORDER BY nombre",
+            (categoria,)
+        )
     
-    def obtener_todos_productos(self) -> List[Dict]:
+    def obtener_todos_productos(self) -> List[Producto]:
         """Obtener todos los productos activos"""
+        return self._consultar(
+            f"SELECT {COLUMNAS_PRODUCTO} FROM productos WHERE activo = TRUE ORDER BY categoria, nombre"
+        )
+    
+    def _consultar(self, sql: str, params: tuple = ()) -> List[Producto]:
         try:
-            return self.db.ejecutar_consulta(
-                "SELECT * FROM productos WHERE activo = TRUE ORDER BY categoria, nombre"
-            )
+            conn = self.db.conectar()
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            productos = [Producto(*fila) for fila in cur.fetchall()]
+            cur.close()
+            conn.close()
+            return productos
         except Exception as e:
-            print(f"Error obteniendo todos los productos: {e}")
-            return []
\ No newline at end of file
+            log.error("❌ Error obteniendo productos: %s", e)
+            return []
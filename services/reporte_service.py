@@ -0,0 +1,300 @@
+# services/reporte_service.py - REPORTES HISTÓRICOS SOBRE ROLLUPS DIARIOS
+from typing import List, Dict, Optional
+from datetime import date, timedelta
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+class ReporteService:
+    """Rollups diarios de ventas y consultas históricas sobre ellos.
+
+    El rollup de un día se escribe al cerrar caja (o desde utils/generar_rollups.py)
+    en dos tablas de hechos:
+      - ventas_diarias_producto: día × producto
+      - ventas_diarias_categoria_pago: día × categoría × método de pago, con lo
+        realmente cobrado (una cuenta dividida se reparte entre sus métodos)
+    Los reportes por rango de fechas leen sólo esas tablas, nunca items_pedido.
+    """
+
+    AGRUPACIONES = {
+        'dia': 'day',
+        'semana': 'week',
+        'mes': 'month'
+    }
+
+    def __init__(self, db_service):
+        self.db = db_service
+
+    # ========== ESCRITURA DE ROLLUPS ==========
+    def generar_rollup_dia(self, fecha: Optional[date] = None) -> bool:
+        """(Re)generar los rollups de un día; idempotente"""
+        fecha = fecha or date.today()
+
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            # Pedidos cobrados ese día (sin los ya cobrados en un día anterior) con lo
+            # pagado por cada método: una cuenta dividida tiene una fila por método
+            cur.execute("""
+                CREATE TEMP TABLE rollup_ventas ON COMMIT DROP AS
+                WITH pedidos_dia AS (
+                    SELECT DISTINCT mc.pedido_id
+                    FROM movimientos_caja mc
+                    WHERE mc.tipo = 'venta'
+                    AND mc.pedido_id IS NOT NULL
+                    AND mc.created_at >= %(fecha)s
+                    AND mc.created_at < %(fecha)s + INTERVAL '1 day'
+                    AND NOT EXISTS (
+                        SELECT 1
+                        FROM movimientos_caja prev
+                        WHERE prev.pedido_id = mc.pedido_id
+                        AND prev.tipo = 'venta'
+                        AND prev.created_at < %(fecha)s
+                    )
+                )
+                SELECT mc.pedido_id, COALESCE(mc.metodo_pago, '') AS metodo_pago, SUM(mc.monto) AS monto
+                FROM pedidos_dia d
+                JOIN movimientos_caja mc ON mc.pedido_id = d.pedido_id AND mc.tipo = 'venta'
+                GROUP BY mc.pedido_id, COALESCE(mc.metodo_pago, '')
+            """, {'fecha': fecha})
+
+            cur.execute("DELETE FROM ventas_diarias_producto WHERE fecha = %s", (fecha,))
+            cur.execute("DELETE FROM ventas_diarias_categoria_pago WHERE fecha = %s", (fecha,))
+
+            # Por producto: unidades e importe a precio de lista
+            cur.execute("""
+                INSERT INTO ventas_diarias_producto
+                (fecha, producto_id, categoria, cantidad, importe, num_pedidos)
+                SELECT
+                    %s,
+                    ip.producto_id,
+                    pr.categoria,
+                    SUM(ip.cantidad),
+                    SUM(ip.cantidad * ip.precio_unitario),
+                    COUNT(DISTINCT ip.pedido_id)
+                FROM (SELECT DISTINCT pedido_id FROM rollup_ventas) v
+                JOIN items_pedido ip ON ip.pedido_id = v.pedido_id
+                JOIN productos pr ON ip.producto_id = pr.id
+                GROUP BY ip.producto_id, pr.categoria
+            """, (fecha,))
+
+            # Por categoría y método: lo cobrado con cada método se reparte entre las
+            # categorías del pedido en proporción a su importe de lista, así que el
+            # importe ya incluye descuentos e IVA y por método cuadra con
+            # movimientos_caja (salvo redondeo a centavo). Las unidades se reparten
+            # en la misma proporción que lo pagado.
+            cur.execute("""
+                WITH lineas AS (
+                    SELECT
+                        ip.pedido_id,
+                        COALESCE(pr.categoria, '') AS categoria,
+                        SUM(ip.cantidad) AS cantidad,
+                        SUM(ip.cantidad * ip.precio_unitario) AS importe
+                    FROM (SELECT DISTINCT pedido_id FROM rollup_ventas) v
+                    JOIN items_pedido ip ON ip.pedido_id = v.pedido_id
+                    JOIN productos pr ON ip.producto_id = pr.id
+                    GROUP BY ip.pedido_id, COALESCE(pr.categoria, '')
+                ), totales AS (
+                    SELECT
+                        l.pedido_id,
+                        SUM(l.importe) AS lista,
+                        (SELECT SUM(v.monto) FROM rollup_ventas v WHERE v.pedido_id = l.pedido_id) AS pagado
+                    FROM lineas l
+                    GROUP BY l.pedido_id
+                )
+                INSERT INTO ventas_diarias_categoria_pago
+                (fecha, categoria, metodo_pago, cantidad, importe, num_pedidos)
+                SELECT
+                    %s,
+                    l.categoria,
+                    v.metodo_pago,
+                    COALESCE(ROUND(SUM(l.cantidad * v.monto / NULLIF(t.pagado, 0))), 0)::int,
+                    COALESCE(ROUND(SUM(l.importe * v.monto / NULLIF(t.lista, 0)), 2), 0),
+                    COUNT(DISTINCT v.pedido_id)
+                FROM lineas l
+                JOIN totales t ON t.pedido_id = l.pedido_id
+                JOIN rollup_ventas v ON v.pedido_id = l.pedido_id
+                GROUP BY l.categoria, v.metodo_pago
+            """, (fecha,))
+
+            conn.commit()
+            cur.close()
+            conn.close()
+
+            log.info("📦 Rollup de ventas generado para %s", fecha.strftime('%d/%m/%Y'))
+            return True
+
+        except Exception as e:
+            log.error("❌ Error generando rollup de %s: %s", fecha, e)
+            return False
+
+    def generar_rollups(self, desde: date, hasta: Optional[date] = None) -> int:
+        """Generar rollups para un rango de días (backfill); devuelve días procesados"""
+        hasta = hasta or date.today()
+        procesados = 0
+
+        dia = desde
+        while dia <= hasta:
+            if self.generar_rollup_dia(dia):
+                procesados += 1
+            dia += timedelta(days=1)
+
+        return procesados
+
+    # ========== CONSULTAS ==========
+    def _periodo(self, agrupacion: str) -> str:
+        if agrupacion not in self.AGRUPACIONES:
+            raise ValueError(f"Agrupación inválida: {agrupacion}")
+        return self.AGRUPACIONES[agrupacion]
+
+    def ventas_por_producto(self, desde: date, hasta: date, agrupacion: str = 'dia') -> List[Dict]:
+        """Ventas por producto y periodo (día, semana o mes)"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            cur.execute("""
+                SELECT
+                    DATE_TRUNC(%s, v.fecha)::date AS periodo,
+                    v.producto_id,
+                    pr.nombre,
+                    v.categoria,
+                    SUM(v.cantidad),
+                    SUM(v.importe)
+                FROM ventas_diarias_producto v
+                JOIN productos pr ON v.producto_id = pr.id
+                WHERE v.fecha BETWEEN %s AND %s
+                GROUP BY periodo, v.producto_id, pr.nombre, v.categoria
+                ORDER BY periodo, SUM(v.importe) DESC
+            """, (self._periodo(agrupacion), desde, hasta))
+
+            ventas = []
+            for row in cur.fetchall():
+                ventas.append({
+                    'periodo': row[0],
+                    'producto_id': row[1],
+                    'nombre': row[2],
+                    'categoria': row[3],
+                    'cantidad': int(row[4]),
+                    'importe': float(row[5])
+                })
+
+            cur.close()
+            conn.close()
+            return ventas
+
+        except Exception as e:
+            log.error("❌ Error obteniendo ventas por producto: %s", e)
+            return []
+
+    def ventas_por_categoria(self, desde: date, hasta: date, agrupacion: str = 'dia') -> List[Dict]:
+        """Ventas por categoría y periodo, con desglose por método de pago"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            cur.execute("""
+                SELECT
+                    DATE_TRUNC(%s, fecha)::date AS periodo,
+                    categoria,
+                    SUM(cantidad),
+                    SUM(importe),
+                    SUM(importe) FILTER (WHERE metodo_pago = 'efectivo'),
+                    SUM(importe) FILTER (WHERE metodo_pago = 'tarjeta'),
+                    SUM(importe) FILTER (WHERE metodo_pago = 'transferencia')
+                FROM ventas_diarias_categoria_pago
+                WHERE fecha BETWEEN %s AND %s
+                GROUP BY periodo, categoria
+                ORDER BY periodo, SUM(importe) DESC
+            """, (self._periodo(agrupacion), desde, hasta))
+
+            ventas = []
+            for row in cur.fetchall():
+                ventas.append({
+                    'periodo': row[0],
+                    'categoria': row[1],
+                    'cantidad': int(row[2]),
+                    'importe': float(row[3]),
+                    'efectivo': float(row[4] or 0),
+                    'tarjeta': float(row[5] or 0),
+                    'transferencia': float(row[6] or 0)
+                })
+
+            cur.close()
+            conn.close()
+            return ventas
+
+        except Exception as e:
+            log.error("❌ Error obteniendo ventas por categoría: %s", e)
+            return []
+
+    def ventas_por_metodo_pago(self, desde: date, hasta: date, agrupacion: str = 'dia') -> List[Dict]:
+        """Ventas por método de pago y periodo"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            cur.execute("""
+                SELECT
+                    DATE_TRUNC(%s, fecha)::date AS periodo,
+                    metodo_pago,
+                    SUM(num_pedidos),
+                    SUM(importe)
+                FROM ventas_diarias_categoria_pago
+                WHERE fecha BETWEEN %s AND %s
+                GROUP BY periodo, metodo_pago
+                ORDER BY periodo, metodo_pago
+            """, (self._periodo(agrupacion), desde, hasta))
+
+            ventas = []
+            for row in cur.fetchall():
+                ventas.append({
+                    'periodo': row[0],
+                    'metodo_pago': row[1],
+                    'num_pedidos': int(row[2]),
+                    'importe': float(row[3])
+                })
+
+            cur.close()
+            conn.close()
+            return ventas
+
+        except Exception as e:
+            log.error("❌ Error obteniendo ventas por método de pago: %s", e)
+            return []
+
+    def top_productos(self, desde: date, hasta: date, limite: int = 10) -> List[Dict]:
+        """Productos más vendidos en un rango de fechas"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+
+            cur.execute("""
+                SELECT
+                    pr.nombre,
+                    SUM(v.cantidad) AS total_vendido,
+                    SUM(v.importe) AS ingreso
+                FROM ventas_diarias_producto v
+                JOIN productos pr ON v.producto_id = pr.id
+                WHERE v.fecha BETWEEN %s AND %s
+                GROUP BY v.producto_id, pr.nombre
+                ORDER BY total_vendido DESC
+                LIMIT %s
+            """, (desde, hasta, limite))
+
+            productos = []
+            for row in cur.fetchall():
+                productos.append({
+                    'nombre': row[0],
+                    'cantidad': int(row[1]),
+                    'ingreso': float(row[2])
+                })
+
+            cur.close()
+            conn.close()
+            return productos
+
+        except Exception as e:
+            log.error("❌ Error obteniendo top productos: %s", e)
+            return []
@@ -1,26 +1,46 @@
 # services/state_manager.py
-from kivy.properties import ObservableDict, ObjectProperty
-from kivy.event import EventDispatcher
-
-
-#class StateManager(EventDispatcher):
-#    pedido_actual = ObservableDict()
-#    usuario_actual = ObservableDict()
-    
-#    def __init__(self):
-#        self.pedido_actual = {
-#            'items': [],
-#            'total': 0.0,
-#            'mesa': None
-#        }
-
-class StateManager(EventDispatcher):
-    pedido_actual = ObjectProperty(None)
-    usuario_actual = ObjectProperty(None)
-    config_empresa = ObjectProperty(None)
-    
+"""
+Estado compartido (pedido actual, usuario, configuración) sin Kivy.
+
+Conserva la forma de un EventDispatcher: bind(pedido_actual=callback) y el
+callback recibe (instancia, valor) al asignar. Una pantalla que necesite
+propiedades de Kivy puede enlazar sus ObjectProperty a estos eventos.
+"""
+import threading
+from typing import Callable, Dict, List
+
+
+class StateManager:
+    PROPIEDADES = ('pedido_actual', 'usuario_actual', 'config_empresa')
+
     def __init__(self):
-        self.bind(
-            pedido_actual=self._on_pedido_change,
-            usuario_actual=self._on_usuario_change
-        )
\ No newline at end of file
+        self._valores = {nombre: None for nombre in self.PROPIEDADES}
+        self._observadores: Dict[str, List[Callable]] = {nombre: [] for nombre in self.PROPIEDADES}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, nombre):
+        valores = self.__dict__.get('_valores')
+        if valores is not None and nombre in valores:
+            return valores[nombre]
+        raise AttributeError(nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre not in self.PROPIEDADES:
+            super().__setattr__(nombre, valor)
+            return
+        with self._lock:
+            self._valores[nombre] = valor
+            observadores = list(self._observadores[nombre])
+        for callback in observadores:
+            callback(self, valor)
+
+    def bind(self, **callbacks):
+        with self._lock:
+            for nombre, callback in callbacks.items():
+                self._observadores[nombre].append(callback)
+
+    def unbind(self, **callbacks):
+        with self._lock:
+            for nombre, callback in callbacks.items():
+                if callback in self._observadores[nombre]:
+                    self._observadores[nombre].remove(callback)
@@ -0,0 +1,118 @@
+# services/stock_service.py - RESERVA DE STOCK POR PEDIDO
+"""
+El stock se descuenta cuando las líneas del pedido se escriben y se devuelve si
+el pedido se cancela.
+
+reservar() corre dentro de la transacción de quien escribe las líneas: una sola
+sentencia UPDATE ... RETURNING descuenta todas (agrupadas por producto) y sólo
+toca las filas con stock suficiente. Si falta alguna se lanza StockInsuficiente
+y quien llama hace rollback: o se reserva el pedido completo o nada.
+
+Las filas se bloquean en orden de id dentro de la misma sentencia, así dos
+pedidos con los mismos productos no se bloquean mutuamente. stock NULL
+significa "sin control de existencias" y nunca se rechaza.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+
+class StockInsuficiente(Exception):
+    """Alguna línea pide más de lo disponible; faltantes = [{producto_id, nombre, pedido, disponible}]"""
+
+    def __init__(self, faltantes: List[Dict]):
+        self.faltantes = faltantes
+        detalle = ", ".join(f"{f['nombre']} (pedido {f['pedido']}, hay {f['disponible']})" for f in faltantes)
+        super().__init__(f"Stock insuficiente: {detalle}")
+
+
+def _agrupar(lineas: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    cantidades: Dict[int, int] = {}
+    for producto_id, cantidad in lineas:
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + int(cantidad)
+    return cantidades
+
+
+def reservar(cur, lineas: Iterable[Tuple[int, int]]) -> Dict[int, Optional[int]]:
+    """Descontar [(producto_id, cantidad)] en la transacción de cur → {producto_id: stock restante}"""
+    cantidades = _agrupar(lineas)
+    if not cantidades:
+        return {}
+
+    ids = list(cantidades)
+    cur.execute("""
+        WITH pedido AS (
+            SELECT producto_id, cantidad
+            FROM unnest(%s::int[], %s::int[]) AS l(producto_id, cantidad)
+        ), bloqueo AS (
+            SELECT p.id FROM productos p
+            WHERE p.id = ANY(%s::int[])
+            ORDER BY p.id
+            FOR UPDATE
+        )
+        UPDATE productos p
+        SET stock = p.stock - pedido.cantidad
+        FROM pedido JOIN bloqueo ON bloqueo.id = pedido.producto_id
+        WHERE p.id = pedido.producto_id
+          AND (p.stock IS NULL OR p.stock >= pedido.cantidad)
+        RETURNING p.id, p.stock
+    """, (ids, [cantidades[i] for i in ids], ids))
+    restantes = {fila[0]: fila[1] for fila in cur.fetchall()}
+
+    if len(restantes) < len(cantidades):
+        faltan = [i for i in ids if i not in restantes]
+        cur.execute("SELECT id, nombre, stock FROM productos WHERE id = ANY(%s::int[])", (faltan,))
+        encontrados = {fila[0]: fila for fila in cur.fetchall()}
+        raise StockInsuficiente([
+            {
+                'producto_id': i,
+                'nombre': encontrados[i][1] if i in encontrados else f"#{i}",
+                'pedido': cantidades[i],
+                'disponible': encontrados[i][2] if i in encontrados else 0
+            }
+            for i in faltan
+        ])
+
+    log.debug("📦 Stock reservado: %s productos", len(restantes))
+    return restantes
+
+
+def liberar_pedido(cur, pedido_id: int) -> int:
+    """Devolver al stock todas las líneas del pedido (al cancelarlo) → productos afectados"""
+    cur.execute("""
+        UPDATE productos p
+        SET stock = p.stock + l.cantidad
+        FROM (
+            SELECT producto_id, SUM(cantidad)::int AS cantidad
+            FROM items_pedido WHERE pedido_id = %s
+            GROUP BY producto_id
+        ) l
+        WHERE p.id = l.producto_id AND p.stock IS NOT NULL
+    """, (pedido_id,))
+    log.debug("📦 Stock liberado del pedido #%s: %s productos", pedido_id, cur.rowcount)
+    return cur.rowcount
+
+
+class StockService:
+    """Consulta de existencias para la caché del catálogo de las terminales"""
+
+    def __init__(self, db_service):
+        self.db = db_service
+
+    def disponibilidad(self, producto_ids: Optional[List[int]] = None) -> Dict[int, Optional[int]]:
+        """{producto_id: stock} de los productos pedidos (o de todos los activos)"""
+        try:
+            conn = self.db.conectar()
+            cur = conn.cursor()
+            if producto_ids is None:
+                cur.execute("SELECT id, stock FROM productos WHERE activo = TRUE")
+            else:
+                cur.execute("SELECT id, stock FROM productos WHERE id = ANY(%s::int[])", (list(producto_ids),))
+            disponible = {fila[0]: fila[1] for fila in cur.fetchall()}
+            cur.close()
+            conn.close()
+            return disponible
+        except Exception as e:
+            log.error("❌ Error consultando stock: %s", e)
+            return {}
@@ -1,6 +1,9 @@
 # services/ticket_service.py - SERVICIO PARA MANEJO DE TICKETS PARCIALES
-import psycopg2
 from typing import List, Dict, Optional
+from models import CERO, Dinero, Ticket
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class TicketService:
     def __init__(self, db_service):
@@ -10,7 +13,7 @@ class TicketService:
                            metodo_pago: str, empleado_id: int) -> Optional[int]:
         """Crear un ticket parcial para división de cuenta"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Obtener número de ticket (cuántos ya existen para este pedido)
@@ -21,8 +24,9 @@ class TicketService:
             """, (pedido_id,))
             numero_ticket = cur.fetchone()[0]
             
-            # Calcular total del ticket
-            total = sum(item['cantidad'] * item['precio_unitario'] for item in items)
+            # Calcular total del ticket (exacto en centavos)
+            subtotales = [Dinero.de(item['precio_unitario']) * int(item['cantidad']) for item in items]
+            total = sum(subtotales, CERO)
             
             # Crear ticket
             cur.execute("""
@@ -34,7 +38,7 @@ class TicketService:
             ticket_id = cur.fetchone()[0]
             
             # Insertar items del ticket
-            for item in items:
+            for item, subtotal in zip(items, subtotales):
                 cur.execute("""
                     INSERT INTO items_ticket 
                     (ticket_id, item_pedido_id, cantidad_asignada, subtotal)
@@ -43,24 +47,24 @@ class TicketService:
                     ticket_id,
                     item['item_pedido_id'],
                     item['cantidad'],
-                    item['cantidad'] * item['precio_unitario']
+                    subtotal
                 ))
             
             conn.commit()
             cur.close()
             conn.close()
             
-            print(f"✅ Ticket #{numero_ticket} creado para pedido #{pedido_id}")
+            log.info("✅ Ticket #%s creado para pedido #%s", numero_ticket, pedido_id)
             return ticket_id
             
         except Exception as e:
-            print(f"❌ Error creando ticket parcial: {e}")
+            log.error("❌ Error creando ticket parcial: %s", e)
             return None
     
-    def obtener_tickets_pedido(self, pedido_id: int) -> List[Dict]:
+    def obtener_tickets_pedido(self, pedido_id: int) -> List[Ticket]:
         """Obtener todos los tickets de un pedido"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -78,30 +82,20 @@ class TicketService:
                 ORDER BY t.numero_ticket
             """, (pedido_id,))
             
-            tickets = []
-            for row in cur.fetchall():
-                tickets.append({
-                    'id': row[0],
-                    'numero': row[1],
-                    'total': float(row[2]),
-                    'metodo_pago': row[3],
-                    'estado': row[4],
-                    'fecha': row[5],
-                    'empleado': row[6]
-                })
+            tickets = [Ticket(*row) for row in cur.fetchall()]
             
             cur.close()
             conn.close()
             return tickets
             
         except Exception as e:
-            print(f"❌ Error obteniendo tickets: {e}")
+            log.error("❌ Error obteniendo tickets: %s", e)
             return []
     
     def obtener_items_ticket(self, ticket_id: int) -> List[Dict]:
         """Obtener items de un ticket específico"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -121,8 +115,8 @@ class TicketService:
                 items.append({
                     'nombre': row[0],
                     'cantidad': row[1],
-                    'precio_unitario': float(row[2]),
-                    'subtotal': float(row[3])
+                    'precio_unitario': Dinero.de(row[2]),
+                    'subtotal': Dinero.de(row[3])
                 })
             
             cur.close()
@@ -130,13 +124,13 @@ class TicketService:
             return items
             
         except Exception as e:
-            print(f"❌ Error obteniendo items de ticket: {e}")
+            log.error("❌ Error obteniendo items de ticket: %s", e)
             return []
     
     def marcar_ticket_pagado(self, ticket_id: int) -> bool:
         """Marcar un ticket como pagado"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             cur.execute("""
@@ -149,86 +143,185 @@ class TicketService:
             cur.close()
             conn.close()
             
-            print(f"✅ Ticket #{ticket_id} marcado como pagado")
+            log.debug("✅ Ticket #%s marcado como pagado", ticket_id)
             return True
             
         except Exception as e:
-            print(f"❌ Error marcando ticket: {e}")
+            log.error("❌ Error marcando ticket: %s", e)
             return False
     
-    def verificar_pedido_completamente_pagado(self, pedido_id: int) -> bool:
-        """Verificar si todos los items del pedido han sido pagados"""
+    def estado_cobro(self, pedido_id: int) -> Optional[Dict]:
+        """Estado de cobro de un pedido (total, pagado, pendiente y líneas) en una sola consulta"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
-            
-            # Contar items del pedido
-            cur.execute("""
-                SELECT SUM(cantidad) as total_items
-                FROM items_pedido
-                WHERE pedido_id = %s
-            """, (pedido_id,))
-            total_items_pedido = cur.fetchone()[0] or 0
-            
-            # Contar items asignados a tickets
-            cur.execute("""
-                SELECT SUM(it.cantidad_asignada) as items_asignados
-                FROM items_ticket it
-                JOIN tickets t ON it.ticket_id = t.id
-                WHERE t.pedido_id = %s AND t.estado = 'pagado'
-            """, (pedido_id,))
-            items_pagados = cur.fetchone()[0] or 0
-            
-            cur.close()
-            conn.close()
-            
-            return items_pagados >= total_items_pedido
-            
+            estados = self._consultar_estado_cobro("p.id = %s", (pedido_id,))
+            return estados[0] if estados else None
         except Exception as e:
-            print(f"❌ Error verificando pedido: {e}")
-            return False
+            log.error("❌ Error obteniendo estado de cobro: %s", e)
+            return None
     
-    def obtener_saldo_pendiente_pedido(self, pedido_id: int) -> Dict:
-        """Obtener información del saldo pendiente de un pedido"""
+    def estado_cobro_mesa(self, mesa: str) -> List[Dict]:
+        """Estado de cobro de todos los pedidos abiertos de una mesa en una sola consulta"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
-            
-            # Total del pedido
-            cur.execute("SELECT total FROM pedidos WHERE id = %s", (pedido_id,))
-            total_pedido = float(cur.fetchone()[0])
-            
-            # Total pagado en tickets
-            cur.execute("""
-                SELECT COALESCE(SUM(total), 0)
-                FROM tickets
-                WHERE pedido_id = %s AND estado = 'pagado'
-            """, (pedido_id,))
-            total_pagado = float(cur.fetchone()[0])
-            
+            return self._consultar_estado_cobro(
+                "p.mesa = %s AND p.estado IN ('pendiente', 'preparacion', 'listo')",
+                (mesa,)
+            )
+        except Exception as e:
+            log.error("❌ Error obteniendo estado de cobro de mesa: %s", e)
+            return []
+    
+    def estado_cobro_abiertos(self) -> List[Dict]:
+        """Estado de cobro de todos los pedidos abiertos (todas las mesas) en una sola consulta"""
+        try:
+            return self._consultar_estado_cobro(
+                "p.estado IN ('pendiente', 'preparacion', 'listo')", ()
+            )
+        except Exception as e:
+            log.error("❌ Error obteniendo pedidos abiertos: %s", e)
+            return []
+    
+    def _consultar_estado_cobro(self, filtro: str, params: tuple) -> List[Dict]:
+        """Ejecutar la consulta CTE de estado de cobro para los pedidos que cumplen el filtro"""
+        conn = self.db.conectar()
+        cur = conn.cursor()
+        
+        try:
+            cur.execute(f"""
+                WITH pedidos_sel AS (
+                    SELECT p.id, p.mesa, p.estado, p.total, p.created_at
+                    FROM pedidos p
+                    WHERE {filtro}
+                ),
+                lineas AS (
+                    SELECT 
+                        ip.id AS item_pedido_id,
+                        ip.pedido_id,
+                        ip.producto_id,
+                        pr.nombre,
+                        ip.cantidad,
+                        ip.precio_unitario,
+                        ip.notas
+                    FROM items_pedido ip
+                    JOIN pedidos_sel ps ON ip.pedido_id = ps.id
+                    JOIN productos pr ON ip.producto_id = pr.id
+                ),
+                tickets_pagados AS (
+                    SELECT t.id, t.pedido_id, t.total
+                    FROM tickets t
+                    JOIN pedidos_sel ps ON t.pedido_id = ps.id
+                    WHERE t.estado = 'pagado'
+                ),
+                pagado_pedido AS (
+                    SELECT pedido_id, SUM(total) AS total_pagado
+                    FROM tickets_pagados
+                    GROUP BY pedido_id
+                ),
+                pagado_linea AS (
+                    SELECT it.item_pedido_id, SUM(it.cantidad_asignada) AS cantidad_pagada
+                    FROM items_ticket it
+                    JOIN tickets_pagados tp ON it.ticket_id = tp.id
+                    GROUP BY it.item_pedido_id
+                )
+                SELECT 
+                    ps.id,
+                    ps.mesa,
+                    ps.estado,
+                    ps.total,
+                    COALESCE(pp.total_pagado, 0),
+                    l.item_pedido_id,
+                    l.producto_id,
+                    l.nombre,
+                    l.cantidad,
+                    l.precio_unitario,
+                    l.notas,
+                    COALESCE(pl.cantidad_pagada, 0),
+                    ps.created_at
+                FROM pedidos_sel ps
+                LEFT JOIN pagado_pedido pp ON pp.pedido_id = ps.id
+                LEFT JOIN lineas l ON l.pedido_id = ps.id
+                LEFT JOIN pagado_linea pl ON pl.item_pedido_id = l.item_pedido_id
+                ORDER BY ps.created_at, ps.id, l.nombre
+            """, params)
+            
+            filas = cur.fetchall()
+        finally:
             cur.close()
             conn.close()
-            
-            return {
-                'total_pedido': total_pedido,
-                'total_pagado': total_pagado,
-                'saldo_pendiente': total_pedido - total_pagado,
-                'porcentaje_pagado': (total_pagado / total_pedido * 100) if total_pedido > 0 else 0
-            }
-            
-        except Exception as e:
-            print(f"❌ Error calculando saldo: {e}")
+        
+        estados = {}
+        for row in filas:
+            estado = estados.get(row[0])
+            if estado is None:
+                total_pedido = Dinero.de(row[3])
+                total_pagado = Dinero.de(row[4])
+                estado = estados[row[0]] = {
+                    'pedido_id': row[0],
+                    'mesa': row[1],
+                    'estado': row[2],
+                    'created_at': row[12],
+                    'total_pedido': total_pedido,
+                    'total_pagado': total_pagado,
+                    'saldo_pendiente': total_pedido - total_pagado,
+                    'porcentaje_pagado': (total_pagado.centavos * 100 / total_pedido.centavos) if total_pedido > 0 else 0,
+                    'cantidad_total': 0,
+                    'cantidad_pagada': 0,
+                    'lineas': []
+                }
+            
+            # Pedido sin items (LEFT JOIN sin coincidencias)
+            if row[5] is None:
+                continue
+            
+            cantidad = row[8]
+            cantidad_pagada = int(row[11])
+            precio_unitario = Dinero.de(row[9])
+            estado['lineas'].append({
+                'item_pedido_id': row[5],
+                'producto_id': row[6],
+                'nombre': row[7],
+                'cantidad': cantidad,
+                'precio_unitario': precio_unitario,
+                'subtotal': cantidad * precio_unitario,
+                'notas': row[10] or '',
+                'cantidad_pagada': cantidad_pagada,
+                'cantidad_pendiente': max(cantidad - cantidad_pagada, 0)
+            })
+            estado['cantidad_total'] += cantidad
+            estado['cantidad_pagada'] += cantidad_pagada
+        
+        for estado in estados.values():
+            estado['completamente_pagado'] = estado['cantidad_pagada'] >= estado['cantidad_total']
+        
+        return list(estados.values())
+    
+    def verificar_pedido_completamente_pagado(self, pedido_id: int) -> bool:
+        """Verificar si todos los items del pedido han sido pagados"""
+        estado = self.estado_cobro(pedido_id)
+        return bool(estado and estado['completamente_pagado'])
+    
+    def obtener_saldo_pendiente_pedido(self, pedido_id: int) -> Dict:
+        """Obtener información del saldo pendiente de un pedido"""
+        estado = self.estado_cobro(pedido_id)
+        
+        if not estado:
             return {
-                'total_pedido': 0,
-                'total_pagado': 0,
-                'saldo_pendiente': 0,
+                'total_pedido': CERO,
+                'total_pagado': CERO,
+                'saldo_pendiente': CERO,
                 'porcentaje_pagado': 0
             }
+        
+        return {
+            'total_pedido': estado['total_pedido'],
+            'total_pagado': estado['total_pagado'],
+            'saldo_pendiente': estado['saldo_pendiente'],
+            'porcentaje_pagado': estado['porcentaje_pagado']
+        }
     
     def generar_formato_ticket_impresion(self, ticket_id: int) -> str:
         """Generar formato de ticket para impresión"""
         try:
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Info del ticket
@@ -281,5 +374,5 @@ class TicketService:
             return ticket
             
         except Exception as e:
-            print(f"❌ Error generando formato: {e}")
+            log.error("❌ Error generando formato: %s", e)
             return ""
\ No newline at end of file
@@ -1,23 +1,30 @@
 # services/ticket_service.py 
 import os
+from decimal import Decimal
 from datetime import datetime
-from typing import Dict, List
-import psycopg2
+from typing import Dict, List, Optional
+from models import CERO, Dinero
+from services.cocina_service import ruteo_estacion
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class TicketServiceCaja:
+    TASA_IVA = Decimal('0.16')
+
     def __init__(self, db_service, config_service):  # CAMBIAR: agregar config_service
         self.db = db_service
         self.config_service = config_service  # CAMBIAR: usar config_service
-        print("✅ TicketService inicializado con ConfigService")
+        log.debug("✅ TicketService inicializado con ConfigService")
     
     def generar_ticket_pago(self, pedido_id: int) -> Dict:
         """Generar contenido para ticket de pago - USANDO CONFIG SERVICE"""
         try:
             # CAMBIAR: Obtener configuración dinámica
             empresa_config = self.config_service.obtener_config_empresa()
-            print(f"🎫 Generando ticket con configuración: {empresa_config['nombre']}")
+            log.debug("🎫 Generando ticket con configuración: %s", empresa_config['nombre'])
             
-            conn = psycopg2.connect(**self.db.conn_params)
+            conn = self.db.conectar()
             cur = conn.cursor()
             
             # Obtener información del pedido (SIN requerir movimiento de caja)
@@ -69,16 +76,16 @@ class TicketServiceCaja:
                 items.append({
                     'nombre': row[0],
                     'cantidad': row[1],
-                    'precio_unitario': float(row[2]),
-                    'subtotal': float(row[3])
+                    'precio_unitario': Dinero.de(row[2]),
+                    'subtotal': Dinero.de(row[3])
                 })
             
             cur.close()
             conn.close()
             
             # Calcular totales
-            subtotal = sum(item['subtotal'] for item in items)
-            iva = subtotal * 0.16  # 16% IVA
+            subtotal = sum((item['subtotal'] for item in items), CERO)
+            iva = subtotal * self.TASA_IVA
             total = subtotal + iva
             
             # Construir ticket - CAMBIAR: usar empresa_config dinámico
@@ -87,7 +94,7 @@ class TicketServiceCaja:
                 'pedido': {
                     'id': pedido_info[0],
                     'mesa': pedido_info[1],
-                    'total': float(pedido_info[2]),
+                    'total': Dinero.de(pedido_info[2]),
                     'fecha_pedido': pedido_info[3].strftime("%d/%m/%Y %H:%M"),
                     'fecha_pago': fecha_pago.strftime("%d/%m/%Y %H:%M"),
                     'mesero': pedido_info[4],
@@ -106,18 +113,54 @@ class TicketServiceCaja:
             return ticket
             
         except Exception as e:
-            print(f"❌ Error generando ticket: {e}")
+            log.error("❌ Error generando ticket: %s", e)
             return {"error": str(e)}
     
-    def generar_ticket_cocina(self, pedido_id: int) -> str:
-        """Generar ticket para cocina"""
+    def generar_ticket_cocina(self, pedido_id: int, estacion: Optional[str] = None) -> str:
+        """Generar ticket para cocina (sólo las líneas de la estación, si se indica)"""
         try:
-            # CAMBIAR: Obtener configuración dinámica para cocina también
-            empresa_config = self.config_service.obtener_config_empresa()
+            pedido_info, por_estacion = self._datos_ticket_cocina(pedido_id)
+            if not pedido_info:
+                return "Error: Pedido no encontrado"
             
-            conn = psycopg2.connect(**self.db.conn_params)
-            cur = conn.cursor()
+            if estacion:
+                por_estacion = {estacion: por_estacion.get(estacion, [])}
+            return self._formatear_ticket_cocina(pedido_info, por_estacion)
+            
+        except Exception as e:
+            log.error("❌ Error generando ticket cocina: %s", e)
+            return f"Error: {e}"
+    
+    def generar_tickets_por_estacion(self, pedido_id: int) -> Dict[str, str]:
+        """Un ticket por estación con líneas del pedido → {estacion: texto}"""
+        try:
+            pedido_info, por_estacion = self._datos_ticket_cocina(pedido_id)
+            if not pedido_info:
+                return {}
             
+            return {
+                estacion: self._formatear_ticket_cocina(pedido_info, {estacion: items})
+                for estacion, items in por_estacion.items()
+            }
+            
+        except Exception as e:
+            log.error("❌ Error generando tickets por estación: %s", e)
+            return {}
+    
+    def enviar_a_cocina(self, pedido_id: int) -> int:
+        """Imprimir el ticket de cada estación en su impresora (cocina_<estacion>) → tickets enviados"""
+        enviados = 0
+        for estacion, texto in self.generar_tickets_por_estacion(pedido_id).items():
+            if self.imprimir_ticket(texto, f"cocina_{estacion}"):
+                enviados += 1
+        log.info("👨‍🍳 Pedido #%s enviado a %s estaciones", pedido_id, enviados)
+        return enviados
+    
+    def _datos_ticket_cocina(self, pedido_id: int):
+        """(pedido_info, {estacion: [(nombre, cantidad, notas)]}) con dos consultas"""
+        conn = self.db.conectar()
+        cur = conn.cursor()
+        try:
             # Obtener información del pedido para cocina
             cur.execute("""
                 SELECT 
@@ -131,55 +174,66 @@ class TicketServiceCaja:
             """, (pedido_id,))
             
             pedido_info = cur.fetchone()
-            
             if not pedido_info:
-                return "Error: Pedido no encontrado"
+                return None, {}
             
-            # Obtener items para cocina
-            cur.execute("""
+            # Obtener items para cocina, ya ruteados a su estación
+            sql_estacion, join_estacion = ruteo_estacion(cur)
+            cur.execute(f"""
                 SELECT 
+                    {sql_estacion} as estacion,
                     pr.nombre,
                     ip.cantidad,
                     COALESCE(ip.notas, '') as notas
                 FROM items_pedido ip
                 JOIN productos pr ON ip.producto_id = pr.id
+                {join_estacion}
                 WHERE ip.pedido_id = %s
-                ORDER BY pr.categoria, pr.nombre
+                ORDER BY estacion, pr.nombre
             """, (pedido_id,))
             
-            items = cur.fetchall()
+            por_estacion: Dict[str, List] = {}
+            for estacion, nombre, cantidad, notas in cur.fetchall():
+                por_estacion.setdefault(estacion, []).append((nombre, cantidad, notas))
             
+            return pedido_info, por_estacion
+        finally:
             cur.close()
             conn.close()
-            
-            # Formatear ticket de cocina - CAMBIAR: incluir nombre de empresa
-            lines = []
-            lines.append("=" * 40)
-            lines.append(f"{empresa_config['nombre']:^40}")  # CAMBIAR: nombre dinámico
-            lines.append(f"{'COCINA':^40}")
-            lines.append(f"{'*** ORDEN ***':^40}")
-            lines.append("=" * 40)
-            lines.append(f"Pedido: #{pedido_info[0]}")
-            lines.append(f"Mesa: {pedido_info[1]}")
-            lines.append(f"Mesero: {pedido_info[3]}")
-            lines.append(f"Hora: {pedido_info[2].strftime('%H:%M')}")
-            lines.append("-" * 40)
-            
-            for item in items:
-                line = f"{item[1]}x {item[0]}"
-                if item[2] and item[2].strip():
-                    line += f" - {item[2]}"
+    
+    def _formatear_ticket_cocina(self, pedido_info, por_estacion: Dict[str, List]) -> str:
+        """Texto del ticket de cocina, con un encabezado por estación"""
+        # CAMBIAR: Obtener configuración dinámica para cocina también
+        empresa_config = self.config_service.obtener_config_empresa()
+        titulo = next(iter(por_estacion)).upper() if len(por_estacion) == 1 else 'COCINA'
+        
+        # Formatear ticket de cocina - CAMBIAR: incluir nombre de empresa
+        lines = []
+        lines.append("=" * 40)
+        lines.append(f"{empresa_config['nombre']:^40}")  # CAMBIAR: nombre dinámico
+        lines.append(f"{titulo:^40}")
+        lines.append(f"{'*** ORDEN ***':^40}")
+        lines.append("=" * 40)
+        lines.append(f"Pedido: #{pedido_info[0]}")
+        lines.append(f"Mesa: {pedido_info[1]}")
+        lines.append(f"Mesero: {pedido_info[3]}")
+        lines.append(f"Hora: {pedido_info[2].strftime('%H:%M')}")
+        lines.append("-" * 40)
+        
+        for estacion, items in por_estacion.items():
+            if len(por_estacion) > 1:
+                lines.append(f"[{estacion.upper()}]")
+            for nombre, cantidad, notas in items:
+                line = f"{cantidad}x {nombre}"
+                if notas and notas.strip():
+                    line += f" - {notas}"
                 lines.append(line)
-            
-            lines.append("=" * 40)
-            lines.append(f"{'¡Buen provecho!':^40}")
-            lines.append("=" * 40)
-            
-            return "\n".join(lines)
-            
-        except Exception as e:
-            print(f"❌ Error generando ticket cocina: {e}")
-            return f"Error: {e}"
+        
+        lines.append("=" * 40)
+        lines.append(f"{'¡Buen provecho!':^40}")
+        lines.append("=" * 40)
+        
+        return "\n".join(lines)
     
     def formatear_ticket_texto(self, ticket_data: Dict) -> str:
         """Formatear ticket como texto para impresión"""
@@ -236,31 +290,28 @@ class TicketServiceCaja:
     def imprimir_ticket(self, ticket_text: str, impresora_nombre: str = None):
         """Imprimir ticket en impresora térmica"""
         try:
-            # Guardar en archivo para pruebas
-            archivo = self.guardar_ticket_archivo(ticket_text)
+            # Guardar en archivo para pruebas (uno por impresora)
+            archivo = self.guardar_ticket_archivo(ticket_text, impresora_nombre)
             
             # Mostrar en consola para debug
-            print("\n" + "="*50)
-            print("PREVIEW DEL TICKET:")
-            print("="*50)
-            print(ticket_text)
-            print("="*50)
-            print(f"✅ Ticket guardado en: {archivo}")
+            log.debug("PREVIEW DEL TICKET:\n%s\n%s\n%s", "=" * 50, ticket_text, "=" * 50)
+            log.info("✅ Ticket guardado en: %s", archivo)
             
             return True
             
         except Exception as e:
-            print(f"❌ Error imprimiendo ticket: {e}")
+            log.error("❌ Error imprimiendo ticket: %s", e)
             return False
     
-    def guardar_ticket_archivo(self, ticket_text: str):
+    def guardar_ticket_archivo(self, ticket_text: str, impresora_nombre: str = None):
         """Guardar ticket en archivo para pruebas"""
         try:
             os.makedirs("tickets", exist_ok=True)
-            filename = f"tickets/ticket_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            sufijo = f"_{impresora_nombre}" if impresora_nombre else ""
+            filename = f"tickets/ticket_{datetime.now().strftime('%Y%m%d_%H%M%S')}{sufijo}.txt"
             with open(filename, 'w', encoding='utf-8') as f:
                 f.write(ticket_text)
             return filename
         except Exception as e:
-            print(f"❌ Error guardando ticket: {e}")
+            log.error("❌ Error guardando ticket: %s", e)
             return None
\ No newline at end of file
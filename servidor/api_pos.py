@@ -0,0 +1,226 @@
+# servidor/api_pos.py - SERVIDOR CENTRAL DEL POS (HTTP + WebSocket)
+# Uso:
+#   python servidor/api_pos.py --puerto 8080 --pool 10            (sólo esta máquina)
+#   python servidor/api_pos.py --host 0.0.0.0 --token <secreto>    (red local: token obligatorio)
+#   En cada terminal: POS_API_URL=http://<servidor>:8080 (y POS_API_TOKEN si se definió)
+"""
+Expone los servicios del contenedor (pedidos, cocina, caja, tickets, auth,
+reportes...; ver servidor/protocolo.py) para que las terminales no abran
+conexiones a PostgreSQL.
+
+- Las operaciones corren en un ThreadPoolExecutor del mismo tamaño que el pool de
+  conexiones: nunca hay más de --pool conexiones abiertas, tengan las terminales
+  que tengan, y las conexiones se reutilizan entre llamadas.
+- Cada operación que modifica un pedido emite {"tipo": "pedido", "pedido_id": ...}
+  por WebSocket (/ws) a todas las terminales conectadas.
+- GET /api/salud devuelve el estado del pool y las terminales conectadas.
+- GET /api/metricas devuelve la latencia por consulta de este proceso (el que
+  corre todas las consultas) sin detenerlo; además se vuelca a
+  metricas_consultas.json cada --volcar-metricas segundos y al cerrar.
+
+Requiere aiohttp (dependencia opcional, sólo en el servidor).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import functools
+import hmac
+import ipaddress
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+
+from services.contenedor import ContenedorServicios
+from services.database_service import METRICAS, PostgreSQLService
+from services.stock_service import StockInsuficiente
+from servidor.protocolo import OPERACIONES, codificar, decodificar, pedidos_del_evento
+from utils.logger import obtener_logger, detener_logging
+
+try:
+    from aiohttp import web, WSMsgType
+except ImportError:  # pragma: no cover - dependencia opcional
+    web = None
+    WSMsgType = None
+
+log = obtener_logger(__name__)
+
+RUTAS_PUBLICAS = ('/api/salud',)
+
+
+class ServidorPOS:
+    """Aplicación aiohttp con los servicios compartidos por todas las terminales"""
+
+    def __init__(self, pool_max: int = 10, token: Optional[str] = None, volcar_metricas_seg: float = 300):
+        if web is None:
+            raise RuntimeError("El servidor API requiere aiohttp (pip install aiohttp)")
+        self.servicios = ContenedorServicios(PostgreSQLService(pool_max=pool_max))
+        # Un hilo por conexión del pool: las llamadas esperan hilo, no conexión
+        self.executor = ThreadPoolExecutor(max_workers=pool_max, thread_name_prefix="api_pos")
+        self.token = token
+        self.volcar_metricas_seg = volcar_metricas_seg
+        self._tarea_metricas = None
+        self.terminales: Set = set()
+        self.llamadas = 0
+        self.inicio = time.time()
+
+    def crear_app(self):
+        @web.middleware
+        async def autenticar(request, handler):
+            return await self._autenticar(request, handler)
+
+        app = web.Application(middlewares=[autenticar])
+        app.router.add_get('/api/salud', self.salud)
+        app.router.add_get('/api/metricas', self.metricas)
+        app.router.add_post('/api/{servicio}/{metodo}', self.llamar)
+        app.router.add_get('/ws', self.websocket)
+        app.on_startup.append(self._al_iniciar)
+        app.on_shutdown.append(self._al_cerrar)
+        return app
+
+    # ========== HTTP ==========
+    async def _autenticar(self, request, handler):
+        if self.token and request.path not in RUTAS_PUBLICAS:
+            enviado = request.headers.get('Authorization', '').removeprefix('Bearer ') or request.query.get('token')
+            if not hmac.compare_digest(enviado.encode(), self.token.encode()):
+                return web.json_response({'error': 'no autorizado'}, status=401)
+        return await handler(request)
+
+    async def salud(self, request):
+        return web.json_response({
+            'ok': True,
+            'pool': self.servicios.db.pool.estado(),
+            'terminales': len(self.terminales),
+            'llamadas': self.llamadas,
+            'activo_s': round(time.time() - self.inicio)
+        })
+
+    async def metricas(self, request):
+        return web.json_response(METRICAS.datos())
+
+    async def _volcar_metricas_periodicamente(self):
+        while True:
+            await asyncio.sleep(self.volcar_metricas_seg)
+            self._volcar_metricas()
+
+    def _volcar_metricas(self):
+        try:
+            self.servicios.db.volcar_metricas()
+        except Exception as e:
+            log.error("❌ Error guardando métricas de consultas: %s", e)
+
+    async def llamar(self, request):
+        servicio = request.match_info['servicio']
+        metodo = request.match_info['metodo']
+        if metodo not in OPERACIONES.get(servicio, ()):
+            return web.json_response({'error': f"Operación desconocida: {servicio}.{metodo}"}, status=404)
+
+        try:
+            cuerpo = decodificar(await request.text()) if request.can_read_body else {}
+            args = list(cuerpo.get('args', []))
+            kwargs = dict(cuerpo.get('kwargs', {}))
+        except (ValueError, AttributeError, KeyError, TypeError):
+            # JSON roto, modelo desconocido (__m__) o con otra cantidad de campos
+            return web.json_response({'error': "Cuerpo inválido"}, status=400)
+
+        funcion = getattr(self.servicios.obtener(servicio), metodo)
+        inicio = time.perf_counter()
+        try:
+            resultado = await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(funcion, *args, **kwargs))
+        except StockInsuficiente as e:
+            # Rechazo de negocio, no fallo: la terminal recibe los faltantes
+            return web.json_response({'error': str(e), 'faltantes': e.faltantes}, status=409)
+        except Exception as e:
+            log.error("❌ %s.%s: %s", servicio, metodo, e)
+            return web.json_response({'error': str(e)}, status=500)
+
+        self.llamadas += 1
+        log.debug("🌐 %s.%s en %.1f ms", servicio, metodo, (time.perf_counter() - inicio) * 1000)
+
+        for pedido_id in pedidos_del_evento(servicio, metodo, args, resultado):
+            self.emitir({'tipo': 'pedido', 'pedido_id': pedido_id, 'origen': f"{servicio}.{metodo}"})
+
+        return web.Response(text=codificar({'resultado': resultado}), content_type='application/json')
+
+    # ========== WEBSOCKET ==========
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=20)
+        await ws.prepare(request)
+        self.terminales.add(ws)
+        log.info("🔌 Terminal conectada desde %s (%s en total)", request.remote, len(self.terminales))
+        try:
+            async for mensaje in ws:
+                if mensaje.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.terminales.discard(ws)
+            log.info("🔌 Terminal desconectada (%s en total)", len(self.terminales))
+        return ws
+
+    def emitir(self, evento: dict):
+        """Enviar un evento a todas las terminales (sin esperar a las lentas)"""
+        if not self.terminales:
+            return
+        texto = codificar(evento)
+        for ws in list(self.terminales):
+            asyncio.ensure_future(self._enviar(ws, texto))
+
+    async def _enviar(self, ws, texto: str):
+        try:
+            await ws.send_str(texto)
+        except (ConnectionError, RuntimeError):
+            self.terminales.discard(ws)
+
+    async def _al_iniciar(self, app):
+        if self.volcar_metricas_seg > 0:
+            self._tarea_metricas = asyncio.ensure_future(self._volcar_metricas_periodicamente())
+
+    async def _al_cerrar(self, app):
+        if self._tarea_metricas is not None:
+            self._tarea_metricas.cancel()
+        for ws in list(self.terminales):
+            await ws.close()
+        self.executor.shutdown(wait=True)
+        self.servicios.cerrar()
+        self._volcar_metricas()
+        self.servicios.db.cerrar_pool()
+
+
+def es_loopback(host: str) -> bool:
+    """True si el host sólo acepta conexiones de esta misma máquina"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor central del POS")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Interfaz de escucha; fuera de loopback exige --token")
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--pool', type=int, default=10, help="Conexiones máximas a PostgreSQL")
+    parser.add_argument('--token', default=os.environ.get('POS_API_TOKEN'),
+                        help="Token que deben enviar las terminales (por defecto POS_API_TOKEN)")
+    parser.add_argument('--volcar-metricas', type=float, default=300,
+                        help="Segundos entre volcados de metricas_consultas.json (0: sólo al cerrar)")
+    args = parser.parse_args()
+
+    # Sin token cualquiera en la red podría abrir caja, cobrar o cancelar pedidos
+    if not args.token and not es_loopback(args.host):
+        log.error("❌ Escuchar en %s requiere --token (o POS_API_TOKEN)", args.host)
+        detener_logging()
+        sys.exit(1)
+
+    servidor = ServidorPOS(args.pool, args.token, args.volcar_metricas)
+    log.info("🚀 Servidor POS en %s:%s (pool de %s conexiones%s)", args.host, args.puerto, args.pool,
+             ", con token" if args.token else "")
+    try:
+        web.run_app(servidor.crear_app(), host=args.host, port=args.puerto, print=None)
+    finally:
+        detener_logging()
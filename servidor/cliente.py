@@ -0,0 +1,192 @@
+# servidor/cliente.py - CLIENTE DEL SERVIDOR API PARA LAS TERMINALES
+"""
+Las terminales usan el servidor con la misma interfaz que los servicios locales.
+
+- ClienteAPI.llamar(servicio, metodo, *args) hace POST con una conexión HTTP
+  keep-alive por hilo (http.client, sin dependencias). Si la conexión se corta
+  después de enviar la petición sólo se repiten las lecturas
+  (protocolo.es_lectura): una escritura pudo ejecutarse y se duplicaría.
+- ServicioRemoto envuelve una instancia local del servicio: las operaciones de
+  servidor/protocolo.OPERACIONES van al servidor y el resto (estado de la
+  terminal, p. ej. PedidoService.pedido_temporal) se queda en la instancia local.
+  Las operaciones también se instalan en la instancia local, así un método local
+  que las usa (AuthService.login → autenticar) llama al servidor.
+- ClienteAPI.suscribir(callback) recibe los eventos de pedido por WebSocket en un
+  hilo de fondo, con reconexión; tras reconectar llega {"tipo": "reconectado"}
+  para que la terminal recargue lo que pudo perderse. Requiere aiohttp; sin él
+  las pantallas siguen refrescando por intervalos.
+- Un StockInsuficiente en el servidor llega como HTTP 409 y se relanza igual en
+  la terminal.
+"""
+import asyncio
+import functools
+import http.client
+import threading
+import time
+import urllib.parse
+from typing import Callable, List, Optional
+from servidor.protocolo import OPERACIONES, codificar, decodificar, es_lectura
+from services.stock_service import StockInsuficiente
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+
+class ErrorAPI(Exception):
+    """El servidor no respondió o rechazó la operación"""
+
+
+class ClienteAPI:
+    """Conexión de una terminal con el servidor central"""
+
+    # Menos que el keep-alive del servidor (75 s en aiohttp): una escritura sobre
+    # una conexión más inactiva que esto va por una nueva, que no puede estar cerrada
+    INACTIVIDAD_MAX_SEG = 30.0
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 15.0):
+        partes = urllib.parse.urlsplit(url)
+        self.https = partes.scheme == 'https'
+        self.host = partes.hostname
+        self.puerto = partes.port or (443 if self.https else 80)
+        self.prefijo = partes.path.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.url_ws = urllib.parse.urlunsplit(('wss' if self.https else 'ws', partes.netloc,
+                                               f"{self.prefijo}/ws", '', ''))
+
+        self._local = threading.local()
+        self._suscriptores: List[Callable] = []
+        self._hilo_eventos: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    # ========== LLAMADAS ==========
+    def _cabeceras(self) -> dict:
+        cabeceras = {'Content-Type': 'application/json'}
+        if self.token:
+            cabeceras['Authorization'] = f"Bearer {self.token}"
+        return cabeceras
+
+    def _conexion(self, nueva: bool = False) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or nueva:
+            if conn is not None:
+                conn.close()
+            clase = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = clase(self.host, self.puerto, timeout=self.timeout)
+        return conn
+
+    def _inactiva(self) -> bool:
+        return time.monotonic() - getattr(self._local, 'usada_en', 0.0) > self.INACTIVIDAD_MAX_SEG
+
+    def llamar(self, servicio: str, metodo: str, *args, **kwargs):
+        """Ejecutar servicio.metodo en el servidor y devolver su resultado"""
+        cuerpo = codificar({'args': list(args), 'kwargs': kwargs}).encode('utf-8')
+        ruta = f"{self.prefijo}/api/{servicio}/{metodo}"
+        lectura = es_lectura(metodo)
+
+        conn = self._conexion(nueva=not lectura and self._inactiva())
+        for intento in range(2):
+            try:
+                conn.request('POST', ruta, body=cuerpo, headers=self._cabeceras())
+            except (ConnectionResetError, BrokenPipeError) as e:
+                # La petición no llegó a enviarse completa: nada se ejecutó
+                conn.close()
+                if intento:
+                    raise ErrorAPI(f"Servidor no disponible: {e}") from e
+                conn = self._conexion(nueva=True)
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise ErrorAPI(f"Servidor no disponible: {e}") from e
+
+            try:
+                respuesta = conn.getresponse()
+                datos = respuesta.read()
+                self._local.usada_en = time.monotonic()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError) as e:
+                # Enviada pero sin respuesta: el servidor pudo ejecutarla, sólo se repiten lecturas
+                conn.close()
+                if intento or not lectura:
+                    raise ErrorAPI(f"Servidor no disponible: {e}") from e
+                conn = self._conexion(nueva=True)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise ErrorAPI(f"Servidor no disponible: {e}") from e
+
+        if respuesta.status == 409:
+            raise StockInsuficiente(decodificar(datos)['faltantes'])
+        if respuesta.status != 200:
+            raise ErrorAPI(f"{servicio}.{metodo}: HTTP {respuesta.status} {datos[:200].decode('utf-8', 'replace')}")
+        return decodificar(datos)['resultado']
+
+    # ========== EVENTOS ==========
+    def suscribir(self, callback: Callable[[dict], None]):
+        """callback(evento) en el hilo de eventos (la UI debe pasarlo a su hilo)"""
+        if callback not in self._suscriptores:
+            self._suscriptores.append(callback)
+        if self._hilo_eventos is None:
+            self._hilo_eventos = threading.Thread(target=self._escuchar, name="api_eventos", daemon=True)
+            self._hilo_eventos.start()
+
+    def desuscribir(self, callback: Callable[[dict], None]):
+        if callback in self._suscriptores:
+            self._suscriptores.remove(callback)
+
+    def detener(self):
+        self._detener.set()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+
+    def _escuchar(self):
+        try:
+            import aiohttp
+        except ImportError:
+            log.warning("⚠️ Sin aiohttp no hay eventos en vivo: las pantallas refrescan por intervalos")
+            return
+        asyncio.run(self._bucle_eventos(aiohttp))
+
+    async def _bucle_eventos(self, aiohttp):
+        espera = 1
+        conectado_antes = False
+        async with aiohttp.ClientSession(headers=self._cabeceras()) as sesion:
+            while not self._detener.is_set():
+                try:
+                    async with sesion.ws_connect(self.url_ws, heartbeat=20) as ws:
+                        log.info("🔌 Eventos del servidor conectados (%s)", self.url_ws)
+                        if conectado_antes:
+                            self._entregar({'tipo': 'reconectado'})
+                        conectado_antes = True
+                        espera = 1
+                        async for mensaje in ws:
+                            if self._detener.is_set():
+                                return
+                            if mensaje.type == aiohttp.WSMsgType.TEXT:
+                                self._entregar(decodificar(mensaje.data))
+                except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                    log.warning("⚠️ Eventos del servidor desconectados: %s (reintento en %s s)", e, espera)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 30)
+
+    def _entregar(self, evento: dict):
+        for callback in list(self._suscriptores):
+            try:
+                callback(evento)
+            except Exception as e:
+                log.error("❌ Error procesando evento %s: %s", evento, e)
+
+
+class ServicioRemoto:
+    """Mismo uso que el servicio local; sus operaciones se ejecutan en el servidor"""
+
+    def __init__(self, cliente: ClienteAPI, nombre: str, local):
+        for metodo in OPERACIONES[nombre]:
+            setattr(local, metodo, functools.partial(cliente.llamar, nombre, metodo))
+        self.__dict__.update(_cliente=cliente, _nombre=nombre, _local=local)
+
+    def __getattr__(self, atributo):
+        return getattr(self._local, atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._local, atributo, valor)
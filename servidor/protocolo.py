@@ -0,0 +1,145 @@
+# servidor/protocolo.py - CONTRATO ENTRE EL SERVIDOR API Y LAS TERMINALES
+"""
+Qué operaciones expone el servidor, qué eventos emiten y cómo viajan los valores.
+
+Las llamadas son POST /api/<servicio>/<metodo> con {"args": [...], "kwargs": {...}}
+y responden {"resultado": ...}. Fechas, Decimal, Dinero y modelos (models/) viajan
+etiquetados para que la terminal reciba los mismos tipos que devolvería el
+servicio local.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+from models import CAMPOS, MODELOS, Dinero
+
+# servicio del contenedor → métodos que se pueden llamar a distancia
+OPERACIONES: Dict[str, Tuple[str, ...]] = {
+    'pedidos': (
+        'crear_pedido', 'agregar_item_pedido', 'crear_pedido_con_items', 'obtener_pedidos_activos',
+        'obtener_pedido_por_id', 'obtener_items_pedido', 'cambiar_estado_pedido',
+        'agregar_productos_pedido_abierto', 'obtener_pedidos_por_estado',
+    ),
+    'productos': (
+        'obtener_categorias', 'obtener_productos_por_categoria', 'obtener_todos_productos',
+    ),
+    'busqueda': (
+        'buscar', 'invalidar',
+    ),
+    'stock': (
+        'disponibilidad',
+    ),
+    'cocina': (
+        'obtener_pedidos_activos', 'cambiar_estado_pedido', 'obtener_estadisticas_cocina',
+        'obtener_estaciones', 'cambiar_estado_pedidos', 'cambiar_estado_items',
+    ),
+    'caja': (
+        'verificar_caja_abierta', 'abrir_caja', 'registrar_pago', 'obtener_ventas_dia',
+        'obtener_pedidos_pendientes_pago', 'cerrar_caja', 'obtener_cierre_actual',
+        'generar_reporte_cierre', 'obtener_historial_cierres', 'calcular_efectivo_teorico',
+        'registrar_arqueo', 'obtener_historial_arqueos',
+    ),
+    'tickets': (
+        'crear_ticket_parcial', 'obtener_tickets_pedido', 'obtener_items_ticket', 'marcar_ticket_pagado',
+        'estado_cobro', 'estado_cobro_mesa', 'estado_cobro_abiertos',
+        'verificar_pedido_completamente_pagado', 'obtener_saldo_pendiente_pedido',
+        'generar_formato_ticket_impresion',
+    ),
+    # Imprimir (imprimir_ticket, enviar_a_cocina) sigue siendo local a la terminal
+    'tickets_caja': (
+        'generar_ticket_pago', 'generar_ticket_cocina', 'generar_tickets_por_estacion',
+    ),
+    # La sesión (usuario_actual) y la matriz de permisos quedan en la terminal
+    'auth': (
+        'autenticar', 'cambiar_pin_empleado', 'registrar_accion', 'obtener_historial',
+        'filas_permisos', 'precargar_cache',
+    ),
+    'reportes': (
+        'ventas_por_producto', 'ventas_por_categoria', 'ventas_por_metodo_pago', 'top_productos',
+    ),
+}
+
+# Métodos que sólo leen: se pueden repetir si se pierde la respuesta. El resto
+# (crear_pedido_con_items, registrar_pago...) podría duplicarse y no se repite.
+PREFIJOS_LECTURA = (
+    'obtener_', 'verificar_', 'estado_cobro', 'calcular_', 'buscar', 'disponibilidad',
+    'ventas_', 'top_', 'filas_', 'generar_ticket', 'generar_formato', 'generar_reporte',
+)
+
+
+def es_lectura(metodo: str) -> bool:
+    return metodo.startswith(PREFIJOS_LECTURA)
+
+
+# (servicio, metodo) → de dónde sale el pedido_id del evento: índice de argumento,
+# 'resultado' o 'afectados' (operaciones en bloque que devuelven {pedido_id: estado})
+EVENTOS_PEDIDO: Dict[Tuple[str, str], Any] = {
+    ('pedidos', 'crear_pedido'): 'resultado',
+    ('pedidos', 'crear_pedido_con_items'): 'resultado',
+    ('pedidos', 'agregar_item_pedido'): 0,
+    ('pedidos', 'cambiar_estado_pedido'): 0,
+    ('pedidos', 'agregar_productos_pedido_abierto'): 0,
+    ('cocina', 'cambiar_estado_pedido'): 0,
+    ('cocina', 'cambiar_estado_pedidos'): 'afectados',
+    ('cocina', 'cambiar_estado_items'): 'afectados',
+    ('caja', 'registrar_pago'): 0,
+    ('tickets', 'crear_ticket_parcial'): 0,
+}
+
+
+def pedidos_del_evento(servicio: str, metodo: str, args: list, resultado) -> List[int]:
+    """pedido_ids afectados por una operación exitosa ([] si no genera evento)"""
+    origen = EVENTOS_PEDIDO.get((servicio, metodo))
+    if origen is None or not resultado:
+        return []
+    if origen == 'resultado':
+        return [resultado]
+    if origen == 'afectados':
+        return list(resultado)
+    return [args[origen]] if len(args) > origen else []
+
+
+# ========== CODIFICACIÓN ==========
+def _a_json(valor):
+    if isinstance(valor, datetime):
+        return {'__dt__': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'__d__': valor.isoformat()}
+    if isinstance(valor, time):
+        return {'__t__': valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {'__dec__': str(valor)}
+    if isinstance(valor, Dinero):
+        return {'__ct__': valor.centavos}
+    nombre = type(valor).__name__
+    if nombre in MODELOS:
+        # Posicional, en el orden de los campos: {"__m__": "Pedido", "v": [...]}
+        return {'__m__': nombre, 'v': [getattr(valor, campo) for campo in CAMPOS[nombre]]}
+    if isinstance(valor, (set, tuple)):
+        return list(valor)
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def _de_json(objeto: Dict):
+    if len(objeto) == 1:
+        if '__dt__' in objeto:
+            return datetime.fromisoformat(objeto['__dt__'])
+        if '__d__' in objeto:
+            return date.fromisoformat(objeto['__d__'])
+        if '__t__' in objeto:
+            return time.fromisoformat(objeto['__t__'])
+        if '__dec__' in objeto:
+            return Decimal(objeto['__dec__'])
+        if '__ct__' in objeto:
+            return Dinero(centavos=objeto['__ct__'])
+    elif '__m__' in objeto:
+        return MODELOS[objeto['__m__']](*objeto['v'])
+    return objeto
+
+
+def codificar(valor) -> str:
+    return json.dumps(valor, default=_a_json, ensure_ascii=False, separators=(',', ':'))
+
+
+def decodificar(texto) -> Any:
+    return json.loads(texto, object_hook=_de_json)
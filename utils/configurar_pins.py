@@ -4,6 +4,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.database_service import PostgreSQLService
+from services.auth_service import crear_pepper, hash_pin, salt_compartido
 
 def configurar_pins_iniciales():
     """Configurar PINs iniciales para los empleados"""
@@ -17,10 +18,18 @@ def configurar_pins_iniciales():
             3: '222222'   # Cocinero
         }
         
+        crear_pepper()
+        
+        # Reusar el salt compartido si ya hay PINs hasheados
+        existentes = db.ejecutar_consulta(
+            "SELECT pin_hash FROM empleados WHERE pin_hash IS NOT NULL"
+        )
+        salt = salt_compartido(e['pin_hash'] for e in existentes)
+        
         for empleado_id, pin in pins.items():
             db.ejecutar_consulta(
-                "UPDATE empleados SET pin_code = %s WHERE id = %s",
-                (pin, empleado_id)
+                "UPDATE empleados SET pin_hash = %s, pin_code = NULL WHERE id = %s",
+                (hash_pin(pin, salt), empleado_id)
             )
             print(f"✅ PIN configurado para empleado {empleado_id}: {pin}")
         
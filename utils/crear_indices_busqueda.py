@@ -0,0 +1,55 @@
+# utils/crear_indices_busqueda.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+
+def crear_indices_busqueda():
+    """Índice trigram sin acentos para la búsqueda de productos (pg_trgm + unaccent)"""
+    db = PostgreSQLService()
+
+    try:
+        print("🔎 Creando índice de búsqueda de productos...")
+
+        # Requiere permisos para CREATE EXTENSION (contrib viene con PostgreSQL)
+        db.ejecutar_consulta("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        db.ejecutar_consulta("CREATE EXTENSION IF NOT EXISTS unaccent")
+        print("✅ Extensiones pg_trgm y unaccent habilitadas")
+
+        # unaccent() es STABLE y no sirve en un índice: envoltura IMMUTABLE con diccionario fijo.
+        # Todo calificado con el esquema de la extensión: REINDEX, restauraciones y
+        # mantenimiento (PG17+) corren con un search_path seguro que no lo incluye,
+        # igual que el modo bench_<pid> de los benchmarks
+        esquemas = {fila['extname']: fila['nspname'] for fila in db.ejecutar_consulta("""
+            SELECT e.extname, n.nspname
+            FROM pg_extension e
+            JOIN pg_namespace n ON n.oid = e.extnamespace
+            WHERE e.extname IN ('unaccent', 'pg_trgm')
+        """)}
+        esquema = esquemas['unaccent']
+        ident = '"' + esquema.replace('"', '""') + '"'
+        trgm = '"' + esquemas['pg_trgm'].replace('"', '""') + '"'
+        diccionario = f"{ident}.unaccent".replace("'", "''")
+        db.ejecutar_consulta(f"""
+            CREATE OR REPLACE FUNCTION pos_normalizar(texto TEXT) RETURNS TEXT AS $$
+                SELECT pg_catalog.lower({ident}.unaccent('{diccionario}'::regdictionary, texto))
+            $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        """)
+        print(f"✅ Función 'pos_normalizar' creada/verificada (unaccent en {esquema})")
+
+        db.ejecutar_consulta(f"""
+            CREATE INDEX IF NOT EXISTS idx_productos_nombre_trgm
+            ON productos USING gin (pos_normalizar(nombre) {trgm}.gin_trgm_ops)
+            WHERE activo = TRUE
+        """)
+        db.ejecutar_consulta("ANALYZE productos")
+        print("✅ Índice 'idx_productos_nombre_trgm' creado/verificado")
+
+        print("🎉 Búsqueda de productos lista")
+
+    except Exception as e:
+        print(f"❌ Error creando índice de búsqueda: {e}")
+
+if __name__ == "__main__":
+    crear_indices_busqueda()
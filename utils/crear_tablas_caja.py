@@ -27,6 +27,13 @@ def crear_tablas_caja():
         """)
         print("✅ Tabla 'movimientos_caja' creada/verificada")
         
+        # Índice para reportes por día (rango sobre created_at)
+        db.ejecutar_consulta("""
+            CREATE INDEX IF NOT EXISTS idx_movimientos_caja_tipo_fecha
+            ON movimientos_caja (tipo, created_at)
+        """)
+        print("✅ Índice 'idx_movimientos_caja_tipo_fecha' creado/verificado")
+        
         # Tabla cierres_caja
         db.ejecutar_consulta("""
             CREATE TABLE IF NOT EXISTS cierres_caja (
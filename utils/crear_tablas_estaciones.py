@@ -0,0 +1,46 @@
+# utils/crear_tablas_estaciones.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+
+# (categoría o subcategoría de productos, estación); lo no mapeado va a 'cocina'
+ESTACIONES_EJEMPLO = [
+    ('hamburguesas', 'parrilla'),
+    ('pizzas', 'parrilla'),
+    ('ensaladas', 'frio'),
+    ('bebidas', 'barra'),
+]
+
+def crear_tablas_estaciones():
+    """Crear tabla de ruteo categoría → estación de cocina"""
+    db = PostgreSQLService()
+
+    try:
+        print("🗃️ Creando tabla de estaciones de cocina...")
+
+        # La subcategoría del producto tiene prioridad sobre su categoría
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS estaciones_cocina (
+                categoria VARCHAR(50) PRIMARY KEY,
+                estacion VARCHAR(30) NOT NULL
+            )
+        """)
+        print("✅ Tabla 'estaciones_cocina' creada/verificada")
+
+        for categoria, estacion in ESTACIONES_EJEMPLO:
+            db.ejecutar_consulta("""
+                INSERT INTO estaciones_cocina (categoria, estacion)
+                VALUES (%s, %s)
+                ON CONFLICT (categoria) DO NOTHING
+            """, (categoria, estacion))
+        print(f"✅ {len(ESTACIONES_EJEMPLO)} categorías ruteadas por defecto")
+
+        print("🎉 Estaciones de cocina listas")
+
+    except Exception as e:
+        print(f"❌ Error creando tabla de estaciones: {e}")
+
+if __name__ == "__main__":
+    crear_tablas_estaciones()
@@ -0,0 +1,59 @@
+# utils/crear_tablas_permisos.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+from services.permisos_service import PERMISOS_POR_DEFECTO, CANAL_NOTIFICACION
+
+def crear_tablas_permisos():
+    """Crear tabla de permisos por rol, su trigger de notificación y los permisos iniciales"""
+    db = PostgreSQLService()
+
+    try:
+        print("🗃️ Creando tabla de permisos...")
+
+        # Rol × recurso (pantalla o acción); '*' concede todo
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS permisos_rol (
+                rol VARCHAR(30) NOT NULL,
+                recurso VARCHAR(50) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (rol, recurso)
+            )
+        """)
+        print("✅ Tabla 'permisos_rol' creada/verificada")
+
+        # Avisar a las terminales para que recompilen su matriz de permisos
+        db.ejecutar_consulta(f"""
+            CREATE OR REPLACE FUNCTION notificar_permisos_rol() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{CANAL_NOTIFICACION}', '');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        db.ejecutar_consulta("DROP TRIGGER IF EXISTS trg_permisos_rol ON permisos_rol")
+        db.ejecutar_consulta("""
+            CREATE TRIGGER trg_permisos_rol
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON permisos_rol
+            FOR EACH STATEMENT EXECUTE FUNCTION notificar_permisos_rol()
+        """)
+        print("✅ Trigger de notificación creado")
+
+        for rol, recursos in PERMISOS_POR_DEFECTO.items():
+            for recurso in recursos:
+                db.ejecutar_consulta("""
+                    INSERT INTO permisos_rol (rol, recurso)
+                    VALUES (%s, %s)
+                    ON CONFLICT (rol, recurso) DO NOTHING
+                """, (rol, recurso))
+        print("✅ Permisos iniciales insertados")
+
+        print("🎉 Tabla de permisos creada exitosamente")
+
+    except Exception as e:
+        print(f"❌ Error creando tabla de permisos: {e}")
+
+if __name__ == "__main__":
+    crear_tablas_permisos()
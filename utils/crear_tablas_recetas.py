@@ -0,0 +1,82 @@
+# utils/crear_tablas_recetas.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+
+def crear_tablas_recetas():
+    """Crear tablas de ingredientes, recetas por producto y control de consumo"""
+    db = PostgreSQLService()
+
+    try:
+        print("🗃️ Creando tablas de recetas e ingredientes...")
+
+        # Cantidades en la unidad del ingrediente (g, ml, pieza...)
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS ingredientes (
+                id SERIAL PRIMARY KEY,
+                nombre VARCHAR(100) NOT NULL UNIQUE,
+                unidad VARCHAR(20) NOT NULL DEFAULT 'g',
+                stock DECIMAL(12,3) NOT NULL DEFAULT 0,
+                stock_minimo DECIMAL(12,3) NOT NULL DEFAULT 0,
+                activo BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        print("✅ Tabla 'ingredientes' creada/verificada")
+
+        # Receta: cuánto de cada ingrediente lleva una unidad del producto
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS recetas (
+                producto_id INTEGER NOT NULL REFERENCES productos(id) ON DELETE CASCADE,
+                ingrediente_id INTEGER NOT NULL REFERENCES ingredientes(id),
+                cantidad DECIMAL(12,3) NOT NULL CHECK (cantidad > 0),
+                PRIMARY KEY (producto_id, ingrediente_id)
+            )
+        """)
+        print("✅ Tabla 'recetas' creada/verificada")
+
+        # Hasta qué línea (items_pedido.id) se descontó cada pedido: evita descontar
+        # dos veces y deja pendientes las líneas agregadas después
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS consumo_pedidos (
+                pedido_id INTEGER PRIMARY KEY REFERENCES pedidos(id) ON DELETE CASCADE,
+                ultimo_item_id INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        print("✅ Tabla 'consumo_pedidos' creada/verificada")
+
+        # Bases anteriores marcaban el pedido entero: sus líneas ya están descontadas
+        db.ejecutar_consulta("ALTER TABLE consumo_pedidos ADD COLUMN IF NOT EXISTS ultimo_item_id INTEGER")
+        db.ejecutar_consulta("""
+            UPDATE consumo_pedidos c
+            SET ultimo_item_id = COALESCE(
+                (SELECT MAX(ip.id) FROM items_pedido ip WHERE ip.pedido_id = c.pedido_id), 0
+            )
+            WHERE c.ultimo_item_id IS NULL
+        """)
+        db.ejecutar_consulta("""
+            ALTER TABLE consumo_pedidos
+                ALTER COLUMN ultimo_item_id SET DEFAULT 0,
+                ALTER COLUMN ultimo_item_id SET NOT NULL
+        """)
+        print("✅ Columna 'consumo_pedidos.ultimo_item_id' creada/verificada")
+
+        # Alertas de InventarioScreen: sólo ingredientes en o bajo su mínimo
+        db.ejecutar_consulta("""
+            CREATE INDEX IF NOT EXISTS idx_ingredientes_bajo_minimo
+            ON ingredientes (nombre)
+            WHERE activo = TRUE AND stock <= stock_minimo
+        """)
+        print("✅ Índice 'idx_ingredientes_bajo_minimo' creado/verificado")
+
+        print("🎉 Tablas de recetas creadas exitosamente")
+
+    except Exception as e:
+        print(f"❌ Error creando tablas de recetas: {e}")
+
+if __name__ == "__main__":
+    crear_tablas_recetas()
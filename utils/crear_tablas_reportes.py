@@ -0,0 +1,49 @@
+# utils/crear_tablas_reportes.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+
+def crear_tablas_reportes():
+    """Crear tablas de rollups diarios para reportes históricos"""
+    db = PostgreSQLService()
+
+    try:
+        print("🗃️ Creando tablas de rollups de ventas...")
+
+        # Hechos día × producto
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS ventas_diarias_producto (
+                fecha DATE NOT NULL,
+                producto_id INTEGER NOT NULL REFERENCES productos(id),
+                categoria VARCHAR(50),
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                importe DECIMAL(12,2) NOT NULL DEFAULT 0,
+                num_pedidos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fecha, producto_id)
+            )
+        """)
+        print("✅ Tabla 'ventas_diarias_producto' creada/verificada")
+
+        # Hechos día × categoría × método de pago
+        db.ejecutar_consulta("""
+            CREATE TABLE IF NOT EXISTS ventas_diarias_categoria_pago (
+                fecha DATE NOT NULL,
+                categoria VARCHAR(50) NOT NULL,
+                metodo_pago VARCHAR(20) NOT NULL,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                importe DECIMAL(12,2) NOT NULL DEFAULT 0,
+                num_pedidos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fecha, categoria, metodo_pago)
+            )
+        """)
+        print("✅ Tabla 'ventas_diarias_categoria_pago' creada/verificada")
+
+        print("🎉 Tablas de reportes creadas exitosamente")
+
+    except Exception as e:
+        print(f"❌ Error creando tablas: {e}")
+
+if __name__ == "__main__":
+    crear_tablas_reportes()
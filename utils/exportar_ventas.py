@@ -0,0 +1,42 @@
+# utils/exportar_ventas.py
+# Uso: python utils/exportar_ventas.py <destino> [--formato parquet|arrow] [--desde YYYY-MM-DD] [--tabla nombre]
+#   Sin --desde continúa desde el último día exportado (watermark); pedidos e
+#   items_pedido reexportan además sus últimos días (ExportacionService.DIAS_REVISION).
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import date
+from services.database_service import PostgreSQLService
+from services.exportacion_service import ExportacionService
+
+def exportar_ventas():
+    """Exportar historial de ventas a archivos columnares particionados por día"""
+    parser = argparse.ArgumentParser(description="Exportación columnar de ventas")
+    parser.add_argument('destino', help="Carpeta de salida")
+    parser.add_argument('--formato', choices=list(ExportacionService.FORMATOS), default='parquet')
+    parser.add_argument('--desde', type=date.fromisoformat, default=None,
+                        help="Reexportar desde esta fecha (ignora el watermark)")
+    parser.add_argument('--tabla', choices=list(ExportacionService.TABLAS), default=None)
+    args = parser.parse_args()
+
+    try:
+        db = PostgreSQLService()
+        exportacion = ExportacionService(db, args.destino, args.formato)
+
+        if args.tabla:
+            resultado = {args.tabla: exportacion.exportar_tabla(args.tabla, args.desde)}
+        else:
+            resultado = exportacion.exportar_todo(args.desde)
+
+        for tabla, filas in resultado.items():
+            print(f"   {tabla}: {filas} filas")
+        print("🎉 Exportación completada")
+
+    except Exception as e:
+        print(f"❌ Error exportando ventas: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    exportar_ventas()
@@ -0,0 +1,26 @@
+# utils/generar_rollups.py
+# Uso: python utils/generar_rollups.py [dias_atras]
+#   Sin argumentos regenera el rollup de ayer y hoy (tarea nocturna).
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, timedelta
+from services.database_service import PostgreSQLService
+from services.reporte_service import ReporteService
+
+def generar_rollups(dias_atras: int = 1):
+    """Regenerar rollups diarios de los últimos días"""
+    db = PostgreSQLService()
+    reporte_service = ReporteService(db)
+
+    hoy = date.today()
+    desde = hoy - timedelta(days=dias_atras)
+
+    print(f"📊 Generando rollups del {desde} al {hoy}...")
+    procesados = reporte_service.generar_rollups(desde, hoy)
+    print(f"🎉 {procesados} días procesados")
+
+if __name__ == "__main__":
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    generar_rollups(dias)
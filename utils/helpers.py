@@ -1,18 +1,22 @@
 # utils/helpers.py (actualizado)
-from kivy.core.window import Window
 from kivy.metrics import dp, sp
 
+def _ancho_ventana():
+    """Ancho de la ventana; importar Window crea la ventana, así que sólo al usarla"""
+    from kivy.core.window import Window
+    return Window.width
+
 def es_movil():
     """Determinar si es dispositivo móvil"""
-    return Window.width <= dp(600)
+    return _ancho_ventana() <= dp(600)
 
 def es_tablet():
     """Determinar si es tablet"""
-    return dp(600) < Window.width <= dp(960)
+    return dp(600) < _ancho_ventana() <= dp(960)
 
 def es_escritorio():
     """Determinar si es escritorio"""
-    return Window.width > dp(960)
+    return _ancho_ventana() > dp(960)
 
 def obtener_tamanos_popup():
     """Obtener tamaño responsivo para popups - Actualizado para MD3"""
@@ -85,16 +89,3 @@ def obtener_radio_bordes():
         return dp(12)
     else:
         return dp(16)
-
-# Hacer disponibles globalmente
-import builtins
-builtins.es_movil = es_movil
-builtins.es_tablet = es_tablet
-builtins.es_escritorio = es_escritorio
-builtins.obtener_tamanos_popup = obtener_tamanos_popup
-builtins.obtener_altura_boton = obtener_altura_boton
-builtins.obtener_fuente_segun_rol = obtener_fuente_segun_rol
-builtins.obtener_columnas_grid = obtener_columnas_grid
-builtins.obtener_espaciado = obtener_espaciado
-builtins.obtener_elevacion_card = obtener_elevacion_card
-builtins.obtener_radio_bordes = obtener_radio_bordes
\ No newline at end of file
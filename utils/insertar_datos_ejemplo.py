@@ -8,6 +8,23 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Ahora importar después de agregar al path
 from services.database_service import PostgreSQLService
 
+# (nombre, rol) - también los usa benchmarks/semilla.py
+EMPLEADOS_EJEMPLO = [
+    ('Juan Pérez', 'administrador'),
+    ('María García', 'mesero'),
+    ('Carlos López', 'cocinero'),
+]
+
+# (nombre, descripción, precio, costo, categoría, subcategoría)
+PRODUCTOS_EJEMPLO = [
+    ('Hamburguesa Clásica', 'Carne, lechuga, tomate, queso', 120.00, 45.00, 'comida', 'hamburguesas'),
+    ('Pizza Margarita', 'Salsa tomate, mozzarella, albahaca', 180.00, 60.00, 'comida', 'pizzas'),
+    ('Ensalada César', 'Lechuga, pollo, crutones, aderezo', 95.00, 30.00, 'comida', 'ensaladas'),
+    ('Coca-Cola', '500ml', 25.00, 8.00, 'bebidas', 'refrescos'),
+    ('Agua Mineral', '500ml', 15.00, 5.00, 'bebidas', 'aguas'),
+    ('Café Americano', 'Taza regular', 35.00, 10.00, 'bebidas', 'cafes'),
+]
+
 def insertar_datos_iniciales():
     db = PostgreSQLService()
     
@@ -21,13 +38,7 @@ def insertar_datos_iniciales():
         print(f"📊 Tablas encontradas: {[t['table_name'] for t in tablas]}")
         
         # 2. Insertar empleados
-        empleados = [
-            ('Juan Pérez', 'administrador'),
-            ('María García', 'mesero'),
-            ('Carlos López', 'cocinero'),
-        ]
-        
-        for nombre, rol in empleados:
+        for nombre, rol in EMPLEADOS_EJEMPLO:
             db.ejecutar_consulta(
                 "INSERT INTO empleados (nombre, rol) VALUES (%s, %s)",
                 (nombre, rol)
@@ -35,16 +46,7 @@ def insertar_datos_iniciales():
         print("✅ Empleados insertados")
         
         # 3. Insertar productos de ejemplo
-        productos = [
-            ('Hamburguesa Clásica', 'Carne, lechuga, tomate, queso', 120.00, 45.00, 'comida', 'hamburguesas'),
-            ('Pizza Margarita', 'Salsa tomate, mozzarella, albahaca', 180.00, 60.00, 'comida', 'pizzas'),
-            ('Ensalada César', 'Lechuga, pollo, crutones, aderezo', 95.00, 30.00, 'comida', 'ensaladas'),
-            ('Coca-Cola', '500ml', 25.00, 8.00, 'bebidas', 'refrescos'),
-            ('Agua Mineral', '500ml', 15.00, 5.00, 'bebidas', 'aguas'),
-            ('Café Americano', 'Taza regular', 35.00, 10.00, 'bebidas', 'cafes'),
-        ]
-        
-        for nombre, descripcion, precio, costo, categoria, subcategoria in productos:
+        for nombre, descripcion, precio, costo, categoria, subcategoria in PRODUCTOS_EJEMPLO:
             db.ejecutar_consulta(
                 """INSERT INTO productos 
                 (nombre, descripcion, precio, costo, categoria, subcategoria, stock) 
@@ -0,0 +1,88 @@
+# utils/logger.py - LOGGING DEL POS (sin dependencias de Kivy)
+"""
+Loggers por módulo bajo el logger raíz 'pos', con escritura no bloqueante.
+
+Uso en un módulo:
+    from utils.logger import obtener_logger
+    log = obtener_logger(__name__)
+    log.debug("Total temporal: %.2f", total)   # formato perezoso: no cuesta nada si DEBUG está apagado
+
+Los registros pasan por una QueueHandler; un QueueListener en su propio hilo los
+escribe en consola (y en archivo si se configura), así la UI nunca espera a la consola.
+
+Nivel: variable de entorno POS_LOG_LEVEL (por defecto INFO) o en caliente con
+cambiar_nivel('DEBUG') / cambiar_nivel('DEBUG', 'services.pedido_service').
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+RAIZ = 'pos'
+FORMATO = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+NIVEL_POR_DEFECTO = 'INFO'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def obtener_logger(nombre: str) -> logging.Logger:
+    """Logger del módulo, colgado de 'pos' (p. ej. 'pos.services.pedido_service')"""
+    if _listener is None:
+        configurar_logging()
+    if nombre == '__main__':
+        nombre = 'main'
+    return logging.getLogger(f"{RAIZ}.{nombre}")
+
+
+def configurar_logging(nivel: Optional[str] = None, archivo: Optional[str] = None):
+    """Instalar la cola y el hilo escritor (idempotente; se llama al primer obtener_logger)"""
+    global _listener
+
+    raiz = logging.getLogger(RAIZ)
+    raiz.setLevel((nivel or os.environ.get('POS_LOG_LEVEL') or NIVEL_POR_DEFECTO).upper())
+    # Kivy instala sus propios handlers en el logger raíz de Python: no propagar
+    raiz.propagate = False
+
+    if _listener is not None:
+        if archivo:
+            _listener.stop()
+            _listener = None
+        else:
+            return
+
+    formato = logging.Formatter(FORMATO, datefmt='%H:%M:%S')
+    destinos = [logging.StreamHandler()]
+    archivo = archivo or os.environ.get('POS_LOG_FILE')
+    if archivo:
+        destinos.append(logging.handlers.RotatingFileHandler(
+            archivo, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8'
+        ))
+    for destino in destinos:
+        destino.setFormatter(formato)
+
+    cola = queue.SimpleQueue()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(logging.handlers.QueueHandler(cola))
+
+    _listener = logging.handlers.QueueListener(cola, *destinos, respect_handler_level=True)
+    _listener.start()
+
+
+def cambiar_nivel(nivel: str, modulo: Optional[str] = None):
+    """Cambiar el nivel en caliente, global o de un módulo ('services.pedido_service')"""
+    nombre = f"{RAIZ}.{modulo}" if modulo else RAIZ
+    logging.getLogger(nombre).setLevel(nivel.upper())
+
+
+def detener_logging():
+    """Vaciar la cola pendiente (al cerrar la app)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(detener_logging)
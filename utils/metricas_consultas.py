@@ -0,0 +1,63 @@
+# utils/metricas_consultas.py
+# Uso: python utils/metricas_consultas.py [archivo.json] [--top N] [--orden total_ms|p95_ms|p99_ms|llamadas]
+#      python utils/metricas_consultas.py --servidor http://<servidor>:8080   (en vivo, con POS_API_TOKEN)
+#   Muestra las métricas de consultas que la app guarda al cerrarse y el servidor
+#   API cada pocos minutos (PostgreSQLService.volcar_metricas, metricas_consultas.json
+#   en la carpeta de datos) o las del servidor en ejecución (GET /api/metricas).
+import sys
+import os
+import json
+import argparse
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rutas import ruta_datos
+
+ARCHIVO_METRICAS = "metricas_consultas.json"
+
+ORDENES = ('total_ms', 'p95_ms', 'p99_ms', 'max_ms', 'llamadas', 'lentas')
+
+def leer_servidor(url: str) -> dict:
+    """Métricas en vivo del servidor API (GET /api/metricas)"""
+    peticion = urllib.request.Request(url.rstrip('/') + "/api/metricas")
+    token = os.environ.get('POS_API_TOKEN')
+    if token:
+        peticion.add_header('Authorization', f"Bearer {token}")
+    with urllib.request.urlopen(peticion, timeout=15) as respuesta:
+        return json.load(respuesta)
+
+def mostrar_metricas(ruta: str, top: int = 20, orden: str = 'total_ms', servidor: str = None):
+    """Imprimir las consultas más costosas"""
+    if servidor:
+        try:
+            datos = leer_servidor(servidor)
+        except OSError as e:
+            print(f"❌ No se pudieron leer las métricas de {servidor}: {e}")
+            return
+    else:
+        ruta = ruta_datos(ruta)
+        if not os.path.exists(ruta):
+            print(f"❌ No existe {ruta}: abre y cierra la app para generarlo")
+            return
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+
+    consultas = sorted(datos['consultas'], key=lambda c: c[orden], reverse=True)[:top]
+
+    print(f"📈 Métricas de consultas ({datos['generado']}, lenta ≥ {datos['umbral_lenta_ms']:.0f} ms)")
+    print(f"{'Consulta':<48} {'Llam.':>7} {'Total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'Máx':>8} {'Filas':>8} {'Lentas':>6}")
+    print("=" * 121)
+    for c in consultas:
+        print(f"{c['nombre'][:48]:<48} {c['llamadas']:>7} {c['total_ms']:>10.1f} {c['p50_ms']:>8.1f} "
+              f"{c['p95_ms']:>8.1f} {c['p99_ms']:>8.1f} {c['max_ms']:>8.1f} {c['filas']:>8} {c['lentas']:>6}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ver métricas de latencia de consultas SQL")
+    parser.add_argument('archivo', nargs='?', default=ARCHIVO_METRICAS)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--orden', choices=ORDENES, default='total_ms')
+    parser.add_argument('--servidor', default=None, help="URL del servidor API (métricas en vivo)")
+    args = parser.parse_args()
+
+    mostrar_metricas(args.archivo, args.top, args.orden, args.servidor)
@@ -0,0 +1,33 @@
+# utils/migrar_estado_items.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+
+def migrar_estado_items():
+    """Agregar el estado de cocina por línea (pendiente → preparacion → listo) a items_pedido"""
+    db = PostgreSQLService()
+
+    try:
+        db.ejecutar_consulta("""
+            ALTER TABLE items_pedido
+            ADD COLUMN IF NOT EXISTS estado VARCHAR(20) NOT NULL DEFAULT 'pendiente'
+        """)
+        print("✅ Columna 'items_pedido.estado' creada/verificada")
+
+        # Pedidos que ya salieron de cocina: sus líneas cuentan como listas
+        db.ejecutar_consulta("""
+            UPDATE items_pedido ip
+            SET estado = 'listo'
+            FROM pedidos p
+            WHERE p.id = ip.pedido_id AND ip.estado = 'pendiente'
+              AND p.estado IN ('listo', 'entregado', 'pagado')
+        """)
+        print("🎉 Estado por línea listo (reinicie la app para que lo use)")
+
+    except Exception as e:
+        print(f"❌ Error migrando estado de líneas: {e}")
+
+if __name__ == "__main__":
+    migrar_estado_items()
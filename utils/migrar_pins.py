@@ -0,0 +1,46 @@
+# utils/migrar_pins.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import PostgreSQLService
+from services.auth_service import crear_pepper, hash_pin, salt_compartido
+
+def migrar_pins():
+    """Agregar pin_hash y reemplazar los PINs en texto plano por su hash con pepper"""
+    db = PostgreSQLService()
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE empleados ADD COLUMN IF NOT EXISTS pin_hash VARCHAR(200)")
+        db.ejecutar_consulta("ALTER TABLE empleados ALTER COLUMN pin_code DROP NOT NULL")
+        # Sin índice único: revelaría (y haría fallar) PINs repetidos entre empleados
+        db.ejecutar_consulta("DROP INDEX IF EXISTS idx_empleados_pin_hash")
+        print("✅ Columna 'pin_hash' creada/verificada")
+        
+        # Único lugar (junto a configurar_pins) donde se genera el pepper
+        crear_pepper()
+        
+        # Todos los empleados comparten salt: un solo hash por intento de login
+        existentes = db.ejecutar_consulta(
+            "SELECT pin_hash FROM empleados WHERE pin_hash IS NOT NULL"
+        )
+        salt = salt_compartido(e['pin_hash'] for e in existentes)
+        
+        pendientes = db.ejecutar_consulta(
+            "SELECT id, pin_code FROM empleados WHERE pin_hash IS NULL AND pin_code IS NOT NULL"
+        )
+        
+        for emp in pendientes:
+            db.ejecutar_consulta(
+                "UPDATE empleados SET pin_hash = %s, pin_code = NULL WHERE id = %s",
+                (hash_pin(emp['pin_code'], salt), emp['id'])
+            )
+            print(f"✅ PIN migrado para empleado {emp['id']}")
+        
+        print(f"🎉 {len(pendientes)} PINs migrados a hash")
+        
+    except Exception as e:
+        print(f"❌ Error migrando PINs: {e}")
+
+if __name__ == "__main__":
+    migrar_pins()
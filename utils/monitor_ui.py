@@ -0,0 +1,219 @@
+# utils/monitor_ui.py - MONITOR DE FRAMES Y BLOQUEOS DE LA UI (opcional)
+"""
+Mide el intervalo entre frames del Clock de Kivy y atribuye cada bloqueo a la
+pantalla y al método que lo causó.
+
+- Un callback del Clock marca cada frame (schedule_interval(…, 0)).
+- Un hilo vigía muestrea la pila del hilo principal mientras un frame se retrasa
+  más que el umbral; al volver el frame, el bloqueo se atribuye a la función del
+  proyecto más vista en las muestras (p. ej. 'CocinaScreen.actualizar_grid_pedidos').
+- reporte() devuelve percentiles de frame y los bloqueos recientes (ventana móvil).
+
+Activación: variable de entorno POS_MONITOR_UI=1 (umbral en POS_MONITOR_UI_MS,
+por defecto 100) o MonitorUI.activar() desde código.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ESTE_ARCHIVO = os.path.abspath(__file__)
+
+
+class MonitorUI:
+    """Monitor de frame-time y bloqueos (un solo monitor por proceso)"""
+
+    VENTANA_FRAMES = 600     # ~10 s a 60 fps
+    VENTANA_BLOQUEOS = 100
+    INTERVALO_MUESTREO = 0.01
+
+    _instancia: Optional["MonitorUI"] = None
+
+    def __init__(self, umbral_ms: float = 100.0):
+        self.umbral_ms = umbral_ms
+        self.frames_ms = deque(maxlen=self.VENTANA_FRAMES)
+        self.bloqueos = deque(maxlen=self.VENTANA_BLOQUEOS)
+        self.total_frames = 0
+        self.total_bloqueos = 0
+
+        self._ultimo_tick = None
+        self._muestras: Counter = Counter()
+        self._pantallas: Counter = Counter()
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo_principal = threading.main_thread().ident
+        self._evento_clock = None
+        self._hilo = None
+
+    # ========== ACTIVACIÓN ==========
+    @classmethod
+    def activar(cls, umbral_ms: Optional[float] = None) -> "MonitorUI":
+        if cls._instancia is None:
+            umbral = umbral_ms or float(os.environ.get('POS_MONITOR_UI_MS', 100))
+            cls._instancia = cls(umbral)
+            cls._instancia._iniciar()
+        return cls._instancia
+
+    @classmethod
+    def activar_si_configurado(cls) -> Optional["MonitorUI"]:
+        """Activar sólo si POS_MONITOR_UI está definido (llamar desde on_start)"""
+        if os.environ.get('POS_MONITOR_UI'):
+            return cls.activar()
+        return None
+
+    @classmethod
+    def instancia(cls) -> Optional["MonitorUI"]:
+        return cls._instancia
+
+    def _iniciar(self):
+        from kivy.clock import Clock
+
+        self._ultimo_tick = time.perf_counter()
+        self._evento_clock = Clock.schedule_interval(self._tick, 0)
+        self._hilo = threading.Thread(target=self._vigilar, name="monitor_ui", daemon=True)
+        self._hilo.start()
+        log.info("⏱️ Monitor de UI activo (bloqueo ≥ %.0f ms)", self.umbral_ms)
+
+    def detener(self):
+        self._detener.set()
+        if self._evento_clock is not None:
+            self._evento_clock.cancel()
+        if MonitorUI._instancia is self:
+            MonitorUI._instancia = None
+
+    # ========== MEDICIÓN ==========
+    def _tick(self, dt):
+        ahora = time.perf_counter()
+        with self._lock:
+            intervalo_ms = (ahora - self._ultimo_tick) * 1000
+            self._ultimo_tick = ahora
+            muestras, self._muestras = self._muestras, Counter()
+            pantallas, self._pantallas = self._pantallas, Counter()
+
+        self.frames_ms.append(intervalo_ms)
+        self.total_frames += 1
+
+        if intervalo_ms >= self.umbral_ms:
+            self._registrar_bloqueo(intervalo_ms, muestras, pantallas)
+
+    def _registrar_bloqueo(self, duracion_ms: float, muestras: Counter, pantallas: Counter):
+        callback = muestras.most_common(1)[0][0] if muestras else '(fuera del código del POS)'
+        pantalla = pantallas.most_common(1)[0][0] if pantallas else self._pantalla_actual()
+
+        self.total_bloqueos += 1
+        self.bloqueos.append({
+            'hora': time.strftime('%H:%M:%S'),
+            'duracion_ms': round(duracion_ms, 1),
+            'pantalla': pantalla,
+            'callback': callback,
+            'muestras': sum(muestras.values())
+        })
+        log.warning("🧊 UI bloqueada %.0f ms en %s por %s", duracion_ms, pantalla, callback)
+
+    def _vigilar(self):
+        """Muestrear la pila del hilo principal mientras el frame está retrasado"""
+        umbral = self.umbral_ms / 1000
+        while not self._detener.wait(self.INTERVALO_MUESTREO):
+            if time.perf_counter() - self._ultimo_tick < umbral:
+                continue
+
+            frame = sys._current_frames().get(self._hilo_principal)
+            if frame is None:
+                continue
+
+            funcion, pantalla = self._atribuir(frame)
+            with self._lock:
+                if funcion:
+                    self._muestras[funcion] += 1
+                if pantalla:
+                    self._pantallas[pantalla] += 1
+
+    @staticmethod
+    def _nombre_funcion(frame) -> str:
+        codigo = frame.f_code
+        qualname = getattr(codigo, 'co_qualname', None)  # Python 3.11+
+        if qualname:
+            return qualname
+        instancia = frame.f_locals.get('self')
+        if instancia is not None:
+            return f"{type(instancia).__name__}.{codigo.co_name}"
+        return codigo.co_name
+
+    @staticmethod
+    def _es_del_proyecto(frame) -> bool:
+        archivo = frame.f_code.co_filename
+        return archivo.startswith(RAIZ_PROYECTO) and archivo != _ESTE_ARCHIVO and 'kivyenv' not in archivo
+
+    def _atribuir(self, frame) -> Tuple[Optional[str], Optional[str]]:
+        """(callback, pantalla) del tramo de pila del proyecto más interno.
+
+        El callback es la función del POS que Kivy invocó (la que está justo encima
+        de un frame de Kivy), p. ej. CocinaScreen.actualizar_grid_pedidos aunque el
+        tiempo se vaya dentro de un servicio que ésta llama.
+        """
+        entrada = None
+        pantalla = None
+        while frame is not None:
+            if self._es_del_proyecto(frame):
+                entrada = frame
+                if pantalla is None:
+                    instancia = frame.f_locals.get('self')
+                    if instancia is not None and type(instancia).__name__.endswith('Screen'):
+                        pantalla = type(instancia).__name__
+            elif entrada is not None:
+                break
+            frame = frame.f_back
+        return (self._nombre_funcion(entrada) if entrada else None), pantalla
+
+    @staticmethod
+    def _pantalla_actual() -> str:
+        try:
+            from kivy.app import App
+            return App.get_running_app().root.ids.screen_manager.current
+        except Exception:
+            return '(desconocida)'
+
+    # ========== REPORTE ==========
+    def reporte(self) -> Dict:
+        """Percentiles de frame de la ventana móvil y bloqueos agrupados"""
+        frames = sorted(self.frames_ms)
+
+        def percentil(p):
+            return round(frames[min(int(p * len(frames)), len(frames) - 1)], 1) if frames else 0.0
+
+        por_callback: Dict[Tuple[str, str], Dict] = {}
+        for bloqueo in self.bloqueos:
+            clave = (bloqueo['pantalla'], bloqueo['callback'])
+            grupo = por_callback.setdefault(clave, {'pantalla': clave[0], 'callback': clave[1],
+                                                   'veces': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            grupo['veces'] += 1
+            grupo['total_ms'] = round(grupo['total_ms'] + bloqueo['duracion_ms'], 1)
+            grupo['max_ms'] = max(grupo['max_ms'], bloqueo['duracion_ms'])
+
+        return {
+            'umbral_ms': self.umbral_ms,
+            'frames': self.total_frames,
+            'bloqueos': self.total_bloqueos,
+            'frame_p50_ms': percentil(0.50),
+            'frame_p95_ms': percentil(0.95),
+            'frame_p99_ms': percentil(0.99),
+            'frame_max_ms': round(frames[-1], 1) if frames else 0.0,
+            'por_callback': sorted(por_callback.values(), key=lambda g: g['total_ms'], reverse=True),
+            'recientes': list(self.bloqueos)[-10:]
+        }
+
+    def registrar_reporte(self):
+        """Escribir el reporte en el log"""
+        r = self.reporte()
+        log.info("⏱️ Frames: %s (p50 %.1f / p95 %.1f / p99 %.1f / máx %.1f ms), bloqueos: %s",
+                 r['frames'], r['frame_p50_ms'], r['frame_p95_ms'], r['frame_p99_ms'],
+                 r['frame_max_ms'], r['bloqueos'])
+        for grupo in r['por_callback']:
+            log.info("   %s · %s: %s veces, %.0f ms total, máx %.0f ms",
+                     grupo['pantalla'], grupo['callback'], grupo['veces'], grupo['total_ms'], grupo['max_ms'])
@@ -22,8 +22,8 @@ def probar_servicios():
         # Probar agregar producto temporal
         if productos:
             pedido_service.agregar_item_temporal(productos[0], 2)
-            print(f"🛒 Pedido temporal: {len(pedido_service.pedido_temporal['items'])} items")
-            print(f"💰 Total: ${pedido_service.pedido_temporal['total']}")
+            print(f"🛒 Pedido temporal: {len(pedido_service.pedido_temporal.items)} items")
+            print(f"💰 Total: ${pedido_service.pedido_temporal.total}")
     
     print("✅ Prueba completada")
 
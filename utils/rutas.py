@@ -0,0 +1,21 @@
+# utils/rutas.py - ARCHIVOS LOCALES DEL POS (sin dependencias de Kivy)
+"""
+Dónde guarda cada terminal sus archivos locales (auditoría pendiente, secretos).
+
+Por defecto es la carpeta de la aplicación, así no dependen del directorio desde
+el que se lance; POS_DATOS_DIR la cambia (p. ej. a un volumen persistente).
+"""
+import os
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def directorio_datos() -> str:
+    directorio = os.environ.get('POS_DATOS_DIR') or DIRECTORIO_APP
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def ruta_datos(nombre: str) -> str:
+    """Ruta absoluta de un archivo local; las rutas ya absolutas se respetan"""
+    return nombre if os.path.isabs(nombre) else os.path.join(directorio_datos(), nombre)
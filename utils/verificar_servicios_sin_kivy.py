@@ -0,0 +1,36 @@
+# utils/verificar_servicios_sin_kivy.py
+# Uso: python utils/verificar_servicios_sin_kivy.py
+#   Importa todos los módulos de services/ y falla si alguno arrastra Kivy
+#   (los servicios deben poder usarse desde scripts, benchmarks y procesos de fondo).
+import sys
+import os
+import time
+import importlib
+import pkgutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services
+
+def verificar_servicios_sin_kivy() -> bool:
+    """Importar cada servicio y comprobar que Kivy no quedó cargado"""
+    ok = True
+    for modulo in sorted(m.name for m in pkgutil.iter_modules(services.__path__)):
+        nombre = f"services.{modulo}"
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nombre)
+        except ImportError as e:
+            print(f"⚠️ {nombre}: dependencia no instalada ({e})")
+            continue
+        ms = (time.perf_counter() - inicio) * 1000
+
+        kivy = sorted(m for m in sys.modules if m == 'kivy' or m.startswith(('kivy.', 'kivymd')))
+        if kivy:
+            print(f"❌ {nombre} importa Kivy: {', '.join(kivy[:5])}")
+            ok = False
+            break
+        print(f"✅ {nombre} ({ms:.0f} ms)")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verificar_servicios_sin_kivy() else 1)
@@ -11,10 +11,10 @@ def verificar_usuarios():
     
     try:
         # Verificar empleados
-        empleados = db.ejecutar_consulta("SELECT id, nombre, rol, pin_code FROM empleados")
+        empleados = db.ejecutar_consulta("SELECT id, nombre, rol, pin_hash IS NOT NULL AS pin_configurado FROM empleados")
         print("👥 EMPLEADOS EN BASE DE DATOS:")
         for emp in empleados:
-            print(f"   ID: {emp['id']}, Nombre: {emp['nombre']}, Rol: {emp['rol']}, PIN: {emp['pin_code']}")
+            print(f"   ID: {emp['id']}, Nombre: {emp['nombre']}, Rol: {emp['rol']}, PIN: {'✅' if emp['pin_configurado'] else '❌ sin configurar'}")
         
         # Verificar permisos del administrador
         admin = db.ejecutar_consulta("SELECT rol FROM empleados WHERE id = 1")
@@ -13,6 +13,10 @@ from kivy.metrics import dp, sp
 from datetime import datetime
 from themes.design_system import ds_color, ds_spacing
 from kivymd.app import MDApp
+from models import Dinero
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class CajaScreen(MDScreen):
     # Estado de caja
@@ -38,7 +42,7 @@ class CajaScreen(MDScreen):
 
     def on_enter(self):
         """Al entrar a la pantalla"""
-        print("💰 Entrando a Módulo Caja")
+        log.debug("💰 Entrando a Módulo Caja")
         self.inicializar_servicios()
         self.verificar_estado_caja()
         self.cargar_pedidos_pendientes()
@@ -58,23 +62,18 @@ class CajaScreen(MDScreen):
         """Inicializar servicios"""
         if not self.caja_service:
             try:
-                from services.database_service import PostgreSQLService
-                from services.caja_service import CajaService
-                from services.ticket_service_caja import TicketServiceCaja
-                from services.config_service import ConfigService
+                from views.servicios_app import servicios_app
                 
                 app = MDApp.get_running_app()
                 self.usuario_actual = app.usuario_actual
                 
-                db = PostgreSQLService()
-                self.caja_service = CajaService(db)
-                
-                config_service = ConfigService(db)
-                self.ticket_service = TicketServiceCaja(db, config_service)
+                servicios = servicios_app()
+                self.caja_service = servicios.caja
+                self.ticket_service = servicios.tickets_caja
                 
-                print("✅ Servicios de caja inicializados")
+                log.debug("✅ Servicios de caja inicializados")
             except Exception as e:
-                print(f"❌ Error inicializando servicios: {e}")
+                log.error("❌ Error inicializando servicios: %s", e)
 
     def verificar_estado_caja(self):
         """Verificar estado de la caja"""
@@ -90,18 +89,18 @@ class CajaScreen(MDScreen):
         if self.caja_service:
             ventas = self.caja_service.obtener_ventas_dia()
             
-            self.total_ventas = ventas['total_monto']
-            self.total_efectivo = ventas['efectivo']
-            self.total_tarjeta = ventas['tarjeta']
-            self.total_transferencia = ventas['transferencia']
+            self.total_ventas = float(ventas['total_monto'])
+            self.total_efectivo = float(ventas['efectivo'])
+            self.total_tarjeta = float(ventas['tarjeta'])
+            self.total_transferencia = float(ventas['transferencia'])
             
-            print(f"📊 Estadísticas: Total ${self.total_ventas:.2f}")
+            log.debug("📊 Estadísticas: Total $%.2f", self.total_ventas)
 
     def cargar_pedidos_pendientes(self):
         """Cargar pedidos listos para pagar"""
         if self.caja_service and self.caja_abierta:
             self.pedidos_pendientes = self.caja_service.obtener_pedidos_pendientes_pago()
-            print(f"📦 {len(self.pedidos_pendientes)} pedidos pendientes")
+            log.debug("📦 %s pedidos pendientes", len(self.pedidos_pendientes))
             self.actualizar_ui_pedidos()
 
     def filtrar_pedidos(self, filtro):
@@ -147,12 +146,12 @@ class CajaScreen(MDScreen):
         # Crear cards
         for pedido in self.pedidos_pendientes:
             card = PedidoPagoCard(
-                pedido_id=pedido['id'],
-                mesa=pedido['mesa'],
-                total=pedido['total'],
-                num_items=len(pedido['items']),
-                mesero=pedido['mesero'],
-                tiempo=self._formato_tiempo(pedido['created_at']),
+                pedido_id=pedido.id,
+                mesa=pedido.mesa,
+                total=float(pedido.total),
+                num_items=len(pedido.items),
+                mesero=pedido.mesero,
+                tiempo=self._formato_tiempo(pedido.created_at),
                 caja_screen=self
             )
             self.ids.contenedor_pedidos.add_widget(card)
@@ -312,8 +311,7 @@ class CajaScreen(MDScreen):
         
         def calcular_cambio(instance, value):
             try:
-                recibido = float(value)
-                cambio = recibido - monto
+                cambio = Dinero.de(float(value)) - Dinero.de(monto)
                 
                 if cambio < 0:
                     label_cambio.text = f"FALTAN: ${abs(cambio):.2f}"
@@ -334,8 +332,8 @@ class CajaScreen(MDScreen):
     def _confirmar_pago_efectivo(self, pedido_id, monto, recibido_str):
         """Confirmar pago en efectivo"""
         try:
-            recibido = float(recibido_str)
-            cambio = recibido - monto
+            recibido = Dinero.de(float(recibido_str))
+            cambio = recibido - Dinero.de(monto)
             
             if cambio < 0:
                 self.mostrar_error("Monto insuficiente")
@@ -358,12 +356,19 @@ class CajaScreen(MDScreen):
     def _procesar_pago_directo(self, pedido_id, monto, metodo_pago):
         """Procesar pago directamente"""
         if self.caja_service:
-            return self.caja_service.registrar_pago(
+            pagado = self.caja_service.registrar_pago(
                 pedido_id,
                 self.usuario_actual['id'],
                 monto,
                 metodo_pago
             )
+            
+            # Avisar al índice de mesas del cierre de cuenta
+            app = MDApp.get_running_app()
+            if pagado and getattr(app, 'mesa_service', None):
+                app.mesa_service.actualizar_pedido(pedido_id)
+            
+            return pagado
         return False
 
     def cerrar_caja(self):
@@ -499,7 +504,7 @@ class CajaScreen(MDScreen):
 
     def forzar_actualizacion(self, *args):
         """Forzar actualización manual"""
-        print("🔄 Actualizando datos...")
+        log.debug("🔄 Actualizando datos...")
         self.verificar_estado_caja()
         self.cargar_pedidos_pendientes()
 
@@ -8,12 +8,23 @@ from kivymd.uix.dialog import MDDialog
 from kivy.uix.scrollview import ScrollView
 from kivymd.uix.button import MDFlatButton
 from kivy.properties import (ListProperty, NumericProperty, StringProperty, 
-                            ObjectProperty, DictProperty)
+                            ObjectProperty, DictProperty, AliasProperty)
 from kivy.clock import Clock
 from kivy.metrics import dp, sp
+import os
 from datetime import datetime
+from services.cocina_service import ESTADOS_ITEM
 from themes.design_system import ds_color, ds_spacing, ds_is_mobile
 from kivymd.app import MDApp
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
+
+# Estados que siguen en pantalla; al pasar a otro (entregado, cancelado) la card se quita
+ESTADOS_EN_PANTALLA = ('pendiente', 'confirmado', 'preparacion', 'listo')
+ICONOS_ITEM = {'pendiente': '•', 'preparacion': '🔥', 'listo': '✅'}
+# Segundos que se juntan toques antes de mandarlos en un solo cambio en bloque
+RETRASO_ENVIO = 0.4
 
 class CocinaScreen(MDScreen):
     pedidos = ListProperty([])
@@ -21,31 +32,61 @@ class CocinaScreen(MDScreen):
     total_pedidos = NumericProperty(0)
     filtro_actual = StringProperty("todos")
     estadisticas = DictProperty({})
+    # Estación que atiende esta pantalla ('' = todas); POS_ESTACION la fija por terminal
+    estacion = StringProperty(os.environ.get('POS_ESTACION', ''))
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.cocina_service = None
         self.actualizar_event = None
+        self._recarga_pendiente = None
         self.dialog = None
+        self._cards = {}
+        # Cambios ya pintados y aún sin enviar: id → [pedido_id, estado anterior, estado nuevo]
+        # (los de pedidos llevan además {item_id: estado previo} de las líneas arrastradas)
+        self._items_pendientes = {}
+        self._pedidos_pendientes = {}
+        self._envio = None
     
     def on_enter(self):
         """Cuando se muestra la pantalla"""
-        print("👨‍🍳 Entrando a Vista Cocina")
+        log.debug("👨‍🍳 Entrando a Vista Cocina")
         self.inicializar_servicios()
         self.cargar_pedidos()
         
-        # Actualizar automáticamente cada 15 segundos
+        # Con servidor central llegan los cambios al momento; el intervalo queda de respaldo
+        from views.servicios_app import suscribir_eventos
+        en_vivo = suscribir_eventos(self._on_evento_pedido)
+        
+        # Actualizar automáticamente cada 15 segundos (60 con eventos en vivo)
         if self.actualizar_event:
             self.actualizar_event.cancel()
         self.actualizar_event = Clock.schedule_interval(
-            lambda dt: self.cargar_pedidos(), 15
+            lambda dt: self.cargar_pedidos(), 60 if en_vivo else 15
         )
     
     def on_leave(self):
         """Cuando se sale de la pantalla"""
+        from views.servicios_app import desuscribir_eventos
+        desuscribir_eventos(self._on_evento_pedido)
+        if self._recarga_pendiente:
+            self._recarga_pendiente.cancel()
+            self._recarga_pendiente = None
+        if self._envio:
+            self._envio.cancel()
+            self._enviar_cambios()
         if self.actualizar_event:
             self.actualizar_event.cancel()
-            print("⏹️ Actualización automática detenida")
+            log.debug("⏹️ Actualización automática detenida")
+    
+    def _on_evento_pedido(self, evento):
+        """Un pedido cambió en otra terminal: recargar una vez por ráfaga de eventos"""
+        if not self._recarga_pendiente:
+            self._recarga_pendiente = Clock.schedule_once(self._recargar_por_evento, 0.3)
+    
+    def _recargar_por_evento(self, dt):
+        self._recarga_pendiente = None
+        self.cargar_pedidos()
 
     # ========== MÉTODOS PARA TOPAPPBAR ==========
     def ir_a_menu(self, *args):
@@ -55,42 +96,83 @@ class CocinaScreen(MDScreen):
             app.cambiar_pantalla("menu")
         else:
             self.manager.current = "menu"
+    
+    def elegir_estacion(self, *args):
+        """Elegir qué estación atiende esta pantalla"""
+        if not self.cocina_service:
+            return
+        
+        content = MDBoxLayout(
+            orientation='vertical',
+            spacing=dp(8),
+            padding=dp(10),
+            size_hint_y=None
+        )
+        content.bind(minimum_height=content.setter('height'))
+        
+        for estacion in [''] + self.cocina_service.obtener_estaciones():
+            content.add_widget(MDRaisedButton(
+                text=estacion.upper() or "TODAS",
+                md_bg_color=ds_color('primary') if estacion == self.estacion else ds_color('gray'),
+                size_hint_x=1,
+                on_release=lambda x, e=estacion: self._cambiar_estacion(e)
+            ))
+        
+        if self.dialog:
+            self.dialog.dismiss()
+        self.dialog = MDDialog(
+            title="Estación",
+            type="custom",
+            content_cls=content,
+            buttons=[
+                MDFlatButton(text="CANCELAR", on_release=lambda x: self.dialog.dismiss())
+            ]
+        )
+        self.dialog.open()
+    
+    def _cambiar_estacion(self, estacion):
+        self.dialog.dismiss()
+        self.estacion = estacion
+        log.info("👨‍🍳 Estación: %s", estacion or "todas")
+        self.cargar_pedidos()
     # ========== FIN MÉTODOS TOPAPPBAR ==========
     
     def inicializar_servicios(self):
         """Inicializar servicios de cocina"""
         if not self.cocina_service:
             try:
-                from services.database_service import PostgreSQLService
-                from services.cocina_service import CocinaService
+                from views.servicios_app import servicios_app
                 
-                db = PostgreSQLService()
-                self.cocina_service = CocinaService(db)
-                print("✅ Servicios de cocina inicializados")
+                self.cocina_service = servicios_app().cocina
+                log.debug("✅ Servicios de cocina inicializados")
             except Exception as e:
-                print(f"❌ Error inicializando servicios: {e}")
+                log.error("❌ Error inicializando servicios: %s", e)
     
     def cargar_pedidos(self, *args):
         """Cargar pedidos activos para cocina"""
         if not self.cocina_service:
-            print("❌ No hay servicio de cocina")
+            log.error("❌ No hay servicio de cocina")
             return
         
         try:
-            print("🔄 Cargando pedidos para cocina...")
-            
-            self.pedidos = self.cocina_service.obtener_pedidos_activos()
-            self.total_pedidos = len(self.pedidos)
+            log.debug("🔄 Cargando pedidos para cocina...")
             
-            self.calcular_estadisticas()
-            self.filtrar_pedidos(self.filtro_actual)
+            self.pedidos = self.cocina_service.obtener_pedidos_activos(self.estacion or None)
+            self._reaplicar_pendientes()
+            self._actualizar_vista()
             
-            print(f"✅ {len(self.pedidos)} pedidos cargados")
+            log.debug("✅ %s pedidos cargados", len(self.pedidos))
             
         except Exception as e:
-            print(f"❌ Error cargando pedidos: {e}")
+            log.error("❌ Error cargando pedidos: %s", e)
             self.mostrar_error("Error al cargar pedidos")
     
+    def _actualizar_vista(self):
+        """Estadísticas y grid desde self.pedidos, sin ir a la base"""
+        self.total_pedidos = len(self.pedidos)
+        self.calcular_estadisticas()
+        self.filtrar_pedidos(self.filtro_actual)
+    
     def calcular_estadisticas(self):
         """Calcular estadísticas de pedidos"""
         stats = {
@@ -103,11 +185,11 @@ class CocinaScreen(MDScreen):
         tiempos = []
         
         for pedido in self.pedidos:
-            estado = pedido.get('estado', 'pendiente')
+            estado = pedido.estado
             if estado in stats:
                 stats[estado] += 1
             
-            created_at = pedido.get('created_at')
+            created_at = pedido.created_at
             if created_at:
                 tiempo_min = self._calcular_minutos_espera(created_at)
                 tiempos.append(tiempo_min)
@@ -145,13 +227,13 @@ class CocinaScreen(MDScreen):
         else:
             self.pedidos_filtrados = [
                 p for p in self.pedidos 
-                if p.get('estado') == filtro
+                if p.estado == filtro
             ]
         
         self.actualizar_chips_filtro(filtro)
         self.actualizar_grid_pedidos()
         
-        print(f"🔍 Filtro: {filtro} - {len(self.pedidos_filtrados)} pedidos")
+        log.debug("🔍 Filtro: %s - %s pedidos", filtro, len(self.pedidos_filtrados))
     
     def actualizar_chips_filtro(self, filtro_activo):
         """Actualizar estado visual de chips de filtro"""
@@ -181,6 +263,7 @@ class CocinaScreen(MDScreen):
             return
         
         self.ids.grid_pedidos.clear_widgets()
+        self._cards = {}
         
         if not self.pedidos_filtrados:
             empty_state = CocinaEmptyState()
@@ -189,29 +272,188 @@ class CocinaScreen(MDScreen):
         
         for pedido in self.pedidos_filtrados:
             card = PedidoCocinaCard(
-                pedido_id=pedido['id'],
-                mesa=pedido['mesa'],
-                estado=pedido['estado'],
-                tiempo_espera=self._formato_tiempo_espera(pedido['created_at']),
-                items_text=self._formato_items(pedido['items']),
-                mesero=pedido['mesero'],
+                pedido_id=pedido.id,
+                mesa=pedido.mesa,
+                estado=pedido.estado,
+                tiempo_espera=self._formato_tiempo_espera(pedido.created_at),
+                items=pedido.items,
+                mesero=pedido.mesero,
                 cocina_screen=self
             )
+            self._cards[pedido.id] = card
             self.ids.grid_pedidos.add_widget(card)
     
+    # ========== CAMBIOS DE ESTADO (OPTIMISTAS, EN BLOQUE) ==========
     def cambiar_estado_pedido(self, pedido_id, nuevo_estado):
-        """Cambiar estado de un pedido"""
-        print(f"🔄 Cambiando pedido {pedido_id} a {nuevo_estado}")
+        """Pintar el cambio ya y mandarlo junto con los demás toques de la ráfaga"""
+        pedido = self._buscar_pedido(pedido_id)
+        if not pedido:
+            return
         
-        if self.cocina_service and self.cocina_service.cambiar_estado_pedido(pedido_id, nuevo_estado):
-            Clock.schedule_once(lambda dt: self.cargar_pedidos(), 0.5)
-            self.mostrar_info(f"✅ Pedido {pedido_id} → {nuevo_estado.upper()}")
+        log.debug("🔄 Cambiando pedido %s a %s", pedido_id, nuevo_estado)
+        if self.estacion and nuevo_estado in ESTADOS_ITEM:
+            # En una estación el botón sólo mueve sus líneas (la card no muestra
+            # las demás); el pedido avanza cuando el servidor lo derive de todas
+            for item in pedido.items:
+                if item.estado in self._atrasados(nuevo_estado):
+                    self._marcar_item(pedido_id, item, nuevo_estado)
         else:
-            self.mostrar_error("Error cambiando estado")
+            # Si se toca dos veces antes del envío se conserva el estado original;
+            # el dict guarda el estado previo de las líneas que arrastra el pedido
+            cambio = self._pedidos_pendientes.setdefault(pedido_id, [pedido_id, pedido.estado, None, {}])
+            cambio[2] = nuevo_estado
+            pedido.estado = nuevo_estado
+            self._avanzar_lineas(pedido, nuevo_estado, cambio[3])
+        self._refrescar_pedido(pedido_id)
+        self._programar_envio()
+    
+    def avanzar_item(self, pedido_id, item):
+        """Tocar una línea la pasa al siguiente estado (pendiente → preparación → listo)"""
+        if item.estado not in ESTADOS_ITEM[:-1]:
+            return
+        
+        self._marcar_item(pedido_id, item, ESTADOS_ITEM[ESTADOS_ITEM.index(item.estado) + 1])
+        self._refrescar_pedido(pedido_id)
+        self._programar_envio()
+    
+    def _marcar_item(self, pedido_id, item, nuevo_estado):
+        if item.id is None:
+            return
+        self._items_pendientes.setdefault(item.id, [pedido_id, item.estado, None])[2] = nuevo_estado
+        item.estado = nuevo_estado
+    
+    @staticmethod
+    def _atrasados(nuevo_estado):
+        """Estados de línea anteriores a nuevo_estado (ninguno si no es de cocina)"""
+        return ESTADOS_ITEM[:ESTADOS_ITEM.index(nuevo_estado)] if nuevo_estado in ESTADOS_ITEM else ()
+    
+    def _programar_envio(self):
+        if not self._envio:
+            self._envio = Clock.schedule_once(lambda dt: self._enviar_cambios(), RETRASO_ENVIO)
+    
+    def _enviar_cambios(self):
+        """Un cambio en bloque por estado destino; si falla se deshace lo pintado"""
+        self._envio = None
+        items, self._items_pendientes = self._items_pendientes, {}
+        pedidos, self._pedidos_pendientes = self._pedidos_pendientes, {}
+        if not self.cocina_service:
+            return
+        
+        errores = 0
+        # Líneas antes que pedidos: el botón del pedido tiene la última palabra
+        for nuevo_estado, ids in self._agrupar(items).items():
+            afectados = self.cocina_service.cambiar_estado_items(ids, nuevo_estado)
+            if afectados is None:
+                errores += 1
+                for item_id in ids:
+                    pedido_id, anterior, _ = items[item_id]
+                    item = self._buscar_item(pedido_id, item_id)
+                    if item:
+                        item.estado = anterior
+            else:
+                # Pedidos que el servidor hizo avanzar a partir de sus líneas
+                self._avisar_mesas(self._aplicar_afectados(afectados))
+        
+        for nuevo_estado, ids in self._agrupar(pedidos).items():
+            afectados = self.cocina_service.cambiar_estado_pedidos(ids, nuevo_estado)
+            if afectados is None:
+                errores += 1
+                for pedido_id in ids:
+                    self._restaurar_pedido(pedido_id, pedidos[pedido_id])
+            else:
+                # Los que el servidor no cambió (p. ej. cancelados en otra terminal) se deshacen
+                cambiados = {int(pedido_id) for pedido_id in afectados}
+                for pedido_id in ids:
+                    if pedido_id not in cambiados:
+                        self._restaurar_pedido(pedido_id, pedidos[pedido_id])
+                self._aplicar_afectados(afectados)
+                self._avisar_mesas(list(cambiados))
+        
+        self._actualizar_vista()
+        if errores:
+            self.mostrar_error("Error cambiando estado; se restauró lo anterior")
+    
+    def _restaurar_pedido(self, pedido_id, cambio):
+        """Volver el pedido y las líneas que arrastró al estado previo al toque"""
+        _, anterior, _, lineas = cambio
+        pedido = self._buscar_pedido(pedido_id)
+        if pedido:
+            pedido.estado = anterior
+            for item in pedido.items:
+                item.estado = lineas.get(item.id, item.estado)
+    
+    @staticmethod
+    def _agrupar(cambios):
+        """{estado nuevo: [id]} de los cambios pendientes que de verdad cambian algo"""
+        grupos = {}
+        for id_, cambio in cambios.items():
+            anterior, nuevo_estado = cambio[1], cambio[2]
+            if nuevo_estado != anterior:
+                grupos.setdefault(nuevo_estado, []).append(id_)
+        return grupos
+    
+    def _aplicar_afectados(self, afectados):
+        """Estado con el que quedó cada pedido (por JSON las claves llegan como texto) → ids que cambiaron"""
+        cambiados = []
+        for pedido_id, estado in afectados.items():
+            pedido = self._buscar_pedido(int(pedido_id))
+            if pedido and pedido.estado != estado:
+                pedido.estado = estado
+                cambiados.append(pedido.id)
+        self.pedidos = [p for p in self.pedidos if p.estado in ESTADOS_EN_PANTALLA]
+        return cambiados
+    
+    @staticmethod
+    def _avisar_mesas(pedido_ids):
+        """Avisar al índice de mesas del cierre de cuenta"""
+        app = MDApp.get_running_app()
+        if getattr(app, 'mesa_service', None):
+            for pedido_id in pedido_ids:
+                app.mesa_service.actualizar_pedido(pedido_id)
+    
+    def _avanzar_lineas(self, pedido, nuevo_estado, anteriores):
+        """Las líneas atrasadas acompañan al pedido, como hace el servicio (anteriores guarda su estado previo)"""
+        atrasados = self._atrasados(nuevo_estado)
+        for item in pedido.items:
+            if item.estado in atrasados:
+                anteriores.setdefault(item.id, item.estado)
+                item.estado = nuevo_estado
+    
+    def _reaplicar_pendientes(self):
+        """Tras recargar, volver a pintar lo que todavía no se ha enviado"""
+        for item_id, (pedido_id, _, nuevo_estado) in self._items_pendientes.items():
+            item = self._buscar_item(pedido_id, item_id)
+            if item:
+                item.estado = nuevo_estado
+        for pedido_id, (_, _, nuevo_estado, lineas) in self._pedidos_pendientes.items():
+            pedido = self._buscar_pedido(pedido_id)
+            if pedido:
+                pedido.estado = nuevo_estado
+                self._avanzar_lineas(pedido, nuevo_estado, lineas)
+    
+    def _refrescar_pedido(self, pedido_id):
+        """Repintar sólo la card del pedido; el grid se rehace si cambia de filtro"""
+        pedido = self._buscar_pedido(pedido_id)
+        card = self._cards.get(pedido_id)
+        if pedido and card and self.filtro_actual in ('todos', pedido.estado):
+            card.estado = pedido.estado
+            card.pintar_items()
+            self.calcular_estadisticas()
+        else:
+            self._actualizar_vista()
+    
+    def _buscar_pedido(self, pedido_id):
+        return next((p for p in self.pedidos if p.id == pedido_id), None)
+    
+    def _buscar_item(self, pedido_id, item_id):
+        pedido = self._buscar_pedido(pedido_id)
+        if not pedido:
+            return None
+        return next((i for i in pedido.items if i.id == item_id), None)
     
     def ver_detalle_pedido(self, pedido_id):
         """Ver detalle completo de un pedido"""
-        pedido = next((p for p in self.pedidos if p['id'] == pedido_id), None)
+        pedido = next((p for p in self.pedidos if p.id == pedido_id), None)
         
         if not pedido:
             return
@@ -225,7 +467,7 @@ class CocinaScreen(MDScreen):
         )
         
         content.add_widget(MDLabel(
-            text=f"PEDIDO #{pedido['id']} - Mesa {pedido['mesa']}",
+            text=f"PEDIDO #{pedido.id} - Mesa {pedido.mesa}",
             font_style="H6",
             bold=True,
             halign="center",
@@ -234,7 +476,7 @@ class CocinaScreen(MDScreen):
         ))
         
         content.add_widget(MDLabel(
-            text=f"⏱️ {self._formato_tiempo_espera(pedido['created_at'])}",
+            text=f"⏱️ {self._formato_tiempo_espera(pedido.created_at)}",
             font_style="Subtitle1",
             halign="center",
             size_hint_y=None,
@@ -250,23 +492,23 @@ class CocinaScreen(MDScreen):
         )
         items_box.bind(minimum_height=items_box.setter('height'))
         
-        for item in pedido['items']:
-            item_text = f"• {item['nombre']} x{item['cantidad']}"
-            if item.get('notas'):
-                item_text += f"\n  📝 {item['notas']}"
+        for item in pedido.items:
+            item_text = f"{ICONOS_ITEM.get(item.estado, '•')} {item.nombre} x{item.cantidad}"
+            if item.notas:
+                item_text += f"\n  📝 {item.notas}"
             
             items_box.add_widget(MDLabel(
                 text=item_text,
                 font_style="Body2",
                 size_hint_y=None,
-                height=dp(40) if item.get('notas') else dp(25)
+                height=dp(40) if item.notas else dp(25)
             ))
         
         scroll.add_widget(items_box)
         content.add_widget(scroll)
         
         content.add_widget(MDLabel(
-            text=f"Mesero: {pedido['mesero']}",
+            text=f"Mesero: {pedido.mesero}",
             font_style="Caption",
             theme_text_color="Secondary",
             halign="center",
@@ -292,7 +534,7 @@ class CocinaScreen(MDScreen):
         """Ver pedidos con tiempo excedido"""
         pedidos_urgentes = [
             p for p in self.pedidos 
-            if self._calcular_minutos_espera(p['created_at']) > 15
+            if self._calcular_minutos_espera(p.created_at) > 15
         ]
         
         if not pedidos_urgentes:
@@ -301,8 +543,8 @@ class CocinaScreen(MDScreen):
         
         mensaje = f"⚠️ {len(pedidos_urgentes)} pedido(s) con más de 15 minutos:\n\n"
         for p in pedidos_urgentes[:5]:
-            tiempo = self._calcular_minutos_espera(p['created_at'])
-            mensaje += f"• Pedido #{p['id']} - Mesa {p['mesa']}: {tiempo} min\n"
+            tiempo = self._calcular_minutos_espera(p.created_at)
+            mensaje += f"• Pedido #{p.id} - Mesa {p.mesa}: {tiempo} min\n"
         
         self.mostrar_info(mensaje)
     
@@ -331,19 +573,6 @@ class CocinaScreen(MDScreen):
         else:
             return f"{minutos} min 🔴"
     
-    def _formato_items(self, items):
-        """Formatear lista de items para mostrar"""
-        if not items:
-            return "Sin items"
-        
-        texto = ""
-        for item in items:
-            texto += f"• {item['nombre']} x{item['cantidad']}\n"
-            if item.get('notas'):
-                texto += f"  📝 {item['notas']}\n"
-        
-        return texto.strip()
-    
     def mostrar_error(self, mensaje):
         """Mostrar diálogo de error"""
         if self.dialog:
@@ -388,7 +617,7 @@ class PedidoCocinaCard(MDCard):
     mesa = StringProperty("")
     estado = StringProperty("pendiente")
     tiempo_espera = StringProperty("")
-    items_text = StringProperty("")
+    items = ListProperty([])
     mesero = StringProperty("")
     cocina_screen = ObjectProperty(None)
     
@@ -402,9 +631,38 @@ class PedidoCocinaCard(MDCard):
         self.elevation = 3
         self.radius = dp(12)
         self.md_bg_color = ds_color('white')
+        Clock.schedule_once(lambda dt: self.pintar_items())
     
-    @property
-    def color_estado(self):
+    def pintar_items(self):
+        """Una fila tocable por línea; el ícono muestra su estado"""
+        if 'lista_items' not in self.ids:
+            return
+        
+        lista = self.ids.lista_items
+        lista.clear_widgets()
+        if not self.items:
+            lista.add_widget(MDLabel(text="Sin items", font_style="Body2", size_hint_y=None, height=dp(28)))
+            return
+        
+        for item in self.items:
+            texto = f"{ICONOS_ITEM.get(item.estado, '•')} {item.nombre} x{item.cantidad}"
+            if item.notas:
+                texto += f"  📝 {item.notas}"
+            lista.add_widget(MDFlatButton(
+                text=texto,
+                size_hint_x=1,
+                theme_text_color="Custom",
+                text_color=ds_color('gray') if item.estado == 'listo' else ds_color('dark'),
+                on_release=lambda x, i=item: self.avanzar_item(i)
+            ))
+    
+    def avanzar_item(self, item):
+        if self.cocina_screen:
+            self.cocina_screen.avanzar_item(self.pedido_id, item)
+    
+    # Propiedades derivadas del estado: AliasProperty para que el kv se repinte
+    # cuando la pantalla cambia el estado sin rehacer la card
+    def _color_estado(self):
         """Color según estado del pedido"""
         colores = {
             'pendiente': ds_color('warning'),
@@ -414,8 +672,7 @@ class PedidoCocinaCard(MDCard):
         }
         return colores.get(self.estado, ds_color('gray'))
     
-    @property
-    def color_estado_light(self):
+    def _color_estado_light(self):
         """Color claro para fondo"""
         colores = {
             'pendiente': (*ds_color('warning')[:3], 0.1),
@@ -435,8 +692,7 @@ class PedidoCocinaCard(MDCard):
         else:
             return ds_color('success')
     
-    @property
-    def texto_boton_principal(self):
+    def _texto_boton_principal(self):
         """Texto del botón según estado"""
         textos = {
             'pendiente': 'INICIAR',
@@ -446,8 +702,7 @@ class PedidoCocinaCard(MDCard):
         }
         return textos.get(self.estado, 'ACCIÓN')
     
-    @property
-    def icono_boton_principal(self):
+    def _icono_boton_principal(self):
         """Ícono del botón según estado"""
         iconos = {
             'pendiente': 'play',
@@ -457,8 +712,7 @@ class PedidoCocinaCard(MDCard):
         }
         return iconos.get(self.estado, 'check')
     
-    @property
-    def color_boton_principal(self):
+    def _color_boton_principal(self):
         """Color del botón según estado"""
         colores = {
             'pendiente': ds_color('warning'),
@@ -468,6 +722,12 @@ class PedidoCocinaCard(MDCard):
         }
         return colores.get(self.estado, ds_color('primary'))
     
+    color_estado = AliasProperty(_color_estado, bind=['estado'])
+    color_estado_light = AliasProperty(_color_estado_light, bind=['estado'])
+    texto_boton_principal = AliasProperty(_texto_boton_principal, bind=['estado'])
+    icono_boton_principal = AliasProperty(_icono_boton_principal, bind=['estado'])
+    color_boton_principal = AliasProperty(_color_boton_principal, bind=['estado'])
+    
     def accion_principal(self):
         """Ejecutar acción principal según estado"""
         estados_sig = {
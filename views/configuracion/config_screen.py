@@ -43,11 +43,9 @@ class ConfigScreen(MDScreen):
         """Inicializar servicios de configuración"""
         if not self.config_service:
             try:
-                from services.database_service import PostgreSQLService
-                from services.config_service import ConfigService
+                from views.servicios_app import servicios_app
                 
-                db = PostgreSQLService()
-                self.config_service = ConfigService(db)
+                self.config_service = servicios_app().config
                 print("✅ Servicios de configuración inicializados")
             except Exception as e:
                 print(f"❌ Error inicializando servicios: {e}")
@@ -9,38 +9,83 @@ from kivymd.uix.textfield import MDTextField
 from kivy.uix.spinner import Spinner
 from kivy.properties import ListProperty, StringProperty, NumericProperty, BooleanProperty
 from kivy.clock import Clock
-from kivy.properties import ObjectProperty, DictProperty
+from kivy.properties import ObjectProperty
 from kivy.metrics import dp, sp
 from themes.design_system import ds_color, ds_spacing, ds_is_mobile
 import psycopg2
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class InventarioScreen(MDScreen):
     productos = ListProperty([])
     categorias = ListProperty([])
     categoria_filtro = StringProperty("Todos")
     busqueda_texto = StringProperty("")
+    alertas_insumos = ListProperty([])
+    
+    TAM_PAGINA = 60
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.db_service = None
+        self.busqueda = None
         self.dialog = None
+        self._hay_mas = False
     
     def on_enter(self):
         """Al entrar a la pantalla"""
-        print("📦 Entrando a Módulo de Inventario")
-        self.inicializar_servicios()
+        log.debug("📦 Entrando a Módulo de Inventario")
+        if not self.inicializar_servicios():
+            return
         self.cargar_categorias()
         self.cargar_productos()
+        self.cargar_alertas_insumos()
     
-    def inicializar_servicios(self):
-        """Inicializar servicios"""
+    def inicializar_servicios(self) -> bool:
+        """Inicializar servicios; False si la pantalla no puede usarse en esta terminal"""
         if not self.db_service:
+            from views.servicios_app import servicios_app
+            servicios = servicios_app()
+            if servicios.remoto:
+                # El inventario consulta la base directamente: sólo en terminales con BD
+                self.mostrar_error("Inventario no disponible en terminales con servidor central")
+                return False
             try:
-                from services.database_service import PostgreSQLService
-                self.db_service = PostgreSQLService()
-                print("✅ Servicio de BD inicializado")
+                self.db_service = servicios.db
+                self.busqueda = servicios.busqueda
+                log.debug("✅ Servicio de BD inicializado")
             except Exception as e:
-                print(f"❌ Error inicializando BD: {e}")
+                log.error("❌ Error inicializando BD: %s", e)
+        return True
+    
+    def cargar_alertas_insumos(self):
+        """Ingredientes en o bajo su mínimo (banner sobre el grid)"""
+        from services.consumo_service import ConsumoService
+        self.alertas_insumos = ConsumoService.instancia(self.db_service).ingredientes_bajo_minimo()
+        if self.alertas_insumos:
+            log.debug("⚠️ %s ingredientes bajo mínimo", len(self.alertas_insumos))
+    
+    def mostrar_alertas_insumos(self):
+        """Diálogo con los ingredientes que hay que reponer"""
+        if not self.alertas_insumos:
+            return
+        
+        lineas = [
+            f"• {a['nombre']}: {a['stock']:g} {a['unidad']} (mínimo {a['stock_minimo']:g})"
+            for a in self.alertas_insumos
+        ]
+        self.dialog = MDDialog(
+            title="⚠️ Ingredientes bajo mínimo",
+            text="\n".join(lineas),
+            buttons=[
+                MDRaisedButton(
+                    text="OK",
+                    on_release=lambda x: self.dialog.dismiss()
+                )
+            ]
+        )
+        self.dialog.open()
     
     def cargar_categorias(self):
         """Cargar categorías disponibles"""
@@ -59,61 +104,33 @@ class InventarioScreen(MDScreen):
             cur.close()
             conn.close()
             
-            print(f"📂 {len(self.categorias)} categorías cargadas")
+            log.debug("📂 %s categorías cargadas", len(self.categorias))
             
         except Exception as e:
-            print(f"❌ Error cargando categorías: {e}")
+            log.error("❌ Error cargando categorías: %s", e)
             self.categorias = ['Todos']
     
-    def cargar_productos(self):
-        """Cargar productos con filtros"""
+    def cargar_productos(self, mas=False):
+        """Cargar una página de productos (búsqueda con ranking en BusquedaProductosService)"""
         try:
-            conn = psycopg2.connect(**self.db_service.conn_params)
-            cur = conn.cursor()
-            
-            query = """
-                SELECT id, nombre, categoria, precio, stock, 
-                       descripcion, imagen_url, activo
-                FROM productos 
-                WHERE activo = TRUE
-            """
-            params = []
-            
-            # Aplicar filtro de categoría
-            if self.categoria_filtro and self.categoria_filtro != "Todos":
-                query += " AND categoria = %s"
-                params.append(self.categoria_filtro)
-            
-            # Aplicar búsqueda
-            if self.busqueda_texto and self.busqueda_texto.strip():
-                query += " AND LOWER(nombre) LIKE LOWER(%s)"
-                params.append(f"%{self.busqueda_texto}%")
-            
-            query += " ORDER BY categoria, nombre"
-            
-            cur.execute(query, params)
-            
-            self.productos = []
-            for row in cur.fetchall():
-                self.productos.append({
-                    'id': row[0],
-                    'nombre': row[1],
-                    'categoria': row[2],
-                    'precio': float(row[3]),
-                    'stock': row[4],
-                    'descripcion': row[5] or '',
-                    'imagen_url': row[6] or '',
-                    'activo': row[7]
-                })
+            desplazamiento = len(self.productos) if mas else 0
+            resultado = self.busqueda.buscar(
+                self.busqueda_texto.strip(), self.categoria_filtro,
+                self.TAM_PAGINA, desplazamiento
+            )
+            self._hay_mas = resultado['hay_mas']
             
-            cur.close()
-            conn.close()
+            if mas:
+                self.productos = self.productos + resultado['productos']
+                self._agregar_cards(resultado['productos'])
+            else:
+                self.productos = resultado['productos']
+                self.actualizar_ui_productos()
             
-            print(f"📦 {len(self.productos)} productos cargados")
-            self.actualizar_ui_productos()
+            log.debug("📦 %s productos cargados (%s)", len(self.productos), resultado['origen'])
             
         except Exception as e:
-            print(f"❌ Error cargando productos: {e}")
+            log.error("❌ Error cargando productos: %s", e)
             self.mostrar_error("Error al cargar productos")
     
     def actualizar_ui_productos(self):
@@ -140,33 +157,51 @@ class InventarioScreen(MDScreen):
                 theme_text_color="Secondary"
             ))
             self.ids.grid_productos.add_widget(empty)
+            self._actualizar_contador()
             return
         
-        # Crear cards de productos
-        for producto in self.productos:
+        self._agregar_cards(self.productos)
+    
+    def _agregar_cards(self, productos):
+        """Agregar cards al final del grid (sólo la página nueva al paginar)"""
+        grid = self.ids.grid_productos
+        if getattr(self, '_boton_mas', None) and self._boton_mas.parent:
+            grid.remove_widget(self._boton_mas)
+        
+        for producto in productos:
             card = ProductoInventarioCard(
                 producto_data=producto,
                 inventario_screen=self
             )
-            self.ids.grid_productos.add_widget(card)
+            grid.add_widget(card)
+        
+        if self._hay_mas:
+            self._boton_mas = MDRaisedButton(
+                text="Cargar más",
+                on_release=lambda x: self.cargar_productos(mas=True)
+            )
+            grid.add_widget(self._boton_mas)
         
-        # Actualizar contador
+        self._actualizar_contador()
+    
+    def _actualizar_contador(self):
         if 'label_count' in self.ids:
-            self.ids.label_count.text = f"{len(self.productos)} productos"
+            mas = "+" if self._hay_mas else ""
+            self.ids.label_count.text = f"{len(self.productos)}{mas} productos"
     
     def filtrar_por_categoria(self, categoria):
         """Filtrar productos por categoría"""
         self.categoria_filtro = categoria
-        print(f"🔍 Filtrando por: {categoria}")
+        log.debug("🔍 Filtrando por: %s", categoria)
         self.cargar_productos()
     
     def buscar_productos(self, texto):
         """Buscar productos por nombre"""
         self.busqueda_texto = texto
-        # Debouncing - esperar 0.5s después de escribir
+        # Debouncing - esperar 0.25s después de escribir (la búsqueda usa índice)
         if hasattr(self, '_busqueda_timer'):
             self._busqueda_timer.cancel()
-        self._busqueda_timer = Clock.schedule_once(lambda dt: self.cargar_productos(), 0.5)
+        self._busqueda_timer = Clock.schedule_once(lambda dt: self.cargar_productos(), 0.25)
     
     def agregar_producto(self):
         """Diálogo para agregar nuevo producto"""
@@ -305,12 +340,13 @@ class InventarioScreen(MDScreen):
             
             self.dialog.dismiss()
             self.mostrar_info(f"✅ Producto '{nombre}' agregado")
+            self.busqueda.invalidar()
             self.cargar_productos()
             
         except ValueError:
             self.mostrar_error("Valores numéricos inválidos")
         except Exception as e:
-            print(f"❌ Error guardando producto: {e}")
+            log.error("❌ Error guardando producto: %s", e)
             self.mostrar_error("Error al guardar producto")
     
     def editar_producto(self, producto_data):
@@ -326,7 +362,7 @@ class InventarioScreen(MDScreen):
         # Nombre
         input_nombre = MDTextField(
             hint_text="Nombre",
-            text=producto_data['nombre'],
+            text=producto_data.nombre,
             mode="rectangle",
             size_hint_y=None,
             height=dp(48)
@@ -336,7 +372,7 @@ class InventarioScreen(MDScreen):
         # Precio
         input_precio = MDTextField(
             hint_text="Precio",
-            text=str(producto_data['precio']),
+            text=str(producto_data.precio),
             mode="rectangle",
             input_filter="float",
             size_hint_y=None,
@@ -347,7 +383,7 @@ class InventarioScreen(MDScreen):
         # Stock
         input_stock = MDTextField(
             hint_text="Stock",
-            text=str(producto_data['stock']),
+            text=str(producto_data.stock),
             mode="rectangle",
             input_filter="int",
             size_hint_y=None,
@@ -358,7 +394,7 @@ class InventarioScreen(MDScreen):
         # Descripción
         input_descripcion = MDTextField(
             hint_text="Descripción",
-            text=producto_data['descripcion'],
+            text=producto_data.descripcion,
             mode="rectangle",
             multiline=True,
             size_hint_y=None,
@@ -367,7 +403,7 @@ class InventarioScreen(MDScreen):
         content.add_widget(input_descripcion)
         
         self.dialog = MDDialog(
-            title=f"Editar: {producto_data['nombre']}",
+            title=f"Editar: {producto_data.nombre}",
             type="custom",
             content_cls=content,
             buttons=[
@@ -379,7 +415,7 @@ class InventarioScreen(MDScreen):
                     text="GUARDAR",
                     md_bg_color=ds_color('primary'),
                     on_release=lambda x: self._actualizar_producto(
-                        producto_data['id'],
+                        producto_data.id,
                         input_nombre.text,
                         input_precio.text,
                         input_stock.text,
@@ -411,17 +447,18 @@ class InventarioScreen(MDScreen):
             
             self.dialog.dismiss()
             self.mostrar_info("✅ Producto actualizado")
+            self.busqueda.invalidar()
             self.cargar_productos()
             
         except Exception as e:
-            print(f"❌ Error actualizando: {e}")
+            log.error("❌ Error actualizando: %s", e)
             self.mostrar_error("Error al actualizar")
     
     def eliminar_producto(self, producto_data):
         """Confirmar y eliminar producto"""
         self.dialog = MDDialog(
             title="Eliminar Producto",
-            text=f"¿Eliminar '{producto_data['nombre']}'?\nEsta acción no se puede deshacer.",
+            text=f"¿Eliminar '{producto_data.nombre}'?\nEsta acción no se puede deshacer.",
             buttons=[
                 MDFlatButton(
                     text="CANCELAR",
@@ -430,7 +467,7 @@ class InventarioScreen(MDScreen):
                 MDRaisedButton(
                     text="ELIMINAR",
                     md_bg_color=ds_color('error'),
-                    on_release=lambda x: self._confirmar_eliminar(producto_data['id'])
+                    on_release=lambda x: self._confirmar_eliminar(producto_data.id)
                 )
             ]
         )
@@ -454,10 +491,11 @@ class InventarioScreen(MDScreen):
             
             self.dialog.dismiss()
             self.mostrar_info("✅ Producto eliminado")
+            self.busqueda.invalidar()
             self.cargar_productos()
             
         except Exception as e:
-            print(f"❌ Error eliminando: {e}")
+            log.error("❌ Error eliminando: %s", e)
             self.mostrar_error("Error al eliminar")
     
     def mostrar_error(self, mensaje):
@@ -500,7 +538,7 @@ class InventarioScreen(MDScreen):
 
 class ProductoInventarioCard(MDCard):
     """Card de producto para inventario"""
-    producto_data = DictProperty({})
+    producto_data = ObjectProperty(None)
     inventario_screen = ObjectProperty(None)
     
     def __init__(self, **kwargs):
@@ -521,13 +559,13 @@ class ProductoInventarioCard(MDCard):
         # Header
         header = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=dp(30))
         header.add_widget(MDLabel(
-            text=self.producto_data['nombre'],
+            text=self.producto_data.nombre,
             font_style="Subtitle1",
             bold=True,
             size_hint_x=0.7
         ))
         header.add_widget(MDLabel(
-            text=f"${self.producto_data['precio']:.2f}",
+            text=f"${self.producto_data.precio:.2f}",
             font_style="Subtitle1",
             bold=True,
             halign="right",
@@ -539,7 +577,7 @@ class ProductoInventarioCard(MDCard):
         
         # Info
         self.add_widget(MDLabel(
-            text=f"Categoría: {self.producto_data['categoria']}",
+            text=f"Categoría: {self.producto_data.categoria}",
             font_style="Caption",
             theme_text_color="Secondary",
             size_hint_y=None,
@@ -547,16 +585,16 @@ class ProductoInventarioCard(MDCard):
         ))
         
         self.add_widget(MDLabel(
-            text=f"Stock: {self.producto_data['stock']} unidades",
+            text=f"Stock: {self.producto_data.stock} unidades",
             font_style="Body2",
             size_hint_y=None,
             height=dp(25)
         ))
         
         # Descripción
-        if self.producto_data['descripcion']:
+        if self.producto_data.descripcion:
             self.add_widget(MDLabel(
-                text=self.producto_data['descripcion'][:60] + "...",
+                text=self.producto_data.descripcion[:60] + "...",
                 font_style="Caption",
                 theme_text_color="Secondary",
                 size_hint_y=None,
@@ -25,11 +25,10 @@ class LoginScreen(MDScreen):
         """Inicializar servicios de autenticación"""
         if not self.auth_service:
             try:
-                from services.database_service import PostgreSQLService
-                from services.auth_service import AuthService
+                from views.servicios_app import servicios_app
                 
-                db = PostgreSQLService()
-                self.auth_service = AuthService(db)
+                # AuthService compartido de la app: su caché de PINs vive por terminal
+                self.auth_service = servicios_app().auth
                 print("✅ Servicios de autenticación inicializados")
             except Exception as e:
                 print(f"❌ Error inicializando servicios: {e}")
@@ -87,6 +86,9 @@ class LoginScreen(MDScreen):
         
         if success:
             self.login_exitoso(usuario)
+        elif self.auth_service.error_configuracion:
+            # Terminal mal configurada: no es un PIN incorrecto ni cuenta como intento
+            self.mostrar_error(self.auth_service.error_configuracion)
         else:
             self.intentos += 1
             intentos_restantes = self.max_intentos - self.intentos
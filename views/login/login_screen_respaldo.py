@@ -34,11 +34,8 @@ class LoginScreen(MDScreen):
         """Inicializar servicios de autenticación"""
         if not self.auth_service:
             try:
-                from services.database_service import PostgreSQLService
-                from services.auth_service import AuthService
-                
-                db = PostgreSQLService()
-                self.auth_service = AuthService(db)
+                from views.servicios_app import servicios_app
+                self.auth_service = servicios_app().auth
                 print("✅ Servicios de autenticación inicializados")
             except Exception as e:
                 print(f"❌ Error inicializando servicios: {e}")
@@ -185,6 +182,8 @@ class LoginScreen(MDScreen):
         
         if success:
             self.login_exitoso(usuario)
+        elif self.auth_service.error_configuracion:
+            self.mostrar_error(self.auth_service.error_configuracion)
         else:
             self.mostrar_error("PIN incorrecto")
     
@@ -4,6 +4,9 @@ from kivy.properties import StringProperty, NumericProperty, DictProperty
 from kivy.clock import Clock
 from themes.design_system import DesignSystem, ds_grid_cols
 from kivymd.app import MDApp
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class MenuScreen(MDScreen):
     usuario_nombre = StringProperty("Usuario")
@@ -20,7 +23,7 @@ class MenuScreen(MDScreen):
     
     def on_enter(self):
         """Cuando la pantalla se muestra"""
-        print("📱 Cargando pantalla de Menú Principal...")
+        log.debug("📱 Cargando pantalla de Menú Principal...")
         self.actualizar_datos_usuario()
         
         if not self._estadisticas_actualizadas:
@@ -45,7 +48,7 @@ class MenuScreen(MDScreen):
                 cols = 3
             
             self.ids.grid_modulos.cols = cols
-            print(f"📐 Grid actualizado: {cols} columnas")
+            log.debug("📐 Grid actualizado: %s columnas", cols)
     
     def actualizar_datos_usuario(self):
         """Actualizar datos del usuario desde app principal"""
@@ -54,31 +57,28 @@ class MenuScreen(MDScreen):
         if app and hasattr(app, 'usuario_actual') and app.usuario_actual:
             self.usuario_nombre = app.usuario_actual.get('nombre', 'Usuario')
             self.usuario_rol = app.usuario_actual.get('rol', 'Rol')
-            print(f"👤 Usuario: {self.usuario_nombre} ({self.usuario_rol})")
+            log.debug("👤 Usuario: %s (%s)", self.usuario_nombre, self.usuario_rol)
         else:
-            print("⚠️ No hay usuario logueado")
+            log.warning("⚠️ No hay usuario logueado")
     
     def actualizar_estadisticas(self):
         """Actualizar estadísticas desde BD"""
         try:
             app = MDApp.get_running_app()
             
-            if not app or not app.db_service:
-                print("⚠️ Servicio de BD no disponible - usando valores de ejemplo")
+            if not app or not getattr(app, 'servicios', None):
+                log.warning("⚠️ Servicio de BD no disponible - usando valores de ejemplo")
                 self.ventas_hoy = 1250
                 self.pedidos_activos = 8
                 self.mesas_ocupadas = 6
                 return
             
-            from services.pedido_service import PedidoService
-            from services.caja_service import CajaService
-            
-            pedido_service = PedidoService(app.db_service)
-            caja_service = CajaService(app.db_service)
+            pedido_service = app.servicios.pedidos
+            caja_service = app.servicios.caja
             
             # Ventas del día
             ventas = caja_service.obtener_ventas_dia()
-            self.ventas_hoy = ventas.get('total_monto', 0)
+            self.ventas_hoy = float(ventas.get('total_monto', 0))
             
             # Pedidos activos
             pedidos = pedido_service.obtener_pedidos_activos()
@@ -94,10 +94,10 @@ class MenuScreen(MDScreen):
                 'mesas_totales': self.mesas_totales
             }
             
-            print(f"📊 Estadísticas actualizadas: {self.estadisticas_data}")
+            log.debug("📊 Estadísticas actualizadas: %s", self.estadisticas_data)
             
         except Exception as e:
-            print(f"⚠️ Error obteniendo estadísticas: {e}")
+            log.warning("⚠️ Error obteniendo estadísticas: %s", e)
             # Valores por defecto
             self.ventas_hoy = 1250
             self.pedidos_activos = 8
@@ -109,13 +109,13 @@ class MenuScreen(MDScreen):
             self.property('usuario_nombre').dispatch(self)
             self.property('ventas_hoy').dispatch(self)
             self.property('pedidos_activos').dispatch(self)
-            print("✅ UI de menú actualizada")
+            log.debug("✅ UI de menú actualizada")
         except Exception as e:
-            print(f"⚠️ Error actualizando UI: {e}")
+            log.warning("⚠️ Error actualizando UI: %s", e)
     
     def ir_a_modulo(self, modulo):
         """MÉTODO CORREGIDO - Navegar a módulo específico"""
-        print(f"🔄 Navegando a módulo: {modulo}")
+        log.debug("🔄 Navegando a módulo: %s", modulo)
         
         app = MDApp.get_running_app()
         
@@ -127,7 +127,7 @@ class MenuScreen(MDScreen):
         
         # Verificar que la pantalla existe
         if modulo not in pantallas_disponibles:
-            print(f"❌ Módulo '{modulo}' no disponible")
+            log.error("❌ Módulo '%s' no disponible", modulo)
             self._mostrar_snackbar(f"Módulo {modulo} en desarrollo")
             return
         
@@ -139,9 +139,9 @@ class MenuScreen(MDScreen):
                 # Fallback directo
                 self.manager.current = modulo
             
-            print(f"✅ Navegación a {modulo} completada")
+            log.debug("✅ Navegación a %s completada", modulo)
         except Exception as e:
-            print(f"❌ Error navegando a {modulo}: {e}")
+            log.error("❌ Error navegando a %s: %s", modulo, e)
             self._mostrar_snackbar(f"Error al abrir {modulo}")
 
 
@@ -157,7 +157,7 @@ class MenuScreen(MDScreen):
                 size_hint_x=0.9
             ).open()
         except Exception as e:
-            print(f"⚠️ Error mostrando snackbar: {e}")
+            log.warning("⚠️ Error mostrando snackbar: %s", e)
     
     def refrescar_estadisticas(self):
         """Método público para refrescar estadísticas"""
@@ -166,4 +166,4 @@ class MenuScreen(MDScreen):
     
     def on_leave(self):
         """Cuando se sale de la pantalla"""
-        print("👋 Saliendo de Menú Principal")
\ No newline at end of file
+        log.debug("👋 Saliendo de Menú Principal")
\ No newline at end of file
@@ -8,12 +8,14 @@ from kivymd.uix.button import MDFlatButton, MDRaisedButton
 from kivymd.uix.textfield import MDTextField
 from kivy.properties import (NumericProperty, DictProperty, ListProperty, 
                             StringProperty, BooleanProperty, ObjectProperty)
-from kivy.clock import Clock
 from kivy.metrics import dp
-import psycopg2
 from typing import Dict, List
 from themes.design_system import ds_color, ds_spacing
 from kivymd.app import MDApp
+from models import Dinero
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class CierreCuentaScreen(MDScreen):
     # Propiedades
@@ -32,114 +34,78 @@ class CierreCuentaScreen(MDScreen):
         self.pedido_service = None
         self.caja_service = None
         self.ticket_service = None
+        self.mesa_service = None
         self.dialog = None
+        self._mesa_por_texto = {}
     
     def on_enter(self):
         """Al entrar a la pantalla"""
-        print("💰 Entrando a Cierre de Cuenta")
+        log.debug("💰 Entrando a Cierre de Cuenta")
         self.inicializar_servicios()
-        self.cargar_mesas_con_pedidos()
+        if self.mesa_service:
+            self.mesa_service.agregar_observador(self._on_mesas_cambiadas)
+            self.mesa_service.cargar()
         self.limpiar_seleccion()
     
+    def on_leave(self):
+        """Al salir de la pantalla"""
+        if self.mesa_service:
+            self.mesa_service.quitar_observador(self._on_mesas_cambiadas)
+    
     def inicializar_servicios(self):
         """Inicializar servicios necesarios"""
         try:
-            from services.database_service import PostgreSQLService
-            from services.pedido_service import PedidoService
-            from services.caja_service import CajaService
-            from services.ticket_service import TicketService
+            from views.servicios_app import servicios_app
             
-            db = PostgreSQLService()
-            self.pedido_service = PedidoService(db)
-            self.caja_service = CajaService(db)
-            self.ticket_service = TicketService(db)
-            print("✅ Servicios de cierre inicializados")
+            servicios = servicios_app()
+            self.pedido_service = servicios.pedidos
+            self.caja_service = servicios.caja
+            self.ticket_service = servicios.tickets
+            
+            # Índice de mesas compartido por la app (se mantiene con eventos de pedido/pago)
+            self.mesa_service = servicios.mesas
+            log.debug("✅ Servicios de cierre inicializados")
         except Exception as e:
-            print(f"❌ Error inicializando servicios: {e}")
+            log.error("❌ Error inicializando servicios: %s", e)
+    
+    def _on_mesas_cambiadas(self):
+        """El índice de mesas cambió: refrescar selector, lista y detalle en memoria"""
+        self.cargar_mesas_con_pedidos()
+        if self.mesa_seleccionada:
+            self.mostrar_pedidos_mesa(self.mesa_seleccionada)
+        if self.pedido_id and not self.mesa_service.obtener_pedido(self.pedido_id):
+            self.limpiar_seleccion()
     
     def cargar_mesas_con_pedidos(self):
-        """Cargar mesas que tienen pedidos abiertos"""
-        try:
-            conn = psycopg2.connect(**self.pedido_service.db.conn_params)
-            cur = conn.cursor()
-            
-            cur.execute("""
-                SELECT 
-                    p.mesa,
-                    COUNT(DISTINCT p.id) as num_pedidos,
-                    SUM(p.total) as total_mesa
-                FROM pedidos p
-                WHERE p.estado IN ('pendiente', 'preparacion', 'listo')
-                GROUP BY p.mesa
-                ORDER BY p.mesa
-            """)
-            
-            self.mesas_disponibles = []
-            for row in cur.fetchall():
-                mesa = row[0]
-                num_pedidos = row[1]
-                total = float(row[2])
-                self.mesas_disponibles.append(
-                    f"Mesa {mesa} - {num_pedidos}p - ${total:.2f}"
-                )
-            
-            cur.close()
-            conn.close()
-            
-            print(f"🏷️ {len(self.mesas_disponibles)} mesas con pedidos")
-            
-        except Exception as e:
-            print(f"❌ Error cargando mesas: {e}")
-            self.mesas_disponibles = []
+        """Cargar mesas que tienen pedidos abiertos (desde el índice en memoria)"""
+        self._mesa_por_texto = {}
+        mesas = []
+        for resumen in self.mesa_service.obtener_mesas():
+            texto = f"Mesa {resumen['mesa']} - {resumen['num_pedidos']}p - ${resumen['total']:.2f}"
+            self._mesa_por_texto[texto] = resumen['mesa']
+            mesas.append(texto)
+        
+        self.mesas_disponibles = mesas
+        log.debug("🏷️ %s mesas con pedidos", len(self.mesas_disponibles))
     
     def cargar_pedidos_mesa(self, texto_mesa):
         """Cargar todos los pedidos de una mesa"""
-        if not texto_mesa or "Seleccionar" in texto_mesa:
+        mesa = self._mesa_por_texto.get(texto_mesa)
+        if mesa is None:
             return
         
-        try:
-            # Extraer número de mesa
-            mesa = texto_mesa.split()[1]
-            self.mesa_seleccionada = mesa
-            
-            conn = psycopg2.connect(**self.pedido_service.db.conn_params)
-            cur = conn.cursor()
-            
-            cur.execute("""
-                SELECT 
-                    p.id,
-                    p.total,
-                    p.estado,
-                    COUNT(ip.id) as num_items
-                FROM pedidos p
-                LEFT JOIN items_pedido ip ON p.id = ip.pedido_id
-                WHERE p.mesa = %s 
-                AND p.estado IN ('pendiente', 'preparacion', 'listo')
-                GROUP BY p.id, p.total, p.estado
-                ORDER BY p.created_at ASC
-            """, (mesa,))
-            
-            self.pedidos_mesa = []
-            for row in cur.fetchall():
-                self.pedidos_mesa.append({
-                    'id': row[0],
-                    'total': float(row[1]),
-                    'estado': row[2],
-                    'num_items': row[3]
-                })
-            
-            cur.close()
-            conn.close()
-            
-            print(f"📋 {len(self.pedidos_mesa)} pedidos en Mesa {mesa}")
-            
-            # Actualizar UI
-            self.actualizar_lista_pedidos()
-            self.actualizar_info_mesa()
-            
-        except Exception as e:
-            print(f"❌ Error cargando pedidos: {e}")
-            self.mostrar_error("Error cargando pedidos")
+        self.mostrar_pedidos_mesa(mesa)
+    
+    def mostrar_pedidos_mesa(self, mesa):
+        """Mostrar los pedidos abiertos de una mesa sin consultar la BD"""
+        self.mesa_seleccionada = mesa
+        self.pedidos_mesa = self.mesa_service.obtener_pedidos_mesa(mesa)
+        
+        log.debug("📋 %s pedidos en Mesa %s", len(self.pedidos_mesa), mesa)
+        
+        # Actualizar UI
+        self.actualizar_lista_pedidos()
+        self.actualizar_info_mesa()
     
     def actualizar_info_mesa(self):
         """Actualizar info rápida de la mesa"""
@@ -168,7 +134,7 @@ class CierreCuentaScreen(MDScreen):
         for pedido in self.pedidos_mesa:
             card = PedidoItemCompact(
                 pedido_id=pedido['id'],
-                pedido_total=pedido['total'],
+                pedido_total=float(pedido['total']),
                 pedido_estado=pedido['estado'],
                 num_items=pedido['num_items']
             )
@@ -185,64 +151,45 @@ class CierreCuentaScreen(MDScreen):
         self.cargar_detalle_pedido()
     
     def cargar_detalle_pedido(self):
-        """Cargar detalle completo del pedido"""
+        """Cargar detalle completo del pedido (desde el índice de mesas)"""
         try:
-            conn = psycopg2.connect(**self.pedido_service.db.conn_params)
-            cur = conn.cursor()
-            
-            # Info del pedido
-            cur.execute("""
-                SELECT id, mesa, total, estado
-                FROM pedidos 
-                WHERE id = %s
-            """, (self.pedido_id,))
-            
-            pedido_info = cur.fetchone()
-            if not pedido_info:
+            estado = self.mesa_service.obtener_pedido(self.pedido_id)
+            if not estado:
                 return
             
             self.pedido_data = {
-                'id': pedido_info[0],
-                'mesa': pedido_info[1],
-                'total': float(pedido_info[2]),
-                'estado': pedido_info[3]
+                'id': estado['pedido_id'],
+                'mesa': estado['mesa'],
+                'total': estado['total_pedido'],
+                'estado': estado['estado'],
+                'total_pagado': estado['total_pagado'],
+                'saldo_pendiente': estado['saldo_pendiente'],
+                'completamente_pagado': estado['completamente_pagado']
             }
             
-            # Items del pedido
-            cur.execute("""
-                SELECT 
-                    pr.nombre,
-                    ip.cantidad,
-                    ip.precio_unitario,
-                    (ip.cantidad * ip.precio_unitario) as subtotal
-                FROM items_pedido ip
-                JOIN productos pr ON ip.producto_id = pr.id
-                WHERE ip.pedido_id = %s
-                ORDER BY pr.nombre
-            """, (self.pedido_id,))
-            
-            self.items_pedido = []
-            for row in cur.fetchall():
-                self.items_pedido.append({
-                    'nombre': row[0],
-                    'cantidad': row[1],
-                    'precio_unitario': float(row[2]),
-                    'subtotal': float(row[3])
-                })
-            
-            cur.close()
-            conn.close()
+            self.items_pedido = [
+                {
+                    'item_pedido_id': linea['item_pedido_id'],
+                    'nombre': linea['nombre'],
+                    'cantidad': linea['cantidad'],
+                    'precio_unitario': linea['precio_unitario'],
+                    'subtotal': linea['subtotal'],
+                    'cantidad_pagada': linea['cantidad_pagada'],
+                    'cantidad_pendiente': linea['cantidad_pendiente']
+                }
+                for linea in estado['lineas']
+            ]
             
-            self.total_original = self.pedido_data['total']
+            self.total_original = float(self.pedido_data['total'])
             self.total_con_descuento = self.total_original
             
             # Actualizar UI
             self.actualizar_ui_detalle()
             
-            print(f"📋 Pedido #{self.pedido_id} cargado: {len(self.items_pedido)} items")
+            log.debug("📋 Pedido #%s cargado: %s items", self.pedido_id, len(self.items_pedido))
             
         except Exception as e:
-            print(f"❌ Error cargando detalle: {e}")
+            log.error("❌ Error cargando detalle: %s", e)
             self.mostrar_error("Error al cargar detalle")
     
     def actualizar_ui_detalle(self):
@@ -290,15 +237,15 @@ class CierreCuentaScreen(MDScreen):
             fila = ItemFilaTabla(
                 item_nombre=item['nombre'],
                 item_cantidad=item['cantidad'],
-                item_precio=item['precio_unitario'],
-                item_subtotal=item['subtotal']
+                item_precio=float(item['precio_unitario']),
+                item_subtotal=float(item['subtotal'])
             )
             self.ids.detalle_items.add_widget(fila)
     
     def seleccionar_metodo(self, metodo):
         """Seleccionar método de pago"""
         self.metodo_pago = metodo
-        print(f"💳 Método seleccionado: {metodo}")
+        log.debug("💳 Método seleccionado: %s", metodo)
         
         # Actualizar visual de chips
         if hasattr(self, 'ids'):
@@ -411,24 +358,25 @@ class CierreCuentaScreen(MDScreen):
         """Confirmar aplicación de descuento"""
         try:
             valor = float(valor_str)
+            total = Dinero.de(self.total_original)
             
             if tipo == 'porcentaje':
                 if valor < 0 or valor > 100:
                     self.mostrar_error("El porcentaje debe estar entre 0 y 100")
                     return
-                descuento = self.total_original * (valor / 100)
+                descuento = total * (valor / 100)
             else:
-                descuento = valor
+                descuento = Dinero.de(valor)
             
-            if descuento > self.total_original:
+            if descuento > total:
                 self.mostrar_error("El descuento no puede ser mayor al total")
                 return
             
-            self.total_con_descuento = self.total_original - descuento
+            self.total_con_descuento = float(total - descuento)
             self.actualizar_ui_detalle()
             self.dialog.dismiss()
             
-            print(f"💰 Descuento aplicado: ${descuento:.2f}")
+            log.debug("💰 Descuento aplicado: $%.2f", descuento)
             
         except ValueError:
             self.mostrar_error("Valor inválido")
@@ -458,27 +406,25 @@ class CierreCuentaScreen(MDScreen):
                 self.metodo_pago
             ):
                 # Cambiar estado
-                self.pedido_service.cambiar_estado_pedido(self.pedido_id, 'pagado')
+                pedido_id = self.pedido_id
+                self.pedido_service.cambiar_estado_pedido(pedido_id, 'pagado')
                 
                 # Mostrar éxito
-                self.mostrar_exito(f"✅ Pago procesado\nPedido #{self.pedido_id}")
+                self.mostrar_exito(f"✅ Pago procesado\nPedido #{pedido_id}")
                 
-                # Recargar datos
-                Clock.schedule_once(lambda dt: self.refrescar_datos(), 1)
+                # Quitar el pedido cobrado del índice (refresca la UI por observador)
+                self.mesa_service.quitar_pedido(pedido_id)
             else:
                 self.mostrar_error("Error al registrar pago")
             
         except Exception as e:
-            print(f"❌ Error procesando pago: {e}")
+            log.error("❌ Error procesando pago: %s", e)
             self.mostrar_error("Error al procesar pago")
     
     def refrescar_datos(self):
-        """Refrescar todos los datos"""
+        """Refrescar todos los datos (recarga completa del índice de mesas)"""
         self.limpiar_seleccion()
-        self.cargar_mesas_con_pedidos()
-        if self.mesa_seleccionada:
-            # Recargar mesa actual
-            self.cargar_pedidos_mesa(f"Mesa {self.mesa_seleccionada}")
+        self.mesa_service.cargar()
     
     def ver_tickets_generados(self):
         """Ver tickets generados (placeholder)"""
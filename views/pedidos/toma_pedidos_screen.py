@@ -6,7 +6,7 @@ from kivymd.uix.label import MDLabel
 from kivymd.uix.button import MDIconButton
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.dialog import MDDialog
-from kivy.properties import BooleanProperty, ObjectProperty, DictProperty
+from kivy.properties import BooleanProperty, ObjectProperty
 from kivymd.uix.button import MDFlatButton, MDRaisedButton
 from kivymd.uix.textfield import MDTextField
 from kivy.properties import StringProperty, ListProperty, NumericProperty
@@ -15,6 +15,12 @@ from kivy.metrics import dp, sp
 from kivymd.app import MDApp
 from themes.design_system import ds_color, ds_spacing, ds_font, ds_button_height
 from kivy.graphics import Color, RoundedRectangle
+from models import Carrito
+from services.indice_catalogo import IndiceCatalogo, interpretar_entrada
+from services.stock_service import StockInsuficiente
+from utils.logger import obtener_logger
+
+log = obtener_logger(__name__)
 
 class TomaPedidoScreen(MDScreen):
     mesa_actual = StringProperty("1")
@@ -27,6 +33,10 @@ class TomaPedidoScreen(MDScreen):
         super().__init__(**kwargs)
         self.pedido_service = None
         self.producto_service = None
+        self.stock_service = None
+        self.tickets_caja = None
+        self.indice_catalogo = None
+        self._widgets_items = {}
         self._cargando = False
         self.dialog = None
 
@@ -48,16 +58,20 @@ class TomaPedidoScreen(MDScreen):
         """Inicialización asíncrona"""
         try:
             self.inicializar_servicios()
+            # Retomar la mesa y el borrador que quedaron abiertos (también tras reiniciar)
+            self.mesa_actual = self.pedido_service.borradores.mesa_activa
+            self.actualizar_ui_pedido()
             self.cargar_categorias()
             self.cargar_categorias_ui()
+            self.cargar_indice_catalogo()
             
             if self.categorias:
                 self.categoria_activa = self.categorias[0]
                 self.on_categoria_seleccionada(self.categoria_activa)
             
-            print(f"✅ Pantalla de pedidos inicializada - Mesa {self.mesa_actual}")
+            log.debug("✅ Pantalla de pedidos inicializada - Mesa %s", self.mesa_actual)
         except Exception as e:
-            print(f"❌ Error inicializando: {e}")
+            log.error("❌ Error inicializando: %s", e)
             self.mostrar_dialogo_error("Error al cargar datos")
         finally:
             self._cargando = False
@@ -65,20 +79,26 @@ class TomaPedidoScreen(MDScreen):
     def inicializar_servicios(self):
         """Inicialización de servicios"""
         if not self.pedido_service or not self.producto_service:
-            from services.database_service import PostgreSQLService
-            from services.pedido_service import PedidoService
-            from services.producto_service import ProductoService
+            from views.servicios_app import servicios_app
             
-            db = PostgreSQLService()
-            self.pedido_service = PedidoService(db)
-            self.producto_service = ProductoService(db)
-            print("✅ Servicios inicializados")
+            servicios = servicios_app()
+            self.pedido_service = servicios.pedidos
+            self.producto_service = servicios.productos
+            self.stock_service = servicios.stock
+            self.tickets_caja = servicios.tickets_caja
+            log.debug("✅ Servicios inicializados")
 
     def cargar_categorias(self):
         """Cargar categorías desde BD"""
         if self.producto_service:
             self.categorias = self.producto_service.obtener_categorias()
-            print(f"📂 {len(self.categorias)} categorías cargadas")
+            log.debug("📂 %s categorías cargadas", len(self.categorias))
+
+    def cargar_indice_catalogo(self):
+        """Catálogo completo en memoria para la búsqueda rápida (una consulta)"""
+        if self.producto_service:
+            self.indice_catalogo = IndiceCatalogo(self.producto_service.obtener_todos_productos())
+            log.debug("🔎 Índice de toma rápida: %s productos", len(self.indice_catalogo.productos))
 
     def cargar_categorias_ui(self):
         """Cargar categorías con chips profesionales"""
@@ -110,9 +130,42 @@ class TomaPedidoScreen(MDScreen):
         """Cargar productos de la categoría"""
         if categoria and self.producto_service:
             self.productos = self.producto_service.obtener_productos_por_categoria(categoria)
-            print(f"🍽️ {len(self.productos)} productos en {categoria}")
+            log.debug("🍽️ %s productos en %s", len(self.productos), categoria)
             self.cargar_productos_ui()
 
+    # ========== BÚSQUEDA RÁPIDA / PLU ==========
+    def on_busqueda_rapida(self, texto):
+        """Filtrar el grid en cada tecla (en memoria); vacío vuelve a la categoría"""
+        if not self.indice_catalogo:
+            return
+        
+        if texto.strip():
+            _, consulta = interpretar_entrada(texto)
+            self.productos = self.indice_catalogo.buscar(consulta)
+        else:
+            self.productos = self.indice_catalogo.por_categoria(self.categoria_activa)
+        self.cargar_productos_ui()
+
+    def agregar_busqueda_rapida(self):
+        """Enter en la caja: '12' agrega el PLU 12, '3*12' tres, 'ham' el primer resultado"""
+        if 'input_rapido' not in self.ids or not self.indice_catalogo:
+            return
+        
+        campo = self.ids.input_rapido
+        cantidad, consulta = interpretar_entrada(campo.text)
+        resultados = self.indice_catalogo.buscar(consulta, limite=1)
+        if not resultados:
+            return
+        
+        if cantidad > 99:
+            self.mostrar_dialogo_info("La cantidad máxima es 99")
+            return
+        
+        if self.agregar_producto_al_pedido(resultados[0], cantidad, avisar=False):
+            campo.text = ""
+            # El Enter quita el foco: devolverlo para seguir tecleando
+            Clock.schedule_once(lambda dt: setattr(campo, 'focus', True))
+
     def cargar_productos_ui(self):
         """Cargar productos con cards profesionales"""
         if not hasattr(self, 'ids') or 'grid_productos' not in self.ids:
@@ -121,8 +174,9 @@ class TomaPedidoScreen(MDScreen):
         self.ids.grid_productos.clear_widgets()
         
         if not self.productos:
+            buscando = 'input_rapido' in self.ids and self.ids.input_rapido.text.strip()
             self.ids.grid_productos.add_widget(MDLabel(
-                text="No hay productos\nen esta categoría",
+                text="Sin coincidencias" if buscando else "No hay productos\nen esta categoría",
                 halign="center",
                 theme_text_color="Secondary",
                 italic=True
@@ -131,9 +185,9 @@ class TomaPedidoScreen(MDScreen):
         
         for producto in self.productos:
             card = ProductCardPro(
-                producto_nombre=producto['nombre'],
-                producto_precio=float(producto['precio']),
-                producto_id=producto['id']
+                producto_nombre=producto.nombre,
+                producto_precio=float(producto.precio),
+                producto_id=producto.id
             )
             card.bind(on_press=lambda instance, prod=producto: self.mostrar_dialogo_producto(prod))
             self.ids.grid_productos.add_widget(card)
@@ -150,7 +204,7 @@ class TomaPedidoScreen(MDScreen):
         
         # Nombre y precio
         content.add_widget(MDLabel(
-            text=producto['nombre'],
+            text=producto.nombre,
             font_style="H6",
             halign="center",
             size_hint_y=None,
@@ -158,7 +212,7 @@ class TomaPedidoScreen(MDScreen):
         ))
         
         content.add_widget(MDLabel(
-            text=f"${float(producto['precio']):.2f}",
+            text=f"${float(producto.precio):.2f}",
             font_style="H5",
             halign="center",
             theme_text_color="Custom",
@@ -234,46 +288,57 @@ class TomaPedidoScreen(MDScreen):
         except ValueError:
             self.mostrar_dialogo_info("Cantidad inválida")
 
-    def agregar_producto_al_pedido(self, producto, cantidad=1, notas=""):
-        """Agregar producto al pedido temporal"""
+    def agregar_producto_al_pedido(self, producto, cantidad=1, notas="", avisar=True):
+        """Agregar producto al pedido temporal (avisar=False: sin diálogo, toma rápida)"""
         try:
             if not self.pedido_service:
                 self.mostrar_dialogo_error("Servicio no disponible")
                 return False
             
-            self.pedido_service.agregar_item_temporal(producto, cantidad, notas)
-            self.actualizar_ui_pedido()
-            self.mostrar_dialogo_info(f"✅ {producto['nombre']} x{cantidad}")
+            # Aviso temprano con el stock en caché; la reserva real es al confirmar
+            carrito = self.pedido_service.pedido_temporal
+            stock = self.indice_catalogo.disponible(producto.id) if self.indice_catalogo else None
+            if stock is not None and carrito.cantidad_producto(producto.id) + cantidad > stock:
+                self.mostrar_dialogo_info(f"Sólo quedan {stock} de {producto.nombre}")
+                return False
+            
+            linea = self.pedido_service.agregar_item_temporal(producto, cantidad, notas)
+            self._refrescar_linea(linea)
+            if avisar:
+                self.mostrar_dialogo_info(f"✅ {producto.nombre} x{cantidad}")
             return True
                 
         except Exception as e:
-            print(f"❌ Error agregando producto: {e}")
+            log.error("❌ Error agregando producto: %s", e)
             self.mostrar_dialogo_error("Error al agregar producto")
             return False
 
     def actualizar_ui_pedido(self):
-        """Actualizar UI del resumen de pedido"""
+        """Reconstruir el resumen completo (al entrar o al limpiar el pedido)"""
         if not self.pedido_service:
             return
-            
-        self.total_pedido = self.pedido_service.pedido_temporal['total']
         
-        # Actualizar contador de items
+        self._actualizar_resumen()
+        self._actualizar_lista_items()
+
+    def _actualizar_resumen(self):
+        """Total y contador de líneas, ya acumulados en el carrito"""
+        carrito = self.pedido_service.pedido_temporal
+        self.total_pedido = float(carrito.total)
+        
         if hasattr(self, 'ids') and 'label_items_count' in self.ids:
-            count = len(self.pedido_service.pedido_temporal['items'])
+            count = len(carrito)
             self.ids.label_items_count.text = f"{count} item{'s' if count != 1 else ''}"
-        
-        # Actualizar lista de items
-        self._actualizar_lista_items()
 
     def _actualizar_lista_items(self):
-        """Actualizar lista de items del pedido"""
+        """Reconstruir la lista de items del pedido"""
         if not hasattr(self, 'ids') or 'lista_items' not in self.ids:
             return
             
         self.ids.lista_items.clear_widgets()
+        self._widgets_items = {}
         
-        if not self.pedido_service.pedido_temporal['items']:
+        if not self.pedido_service.pedido_temporal:
             # Estado vacío
             empty_box = MDBoxLayout(
                 orientation='vertical',
@@ -295,55 +360,82 @@ class TomaPedidoScreen(MDScreen):
             ))
             self.ids.lista_items.add_widget(empty_box)
         else:
-            for item in self.pedido_service.pedido_temporal['items']:
-                order_item = OrderItemPro(
-                    item_nombre=item['nombre'],
-                    item_cantidad=item['cantidad'],
-                    item_precio=item['precio'],
-                    item_subtotal=item['subtotal'],
-                    item_data=item,
-                    pedido_screen=self
-                )
-                self.ids.lista_items.add_widget(order_item)
+            for item in self.pedido_service.pedido_temporal:
+                self._agregar_widget_linea(item)
+
+    def _agregar_widget_linea(self, item):
+        order_item = OrderItemPro(
+            item_nombre=item.nombre,
+            item_cantidad=item.cantidad,
+            item_precio=float(item.precio),
+            item_subtotal=float(item.subtotal),
+            item_data=item,
+            pedido_screen=self
+        )
+        self._widgets_items[Carrito.clave(item)] = order_item
+        self.ids.lista_items.add_widget(order_item)
+
+    def _refrescar_linea(self, item):
+        """Reflejar el cambio de una sola línea: crear, actualizar o quitar su widget"""
+        self.pedido_service.borradores.guardar()
+        self._actualizar_resumen()
+        if not hasattr(self, 'ids') or 'lista_items' not in self.ids:
+            return
+        
+        carrito = self.pedido_service.pedido_temporal
+        widget = self._widgets_items.get(Carrito.clave(item))
+        if item in carrito:
+            if widget is None:
+                if not self._widgets_items:
+                    self.ids.lista_items.clear_widgets()  # fuera el estado vacío
+                self._agregar_widget_linea(item)
+            else:
+                widget.item_cantidad = item.cantidad
+                widget.item_subtotal = float(item.subtotal)
+        else:
+            if widget is not None:
+                self.ids.lista_items.remove_widget(widget)
+                del self._widgets_items[Carrito.clave(item)]
+            if not carrito:
+                self._actualizar_lista_items()
 
     def incrementar_item(self, item_data):
         """Incrementar cantidad de un item"""
-        if item_data in self.pedido_service.pedido_temporal['items']:
-            item_data['cantidad'] += 1
-            item_data['subtotal'] = item_data['cantidad'] * item_data['precio']
-            self.pedido_service._calcular_total_temporal()
-            self.actualizar_ui_pedido()
+        if self.pedido_service.pedido_temporal.cambiar_cantidad(item_data, 1):
+            self._refrescar_linea(item_data)
 
     def decrementar_item(self, item_data):
-        """Decrementar cantidad de un item"""
-        if item_data in self.pedido_service.pedido_temporal['items']:
-            if item_data['cantidad'] > 1:
-                item_data['cantidad'] -= 1
-                item_data['subtotal'] = item_data['cantidad'] * item_data['precio']
-                self.pedido_service._calcular_total_temporal()
-                self.actualizar_ui_pedido()
-            else:
-                self.eliminar_item_pedido(item_data)
+        """Decrementar cantidad de un item (en 1 se quita la línea)"""
+        if self.pedido_service and item_data in self.pedido_service.pedido_temporal:
+            self.pedido_service.pedido_temporal.cambiar_cantidad(item_data, -1)
+            self._refrescar_linea(item_data)
 
     def eliminar_item_pedido(self, item_data):
         """Eliminar item del pedido"""
-        if self.pedido_service:
-            items = self.pedido_service.pedido_temporal['items']
-            if item_data in items:
-                items.remove(item_data)
-                self.pedido_service._calcular_total_temporal()
-                self.actualizar_ui_pedido()
+        if self.pedido_service and self.pedido_service.pedido_temporal.quitar(item_data):
+            self._refrescar_linea(item_data)
 
     def cambiar_mesa(self):
-        """Diálogo para cambiar mesa"""
+        """Diálogo para cambiar mesa; las mesas con borrador se abren con un toque"""
+        abiertos = [c for c in self.pedido_service.borradores.abiertos() if c.mesa != self.mesa_actual] \
+            if self.pedido_service else []
+        
         content = MDBoxLayout(
             orientation='vertical',
             spacing=dp(15),
             padding=dp(20),
             size_hint_y=None,
-            height=dp(120)
+            height=dp(120) + dp(48) * len(abiertos)
         )
         
+        for carrito in abiertos:
+            content.add_widget(MDFlatButton(
+                text=f"Mesa {carrito.mesa} · {len(carrito)} items · ${carrito.total:.2f}",
+                size_hint_y=None,
+                height=dp(40),
+                on_release=lambda x, mesa=carrito.mesa: self._cambiar_mesa_confirm(mesa)
+            ))
+        
         input_mesa = MDTextField(
             hint_text="Número de mesa",
             text=self.mesa_actual,
@@ -373,55 +465,67 @@ class TomaPedidoScreen(MDScreen):
         self.dialog.open()
 
     def _cambiar_mesa_confirm(self, nueva_mesa):
-        """Confirmar cambio de mesa"""
+        """Confirmar cambio de mesa: el borrador actual se conserva y se abre el de la nueva"""
         if nueva_mesa and nueva_mesa.strip():
             self.mesa_actual = nueva_mesa.strip()
-            print(f"🔄 Mesa cambiada a: {self.mesa_actual}")
+            if self.pedido_service:
+                self.pedido_service.borradores.cambiar_mesa(self.mesa_actual)
+                self.actualizar_ui_pedido()
+            log.debug("🔄 Mesa cambiada a: %s", self.mesa_actual)
             self.dialog.dismiss()
 
     def confirmar_pedido(self):
         """Confirmar y guardar pedido"""
-        if not self.pedido_service or not self.pedido_service.pedido_temporal['items']:
+        if not self.pedido_service or not self.pedido_service.pedido_temporal:
             self.mostrar_dialogo_info("Agrega productos al pedido")
             return
         
+        producto_ids = [item.producto_id for item in self.pedido_service.pedido_temporal]
         try:
             empleado_id = self.obtener_empleado_actual()
             
-            # Crear pedido
-            pedido_id = self.pedido_service.crear_pedido(
+            # Crear pedido con sus items y total, reservando stock (una transacción)
+            pedido_id = self.pedido_service.crear_pedido_con_items(
                 self.mesa_actual, 
                 empleado_id, 
-                ""
+                self.pedido_service.pedido_temporal.items
             )
             
             if not pedido_id:
                 self.mostrar_dialogo_error("Error al crear pedido")
                 return
             
-            # Agregar items
-            for item in self.pedido_service.pedido_temporal['items']:
-                self.pedido_service.agregar_item_pedido(
-                    pedido_id,
-                    item['producto_id'],
-                    item['cantidad'],
-                    item['precio'],
-                    item.get('notas', '')
-                )
+            # Avisar al índice de mesas del cierre de cuenta
+            app = MDApp.get_running_app()
+            if getattr(app, 'mesa_service', None):
+                app.mesa_service.actualizar_pedido(pedido_id)
             
-            # Actualizar total
-            self.pedido_service._actualizar_total_pedido(pedido_id)
+            # Un ticket por estación (parrilla, barra...); si falla el pedido ya está guardado
+            if self.tickets_caja:
+                self.tickets_caja.enviar_a_cocina(pedido_id)
             
             # Limpiar y confirmar
             self.limpiar_pedido()
+            self.actualizar_stock_catalogo(producto_ids)
             self.mostrar_dialogo_info(f"✅ Pedido #{pedido_id} creado\nMesa {self.mesa_actual}")
             
-            print(f"✅ Pedido #{pedido_id} confirmado - Mesa {self.mesa_actual}")
+            log.info("✅ Pedido #%s confirmado - Mesa %s", pedido_id, self.mesa_actual)
             
+        except StockInsuficiente as e:
+            # Nada se guardó: el mesero ajusta el pedido con el stock real
+            if self.indice_catalogo:
+                self.indice_catalogo.actualizar_stock({f['producto_id']: f['disponible'] for f in e.faltantes})
+            faltan = "\n".join(f"{f['nombre']}: pedido {f['pedido']}, quedan {f['disponible']}" for f in e.faltantes)
+            self.mostrar_dialogo_info(f"Stock insuficiente\n{faltan}")
         except Exception as e:
-            print(f"❌ Error confirmando pedido: {e}")
+            log.error("❌ Error confirmando pedido: %s", e)
             self.mostrar_dialogo_error("Error al confirmar")
 
+    def actualizar_stock_catalogo(self, producto_ids):
+        """Refrescar en la caché del catálogo el stock de los productos recién pedidos"""
+        if self.indice_catalogo and self.stock_service and producto_ids:
+            self.indice_catalogo.actualizar_stock(self.stock_service.disponibilidad(producto_ids))
+
     def limpiar_pedido(self):
         """Limpiar pedido temporal"""
         if self.pedido_service:
@@ -521,7 +625,7 @@ class OrderItemPro(MDCard):
     item_cantidad = NumericProperty(1)
     item_precio = NumericProperty(0.0)
     item_subtotal = NumericProperty(0.0)
-    item_data = DictProperty({})
+    item_data = ObjectProperty(None)
     pedido_screen = ObjectProperty(None)
     
     def __init__(self, **kwargs):
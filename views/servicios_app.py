@@ -0,0 +1,53 @@
+# views/servicios_app.py - ADAPTADOR ENTRE PANTALLAS Y SERVICIOS
+"""
+Las pantallas no construyen servicios: piden el contenedor de la app.
+
+    from views.servicios_app import servicios_app
+    self.caja_service = servicios_app().caja
+
+Si la pantalla se usa fuera de POSApp (pruebas de una sola pantalla,
+main_test.py) se crea un contenedor propio del proceso.
+
+Con servidor central (POS_API_URL) las pantallas pueden suscribirse a los
+eventos de pedido en vez de refrescar por intervalos; el callback se ejecuta
+en el hilo de Kivy.
+"""
+from typing import Callable, Dict
+from kivy.app import App
+from kivy.clock import Clock
+from services.contenedor import ContenedorServicios
+
+_contenedor_local = None
+_envolturas: Dict[Callable, Callable] = {}
+
+
+def servicios_app() -> ContenedorServicios:
+    """Contenedor de servicios de la app en ejecución"""
+    global _contenedor_local
+    app = App.get_running_app()
+    servicios = getattr(app, 'servicios', None)
+    if servicios is not None:
+        return servicios
+    if _contenedor_local is None:
+        _contenedor_local = ContenedorServicios()
+    return _contenedor_local
+
+
+def suscribir_eventos(callback: Callable[[dict], None]) -> bool:
+    """Recibir eventos del servidor en el hilo de Kivy; False si no hay servidor central"""
+    servicios = servicios_app()
+    if not servicios.remoto:
+        return False
+
+    def en_hilo_ui(evento):
+        Clock.schedule_once(lambda dt: callback(evento))
+
+    _envolturas[callback] = en_hilo_ui
+    servicios.api.suscribir(en_hilo_ui)
+    return True
+
+
+def desuscribir_eventos(callback: Callable[[dict], None]):
+    envoltura = _envolturas.pop(callback, None)
+    if envoltura is not None:
+        servicios_app().api.desuscribir(envoltura)